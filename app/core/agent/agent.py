@@ -8,6 +8,7 @@ from app.core.model.job import Job
 from app.core.model.message import AgentMessage, GraphMessage, MessageType, WorkflowMessage
 from app.core.reasoner.reasoner import Reasoner
 from app.core.service.artifact_service import ArtifactService
+from app.core.service.job_event_service import JobEventService
 from app.core.service.job_service import JobService
 from app.core.service.message_service import MessageService
 from app.core.workflow.workflow import Workflow
@@ -67,6 +68,7 @@ class Agent(ABC):
         self._message_service: MessageService = MessageService.instance
         self._job_service: JobService = JobService.instance
         self._artifact_service: ArtifactService = ArtifactService.instance
+        self._job_event_service: JobEventService = JobEventService.instance
 
     def get_id(self) -> str:
         """Get the unique identifier of the agent."""
@@ -2,6 +2,7 @@ import traceback
 from typing import List, cast
 
 from app.core.agent.agent import Agent
+from app.core.common.cancellation import JobCancelledError
 from app.core.common.system_env import SystemEnv
 from app.core.common.type import JobStatus, WorkflowStatus
 from app.core.model.job import SubJob
@@ -89,6 +90,24 @@ class Expert(Agent):
                 reasoner=self._reasoner,
                 workflow_messages=workflow_messages,
                 lesson=agent_message.get_lesson(),
+                cancellation_token=agent_message.get_cancellation_token(),
+            )
+        except JobCancelledError as e:
+            # the job graph is stopped or failed, so the job is not retried
+            # color: orange
+            print(f"\033[38;5;208m[Warning]: Job {job.id} is cancelled: {str(e)}\033[0m")
+            workflow_message = WorkflowMessage(
+                job_id=job.id,
+                payload={
+                    "scratchpad": f"The current job {job.id} is cancelled: {str(e)}",
+                    "status": WorkflowStatus.EXECUTION_ERROR,
+                    "evaluation": "The job graph is stopped or failed.",
+                    "lesson": "",
+                },
+            )
+            self._message_service.save_message(message=workflow_message)
+            return self.save_output_agent_message(
+                job=job, workflow_message=workflow_message, lesson=str(e)
             )
         except Exception as e:
             workflow_message = WorkflowMessage(
@@ -1,7 +1,7 @@
-from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 import json
-import time
-from typing import Dict, List, Optional, Set, Union
+from typing import Deque, Dict, List, Optional, Set, Union
 
 import networkx as nx  # type: ignore
 
@@ -11,7 +11,7 @@ from app.core.agent.expert import Expert
 from app.core.agent.leader_state import LeaderState
 from app.core.common.async_func import run_in_thread
 from app.core.common.system_env import SystemEnv
-from app.core.common.type import ChatMessageRole, JobStatus, WorkflowStatus
+from app.core.common.type import ChatMessageRole, JobEventType, JobStatus, WorkflowStatus
 from app.core.common.util import parse_jsons
 from app.core.model.job import Job, SubJob
 from app.core.model.job_graph import JobGraph
@@ -21,6 +21,7 @@ from app.core.prompt.job_decomposition import (
     TASK_AND_PROFILE_PROMPT,
     subjob_required_keys,
 )
+from app.core.tracer.tracer import Tracer, trace_span
 
 
 class Leader(Agent):
@@ -31,10 +32,13 @@ class Leader(Agent):
         agent_config: AgentConfig,
         id: Optional[str] = None,
         leader_state: Optional[LeaderState] = None,
+        max_concurrency: Optional[int] = None,
     ):
         super().__init__(agent_config=agent_config, id=id)
         # self._workflow of the leader is used to decompose the job
         self._leader_state: LeaderState = leader_state or BuiltinLeaderState()
+        # the max number of the subjobs of a job graph executed concurrently
+        self._max_concurrency: int = max(1, max_concurrency or SystemEnv.LEADER_MAX_CONCURRENCY)
 
     def execute(self, agent_message: AgentMessage, retry_count: int = 0) -> JobGraph:
         """Decompose the original job into subjobs.
@@ -295,20 +299,26 @@ class Leader(Agent):
                 f"{original_job_result.status.value}."
             )
 
-        # decompose the job into decomposed job graph
-        decomposed_job_graph: JobGraph = self.execute(
-            agent_message=AgentMessage(
-                job_id=original_job.id,
-            )
-        )
+        with trace_span("leader.execute_original_job", job_id=original_job.id):
+            # decompose the job into decomposed job graph
+            with trace_span("leader.decompose", job_id=original_job.id) as span:
+                decomposed_job_graph: JobGraph = self.execute(
+                    agent_message=AgentMessage(
+                        job_id=original_job.id,
+                    )
+                )
+                span.set_attribute("subjob_count", len(decomposed_job_graph.vertices()))
 
-        # update the decomposed job graph in the job service
-        self._job_service.replace_subgraph(
-            original_job_id=original_job.id, new_subgraph=decomposed_job_graph
-        )
+            # update the decomposed job graph in the job service
+            self._job_service.replace_subgraph(
+                original_job_id=original_job.id, new_subgraph=decomposed_job_graph
+            )
+            self._publish_subjobs_created(
+                original_job_id=original_job.id, job_graph=decomposed_job_graph
+            )
 
-        # execute the decomposed job graph
-        self.execute_job_graph(original_job_id=original_job.id)
+            # execute the decomposed job graph
+            self.execute_job_graph(original_job_id=original_job.id)
 
     def execute_job_graph(self, original_job_id: str) -> None:
         """Execute the job graph with dependency-based parallel execution.
@@ -316,6 +326,15 @@ class Leader(Agent):
         Jobs are represented in a directed graph (job_graph) where edges define dependencies.
         Please make sure the job graph is a directed acyclic graph (DAG).
 
+        The scheduling is event-driven: each pending job keeps an in-degree counter of its
+        unfinished predecessors, which is decreased when a predecessor completes. A job is
+        dispatched as soon as its counter drops to zero, and the leader blocks on the completion
+        of the running jobs instead of polling them. At most `max_concurrency` jobs of the job
+        graph run at the same time.
+
+        Once the job graph is stopped or failed, its cancellation token is cancelled, which aborts
+        the running jobs, and no more jobs are dispatched.
+
         Args:
             original_job_id (str): The original job id.
         """
@@ -325,74 +344,89 @@ class Leader(Agent):
 
         job_graph: JobGraph = self._job_service.get_job_graph(original_job_id)
         pending_job_ids: Set[str] = set(job_graph.vertices())
-        running_jobs: Dict[str, Future] = {}  # job_id -> Concurrent Future
+        running_jobs: Dict[Future, str] = {}  # Concurrent Future -> job_id
         expert_results: Dict[str, WorkflowMessage] = {}  # job_id -> WorkflowMessage (expert result)
         job_inputs: Dict[str, AgentMessage] = {}  # job_id -> AgentMessage (input)
 
-        with ThreadPoolExecutor() as executor:
-            while pending_job_ids or running_jobs:
-                # find jobs that are ready to execute (all dependencies completed)
-                ready_job_ids: Set[str] = set()
-                for job_id in pending_job_ids:
-                    # check if all predecessors are completed
-                    all_predecessors_completed = all(
-                        pred not in pending_job_ids and pred not in running_jobs
-                        for pred in job_graph.predecessors(job_id)
-                    )
-                    if all_predecessors_completed:
-                        # form the agent message to the agent
+        # job_id -> number of the unfinished (pending or running) predecessors
+        in_degrees: Dict[str, int] = self._count_in_degrees(
+            job_graph=job_graph, unfinished_job_ids=pending_job_ids
+        )
+        ready_job_ids: Deque[str] = deque(
+            job_id for job_id in job_graph.vertices() if in_degrees.get(job_id, None) == 0
+        )
+
+        cancellation_token = self._job_service.get_cancellation_token(original_job_id)
+        try:
+            with ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+                while pending_job_ids or running_jobs:
+                    # execute ready jobs (all dependencies completed), bounded by the concurrency,
+                    # until the job graph is cancelled
+                    while (
+                        ready_job_ids
+                        and len(running_jobs) < self._max_concurrency
+                        and not cancellation_token.cancelled
+                    ):
+                        job_id = ready_job_ids.popleft()
+
+                        # form the agent message to the agent, and keep the lesson learned from the
+                        # previous execution (if any)
                         job: SubJob = self._job_service.get_subjob(job_id)
                         pred_messages: List[WorkflowMessage] = [
                             expert_results[pred_id] for pred_id in job_graph.predecessors(job_id)
                         ]
-                        job_inputs[job.id] = AgentMessage(
-                            job_id=job.id, workflow_messages=pred_messages
+                        previous_input = job_inputs.get(job_id, None)
+                        job_inputs[job_id] = AgentMessage(
+                            job_id=job_id,
+                            workflow_messages=pred_messages,
+                            lesson=previous_input.get_lesson() if previous_input else None,
+                            cancellation_token=cancellation_token,
                         )
-                        ready_job_ids.add(job_id)
-
-                # execute ready jobs
-                for job_id in ready_job_ids:
-                    expert_id = self._job_service.get_subjob(job_id).expert_id
-                    assert expert_id, "The subjob is not assigned to an expert."
-                    expert = self.state.get_expert_by_id(expert_id=expert_id)
-                    # submit the job to the executor
-                    running_jobs[job_id] = executor.submit(
-                        self._execute_job, expert, job_inputs[job_id]
-                    )
-                    pending_job_ids.remove(job_id)
-
-                # if there are no running jobs but still pending jobs, it may be a deadlock
-                if not running_jobs and pending_job_ids:
-                    raise ValueError(
-                        "Deadlock detected or invalid job graph: some jobs cannot be executed due "
-                        "to dependencies."
-                    )
-
-                # check for completed jobs
-                completed_job_ids = []
-                for job_id, future in running_jobs.items():
-                    if future.done():
-                        completed_job_ids.append(job_id)
-
-                # process completed jobs
-                for completed_job_id in completed_job_ids:
-                    future = running_jobs[completed_job_id]
 
-                    # get the agent result
-                    agent_result: AgentMessage = future.result()
-
-                    if (
-                        agent_result.get_workflow_result_message().status
-                        == WorkflowStatus.INPUT_DATA_ERROR
-                    ):
-                        # TODO: how to handle the concurrent situations?
-                        pending_job_ids.add(completed_job_id)
-                        predecessors = list(job_graph.predecessors(completed_job_id))
-
-                        # add the predecessors back to pending jobs
-                        pending_job_ids.update(predecessors)
+                        assert job.expert_id, "The subjob is not assigned to an expert."
+                        expert = self.state.get_expert_by_id(expert_id=job.expert_id)
+                        # submit the job to the executor
+                        future = executor.submit(
+                            Tracer().propagate(self._execute_job), expert, job_inputs[job_id]
+                        )
+                        running_jobs[future] = job_id
+                        pending_job_ids.remove(job_id)
+                        del in_degrees[job_id]
+
+                    # if there are no running jobs but still pending jobs, it may be a deadlock
+                    if not running_jobs:
+                        if pending_job_ids and not cancellation_token.cancelled:
+                            raise ValueError(
+                                "Deadlock detected or invalid job graph: some jobs cannot be "
+                                "executed due to dependencies."
+                            )
+                        break
+
+                    # block until at least one of the running jobs is completed
+                    completed_futures, _ = wait(running_jobs.keys(), return_when=FIRST_COMPLETED)
+
+                    # process completed jobs
+                    job_graph_changed = False
+                    for future in completed_futures:
+                        completed_job_id = running_jobs.pop(future)
+
+                        # get the agent result
+                        agent_result: AgentMessage = future.result()
+                        if cancellation_token.cancelled:
+                            # drain the running jobs, without rescheduling the job graph
+                            continue
+
+                        if (
+                            agent_result.get_workflow_result_message().status
+                            == WorkflowStatus.INPUT_DATA_ERROR
+                        ):
+                            # TODO: how to handle the concurrent situations?
+                            pending_job_ids.add(completed_job_id)
+                            predecessors = job_graph.predecessors(completed_job_id)
+
+                            # add the predecessors back to pending jobs
+                            pending_job_ids.update(predecessors)
 
-                        if predecessors:
                             for pred_id in predecessors:
                                 # remove the job result
                                 if pred_id in expert_results:
@@ -408,59 +442,112 @@ class Leader(Agent):
                                 assert lesson is not None
                                 input_agent_message.add_lesson(lesson)
                                 job_inputs[pred_id] = input_agent_message
+                            job_graph_changed = True
+
+                        elif (
+                            agent_result.get_workflow_result_message().status
+                            == WorkflowStatus.JOB_TOO_COMPLICATED_ERROR
+                        ):
+                            # TODO: how to handle the concurrent situations?
+                            old_job_graph: JobGraph = JobGraph()
+                            old_job_graph.add_vertex(completed_job_id)
+
+                            # reexecute the subjob with a new sub-subjob
+                            new_job_graqph: JobGraph = self.execute(agent_message=agent_result)
+                            self._job_service.replace_subgraph(
+                                original_job_id=original_job_id,
+                                new_subgraph=new_job_graqph,
+                                old_subgraph=old_job_graph,
+                            )
+                            self._publish_subjobs_created(
+                                original_job_id=original_job_id, job_graph=new_job_graqph
+                            )
+
+                            # get the newest job graph
+                            job_graph = self._job_service.get_job_graph(original_job_id)
+
+                            # save the old subjob result
+                            expert_results[completed_job_id] = (
+                                agent_result.get_workflow_result_message()
+                            )
 
-                    elif (
-                        agent_result.get_workflow_result_message().status
-                        == WorkflowStatus.JOB_TOO_COMPLICATED_ERROR
-                    ):
-                        # TODO: how to handle the concurrent situations?
-                        old_job_graph: JobGraph = JobGraph()
-                        old_job_graph.add_vertex(completed_job_id)
-
-                        # reexecute the subjob with a new sub-subjob
-                        new_job_graqph: JobGraph = self.execute(agent_message=agent_result)
-                        self._job_service.replace_subgraph(
-                            original_job_id=original_job_id,
-                            new_subgraph=new_job_graqph,
-                            old_subgraph=old_job_graph,
+                            # add the new subjobs to the pending jobs
+                            pending_job_ids.update(new_job_graqph.vertices())
+                            job_graph_changed = True
+
+                        else:
+                            expert_results[completed_job_id] = (
+                                agent_result.get_workflow_result_message()
+                            )
+
+                            # notify the successors that one of their dependencies is completed
+                            for succ_id in job_graph.successors(completed_job_id):
+                                if succ_id in in_degrees:
+                                    in_degrees[succ_id] -= 1
+                                    if in_degrees[succ_id] == 0:
+                                        ready_job_ids.append(succ_id)
+
+                    if job_graph_changed:
+                        # the dependencies have been rewired, so recount the in-degrees
+                        in_degrees = self._count_in_degrees(
+                            job_graph=job_graph,
+                            unfinished_job_ids=pending_job_ids | set(running_jobs.values()),
+                            pending_job_ids=pending_job_ids,
                         )
-
-                        # get the newest job graph
-                        job_graph = self._job_service.get_job_graph(original_job_id)
-
-                        # remove the old subjob from the pending jobs
-                        del running_jobs[completed_job_id]
-
-                        # save the old subjob result
-                        expert_results[completed_job_id] = (
-                            agent_result.get_workflow_result_message()
+                        ready_job_ids = deque(
+                            job_id
+                            for job_id in job_graph.vertices()
+                            if in_degrees.get(job_id, None) == 0
                         )
 
-                        for new_subjob_id in new_job_graqph.vertices():
-                            # add the new subjobs to the pending jobs
-                            pending_job_ids.add(new_subjob_id)
-                            # add the inputs for the new head subjobs
-                            if not job_graph.predecessors(new_subjob_id):
-                                pred_messages = [
-                                    expert_results[pred_id]
-                                    for pred_id in job_graph.predecessors(new_subjob_id)
-                                ]
-                                job_inputs[new_subjob_id] = AgentMessage(
-                                    job_id=new_subjob_id,
-                                    workflow_messages=pred_messages,
-                                )
-
-                    else:
-                        expert_results[completed_job_id] = (
-                            agent_result.get_workflow_result_message()
-                        )
+            # assemble the result of the original job, which notifies the waiters of the job. The
+            # result of a cancelled job graph is saved by the leader which cancelled it
+            if not cancellation_token.cancelled:
+                self._job_service.query_original_job_result(original_job_id=original_job_id)
+        finally:
+            self._job_service.release_cancellation_token(original_job_id)
+
+    def _publish_subjobs_created(self, original_job_id: str, job_graph: JobGraph) -> None:
+        """Publish the subjobs of the job graph, which are created by the decomposition."""
+        if not self._job_event_service.has_subscribers(original_job_id):
+            return
+        for subjob_id in job_graph.vertices():
+            subjob: SubJob = self._job_service.get_subjob(subjob_id)
+            self._job_event_service.publish_event(
+                JobEventType.SUBJOB_CREATED,
+                job=subjob,
+                payload={
+                    "goal": subjob.goal,
+                    "assigned_expert_name": subjob.assigned_expert_name,
+                    "dependencies": job_graph.predecessors(subjob_id),
+                },
+            )
 
-                    # remove from running jobs
-                    del running_jobs[completed_job_id]
+    def _count_in_degrees(
+        self,
+        job_graph: JobGraph,
+        unfinished_job_ids: Set[str],
+        pending_job_ids: Optional[Set[str]] = None,
+    ) -> Dict[str, int]:
+        """Count the unfinished predecessors of each pending job.
 
-                # if no jobs are ready but some are pending, wait a bit
-                if not completed_job_ids and running_jobs:
-                    time.sleep(0.5)
+        Args:
+            job_graph (JobGraph): The job graph.
+            unfinished_job_ids (Set[str]): The ids of the pending and the running jobs.
+            pending_job_ids (Optional[Set[str]]): The ids of the pending jobs. Defaults to the
+                unfinished jobs.
+
+        Returns:
+            Dict[str, int]: The in-degree counter of each pending job.
+        """
+        if pending_job_ids is None:
+            pending_job_ids = unfinished_job_ids
+        return {
+            job_id: sum(
+                1 for pred_id in job_graph.predecessors(job_id) if pred_id in unfinished_job_ids
+            )
+            for job_id in pending_job_ids
+        }
 
     def stop_job_graph(self, job_id: str, stop_info: str) -> None:
         """Stop the job graph.
@@ -469,8 +556,8 @@ class Leader(Agent):
         entire current job as `STOPPED`, while other jobs without results (including subjobs and
         original jobs) are marked as `STOPPED`.
 
-        Note that the running jobs are not stopped, since they are already set up in the
-        ThreadPoolExecutor. The running jobs will be marked as `STOPPED` when they are finished.
+        The running jobs are cancelled cooperatively: their in-flight model requests and tool calls
+        are aborted, and the job graph dispatches no more jobs.
         """
         # get the original job
         try:
@@ -493,6 +580,9 @@ class Leader(Agent):
             original_job_result.status = JobStatus.STOPPED
             self._job_service.save_job_result(job_result=original_job_result)
 
+        # abort the running jobs, once their statuses are final
+        self._job_service.cancel_job_graph(original_job_id=original_job.id, reason=stop_info)
+
     def fail_job_graph(self, job_id: str, error_info: str) -> None:
         """Fail the job graph.
 
@@ -532,6 +622,9 @@ class Leader(Agent):
             original_job_result.status = JobStatus.FAILED
             self._job_service.save_job_result(job_result=original_job_result)
 
+            # abort the other running jobs, once their statuses are final
+            self._job_service.cancel_job_graph(original_job_id=original_job.id, reason=error_info)
+
     def recover_original_job(self, original_job_id: str) -> None:
         """Reconver the original job.
 
@@ -613,12 +706,21 @@ class Leader(Agent):
             )
             self._message_service.save_message(message=error_hybrid_message)
 
+        self._job_event_service.publish_event(
+            JobEventType.FINAL_ANSWER, job=original_job, payload={"answer": error_payload}
+        )
+
         # color: red
         print(f"\033[38;5;196m[ERROR]: {error_payload}\033[0m")
 
     def _execute_job(self, expert: Expert, agent_message: AgentMessage) -> AgentMessage:
         """Dispatch the job to the expert, and handle the result."""
-        agent_result_message: AgentMessage = expert.execute(agent_message=agent_message)
+        with trace_span(
+            "expert.execute",
+            job_id=agent_message.get_job_id(),
+            expert=expert.get_profile().name,
+        ):
+            agent_result_message: AgentMessage = expert.execute(agent_message=agent_message)
         workflow_result: WorkflowMessage = agent_result_message.get_workflow_result_message()
 
         if workflow_result.status == WorkflowStatus.SUCCESS:
@@ -651,7 +753,8 @@ class Leader(Agent):
             replaced_job_graph.add_vertex(subjob.id)
 
             # reexecute the subjob with a new sub-subjob
-            new_job_graqph: JobGraph = self.execute(agent_message=agent_result_message)
+            with trace_span("leader.decompose", job_id=subjob.id):
+                new_job_graqph: JobGraph = self.execute(agent_message=agent_result_message)
             self._job_service.replace_subgraph(
                 original_job_id=subjob.id,
                 new_subgraph=new_job_graqph,
@@ -1,7 +1,12 @@
 import asyncio
 import concurrent.futures
 import threading
-from typing import Any
+from typing import Any, Awaitable, Coroutine, Optional, TypeVar
+
+from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
+
+T = TypeVar("T")
 
 
 def run_async_function(
@@ -9,11 +14,10 @@ def run_async_function(
     *args: Any,
     **kwargs: Any,
 ):
-    """Run an async function in a sync context by managing event loops intelligently.
+    """Run an async function in a sync context, on a long-lived event loop.
 
-    This is particularly useful when you need to call async functions from synchronous code,
-    or when dealing with nested event loops (e.g., calling async code from within async code
-    that's being run synchronously).
+    It is a shortcut of `EventLoopRunner().run(async_func(*args, **kwargs))`, kept for the
+    callers which pass the async function and its arguments separately.
 
     Args:
         async_func: An async function (coroutine function) to execute. This should be a
@@ -27,39 +31,7 @@ def run_async_function(
     Raises:
         Exception: Any exception raised by the async function is re-raised to the caller.
     """
-    try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # use a thread pool to run the async function, in the case of nested event loops
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-
-                def run_in_new_loop():
-                    # create a new event loop
-                    new_loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(new_loop)
-                    try:
-                        return new_loop.run_until_complete(async_func(*args, **kwargs))
-                    finally:
-                        new_loop.close()
-
-                # submit the task to the thread pool and wait for the result
-                future = executor.submit(run_in_new_loop)
-                return future.result()
-        else:
-            # if the loop exists but is not running, use it directly
-            return loop.run_until_complete(async_func(*args, **kwargs))
-    except RuntimeError:
-        # create a new one, if no event loop is found
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(async_func(*args, **kwargs))
-        except Exception as e:
-            # re-raise the exception to show the error from run_async_function,
-            # but hide the traceback from this helper function.
-            raise e
-        finally:
-            loop.close()
+    return EventLoopRunner().run(async_func(*args, **kwargs))
 
 
 def run_in_thread(func, *args, **kwargs):
@@ -100,3 +72,143 @@ def run_in_thread(func, *args, **kwargs):
 
     # return thread object to allow caller to choose to thread.join and wait
     return thread
+
+
+class BackgroundEventLoop:
+    """An event loop running forever in a daemon thread.
+
+    Async resources are bound to the event loop which created them (e.g. MCP sessions), so they
+    can not outlive the short-lived loops created by `run_async_function`. By creating and using
+    such resources only in a background event loop, they can be shared by callers living in any
+    thread or event loop.
+
+    The loop and its thread are started lazily, and restarted if the loop has been stopped.
+    """
+
+    def __init__(self, name: str = "background-event-loop"):
+        self._name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Get the background event loop, starting it if it is not running."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._run_forever, args=(loop,), name=self._name, daemon=True
+                )
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+            return self._loop
+
+    def is_current(self) -> bool:
+        """Check whether the caller is running in the background event loop."""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """Schedule the coroutine in the background event loop, and return its future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def run_async(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run the coroutine in the background event loop, and await it from the current loop.
+
+        Cancelling the caller also cancels the coroutine in the background event loop.
+        """
+        if self.is_current():
+            return await coro
+        result: Awaitable[T] = asyncio.wrap_future(self.submit(coro))
+        return await result
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run the coroutine in the background event loop, and block until it completes."""
+        if self.is_current():
+            coro.close()
+            raise RuntimeError("Can not block the background event loop on itself.")
+        return self.submit(coro).result(timeout=timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the background event loop, and wait for its thread to exit."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+
+    @staticmethod
+    def _run_forever(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+
+class _ThreadEventLoop:
+    """The persistent event loop of a thread, closed when the thread exits."""
+
+    def __init__(self):
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+
+    def __del__(self):
+        if not self.loop.is_closed() and not self.loop.is_running():
+            self.loop.close()
+
+
+class EventLoopRunner(metaclass=Singleton):
+    """Runner of coroutines from sync code, on long-lived event loops.
+
+    Each thread owns one event loop, which is created on its first call and reused by all the
+    later calls of the thread (e.g. every operator of a job), instead of setting up and tearing
+    down a new event loop per call. So the async resources bound to the loop (e.g. HTTP
+    clients) can be reused across the calls.
+
+    A call from inside a running event loop (e.g. sync code called by a coroutine) can not
+    block that loop to run the coroutine, so the coroutine is handed to a worker thread of the
+    runner, which runs it on the persistent event loop of the worker.
+    """
+
+    def __init__(self):
+        self._thread_local = threading.local()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, SystemEnv.EVENT_LOOP_RUNNER_MAX_WORKERS),
+            thread_name_prefix="event-loop-runner",
+        )
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """Schedule the coroutine on the event loop of a worker thread, and return its future."""
+        return self._executor.submit(self._run_in_thread_loop, coro)
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run the coroutine, and block until it completes.
+
+        The coroutine runs on the event loop of the calling thread, or is submitted to a worker
+        thread if the calling thread is already running an event loop.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self._run_in_thread_loop(coro)
+        return self.submit(coro).result()
+
+    def _run_in_thread_loop(self, coro: Coroutine[Any, Any, T]) -> T:
+        thread_event_loop: Optional[_ThreadEventLoop] = getattr(
+            self._thread_local, "event_loop", None
+        )
+        if thread_event_loop is None or thread_event_loop.loop.is_closed():
+            thread_event_loop = _ThreadEventLoop()
+            self._thread_local.event_loop = thread_event_loop
+
+        asyncio.set_event_loop(thread_event_loop.loop)
+        return thread_event_loop.loop.run_until_complete(coro)
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class JobCancelledError(Exception):
+    """The execution of a job is cancelled, since its job graph is stopped or failed."""
+
+
+class CancellationToken:
+    """Cooperative cancellation token of the execution of a job graph.
+
+    The token is cancelled by the leader when the job graph is stopped or failed, and is passed
+    down to the experts, the workflows, the operators and the reasoners, which check it between
+    the steps of the execution. The in-flight awaitables run by `run` (e.g. the LLM requests and
+    the tool calls) are cancelled as soon as the token is cancelled, from any thread.
+
+    Note that a sync function running in a worker thread can not be interrupted, so it is
+    abandoned instead, and its result is discarded.
+    """
+
+    def __init__(self):
+        self._event: threading.Event = threading.Event()
+        self._reason: Optional[str] = None
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        """Check if the token is cancelled."""
+        return self._event.is_set()
+
+    @property
+    def reason(self) -> Optional[str]:
+        """Get the reason of the cancellation."""
+        return self._reason
+
+    def cancel(self, reason: str = "The job is cancelled.") -> None:
+        """Cancel the token, and the awaitables run by the token. Cancelling twice is a no-op."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def raise_if_cancelled(self) -> None:
+        """Raise JobCancelledError if the token is cancelled."""
+        if self._event.is_set():
+            raise JobCancelledError(self._reason)
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call the callback once the token is cancelled (or now, if it is already cancelled).
+
+        Returns:
+            Callable[[], None]: The function to remove the callback.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        """Await the awaitable, and cancel it once the token is cancelled.
+
+        Raises:
+            JobCancelledError: If the token is cancelled before the awaitable completes.
+        """
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(awaitable)
+
+        def cancel_task() -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(task.cancel)
+
+        remove_callback = self.add_callback(cancel_task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            # the caller itself is cancelled, instead of the token
+            current_task = asyncio.current_task()
+            if not self._event.is_set() or (current_task and current_task.cancelling()):
+                raise
+            raise JobCancelledError(self._reason) from None
+        finally:
+            remove_callback()
+
+    def _remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
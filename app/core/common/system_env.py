@@ -22,10 +22,26 @@ _env_vars: Dict[str, Tuple[Type, Any]] = {
     "MAX_TOKENS": (int, 1048576),
     "MAX_COMPLETION_TOKENS": (int, 65535),
     "MAX_REASONING_ROUNDS": (int, 20),
+    "ENABLE_THINKER_DELIVERABLE": (bool, False),  # let the thinker deliver without an actor round
+    "MOCK_LLM_SCRIPT_PATH": (str, None),  # YAML/JSON script of the MOCK model platform
+    "MOCK_LLM_LATENCY": (float, 0.0),  # simulated seconds per MOCK model call
+    "MOCK_LLM_TOKENS_PER_SECOND": (float, None),  # simulated MOCK generation speed, if set
+    "ENABLE_LLM_STREAMING": (bool, False),  # stream the output, and call functions early
+    "ENABLE_PROMPT_CACHING": (bool, True),  # mark the stable prompt prefix as cacheable
+    "LLM_MAX_CONCURRENCY_PER_PROVIDER": (int, 16),  # max in-flight requests per LLM provider
+    "LLM_MAX_REQUESTS_PER_MINUTE_PER_PROVIDER": (int, None),  # unlimited if not set
+    "ENABLE_CONCURRENT_FUNCTION_CALLING": (bool, False),  # run function calls of a turn together
+    "MAX_CONCURRENT_FUNCTION_CALLS": (int, 4),
+    "EVENT_LOOP_RUNNER_MAX_WORKERS": (int, 32),  # threads running coroutines for nested calls
     "PRINT_REASONER_MESSAGES": (bool, True),
     "PRINT_SYSTEM_PROMPT": (bool, True),
     "PRINT_REASONER_OUTPUT": (bool, True),
     "LIFE_CYCLE": (int, 3),
+    "JOB_GRAPH_CACHE_SIZE": (int, 256),  # max job graphs of the original jobs kept in memory
+    "LEADER_MAX_CONCURRENCY": (int, 8),  # max subjobs of a job graph executed concurrently
+    "JOB_EVENT_BUFFER_SIZE": (int, 256),  # max buffered events per job event subscriber
+    "JOB_EVENT_PUBLISH_TIMEOUT": (float, 1.0),  # seconds to wait for a full subscriber buffer
+    "JOB_EVENT_HEARTBEAT_INTERVAL": (float, 15.0),  # seconds between keep-alives of idle streams
     "MAX_RETRY_COUNT": (int, 3),
     "DATABASE_URL": (str, f"sqlite:///{os.path.expanduser('~')}/.chat2graph/system/chat2graph.db"),
     "DATABASE_POOL_SIZE": (int, 50),
@@ -42,6 +58,7 @@ _env_vars: Dict[str, Tuple[Type, Any]] = {
     "EMBEDDING_MODEL_APIKEY": (str, None),
     "GLOBAL_KNOWLEDGE_BASE_NAME": (str, "Global Knowledge Base"),
     "KNOWLEDGE_STORE_TYPE": (KnowledgeStoreType, KnowledgeStoreType.VECTOR),
+    "KNOWLEDGE_STORE_CACHE_SIZE": (int, 16),  # max knowledge store instances kept in memory
     "TUGRAPH_NAME_PREFIX": (str, "Tu_"),
     "GRAPH_KNOWLEDGE_STORE_USERNAME": (str, "admin"),
     "GRAPH_KNOWLEDGE_STORE_PASSWORD": (str, "73@TuGraph"),
@@ -53,9 +70,29 @@ _env_vars: Dict[str, Tuple[Type, Any]] = {
     "GRAPH_DB_USERNAME": (str, None),
     "GRAPH_DB_PASSWORD": (str, None),
     "GRAPH_DB_NAME": (str, "Default Graph DB"),
+    "GRAPH_DB_MAX_CONNECTION_POOL_SIZE": (int, 50),
+    "GRAPH_DB_CONNECTION_ACQUISITION_TIMEOUT": (float, 60.0),
+    "GRAPH_DB_MAX_CONNECTION_LIFETIME": (int, 3600),
+    "GRAPH_DB_HEALTH_CHECK_INTERVAL": (int, 60),  # seconds between driver health checks
+    "MCP_CONNECTION_POOL_SIZE": (int, 4),  # max warm connections kept per MCP tool group
+    "MCP_CONNECTION_IDLE_TIMEOUT": (float, 300.0),  # seconds before an idle connection is closed
+    "MCP_CONNECTION_LEASE_TIMEOUT": (float, 120.0),  # seconds to wait for a free connection
+    "MCP_CONNECTION_HEALTH_CHECK_INTERVAL": (float, 30.0),  # seconds between idle pings
+    "ENABLE_TRACING": (bool, False),  # record the spans of the job executions
+    "TRACING_EXPORTERS": (str, "MEMORY"),  # comma-separated span exporters: JSONL, MEMORY, OTLP
+    "TRACING_JSONL_PATH": (str, f"{os.path.expanduser('~')}/.chat2graph/system/traces.jsonl"),
+    "TRACING_BUFFER_SIZE": (int, 4096),  # max recent spans kept by the in-memory exporter
+    "TRACING_OTLP_ENDPOINT": (str, "http://localhost:4317"),  # OTLP/gRPC collector endpoint
     "SCHEMA_FILE_NAME": (str, "graph.db.schema.json"),
     "SCHEMA_FILE_ID": (str, "schema_file_id"),
     "LANGUAGE": (str, "en-US"),
+    "ENABLE_MEMORY_COMPACTION": (bool, False),  # summarize and truncate the reasoner history
+    "MEMORY_VERBATIM_ROUNDS": (int, 4),  # last reasoning rounds sent to the model verbatim
+    "MEMORY_MAX_HISTORY_TOKENS": (int, 32768),  # token budget of the history per model request
+    "MEMORY_MAX_FUNCTION_OUTPUT_TOKENS": (int, 2048),  # longer function outputs are truncated
+    "MEMORY_CACHE_SIZE": (int, 256),  # max jobs whose memories are kept in memory
+    "MEMORY_TTL": (float, 3600.0),  # seconds to keep the memories of a job since its last use
+    "ENABLE_MEMORY_SPILL": (bool, False),  # save the evicted reasoner memories to the database
     "ENABLE_MEMFUSE": (bool, False),  # enable MemFuse as agent memory module
     "PRINT_MEMORY_LOG": (bool, False),
     "MEMFUSE_BASE_URL": (str, "http://localhost:8765"),
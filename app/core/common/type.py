@@ -5,6 +5,7 @@ class ModelPlatformType(Enum):
     """Model platform type enum."""
 
     LITELLM = "LITELLM"
+    MOCK = "MOCK"  # replays the scripted responses, without calling any LLM
 
 
 class WorkflowPlatformType(Enum):
@@ -73,6 +74,18 @@ class JobStatus(Enum):
     STOPPED = "STOPPED"
 
 
+class JobEventType(Enum):
+    """Type of the events published during the execution of an original job."""
+
+    SUBJOB_CREATED = "SUBJOB_CREATED"
+    JOB_STATUS_CHANGED = "JOB_STATUS_CHANGED"
+    REASONER_MESSAGE_APPENDED = "REASONER_MESSAGE_APPENDED"
+    ARTIFACT_UPDATED = "ARTIFACT_UPDATED"
+    FINAL_ANSWER = "FINAL_ANSWER"
+    # the subscriber was too slow, and was dropped before the job reached a final status
+    SUBSCRIPTION_DROPPED = "SUBSCRIPTION_DROPPED"
+
+
 class FunctionCallStatus(Enum):
     """Status of a function call."""
 
@@ -137,3 +150,11 @@ class McpTransportType(Enum):
     SSE = "SSE"
     WEBSOCKET = "WEBSOCKET"
     STREAMABLE_HTTP = "STREAMABLE_HTTP"
+
+
+class SpanExporterType(Enum):
+    """Span exporter type enumeration"""
+
+    JSONL = "JSONL"
+    MEMORY = "MEMORY"
+    OTLP = "OTLP"
@@ -1,13 +1,76 @@
 from contextlib import contextmanager
-from typing import Any, Generator, Generic, List, Optional, Type, TypeVar
-
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Collection,
+    Generator,
+    Generic,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    cast,
+)
+
+from sqlalchemy import Table, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.orm import DeclarativeBase, Session as SqlAlchemySession
+from sqlalchemy.orm.util import identity_key
 
 from app.core.common.singleton import Singleton
 from app.core.dal.database import DbSession
+from app.core.tracer.tracer import trace_span
 
 T = TypeVar("T", bound=DeclarativeBase)
 
+# the session of the current unit of work, shared by the writes of all the DAOs
+_unit_of_work_session: ContextVar[Optional[SqlAlchemySession]] = ContextVar(
+    "unit_of_work_session", default=None
+)
+
+# the key of the written rows in the session info, which are expired in the read sessions
+# once the writes are committed: {(read session, model, id)}
+_WRITTEN_ROWS = "written_rows"
+
+
+@contextmanager
+def unit_of_work() -> Generator[SqlAlchemySession, None, None]:
+    """Batch the DAO reads and writes in the block into one transaction.
+
+    The DAOs use the session of the unit of work, instead of opening and committing a session
+    per write, and the session is committed when the block exits (or rolled back if it raises).
+    A nested unit of work joins the outer one.
+    """
+    session = _unit_of_work_session.get()
+    if session is not None:
+        yield session
+        return
+
+    session = DbSession(expire_on_commit=False)
+    token = _unit_of_work_session.set(session)
+    try:
+        with trace_span("db.unit_of_work"):
+            yield session
+            session.commit()
+        _expire_written_rows(session)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        _unit_of_work_session.reset(token)
+        session.close()
+
+
+def _expire_written_rows(session: SqlAlchemySession) -> None:
+    """Expire the committed rows cached by the read sessions, so they are reloaded on access."""
+    written_rows: Set[Tuple[SqlAlchemySession, type, str]] = session.info.pop(_WRITTEN_ROWS, set())
+    for read_session, model, id in written_rows:
+        obj = read_session.identity_map.get(identity_key(model, id))
+        if obj is not None:
+            read_session.expire(obj)
+
 
 class Dao(Generic[T], metaclass=Singleton):
     """Data Access Object"""
@@ -18,16 +81,23 @@ class Dao(Generic[T], metaclass=Singleton):
 
     @property
     def session(self) -> SqlAlchemySession:
-        """Get the session."""
-        return self._session
+        """Get the session, which is the session of the unit of work, if any."""
+        return _unit_of_work_session.get() or self._session
 
     @contextmanager
     def new_session(self) -> Generator[SqlAlchemySession, None, None]:
-        """Create a new session."""
-        session = DbSession()
-        try:
+        """Create a new session, or join the session of the unit of work, if any."""
+        session = _unit_of_work_session.get()
+        if session is not None:
             yield session
-            session.commit()
+            return
+
+        session = DbSession(expire_on_commit=False)
+        try:
+            with trace_span("db.write", table=getattr(self._model, "__tablename__", None)):
+                yield session
+                session.commit()
+            _expire_written_rows(session)
         except Exception:
             session.rollback()
             raise
@@ -39,19 +109,63 @@ class Dao(Generic[T], metaclass=Singleton):
         with self.new_session() as s:
             obj = self._model(**kwargs)
             s.add(obj)
-            s.commit()
+            if getattr(obj, "id", None) is None:
+                # generate the ID, which is returned to the caller
+                s.flush()
 
             assert hasattr(obj, "id") and obj.id is not None, (
-                "Object ID should not be None after commit"
+                "Object ID should not be None after flush"
             )
-            result = self.get_by_id(obj.id)
-            if result is None:
-                raise ValueError(f"Failed to create {self._model.__name__}")
-            return result
+            self._mark_written(s, obj.id, expire=False)
+        return obj
+
+    def upsert(self, **kwargs: Any) -> None:
+        """Insert an object, or update the existing object with the same ID, in one statement.
+
+        As in an ORM insert, the None values of the columns with server defaults (e.g. the
+        timestamps) are left out of the insert, so the database fills them. The update of an
+        existing object still writes them, so they can be set back to NULL.
+        """
+        with self.new_session() as s:
+            table = cast(Table, self._model.__table__)
+            primary_keys = [c.name for c in table.primary_key.columns]
+            inserts = {
+                k: v
+                for k, v in kwargs.items()
+                if v is not None or k not in table.c or table.c[k].server_default is None
+            }
+            updates = {k: v for k, v in kwargs.items() if k not in primary_keys}
+
+            dialect = s.get_bind().dialect.name
+            if dialect in ("sqlite", "postgresql"):
+                insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+                stmt = insert(table).values(**inserts)
+                if updates:
+                    stmt = stmt.on_conflict_do_update(index_elements=primary_keys, set_=updates)
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=primary_keys)
+                s.execute(stmt)
+            elif dialect in ("mysql", "mariadb"):
+                mysql_stmt = mysql.insert(table).values(**inserts)
+                s.execute(
+                    mysql_stmt.on_duplicate_key_update(
+                        **(updates or {k: mysql_stmt.inserted[k] for k in primary_keys})
+                    )
+                )
+            else:
+                s.merge(self._model(**kwargs))
+            self._mark_written(s, kwargs.get("id"))
 
     def get_by_id(self, id: str) -> Optional[T]:
         """Get an object by ID."""
-        return self.session.query(self._model).get(id)
+        return self.session.get(self._model, id)
+
+    def get_by_ids(self, ids: Collection[str]) -> List[T]:
+        """Get the objects by IDs, in one query. The missing IDs are skipped."""
+        if not ids:
+            return []
+        table = cast(Table, self._model.__table__)
+        return self.session.query(self._model).filter(table.c.id.in_(set(ids))).all()
 
     def filter_by(self, **kwargs: Any) -> List[T]:
         """Filter objects."""
@@ -66,21 +180,47 @@ class Dao(Generic[T], metaclass=Singleton):
         return self.session.query(self._model).count()
 
     def update(self, id: str, **kwargs: Any) -> T:
-        """Update an object."""
+        """Update an object, and return the updated object without reading it again."""
         kwargs.pop("id", None)
-        if len(kwargs) != 0:
+        if len(kwargs) == 0:
+            result = self.get_by_id(id)
+        else:
             with self.new_session() as s:
-                # add synchronize_session parameter to satisfy type checker
-                s.query(self._model).filter_by(id=id).update(kwargs, synchronize_session=False)  # type: ignore[arg-type]
+                stmt = update(self._model).filter_by(id=id).values(**kwargs)
+                if s.get_bind().dialect.update_returning:
+                    result = s.scalars(
+                        stmt.returning(self._model),
+                        execution_options={"populate_existing": True},
+                    ).one_or_none()
+                else:
+                    s.execute(stmt, execution_options={"synchronize_session": False})
+                    result = s.get(self._model, id, populate_existing=True)
+                self._mark_written(s, id, expire=False)
 
-        result = self.get_by_id(id)
         if result is None:
             raise ValueError(f"{self._model.__name__} with id {id} not found")
-
-        self.session.refresh(result)
         return result
 
     def delete(self, id: str):
         """Delete an object."""
         with self.new_session() as s:
             s.query(self._model).filter_by(id=id).delete()
+
+    def _mark_written(
+        self, session: SqlAlchemySession, id: Optional[str], expire: bool = True
+    ) -> None:
+        """Record the written row, to expire its cached copy once the write is committed.
+
+        Args:
+            session (SqlAlchemySession): The session of the write.
+            id (Optional[str]): The ID of the written row.
+            expire (bool): Whether to expire the copy in the session of the write, which is
+                stale unless the write has loaded the row into the session.
+        """
+        if id is None:
+            return
+        session.info.setdefault(_WRITTEN_ROWS, set()).add((self._session, self._model, id))
+        if expire:
+            obj = session.identity_map.get(identity_key(self._model, id))
+            if obj is not None:
+                session.expire(obj)
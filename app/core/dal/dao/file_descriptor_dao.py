@@ -1,3 +1,5 @@
+from typing import Collection, Dict
+
 from sqlalchemy.orm import Session as SqlAlchemySession
 
 from app.core.common.type import FileStorageType, KnowledgeStoreFileStatus
@@ -17,6 +19,17 @@ class FileDescriptorDao(Dao[FileDescriptorDo]):
         file_descriptor_do = self.get_by_id(id=id)
         if not file_descriptor_do:
             raise ValueError(f"File descriptor with ID {id} not found")
+        return self._parse_into_file_descriptor(file_descriptor_do)
+
+    def get_file_descriptors_by_ids(self, ids: Collection[str]) -> Dict[str, FileDescriptor]:
+        """Get the file descriptors by IDs, in one query. The missing IDs are skipped."""
+        return {
+            str(file_descriptor_do.id): self._parse_into_file_descriptor(file_descriptor_do)
+            for file_descriptor_do in self.get_by_ids(ids)
+        }
+
+    def _parse_into_file_descriptor(self, file_descriptor_do: FileDescriptorDo) -> FileDescriptor:
+        """Create a file descriptor model instance."""
         return FileDescriptor(
             id=str(file_descriptor_do.id),
             name=str(file_descriptor_do.name),
@@ -1,7 +1,8 @@
-from typing import Optional, cast
+from typing import Collection, Dict, List, Optional, cast
 
 from sqlalchemy.orm import Session as SqlAlchemySession
 
+from app.core.common.type import JobStatus
 from app.core.dal.dao.dao import Dao
 from app.core.dal.do.job_do import JobDo
 from app.core.model.job import Job, JobType, SubJob
@@ -14,40 +15,11 @@ class JobDao(Dao[JobDo]):
     def __init__(self, session: SqlAlchemySession):
         super().__init__(JobDo, session)
 
-    def save_job(self, job: Job) -> JobDo:
-        """Create a new job model."""
-        try:
-            self.get_job_by_id(id=job.id)
-            return self._update_job(job=job)
-        except ValueError:
-            if isinstance(job, SubJob):
-                return self.create(
-                    category=JobType.SUB_JOB.value,
-                    id=job.id,
-                    goal=job.goal,
-                    context=job.context,
-                    session_id=job.session_id,
-                    original_job_id=job.original_job_id,
-                    expert_id=job.expert_id,
-                    output_schema=job.output_schema,
-                    life_cycle=job.life_cycle,
-                    is_legacy=job.is_legacy,
-                    thinking=job.thinking,
-                    assigned_expert_name=job.assigned_expert_name,
-                )
-            return self.create(
-                category=JobType.JOB.value,
-                id=job.id,
-                goal=job.goal,
-                context=job.context,
-                session_id=job.session_id,
-                assigned_expert_name=job.assigned_expert_name,
-            )
-
-    def _update_job(self, job: Job) -> JobDo:
-        """Update a job model."""
+    def save_job(self, job: Job) -> None:
+        """Create or update a job model, in one statement."""
         if isinstance(job, SubJob):
-            return self.update(
+            self.upsert(
+                category=JobType.SUB_JOB.value,
                 id=job.id,
                 goal=job.goal,
                 context=job.context,
@@ -60,14 +32,15 @@ class JobDao(Dao[JobDo]):
                 thinking=job.thinking,
                 assigned_expert_name=job.assigned_expert_name,
             )
-        return self.update(
-            id=job.id,
-            goal=job.goal,
-            context=job.context,
-            session_id=job.session_id,
-            assigned_expert_name=job.assigned_expert_name,
-            dag=job.dag,
-        )
+        else:
+            self.upsert(
+                category=JobType.JOB.value,
+                id=job.id,
+                goal=job.goal,
+                context=job.context,
+                session_id=job.session_id,
+                assigned_expert_name=job.assigned_expert_name,
+            )
 
     def save_job_result(self, job_result: JobResult) -> JobDo:
         """Update a job model with the job result."""
@@ -83,6 +56,36 @@ class JobDao(Dao[JobDo]):
         result = self.get_by_id(id=id)
         if not result:
             raise ValueError(f"Job with ID {id} not found")
+        return self._parse_into_job(result)
+
+    def get_jobs_by_ids(self, ids: Collection[str]) -> Dict[str, Job]:
+        """Get the jobs by IDs, in one query. The missing IDs are skipped."""
+        return {str(job_do.id): self._parse_into_job(job_do) for job_do in self.get_by_ids(ids)}
+
+    def get_job_results_by_ids(self, ids: Collection[str]) -> Dict[str, JobResult]:
+        """Get the job results by job IDs, in one query. The missing IDs are skipped."""
+        return {
+            str(job_do.id): self._parse_into_job_result(job_do) for job_do in self.get_by_ids(ids)
+        }
+
+    def get_subjobs_by_original_job_ids(
+        self, original_job_ids: Collection[str]
+    ) -> Dict[str, List[SubJob]]:
+        """Get the subjobs of the original jobs, in one query."""
+        subjobs: Dict[str, List[SubJob]] = {id: [] for id in original_job_ids}
+        if not original_job_ids:
+            return subjobs
+        job_dos = (
+            self.session.query(self._model)
+            .filter(self._model.original_job_id.in_(set(original_job_ids)))
+            .all()
+        )
+        for job_do in job_dos:
+            subjobs[str(job_do.original_job_id)].append(cast(SubJob, self._parse_into_job(job_do)))
+        return subjobs
+
+    def _parse_into_job(self, result: JobDo) -> Job:
+        """Create a job (original job / subjob) model instance."""
         if result.category == JobType.JOB.value:
             return Job(
                 id=cast(str, result.id),
@@ -111,3 +114,12 @@ class JobDao(Dao[JobDo]):
                 str(result.assigned_expert_name) if result.assigned_expert_name else None,
             ),
         )
+
+    def _parse_into_job_result(self, job_do: JobDo) -> JobResult:
+        """Create a job result model instance."""
+        return JobResult(
+            job_id=str(job_do.id),
+            status=JobStatus[str(job_do.status)],
+            duration=float(job_do.duration),
+            tokens=int(job_do.tokens),
+        )
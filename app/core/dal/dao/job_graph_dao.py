@@ -0,0 +1,87 @@
+from typing import Iterable, Sequence, Tuple
+
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.orm import Session as SqlAlchemySession
+
+from app.core.dal.dao.dao import Dao
+from app.core.dal.do.job_graph_do import JobEdgeDo, JobVertexDo
+from app.core.model.job_graph import JobGraph
+
+
+class JobGraphDao(Dao[JobVertexDo]):
+    """Job Graph Data Access Object
+
+    The job graph of an original job is stored as rows of vertices and edges, so that it is
+    updated incrementally, instead of rewriting the whole graph.
+    """
+
+    def __init__(self, session: SqlAlchemySession):
+        super().__init__(JobVertexDo, session)
+
+    def get_job_graph(self, original_job_id: str) -> JobGraph:
+        """Get the job graph of the original job, which is empty if it has no vertex."""
+        vertex_ids: Sequence[str] = self.session.scalars(
+            select(JobVertexDo.job_id)
+            .where(JobVertexDo.original_job_id == original_job_id)
+            .order_by(JobVertexDo.id)
+        ).all()
+        edges: Sequence[Tuple[str, str]] = self.session.execute(
+            select(JobEdgeDo.source_id, JobEdgeDo.target_id)
+            .where(JobEdgeDo.original_job_id == original_job_id)
+            .order_by(JobEdgeDo.id)
+        ).all()
+
+        job_graph = JobGraph()
+        for vertex_id in vertex_ids:
+            job_graph.add_vertex(vertex_id)
+        for source_id, target_id in edges:
+            job_graph.add_edge(source_id, target_id)
+        return job_graph
+
+    def add_vertices(self, original_job_id: str, vertex_ids: Iterable[str]) -> None:
+        """Add the vertices to the job graph, which must not be in the job graph."""
+        rows = [{"original_job_id": original_job_id, "job_id": id} for id in vertex_ids]
+        if rows:
+            with self.new_session() as s:
+                s.execute(insert(JobVertexDo), rows)
+
+    def remove_vertices(self, original_job_id: str, vertex_ids: Iterable[str]) -> None:
+        """Remove the vertices and their edges from the job graph."""
+        vertex_ids = list(vertex_ids)
+        if not vertex_ids:
+            return
+        with self.new_session() as s:
+            s.execute(
+                delete(JobEdgeDo).where(
+                    JobEdgeDo.original_job_id == original_job_id,
+                    or_(JobEdgeDo.source_id.in_(vertex_ids), JobEdgeDo.target_id.in_(vertex_ids)),
+                )
+            )
+            s.execute(
+                delete(JobVertexDo).where(
+                    JobVertexDo.original_job_id == original_job_id,
+                    JobVertexDo.job_id.in_(vertex_ids),
+                )
+            )
+
+    def add_edges(self, original_job_id: str, edges: Iterable[Tuple[str, str]]) -> None:
+        """Add the edges to the job graph, which must not be in the job graph."""
+        rows = [
+            {"original_job_id": original_job_id, "source_id": source_id, "target_id": target_id}
+            for source_id, target_id in edges
+        ]
+        if rows:
+            with self.new_session() as s:
+                s.execute(insert(JobEdgeDo), rows)
+
+    def remove_edges(self, original_job_id: str, edges: Iterable[Tuple[str, str]]) -> None:
+        """Remove the edges from the job graph."""
+        with self.new_session() as s:
+            for source_id, target_id in edges:
+                s.execute(
+                    delete(JobEdgeDo).where(
+                        JobEdgeDo.original_job_id == original_job_id,
+                        JobEdgeDo.source_id == source_id,
+                        JobEdgeDo.target_id == target_id,
+                    )
+                )
@@ -1,9 +1,10 @@
-from typing import List, cast
+import json
+from typing import Any, Collection, Dict, List, Optional, Sequence, Set, Tuple, cast
 
 from sqlalchemy.orm import Session as SqlAlchemySession
 
-from app.core.common.type import ChatMessageRole
-from app.core.dal.dao.dao import Dao
+from app.core.common.type import ChatMessageRole, FunctionCallStatus, MessageSourceType
+from app.core.dal.dao.dao import Dao, unit_of_work
 from app.core.dal.dao.file_descriptor_dao import FileDescriptorDao
 from app.core.dal.do.message_do import (
     AgentMessageDo,
@@ -15,6 +16,7 @@ from app.core.dal.do.message_do import (
     TextMessageDo,
     WorkflowMessageDo,
 )
+from app.core.model.file_descriptor import FileDescriptor
 from app.core.model.message import (
     AgentMessage,
     FileMessage,
@@ -26,6 +28,19 @@ from app.core.model.message import (
     TextMessage,
     WorkflowMessage,
 )
+from app.core.toolkit.tool import FunctionCallResult
+
+
+class _RelatedRows:
+    """The rows related to the messages being parsed, which are loaded in bulk."""
+
+    def __init__(self):
+        # message id -> related message
+        self.messages: Dict[str, MessageDo] = {}
+        # (job id, role) -> instruction text messages of the hybrid messages
+        self.instructions: Dict[Tuple[str, str], List[TextMessageDo]] = {}
+        # file id -> file descriptor of the file messages
+        self.file_descriptors: Dict[str, FileDescriptor] = {}
 
 
 class MessageDao(Dao[MessageDo]):
@@ -35,14 +50,10 @@ class MessageDao(Dao[MessageDo]):
         super().__init__(MessageDo, session)
 
     def save_message(self, message: Message) -> MessageDo:
-        """Create a new message."""
+        """Create or update a message, in one statement."""
         message_do = self.parse_into_message_do(message)
         message_dict = {c.name: getattr(message_do, c.name) for c in message_do.__table__.columns}
-        try:
-            self.create(**message_dict)
-        except Exception:
-            message_dict.pop("id", None)
-            self.update(id=str(message_do.id), **message_dict)
+        self.upsert(**message_dict)
         return message_do
 
     def get_message(self, id: str) -> Message:
@@ -60,13 +71,93 @@ class MessageDao(Dao[MessageDo]):
         return (
             self.session.query(self._model)
             .filter(
+                self._model.job_id == job_id,
                 self._model.type == MessageType.TEXT_MESSAGE.value,
+                self._model.role == role.value,
+            )
+            .all()
+        )
+
+    def get_hybrid_message_by_job_id_and_role(
+        self, job_id: str, role: ChatMessageRole
+    ) -> List[HybridMessageDo]:
+        """Get hybrid message by job and role."""
+        return (
+            self.session.query(self._model)
+            .filter(
                 self._model.job_id == job_id,
+                self._model.type == MessageType.HYBRID_MESSAGE.value,
                 self._model.role == role.value,
             )
             .all()
         )
 
+    def filter_text_messages_by_session(self, session_id: str) -> List[TextMessageDo]:
+        """Get the text messages of the session, in chronological order."""
+        return (
+            self.session.query(self._model)
+            .filter(
+                self._model.session_id == session_id,
+                self._model.type == MessageType.TEXT_MESSAGE.value,
+            )
+            .order_by(self._model.timestamp)
+            .all()
+        )
+
+    def get_agent_messages_by_job_ids(
+        self, job_ids: Collection[str]
+    ) -> Dict[str, List[AgentMessage]]:
+        """Get the agent messages of the jobs, in a constant number of queries."""
+        agent_messages: Dict[str, List[AgentMessage]] = {job_id: [] for job_id in job_ids}
+        message_dos = self._filter_by_job_ids(job_ids, MessageType.AGENT_MESSAGE)
+        for message in self.parse_into_messages(message_dos):
+            agent_messages[str(message.get_job_id())].append(cast(AgentMessage, message))
+        return agent_messages
+
+    def get_hybrid_messages_by_job_ids(self, job_ids: Collection[str]) -> List[HybridMessage]:
+        """Get the hybrid messages of the jobs, in a constant number of queries."""
+        message_dos = self._filter_by_job_ids(job_ids, MessageType.HYBRID_MESSAGE)
+        return cast(List[HybridMessage], self.parse_into_messages(message_dos))
+
+    def save_model_messages(self, messages: Sequence[ModelMessage], operator_id: str) -> None:
+        """Create or update the model messages of the operator, in one transaction."""
+        with unit_of_work():
+            for message in messages:
+                message_do = self.parse_into_message_do(message)
+                message_dict = {
+                    c.name: getattr(message_do, c.name) for c in message_do.__table__.columns
+                }
+                self.upsert(**{**message_dict, "operator_id": operator_id})
+
+    def get_model_messages(self, job_id: str, operator_id: str) -> List[ModelMessage]:
+        """Get the model messages of the operator in the job, ordered by their steps."""
+        message_dos = (
+            self.session.query(self._model)
+            .filter(
+                self._model.job_id == job_id,
+                self._model.operator_id == operator_id,
+                self._model.type == MessageType.MODEL_MESSAGE.value,
+            )
+            .order_by(self._model.step)
+            .all()
+        )
+        return cast(List[ModelMessage], self.parse_into_messages(message_dos))
+
+    def _filter_by_job_ids(
+        self, job_ids: Collection[str], message_type: MessageType
+    ) -> List[MessageDo]:
+        """Get the messages of the jobs by type, in one query."""
+        if not job_ids:
+            return []
+        return (
+            self.session.query(self._model)
+            .filter(
+                self._model.job_id.in_(set(job_ids)),
+                self._model.type == message_type.value,
+            )
+            .all()
+        )
+
     def parse_into_message_do(self, message: Message) -> MessageDo:
         """Create a message model instance."""
 
@@ -94,13 +185,21 @@ class MessageDao(Dao[MessageDo]):
             )
 
         if isinstance(message, ModelMessage):
-            # TODO: to refine the fields for model message
-            # source_type: MessageSourceType = MessageSourceType.MODEL,
-            # function_calls: Optional[List[FunctionCallResult]] = None,
-
             return ModelMessageAO(
                 type=MessageType.MODEL_MESSAGE.value,
                 payload=message.get_payload(),
+                source_type=message.get_source_type().value,
+                function_calls_json=[
+                    {
+                        "func_name": result.func_name,
+                        "func_args": json.loads(json.dumps(result.func_args, default=str)),
+                        "call_objective": result.call_objective,
+                        "output": result.output,
+                        "status": result.status.value,
+                    }
+                    for result in message.get_function_calls() or []
+                ]
+                or None,
                 id=message.get_id(),
                 job_id=message.get_job_id(),
                 timestamp=message.get_timestamp(),
@@ -154,6 +253,57 @@ class MessageDao(Dao[MessageDo]):
 
     def parse_into_message(self, message_do: MessageDo) -> Message:
         """Create a message model instance."""
+        return self.parse_into_messages([message_do])[0]
+
+    def parse_into_messages(self, message_dos: Sequence[MessageDo]) -> List[Message]:
+        """Create the message model instances.
+
+        The related rows of all the messages (workflow messages, attached messages, instruction
+        messages and file descriptors) are loaded together, so the number of queries does not
+        grow with the number of messages.
+        """
+        related = self._load_related_rows(message_dos)
+        return [self._parse_into_message(message_do, related) for message_do in message_dos]
+
+    def _load_related_rows(self, message_dos: Sequence[MessageDo]) -> _RelatedRows:
+        """Load the rows related to the messages, in a few queries per level of relation."""
+        related = _RelatedRows()
+        instruction_job_ids: Set[str] = set()
+        file_ids: Set[str] = set()
+
+        pending: Sequence[MessageDo] = message_dos
+        while pending:
+            related_message_ids: Set[str] = set()
+            for message_do in pending:
+                message_type = MessageType(str(message_do.type))
+                if message_type in (MessageType.AGENT_MESSAGE, MessageType.HYBRID_MESSAGE):
+                    related_message_ids.update(message_do.related_message_ids or [])
+                if message_type == MessageType.HYBRID_MESSAGE:
+                    instruction_job_ids.add(str(message_do.job_id))
+                if message_type == MessageType.FILE_MESSAGE:
+                    file_ids.update(message_do.related_message_ids or [])
+            related_message_ids.difference_update(related.messages)
+
+            pending = self.get_by_ids(related_message_ids)
+            related.messages.update({str(message_do.id): message_do for message_do in pending})
+
+        for message_do in self._filter_by_job_ids(instruction_job_ids, MessageType.TEXT_MESSAGE):
+            key = (str(message_do.job_id), str(message_do.role))
+            related.instructions.setdefault(key, []).append(message_do)
+
+        file_descriptor_dao: FileDescriptorDao = FileDescriptorDao.instance
+        related.file_descriptors = file_descriptor_dao.get_file_descriptors_by_ids(file_ids)
+        return related
+
+    def _get_related_message(self, id: str, related: _RelatedRows) -> Message:
+        """Get a related message from the loaded rows."""
+        message_do: Optional[MessageDo] = related.messages.get(id)
+        if not message_do:
+            raise ValueError(f"Message with ID {id} not found")
+        return self._parse_into_message(message_do, related)
+
+    def _parse_into_message(self, message_do: MessageDo, related: _RelatedRows) -> Message:
+        """Create a message model instance, whose related rows are loaded."""
         message_type = MessageType(str(message_do.type))
 
         if message_type == MessageType.WORKFLOW_MESSAGE:
@@ -172,7 +322,10 @@ class MessageDao(Dao[MessageDo]):
                 payload=str(message_do.payload),
                 workflow_messages=cast(
                     List[WorkflowMessage],
-                    [self.get_message(wf_id) for wf_id in list(message_do.related_message_ids)]
+                    [
+                        self._get_related_message(wf_id, related)
+                        for wf_id in list(message_do.related_message_ids)
+                    ]
                     or [],
                 ),
                 artifact_ids=list(message_do.artifact_ids),
@@ -192,13 +345,14 @@ class MessageDao(Dao[MessageDo]):
             )
 
         if message_type == MessageType.FILE_MESSAGE:
-            file_descriptor_dao: FileDescriptorDao = FileDescriptorDao.instance
             assert len(list(message_do.related_message_ids)) == 1, (
                 f"File message {message_do.id} should have only one file id. "
                 f"File id(s) :{list(message_do.related_message_ids)}"
             )
             file_id: str = list(message_do.related_message_ids)[0]
-            file_descriptor = file_descriptor_dao.get_file_descriptor_by_id(id=file_id)
+            file_descriptor = related.file_descriptors.get(file_id)
+            if not file_descriptor:
+                raise ValueError(f"File descriptor with ID {file_id} not found")
             return FileMessage(
                 id=str(message_do.id),
                 file_id=str(list(message_do.related_message_ids)[0]),
@@ -219,8 +373,8 @@ class MessageDao(Dao[MessageDo]):
 
         if message_type == MessageType.HYBRID_MESSAGE:
             role = ChatMessageRole(str(message_do.role))
-            instruction_results: List[TextMessageDo] = self.get_text_message_by_job_id_and_role(
-                job_id=str(message_do.job_id), role=role
+            instruction_results: List[TextMessageDo] = related.instructions.get(
+                (str(message_do.job_id), role.value), []
             )
             assert len(instruction_results) == 1, (
                 f"Hybrid message {message_do.id} should have exactly one instruction message, "
@@ -228,7 +382,7 @@ class MessageDao(Dao[MessageDo]):
             )
             instruction_message: TextMessage = cast(
                 TextMessage,
-                self.parse_into_message(message_do=instruction_results[0]),
+                self._parse_into_message(instruction_results[0], related),
             )
 
             return HybridMessage(
@@ -236,13 +390,35 @@ class MessageDao(Dao[MessageDo]):
                 instruction_message=instruction_message,
                 job_id=str(message_do.job_id),
                 session_id=str(message_do.session_id),
-                # load the attached messages from the database
+                # the attached messages are loaded from the database with the related rows
                 attached_messages=[
-                    cast(FileMessage, self.get_message(id=str(attached_id)))
+                    cast(FileMessage, self._get_related_message(str(attached_id), related))
                     for attached_id in list(message_do.related_message_ids)
                 ],
                 timestamp=int(message_do.timestamp),
                 role=role,
             )
 
+        if message_type == MessageType.MODEL_MESSAGE:
+            return ModelMessage(
+                id=str(message_do.id),
+                job_id=str(message_do.job_id),
+                payload=str(message_do.payload),
+                step=int(message_do.step),
+                timestamp=int(message_do.timestamp) if message_do.timestamp is not None else None,
+                source_type=MessageSourceType(str(message_do.source_type or "MODEL")),
+                function_calls=[
+                    FunctionCallResult(
+                        func_name=result["func_name"],
+                        func_args=result["func_args"],
+                        call_objective=result["call_objective"],
+                        output=result["output"],
+                        status=FunctionCallStatus(result["status"]),
+                    )
+                    for result in cast(List[Dict[str, Any]], message_do.function_calls_json)
+                ]
+                if message_do.function_calls_json
+                else None,
+            )
+
         raise ValueError(f"Unsupported message type: {message_type}")
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+
+from app.core.dal.database import Do
+
+
+class JobVertexDo(Do):  # type: ignore
+    """Job graph vertex table, where each vertex is a subjob of the original job"""
+
+    __tablename__ = "job_vertex"
+    __table_args__ = (UniqueConstraint("original_job_id", "job_id"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # keeps the insertion order
+    original_job_id = Column(String(36), nullable=False, index=True)  # FK constraint
+    job_id = Column(String(36), nullable=False)  # FK constraint
+
+
+class JobEdgeDo(Do):  # type: ignore
+    """Job graph edge table, where each edge is a dependency between two subjobs"""
+
+    __tablename__ = "job_edge"
+    __table_args__ = (UniqueConstraint("original_job_id", "source_id", "target_id"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # keeps the insertion order
+    original_job_id = Column(String(36), nullable=False, index=True)  # FK constraint
+    source_id = Column(String(36), nullable=False)  # FK constraint
+    target_id = Column(String(36), nullable=False)  # FK constraint
@@ -1,6 +1,6 @@
 from uuid import uuid4
 
-from sqlalchemy import JSON, BigInteger, Column, String, Text, func
+from sqlalchemy import JSON, BigInteger, Column, Index, String, Text, func
 
 from app.core.dal.database import Do
 from app.core.model.message import MessageType
@@ -55,6 +55,13 @@ class MessageDo(Do):  # type: ignore
         "polymorphic_on": type,
     }
 
+    __table_args__ = (
+        # the messages of a job by type and role (also serving the lookups by job and type)
+        Index("ix_message_job_id_type_role", "job_id", "type", "role"),
+        # the messages of a session by type, in chronological order
+        Index("ix_message_session_id_type_timestamp", "session_id", "type", "timestamp"),
+    )
+
 
 class ModelMessageAO(MessageDo):
     """Model message"""
@@ -5,6 +5,7 @@ from app.core.dal.do.artifact_do import ArtifactDo
 from app.core.dal.do.file_descriptor_do import FileDescriptorDo
 from app.core.dal.do.graph_db_do import GraphDbDo
 from app.core.dal.do.job_do import JobDo
+from app.core.dal.do.job_graph_do import JobEdgeDo, JobVertexDo
 from app.core.dal.do.knowledge_do import KnowledgeBaseDo
 from app.core.dal.do.message_do import MessageDo
 from app.core.dal.do.session_do import SessionDo
@@ -26,8 +27,15 @@ def init_db() -> None:
             KnowledgeBaseDo.__table__,
             SessionDo.__table__,
             JobDo.__table__,
+            JobVertexDo.__table__,
+            JobEdgeDo.__table__,
             MessageDo.__table__,
             ArtifactDo.__table__,
         ],
         checkfirst=True,
     )
+
+    # create the indexes added to the existing tables, which are skipped by create_all
+    for table in Do.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
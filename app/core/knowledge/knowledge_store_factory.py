@@ -1,19 +1,82 @@
+from collections import OrderedDict
+import threading
+from typing import Dict, Optional, Tuple
+
 from app.core.common.system_env import SystemEnv
 from app.core.common.type import KnowledgeStoreType
 from app.core.knowledge.knowledge_store import KnowledgeStore
 
 
 class KnowledgeStoreFactory:
-    """Knowledge store factory."""
+    """Knowledge store factory.
+
+    The knowledge stores are cached by the knowledge base id, with LRU eviction, because building
+    a store (the Chroma client, the remote embedding client and the retriever) is expensive.
+
+    Attributes:
+        _stores (OrderedDict[Tuple[KnowledgeStoreType, str], KnowledgeStore]): The cached
+            knowledge stores, from the least to the most recently used.
+        _lock (threading.Lock): The lock guarding the cache.
+        _creation_locks (Dict[Tuple[KnowledgeStoreType, str], threading.Lock]): The locks making
+            sure a knowledge store is built once, while the others can be built concurrently.
+    """
+
+    _stores: "OrderedDict[Tuple[KnowledgeStoreType, str], KnowledgeStore]" = OrderedDict()
+    _lock: threading.Lock = threading.Lock()
+    _creation_locks: Dict[Tuple[KnowledgeStoreType, str], threading.Lock] = {}
 
     @classmethod
     def get_or_create(cls, name: str) -> KnowledgeStore:
         """Get ore create a knowledge store."""
+        key = (SystemEnv.KNOWLEDGE_STORE_TYPE, name)
+        with cls._lock:
+            store = cls._get_cached(key)
+            if store is not None:
+                return store
+            creation_lock = cls._creation_locks.setdefault(key, threading.Lock())
+
+        with creation_lock:
+            with cls._lock:
+                store = cls._get_cached(key)
+                if store is not None:
+                    return store
+
+            store = cls._create(key[0], name)
+
+            with cls._lock:
+                cls._stores[key] = store
+                while len(cls._stores) > max(1, SystemEnv.KNOWLEDGE_STORE_CACHE_SIZE):
+                    cls._stores.popitem(last=False)
+                cls._creation_locks.pop(key, None)
+        return store
+
+    @classmethod
+    def invalidate(cls, name: str) -> None:
+        """Remove the cached knowledge store, e.g. after the knowledge base is dropped."""
+        with cls._lock:
+            for key in [key for key in cls._stores if key[1] == name]:
+                del cls._stores[key]
+
+    @classmethod
+    def clear(cls) -> None:
+        """Remove all the cached knowledge stores."""
+        with cls._lock:
+            cls._stores.clear()
+
+    @classmethod
+    def _get_cached(cls, key: Tuple[KnowledgeStoreType, str]) -> Optional[KnowledgeStore]:
+        store = cls._stores.get(key)
+        if store is not None:
+            cls._stores.move_to_end(key)
+        return store
+
+    @staticmethod
+    def _create(knowledge_store_type: KnowledgeStoreType, name: str) -> KnowledgeStore:
         from app.plugin.dbgpt.dbgpt_knowledge_store import GraphKnowledgeStore, VectorKnowledgeStore
 
-        if SystemEnv.KNOWLEDGE_STORE_TYPE == KnowledgeStoreType.VECTOR:
+        if knowledge_store_type == KnowledgeStoreType.VECTOR:
             return VectorKnowledgeStore(name)
-        elif SystemEnv.KNOWLEDGE_STORE_TYPE == KnowledgeStoreType.GRAPH:
+        elif knowledge_store_type == KnowledgeStoreType.GRAPH:
             return GraphKnowledgeStore(name)
 
-        raise ValueError(f"Cannot create knowledge store of type {SystemEnv.NOWLEDGE_STORE_TYPE}")
+        raise ValueError(f"Cannot create knowledge store of type {knowledge_store_type}")
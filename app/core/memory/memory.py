@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Any, List, Optional, Union
 
+from app.core.memory.memory_policy import MemoryPolicy
 from app.core.model.message import ModelMessage
 from app.core.model.task import MemoryKey
 
@@ -10,6 +11,19 @@ class Memory(ABC):
 
     def __init__(self) -> None:
         self._history_messages: List[ModelMessage] = []
+        self._policy: Optional[MemoryPolicy] = None
+
+    def set_policy(self, policy: Optional[MemoryPolicy]) -> None:
+        """Set the policy of the messages sent to the model, None to send all the messages."""
+        self._policy = policy
+
+    def get_context_messages(self) -> List[ModelMessage]:
+        """Get the messages sent to the model, which are chosen from the history messages by the
+        memory policy (e.g. summarized and truncated to fit in the context window)."""
+        messages = self.get_messages()
+        if self._policy is None or not messages:
+            return messages
+        return self._policy.apply(messages)
 
     @abstractmethod
     def add_message(self, message: ModelMessage) -> None:
@@ -0,0 +1,264 @@
+from abc import ABC, abstractmethod
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import MessageSourceType
+from app.core.model.message import ModelMessage
+from app.core.toolkit.tool import FunctionCallResult
+
+# the tags of the reasoner messages which carry the gist of a round, in the order of preference
+_GIST_PATTERN = re.compile(r"<(action|instruction|deliverable)>\s*(.*?)\s*</\1>", re.DOTALL)
+_SUMMARY_HEADER = ["<history_summary>", "The earlier rounds of the reasoning are summarized:"]
+_SUMMARY_FOOTER = ["</history_summary>"]
+
+
+class MemoryPolicy(ABC):
+    """Policy of the messages sent to the model, chosen from the history of a reasoner memory.
+
+    The memory keeps the whole history, and the policy only builds the view of it which is sent
+    in the model requests, so the messages in the memory are never modified.
+    """
+
+    @abstractmethod
+    def apply(self, messages: List[ModelMessage]) -> List[ModelMessage]:
+        """Build the messages sent to the model from the history messages."""
+
+
+class TokenCounter:
+    """Count the tokens of the texts by the tokenizer of the model, falling back to an estimate of
+    4 characters per token if the tokenizer is not available."""
+
+    def __init__(self, model_name: Optional[str] = None):
+        self._model_name: str = model_name or ""
+
+    def count(self, text: str) -> int:
+        """Count the tokens of the text."""
+        if not text:
+            return 0
+        try:
+            import litellm
+
+            return int(litellm.token_counter(model=self._model_name, text=text))
+        except Exception:
+            return len(text) // 4 + 1
+
+
+class TokenBudgetMemoryPolicy(MemoryPolicy):
+    """Keep the history sent to the model in a token budget.
+
+    The history is split into rounds (a model message, or a thinker message with the actor
+    message answering it), and:
+        1. the last rounds are kept verbatim, except for the oversized function outputs, which are
+            truncated with a pointer to the full output kept in the memory;
+        2. the older rounds are summarized into one message, by extracting the gist of each round
+            (its action or instruction, and the functions called), without calling the model;
+        3. if the history still exceeds the budget, fewer rounds are kept verbatim (but at least
+            the last one), and then the oldest rounds are dropped from the summary.
+
+    The truncated messages, the round summaries and the token counts are cached by the message
+    IDs, so each message is processed once, however many rounds it is sent in.
+
+    Attributes:
+        _verbatim_rounds (int): The number of the last rounds kept verbatim.
+        _max_tokens (int): The token budget of the history messages in each model request.
+        _max_function_output_tokens (int): The max tokens of a function output in the history.
+        _summary_chars (int): The max characters of the gist of a round in the summary.
+        _token_counter (TokenCounter): The token counter.
+    """
+
+    def __init__(
+        self,
+        verbatim_rounds: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        max_function_output_tokens: Optional[int] = None,
+        summary_chars: int = 200,
+        token_counter: Optional[TokenCounter] = None,
+    ):
+        self._verbatim_rounds: int = max(1, verbatim_rounds or SystemEnv.MEMORY_VERBATIM_ROUNDS)
+        self._max_tokens: int = max_tokens or SystemEnv.MEMORY_MAX_HISTORY_TOKENS
+        self._max_function_output_tokens: int = (
+            max_function_output_tokens or SystemEnv.MEMORY_MAX_FUNCTION_OUTPUT_TOKENS
+        )
+        self._summary_chars: int = summary_chars
+        self._token_counter: TokenCounter = token_counter or TokenCounter(SystemEnv.LLM_NAME)
+        self._summary_header_tokens: int = self._token_counter.count(
+            "\n".join(_SUMMARY_HEADER + _SUMMARY_FOOTER + ["- (0 earlier rounds are omitted)"])
+        )
+
+        # message id -> (fingerprint, message sent to the model, tokens)
+        self._compacted: Dict[str, Tuple[int, ModelMessage, int]] = {}
+        # id of the last message of the round -> (fingerprint, summary line, tokens)
+        self._summaries: Dict[str, Tuple[int, str, int]] = {}
+        # the last summary message, reused while the summarized rounds do not change
+        self._summary_message: Optional[Tuple[str, ModelMessage]] = None
+
+    def apply(self, messages: List[ModelMessage]) -> List[ModelMessage]:
+        rounds = self._split_rounds(messages)
+        verbatim_rounds = min(self._verbatim_rounds, len(rounds))
+
+        while True:
+            recent_messages = [
+                self._compact(message)
+                for round_messages in rounds[-verbatim_rounds:]
+                for message in round_messages
+            ]
+            recent_tokens = sum(tokens for _, tokens in recent_messages)
+            summaries = [
+                self._summarize(round_messages) for round_messages in rounds[:-verbatim_rounds]
+            ]
+            summary_tokens = sum(tokens for _, tokens in summaries)
+            if summaries:
+                summary_tokens += self._summary_header_tokens
+            if recent_tokens + summary_tokens <= self._max_tokens or verbatim_rounds == 1:
+                break
+            verbatim_rounds -= 1
+
+        # drop the oldest rounds from the summary, until the history fits in the budget
+        omitted_rounds = 0
+        while summaries and recent_tokens + summary_tokens > self._max_tokens:
+            summary_tokens -= summaries[omitted_rounds][1]
+            omitted_rounds += 1
+            if omitted_rounds == len(summaries):
+                break
+
+        result = [message for message, _ in recent_messages]
+        if summaries:
+            summary_message = self._build_summary_message(
+                first_message=rounds[0][0],
+                summary_lines=[line for line, _ in summaries[omitted_rounds:]],
+                omitted_rounds=omitted_rounds,
+            )
+            result.insert(0, summary_message)
+        return result
+
+    def _split_rounds(self, messages: List[ModelMessage]) -> List[List[ModelMessage]]:
+        """Split the messages into rounds, where a thinker message is grouped with the message
+        answering it."""
+        rounds: List[List[ModelMessage]] = []
+        for message in messages:
+            if rounds and rounds[-1][-1].get_source_type() == MessageSourceType.THINKER:
+                rounds[-1].append(message)
+            else:
+                rounds.append([message])
+        return rounds
+
+    def _fingerprint(self, message: ModelMessage) -> int:
+        return hash(
+            (
+                message.get_payload(),
+                tuple(
+                    (result.status, result.func_name, result.call_objective, result.output)
+                    for result in message.get_function_calls() or []
+                ),
+            )
+        )
+
+    def _compact(self, message: ModelMessage) -> Tuple[ModelMessage, int]:
+        """Truncate the oversized function outputs of the message, and count its tokens.
+
+        The message is returned as it is if no output is truncated. Otherwise, a copy with the
+        truncated outputs is returned, which is cached so its rendered content is reused.
+        """
+        fingerprint = self._fingerprint(message)
+        cached = self._compacted.get(message.get_id())
+        if cached and cached[0] == fingerprint:
+            return cached[1], cached[2]
+
+        compacted_message = message
+        func_call_results = message.get_function_calls()
+        tokens = self._token_counter.count(message.get_payload())
+        if func_call_results:
+            truncated_results: List[FunctionCallResult] = []
+            for i, result in enumerate(func_call_results):
+                output = self._truncate_output(message, i, result.output)
+                tokens += self._token_counter.count(output) + self._token_counter.count(
+                    f"{result.func_name} {result.call_objective}"
+                )
+                truncated_results.append(
+                    result
+                    if output is result.output
+                    else FunctionCallResult(
+                        func_name=result.func_name,
+                        func_args=result.func_args,
+                        call_objective=result.call_objective,
+                        output=output,
+                        status=result.status,
+                    )
+                )
+            if any(a is not b for a, b in zip(truncated_results, func_call_results, strict=True)):
+                compacted_message = ModelMessage(
+                    payload=message.get_payload(),
+                    job_id=message.get_job_id(),
+                    step=message.get_step(),
+                    timestamp=message.get_timestamp(),
+                    id=message.get_id(),
+                    source_type=message.get_source_type(),
+                    function_calls=truncated_results,
+                )
+
+        self._compacted[message.get_id()] = (fingerprint, compacted_message, tokens)
+        return compacted_message, tokens
+
+    def _truncate_output(self, message: ModelMessage, index: int, output: str) -> str:
+        """Truncate the function output to the max tokens, keeping its head."""
+        output_tokens = self._token_counter.count(output)
+        if output_tokens <= self._max_function_output_tokens:
+            return output
+
+        # cut the output in proportion to its tokens, which avoids counting the tokens repeatedly
+        head = output[: len(output) * self._max_function_output_tokens // output_tokens]
+        return (
+            f"{head}\n... [truncated: {output_tokens - self._max_function_output_tokens} of "
+            f"{output_tokens} tokens omitted. The full output is kept in the reasoner memory, as "
+            f"the function call result #{index + 1} of the message {message.get_id()}]"
+        )
+
+    def _summarize(self, round_messages: List[ModelMessage]) -> Tuple[str, int]:
+        """Summarize a round into one line, by extracting its gist and the called functions."""
+        last_message = round_messages[-1]
+        fingerprint = hash(tuple(self._fingerprint(message) for message in round_messages))
+        cached = self._summaries.get(last_message.get_id())
+        if cached and cached[0] == fingerprint:
+            return cached[1], cached[2]
+
+        parts: List[str] = []
+        for message in round_messages:
+            match = _GIST_PATTERN.search(message.get_payload())
+            gist = match.group(2) if match else message.get_payload()
+            gist = " ".join(gist.split())
+            if len(gist) > self._summary_chars:
+                gist = gist[: self._summary_chars] + "..."
+            if gist:
+                parts.append(f"{message.get_source_type().value.lower()}: {gist}")
+            for result in message.get_function_calls() or []:
+                parts.append(
+                    f"{result.status.value} called function {result.func_name} "
+                    f"({result.call_objective})"
+                )
+        line = f"- Step {round_messages[0].get_step()}: " + "; ".join(parts)
+        tokens = self._token_counter.count(line)
+        self._summaries[last_message.get_id()] = (fingerprint, line, tokens)
+        return line, tokens
+
+    def _build_summary_message(
+        self, first_message: ModelMessage, summary_lines: List[str], omitted_rounds: int
+    ) -> ModelMessage:
+        """Build the message of the summarized rounds, reused if the summary does not change."""
+        lines = list(_SUMMARY_HEADER)
+        if omitted_rounds:
+            lines.append(f"- ({omitted_rounds} earlier rounds are omitted)")
+        lines.extend(summary_lines)
+        lines.extend(_SUMMARY_FOOTER)
+        payload = "\n".join(lines)
+
+        if self._summary_message and self._summary_message[0] == payload:
+            return self._summary_message[1]
+        summary_message = ModelMessage(
+            payload=payload,
+            job_id=first_message.get_job_id(),
+            step=first_message.get_step(),
+            source_type=first_message.get_source_type(),
+        )
+        self._summary_message = (payload, summary_message)
+        return summary_message
@@ -22,6 +22,7 @@ class LocalToolConfig(ToolConfig):
     """Local tool configuration data class"""
 
     module_path: str
+    max_concurrency: Optional[int] = None  # max concurrent calls of the tool in one turn
 
 
 @dataclass
@@ -148,6 +149,7 @@ class AgenticConfig:
                     name=tool_dict.get("name", ""),
                     type=ToolType.LOCAL_TOOL,
                     module_path=tool_dict.get("module_path", ""),
+                    max_concurrency=tool_dict.get("max_concurrency", None),
                 )
             elif tool_type == ToolGroupType.MCP.value:
                 tool_config = McpConfig(
@@ -156,6 +158,8 @@ class AgenticConfig:
                     transport_config=McpTransportConfig.from_dict(
                         tool_dict.get("mcp_transport_config", {})
                     ),
+                    max_concurrency=tool_dict.get("max_concurrency", None),
+                    exclusive_connection=tool_dict.get("exclusive_connection", False),
                 )
             else:
                 raise ValueError(
@@ -308,8 +312,12 @@ class AgenticConfig:
                     "type": tool.type.value,
                     "mcp_transport_config": tool.transport_config.to_dict(),
                 }
+                if tool.exclusive_connection:
+                    tool_dict["exclusive_connection"] = tool.exclusive_connection
             else:
                 raise ValueError(f"Unknown tool type: {type(tool)}")
+            if tool.max_concurrency:
+                tool_dict["max_concurrency"] = tool.max_concurrency
             result["tools"].append(tool_dict)
 
         # actions exportation
@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field
+import time
+from typing import Any, Dict, Optional
+
+from app.core.common.type import JobEventType, JobStatus
+from app.core.model.job_result import JobResult
+
+
+@dataclass
+class JobEvent:
+    """Job event data class, published during the execution of an original job.
+
+    Attributes:
+        type (JobEventType): the type of the event.
+        original_job_id (str): the original job, whose subscribers receive the event.
+        job_id (str): the job (original job / subjob) the event is about.
+        payload (Dict[str, Any]): the content of the event, which depends on its type.
+        timestamp (float): the time (in seconds since the epoch) the event was published.
+    """
+
+    type: JobEventType
+    original_job_id: str
+    job_id: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+    @classmethod
+    def status_changed(cls, original_job_id: str, job_result: JobResult) -> "JobEvent":
+        """Create the event of the job result saved for a job of the original job."""
+        return cls(
+            type=JobEventType.JOB_STATUS_CHANGED,
+            original_job_id=original_job_id,
+            job_id=job_result.job_id,
+            payload={
+                "status": job_result.status.value,
+                "duration": job_result.duration,
+                "tokens": job_result.tokens,
+            },
+        )
+
+    @classmethod
+    def subscription_dropped(cls, original_job_id: str) -> "JobEvent":
+        """Create the event ending the stream of a subscriber dropped for being too slow, which
+        tells it apart from the end of the job."""
+        return cls(
+            type=JobEventType.SUBSCRIPTION_DROPPED,
+            original_job_id=original_job_id,
+            job_id=original_job_id,
+            payload={"reason": "The subscriber was too slow, so the later events were missed."},
+        )
+
+    def get_status(self) -> Optional[JobStatus]:
+        """Get the job status, if the event is a status change."""
+        if self.type != JobEventType.JOB_STATUS_CHANGED:
+            return None
+        return JobStatus(self.payload["status"])
+
+    def is_final(self) -> bool:
+        """Check if the event ends the events of the original job, i.e. the original job has
+        reached a final status."""
+        return self.job_id == self.original_job_id and self.get_status() in [
+            JobStatus.FINISHED,
+            JobStatus.FAILED,
+            JobStatus.STOPPED,
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the event to a JSON-serializable dictionary."""
+        return {
+            "type": self.type.value,
+            "original_job_id": self.original_job_id,
+            "job_id": self.job_id,
+            "payload": self.payload,
+            "timestamp": self.timestamp,
+        }
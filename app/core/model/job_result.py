@@ -22,3 +22,32 @@ class JobResult:
     def has_result(self) -> bool:
         """Check if the job has result."""
         return self.status in [JobStatus.FINISHED, JobStatus.FAILED, JobStatus.STOPPED]
+
+
+@dataclass
+class ModelUsage:
+    """Model usage data class, the LLM usage of one or more model calls.
+
+    Attributes:
+        prompt_tokens (int): the tokens of the prompts.
+        completion_tokens (int): the tokens of the completions.
+        duration (float): the wall time (in seconds) of the model calls.
+        calls (int): the number of the model calls.
+    """
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    duration: float = 0.0
+    calls: int = 1
+
+    @property
+    def total_tokens(self) -> int:
+        """Get the total tokens of the prompts and the completions."""
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, usage: "ModelUsage") -> None:
+        """Add up the usage of other model calls."""
+        self.prompt_tokens += usage.prompt_tokens
+        self.completion_tokens += usage.completion_tokens
+        self.duration += usage.duration
+        self.calls += usage.calls
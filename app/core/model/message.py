@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 import json
-from typing import Any, Dict, Generic, List, Optional, TypeVar
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar
 from uuid import uuid4
 
+from app.core.common.cancellation import CancellationToken
 from app.core.common.type import ChatMessageRole, MessageSourceType, WorkflowStatus
 from app.core.model.file_descriptor import FileDescriptor
+from app.core.model.job_result import ModelUsage
 from app.core.toolkit.tool import FunctionCallResult
 
 T = TypeVar("T", bound="ChatMessage")
@@ -65,12 +67,18 @@ class ModelMessage(Message):
         id: Optional[str] = None,
         source_type: MessageSourceType = MessageSourceType.MODEL,
         function_calls: Optional[List[FunctionCallResult]] = None,
+        usage: Optional[ModelUsage] = None,
     ):
         super().__init__(job_id=job_id, timestamp=timestamp, id=id)
         self._payload: str = payload
         self._step: int = step
         self._source_type: MessageSourceType = source_type
         self._function_calls: Optional[List[FunctionCallResult]] = function_calls
+        # the usage of the model call which generated the message, which is not persisted
+        self._usage: Optional[ModelUsage] = usage
+        # the content rendered for the model requests, with the fingerprint of the rendered
+        # fields, which is not persisted
+        self._rendered: Optional[Tuple[int, str]] = None
 
     def get_payload(self) -> str:
         """Get the content of the message."""
@@ -88,6 +96,26 @@ class ModelMessage(Message):
         """Get the function of the message."""
         return self._function_calls
 
+    def get_usage(self) -> Optional[ModelUsage]:
+        """Get the usage of the model call which generated the message."""
+        return self._usage
+
+    def set_usage(self, usage: Optional[ModelUsage]) -> None:
+        """Set the usage of the model call which generated the message."""
+        self._usage = usage
+
+    def get_rendered(self, fingerprint: int) -> Optional[str]:
+        """Get the content rendered for the model requests, if it is rendered from the fields
+        with the same fingerprint."""
+        if self._rendered is not None and self._rendered[0] == fingerprint:
+            return self._rendered[1]
+        return None
+
+    def set_rendered(self, fingerprint: int, content: str) -> None:
+        """Cache the content rendered for the model requests, with the fingerprint of the
+        rendered fields."""
+        self._rendered = (fingerprint, content)
+
     def set_source_type(self, source_type: MessageSourceType):
         """Set the source type of the message."""
         self._source_type = source_type
@@ -102,6 +130,7 @@ class ModelMessage(Message):
             id=self._id,
             source_type=self._source_type,
             function_calls=self._function_calls,
+            usage=self._usage,
         )
 
 
@@ -187,12 +216,15 @@ class AgentMessage(Message):
         lesson: Optional[str] = None,
         timestamp: Optional[int] = None,
         id: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ):
         super().__init__(job_id=job_id, timestamp=timestamp, id=id)
         self._payload: Optional[str] = payload
         self._workflow_messages: List[WorkflowMessage] = workflow_messages or []
         self._artifact_ids: List[str] = artifact_ids or []
         self._lesson: Optional[str] = lesson
+        # the cancellation token of the job graph, which is not persisted
+        self._cancellation_token: Optional[CancellationToken] = cancellation_token
 
     def get_payload(self) -> Optional[str]:
         """Get the content of the message."""
@@ -219,6 +251,11 @@ class AgentMessage(Message):
         """Get the lesson of the execution of the job."""
         return self._lesson
 
+    def get_cancellation_token(self) -> Optional[CancellationToken]:
+        """Get the cancellation token of the job graph, which is cancelled once the job graph is
+        stopped or failed."""
+        return self._cancellation_token
+
     def add_lesson(self, lesson: str) -> None:
         """Add the lesson of the execution of the job."""
         if self._lesson:
@@ -234,6 +271,7 @@ class AgentMessage(Message):
             lesson=self._lesson,
             timestamp=self._timestamp,
             id=self._id,
+            cancellation_token=self._cancellation_token,
         )
 
 
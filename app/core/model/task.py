@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+from app.core.common.cancellation import CancellationToken
 from app.core.env.insight.insight import Insight
 from app.core.model.file_descriptor import FileDescriptor
 from app.core.model.job import Job
@@ -45,6 +46,8 @@ class Task:
         insights (Optional[List[Insight]]): The insights from the memory module.
         lesson (Optional[str]): The lesson learned from the job execution.
         file_descriptors (Optional[List[FileDescriptor]]): The file descriptors.
+        cancellation_token (CancellationToken): The cancellation token of the job graph, which
+            stops the reasoning once the job graph is stopped or failed.
     """
 
     job: Job
@@ -56,6 +59,7 @@ class Task:
     insights: Optional[List[Insight]] = None
     lesson: Optional[str] = None
     file_descriptors: Optional[List[FileDescriptor]] = None
+    cancellation_token: CancellationToken = field(default_factory=CancellationToken)
 
     def get_tool_call_ctx(self) -> ToolCallContext:
         """Get the function call context for the task."""
@@ -46,6 +46,32 @@ Here are some available tools (functions) that I can use and enhance my abilitie
 """  # noqa: E501
 
 
+# appended to the thinker prompt, to let the thinker deliver the task without an actor round
+THINKER_DELIVERABLE_PROMPT_TEMPLATE = """
+===== DIRECT DELIVERABLE =====
+If the task is already complete, and everything the final delivery needs is in our conversation (e.g. the results of my function calls), you may provide the final delivery yourself, instead of instructing me to provide it, which saves a turn. Then replace the <instruction> and <input> sections with the <deliverable> section below, and include 'TASK_DONE' within it. The conversation is closed once the <deliverable> appears. Never provide the <deliverable> if any function still needs to be called.
+
+<deliverable>
+    <task_objective>
+    [should be the same as the TASK, but avoiding mentioning specific roles]
+    </task_objective>
+    <task_context>
+    [should be the paragraphs]
+    </task_context>
+    <key_reasoning_points>
+    - Point 1: [Specific content/data/info and conclusion ...]
+    - Point 2: [Specific content/data/info and conclusion ...]
+    ...
+    </key_reasoning_points>
+    <final_output>
+    [should be the long and verbose]
+    {output_schema}
+    </final_output>
+    TASK_DONE
+</deliverable>
+"""  # noqa: E501
+
+
 ACTOR_PROMPT_TEMPLATE = """
 ===== RULES OF ASSISTANT =====
 Never forget you are a {actor_name} LLM and I am a {thinker_name} LLM. Never flip roles!
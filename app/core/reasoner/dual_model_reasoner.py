@@ -6,10 +6,15 @@ from app.core.common.type import MessageSourceType
 from app.core.memory.memory import Memory
 from app.core.model.message import ModelMessage
 from app.core.model.task import Task
-from app.core.prompt.reasoner import ACTOR_PROMPT_TEMPLATE, THINKER_PROMPT_TEMPLATE
+from app.core.prompt.reasoner import (
+    ACTOR_PROMPT_TEMPLATE,
+    THINKER_DELIVERABLE_PROMPT_TEMPLATE,
+    THINKER_PROMPT_TEMPLATE,
+)
 from app.core.reasoner.model_service import ModelService
 from app.core.reasoner.model_service_factory import ModelServiceFactory
 from app.core.reasoner.reasoner import Reasoner
+from app.core.tracer.tracer import trace_span
 
 
 class DualModelReasoner(Reasoner):
@@ -20,7 +25,6 @@ class DualModelReasoner(Reasoner):
         _thinker_name (str): The name of the thinker.
         _actor_model (ModelService): The actor model service.
         _thinker_model (ModelService): The thinker model service.
-        _memories (Dict[str, ReasonerMemory]): The memories of the reasonings.
     """
 
     def __init__(
@@ -51,6 +55,7 @@ class DualModelReasoner(Reasoner):
         # prepare the variables from the SystemEnv
         max_reasoning_rounds: int = SystemEnv.MAX_REASONING_ROUNDS
         print_messages: bool = SystemEnv.PRINT_REASONER_MESSAGES
+        thinker_deliverable: bool = SystemEnv.ENABLE_THINKER_DELIVERABLE
 
         # set the system prompt
         actor_sys_prompt = self._format_actor_sys_prompt(task=task)
@@ -74,53 +79,89 @@ class DualModelReasoner(Reasoner):
         reasoner_memory = await self.get_memory(memory_key=task.get_reasoner_memory_key())
         reasoner_memory.add_message(init_message)
 
-        for _ in range(max_reasoning_rounds):
-            # thinker
-            response = await self._thinker_model.generate(
+        for reasoning_round in range(1, max_reasoning_rounds + 1):
+            with trace_span(
+                "reasoner.round",
+                job_id=task.job.id,
+                operator_id=task.get_tool_call_ctx().operator_id,
+                round=reasoning_round,
+            ):
+                # thinker
+                response = await self._think(task, thinker_sys_prompt, reasoner_memory)
+                reasoner_memory.add_message(response)
+                self._report_message(task, response, print_messages)
+
+                # fast path: the thinker delivers the task, without an actor round
+                if thinker_deliverable and self.stopped(response):
+                    break
+
+                # actor
+                response = await self._act(task, actor_sys_prompt, reasoner_memory)
+                reasoner_memory.add_message(response)
+                self._report_message(task, response, print_messages)
+
+                if self.stopped(response):
+                    break
+
+        return await self.conclude(reasoner_memory=reasoner_memory)
+
+    async def _think(
+        self, task: Task, thinker_sys_prompt: str, reasoner_memory: Memory
+    ) -> ModelMessage:
+        """Call the thinker on the history in the memory."""
+        # the in-flight model request and tool calls are aborted once the job graph is stopped or
+        # failed
+        response = await task.cancellation_token.run(
+            self._thinker_model.generate(
                 sys_prompt=thinker_sys_prompt,
-                messages=reasoner_memory.get_messages(),
+                messages=reasoner_memory.get_context_messages(),
                 tool_call_ctx=task.get_tool_call_ctx(),
             )
-            response.set_source_type(MessageSourceType.THINKER)
-            reasoner_memory.add_message(response)
-
-            # TODO: use standard logging instead of print
-            if print_messages:
-                print(f"\033[94mjob_id: {task.job.id}\nThinker:\n{response.get_payload()}\033[0m\n")
+        )
+        response.set_source_type(MessageSourceType.THINKER)
+        return response
 
-            # actor
-            response = await self._actor_model.generate(
+    async def _act(
+        self, task: Task, actor_sys_prompt: str, reasoner_memory: Memory
+    ) -> ModelMessage:
+        """Call the actor on the history in the memory, which calls the functions, if any."""
+        response = await task.cancellation_token.run(
+            self._actor_model.generate(
                 sys_prompt=actor_sys_prompt,
-                messages=reasoner_memory.get_messages(),
+                messages=reasoner_memory.get_context_messages(),
                 tools=task.tools,
                 tool_call_ctx=task.get_tool_call_ctx(),
             )
-            response.set_source_type(MessageSourceType.ACTOR)
-            reasoner_memory.add_message(response)
-
-            # TODO: use standard logging instead of print
-            if print_messages:
-                print(f"\033[92mjob_id: {task.job.id}\nActor:\n{response.get_payload()}\033[0m\n")
-                func_call_results = response.get_function_calls()
-                if func_call_results:
-                    print(
-                        "\033[92m<function_call_result>\n"
-                        + "\n".join(
-                            [
-                                f"{i + 1}. {result.status.value} called function "
-                                f"{result.func_name}:\n"
-                                f"Call objective: {result.call_objective}\n"
-                                f"Function Output: {result.output}"
-                                for i, result in enumerate(func_call_results)
-                            ]
-                        )
-                        + "\n</function_call_result>\033[0m\n"
-                    )
-
-            if self.stopped(response):
-                break
+        )
+        response.set_source_type(MessageSourceType.ACTOR)
+        return response
 
-        return await self.conclude(reasoner_memory=reasoner_memory)
+    def _report_message(self, task: Task, message: ModelMessage, print_messages: bool) -> None:
+        """Publish the message appended to the memory, record its usage, and print it."""
+        self._publish_message(task=task, message=message)
+        self._record_usage(task=task, message=message)
+
+        # TODO: use standard logging instead of print
+        if not print_messages:
+            return
+        if message.get_source_type() == MessageSourceType.THINKER:
+            print(f"\033[94mjob_id: {task.job.id}\nThinker:\n{message.get_payload()}\033[0m\n")
+            return
+        print(f"\033[92mjob_id: {task.job.id}\nActor:\n{message.get_payload()}\033[0m\n")
+        func_call_results = message.get_function_calls()
+        if func_call_results:
+            print(
+                "\033[92m<function_call_result>\n"
+                + "\n".join(
+                    [
+                        f"{i + 1}. {result.status.value} called function {result.func_name}:\n"
+                        f"Call objective: {result.call_objective}\n"
+                        f"Function Output: {result.output}"
+                        for i, result in enumerate(func_call_results)
+                    ]
+                )
+                + "\n</function_call_result>\033[0m\n"
+            )
 
     async def update_knowledge(self, data: Any) -> None:
         """Update the knowledge."""
@@ -175,13 +216,6 @@ class DualModelReasoner(Reasoner):
         task_context = self._build_task_context(task)
         func_description = self._build_func_description(task)
 
-        if task.operator_config and task.operator_config.output_schema:
-            output_schema = (
-                "[Follow the final_output example:]\n" + task.operator_config.output_schema.strip()
-            )
-        else:
-            output_schema = ""
-
         # TODO: The prompt template comes from the <system-name>.config.yaml
         return ACTOR_PROMPT_TEMPLATE.format(
             actor_name=self._actor_name,
@@ -193,7 +227,7 @@ class DualModelReasoner(Reasoner):
             else "No specific instructions to execute.",
             context=task_context,
             functions=func_description,
-            output_schema=output_schema,
+            output_schema=self._format_output_schema(task),
         )
 
     def _format_thinker_sys_prompt(self, task: Task) -> str:
@@ -202,7 +236,7 @@ class DualModelReasoner(Reasoner):
         func_description = self._build_func_description(task)
 
         # TODO: The prompt template comes from the <system-name>.config.yaml
-        return THINKER_PROMPT_TEMPLATE.format(
+        sys_prompt = THINKER_PROMPT_TEMPLATE.format(
             actor_name=self._actor_name,
             thinker_name=self._thinker_name,
             max_reasoning_rounds=SystemEnv.MAX_REASONING_ROUNDS,
@@ -213,6 +247,19 @@ class DualModelReasoner(Reasoner):
             context=task_context,
             functions=func_description,
         )
+        if SystemEnv.ENABLE_THINKER_DELIVERABLE:
+            sys_prompt += THINKER_DELIVERABLE_PROMPT_TEMPLATE.format(
+                output_schema=self._format_output_schema(task)
+            )
+        return sys_prompt
+
+    def _format_output_schema(self, task: Task) -> str:
+        """Format the example of the final output, if the operator has an output schema."""
+        if task.operator_config and task.operator_config.output_schema:
+            return (
+                "[Follow the final_output example:]\n" + task.operator_config.output_schema.strip()
+            )
+        return ""
 
     @staticmethod
     def stopped(message: ModelMessage) -> bool:
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+import asyncio
+import contextlib
 import inspect
 import json
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
@@ -6,8 +8,10 @@ from uuid import uuid4
 
 from mcp.types import TextContent
 
+from app.core.common.system_env import SystemEnv
 from app.core.common.type import FunctionCallStatus
 from app.core.common.util import parse_jsons
+from app.core.model.job_result import ModelUsage
 from app.core.model.message import ModelMessage
 from app.core.model.task import Task, ToolCallContext
 from app.core.prompt.model_service import FUNC_CALLING_JSON_GUIDE
@@ -16,10 +20,21 @@ from app.core.reasoner.injection_mapping import (
     setup_injection_services_mapping,
 )
 from app.core.toolkit.tool import FunctionCallResult, Tool
+from app.core.tracer.tracer import trace_span
+
+# observer of the streamed model output: (text chunk, tool call context of the generation)
+TokenObserver = Callable[[str, Optional[ToolCallContext]], None]
 
 
 class ModelService(ABC):
-    """Model service."""
+    """Model service.
+
+    Attributes:
+        _token_observers (List[TokenObserver]): The observers of the streamed model output, shared
+            by all the model services (e.g. to stream the tokens to the UI).
+    """
+
+    _token_observers: List[TokenObserver] = []
 
     def __init__(self):
         # setup the injection services mapping (used by function callings)
@@ -38,6 +53,85 @@ class ModelService(ABC):
     ) -> ModelMessage:
         """Generate a text given a prompt non-streaming"""
 
+    @classmethod
+    def add_token_observer(cls, observer: TokenObserver) -> None:
+        """Observe the text chunks of the streamed model outputs."""
+        ModelService._token_observers.append(observer)
+
+    @classmethod
+    def remove_token_observer(cls, observer: TokenObserver) -> None:
+        """Stop observing the text chunks of the streamed model outputs."""
+        if observer in ModelService._token_observers:
+            ModelService._token_observers.remove(observer)
+
+    def _notify_token_observers(
+        self, chunk: str, tool_call_ctx: Optional[ToolCallContext] = None
+    ) -> None:
+        """Send a text chunk of the streamed model output to the observers."""
+        for observer in list(ModelService._token_observers):
+            try:
+                observer(chunk, tool_call_ctx)
+            except Exception as e:
+                print(f"\033[38;5;208m[Warning]: Token observer failed: {e}\033[0m")
+
+    def _render_message(self, message: ModelMessage, with_function_calls: bool = True) -> str:
+        """Render the content of a message in the model requests: the payload, followed by the
+        results of the function calls of the message (if any).
+
+        The reasoners resend the whole history in every round, so the rendered content is cached
+        in the message, and it is rendered again only if the fingerprint of the rendered fields
+        changes. The fingerprint is cheap to check, since the hashes of the strings are cached.
+
+        Args:
+            message (ModelMessage): The message to render.
+            with_function_calls (bool): Whether to render the results of the function calls.
+        """
+        func_call_results = (message.get_function_calls() or []) if with_function_calls else []
+        fingerprint = hash(
+            (
+                message.get_payload(),
+                tuple(
+                    (result.status, result.func_name, result.call_objective, result.output)
+                    for result in func_call_results
+                ),
+            )
+        )
+        content = message.get_rendered(fingerprint)
+        if content is not None:
+            return content
+
+        content = message.get_payload()
+        if func_call_results:
+            content += (
+                "<function_call_result>\n"
+                + "\n".join(
+                    [
+                        f"{i + 1}. {result.status.value} called function "
+                        f"{result.func_name}:\n"
+                        f"Call objective: {result.call_objective}\n"
+                        f"Function Output: {result.output}"
+                        for i, result in enumerate(func_call_results)
+                    ]
+                )
+                + "\n</function_call_result>"
+            )
+        content = content.strip()
+        message.set_rendered(fingerprint, content)
+        return content
+
+    def _get_span_attributes(
+        self, usage: ModelUsage, prompt_texts: List[str], response_text: Optional[str]
+    ) -> Dict[str, Any]:
+        """Get the attributes of the span of a model call: the tokens, the latency and the sizes
+        of the request and the response."""
+        return {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "model_duration": usage.duration,
+            "prompt_bytes": sum(len(text.encode("utf-8")) for text in prompt_texts if text),
+            "response_bytes": len((response_text or "").encode("utf-8")),
+        }
+
     async def call_function(
         self,
         tools: List[Tool],
@@ -59,91 +153,134 @@ class ModelService(ABC):
             # do not call any functions
             return None
 
-        func_call_results: List[FunctionCallResult] = []
+        if not SystemEnv.ENABLE_CONCURRENT_FUNCTION_CALLING or len(func_calls) == 1:
+            return [
+                await self._call_function(
+                    tools=tools,
+                    func_tuple=func_tuple,
+                    err=err,
+                    tool_call_ctx=tool_call_ctx,
+                )
+                for func_tuple, err in func_calls
+            ]
+
+        # concurrent mode: the independent function calls of one turn are executed concurrently
+        scheduler = FunctionCallScheduler(
+            model_service=self, tools=tools, tool_call_ctx=tool_call_ctx, concurrent=True
+        )
         for func_tuple, err in func_calls:
-            if err:
-                # handle parsing error
-                func_call_results.append(FunctionCallResult.error(err))
-                continue
+            scheduler.submit(func_tuple=func_tuple, err=err)
+        return await scheduler.results()
 
-            assert isinstance(func_tuple, tuple)
-            func_name, call_objective, func_args = func_tuple
-            func = self._find_function(func_name, tools)
-            if not func:
-                if len(tools) == 0:
-                    available_funcs_desc = "No function calling available now."
-                else:
-                    available_funcs_desc = (
-                        "The available functions/tools that can be called by <function_call>: ["
-                        f"{', '.join([tool.function.__name__ for tool in tools])}]"
-                    )
-                func_call_results.append(
-                    FunctionCallResult(
-                        func_name=func_name,
-                        call_objective=call_objective,
-                        func_args=func_args,
-                        status=FunctionCallStatus.FAILED,
-                        output=f"Error: Function {func_name} does not exist in the current scope. "
-                        "You have called a function that does not exist in the system, "
-                        f"and have made a mistake of function calling. {available_funcs_desc}",
-                    )
+    async def _call_function(
+        self,
+        tools: List[Tool],
+        func_tuple: Optional[Tuple[str, str, Dict[str, Any]]],
+        err: Optional[str],
+        tool_call_ctx: Optional[ToolCallContext] = None,
+        run_sync_in_thread: bool = False,
+    ) -> FunctionCallResult:
+        """Call one parsed function.
+
+        Args:
+            tools (List[Tool]): The tools to call
+            func_tuple (Optional[Tuple[str, str, Dict[str, Any]]]): The parsed function name,
+                call objective and arguments
+            err (Optional[str]): The parsing error of the function call, if any
+            tool_call_ctx (Optional[ToolCallContext]): The context of the tool call
+            run_sync_in_thread (bool): Whether to run a sync function in a worker thread, so that
+                it does not block the other function calls of the event loop
+
+        Returns:
+            FunctionCallResult: The result of the function call
+        """
+        if err:
+            # handle parsing error
+            return FunctionCallResult.error(err)
+
+        assert isinstance(func_tuple, tuple)
+        func_name, call_objective, func_args = func_tuple
+        func = self._find_function(func_name, tools)
+        if not func:
+            if len(tools) == 0:
+                available_funcs_desc = "No function calling available now."
+            else:
+                available_funcs_desc = (
+                    "The available functions/tools that can be called by <function_call>: ["
+                    f"{', '.join([tool.function.__name__ for tool in tools])}]"
                 )
-                continue
+            return FunctionCallResult(
+                func_name=func_name,
+                call_objective=call_objective,
+                func_args=func_args,
+                status=FunctionCallStatus.FAILED,
+                output=f"Error: Function {func_name} does not exist in the current scope. "
+                "You have called a function that does not exist in the system, "
+                f"and have made a mistake of function calling. {available_funcs_desc}",
+            )
 
-            try:
-                # prepare function arguments:
-                # handle the service injection based on sig parameter types.
-                # this will auto-inject services from the mapping when a function requires them
-                # TODO: handle the case when the function has no type hints
-                # TODO: handle the case when the function has default value
-                sig = inspect.signature(func)
-                for param_name, param in sig.parameters.items():
-                    injection_type_found: bool = False
-                    param_type: Any = param.annotation
-
-                    # inject task parameter if parameter type is Task
-                    if param_type is ToolCallContext:
-                        if tool_call_ctx is None:
-                            raise ValueError(
-                                f"Function {func_name} requires FunctionCallContext, "
-                                "but no FunctionCallContext is provided."
-                            )
-                        func_args[param_name] = tool_call_ctx
-                        injection_type_found = True
-                        continue
-
-                    # handle the union types
-                    if param_type is Union:
-                        available_types = getattr(param_type, "__args__", [])
-                        for available_type in available_types:
-                            # skip None type
-                            if available_type is type(None):
-                                continue
-
-                            # inject task if Task type is found in union
-                            if available_type is Task:
-                                if tool_call_ctx is None:
-                                    raise ValueError(
-                                        f"Function {func_name} requires FunctionCallContext, "
-                                        "but no FunctionCallContext is provided."
-                                    )
-                                func_args[param_name] = tool_call_ctx
-                                injection_type_found = True
-                                break
-
-                            if available_type in injection_services_mapping:
-                                func_args[param_name] = injection_services_mapping[available_type]
-                                injection_type_found = True
-                                break
-
-                    # try to inject service based on parameter type
-                    if not injection_type_found:
-                        if param_type in injection_services_mapping:
-                            func_args[param_name] = injection_services_mapping[param_type]
-
-                # execute function call
+        try:
+            # prepare function arguments:
+            # handle the service injection based on sig parameter types.
+            # this will auto-inject services from the mapping when a function requires them
+            # TODO: handle the case when the function has no type hints
+            # TODO: handle the case when the function has default value
+            sig = inspect.signature(func)
+            for param_name, param in sig.parameters.items():
+                injection_type_found: bool = False
+                param_type: Any = param.annotation
+
+                # inject task parameter if parameter type is Task
+                if param_type is ToolCallContext:
+                    if tool_call_ctx is None:
+                        raise ValueError(
+                            f"Function {func_name} requires FunctionCallContext, "
+                            "but no FunctionCallContext is provided."
+                        )
+                    func_args[param_name] = tool_call_ctx
+                    injection_type_found = True
+                    continue
+
+                # handle the union types
+                if param_type is Union:
+                    available_types = getattr(param_type, "__args__", [])
+                    for available_type in available_types:
+                        # skip None type
+                        if available_type is type(None):
+                            continue
+
+                        # inject task if Task type is found in union
+                        if available_type is Task:
+                            if tool_call_ctx is None:
+                                raise ValueError(
+                                    f"Function {func_name} requires FunctionCallContext, "
+                                    "but no FunctionCallContext is provided."
+                                )
+                            func_args[param_name] = tool_call_ctx
+                            injection_type_found = True
+                            break
+
+                        if available_type in injection_services_mapping:
+                            func_args[param_name] = injection_services_mapping[available_type]
+                            injection_type_found = True
+                            break
+
+                # try to inject service based on parameter type
+                if not injection_type_found:
+                    if param_type in injection_services_mapping:
+                        func_args[param_name] = injection_services_mapping[param_type]
+
+            # execute function call
+            with trace_span(
+                "tool.call",
+                function=func_name,
+                job_id=tool_call_ctx.job_id if tool_call_ctx else None,
+                operator_id=tool_call_ctx.operator_id if tool_call_ctx else None,
+            ) as span:
                 if inspect.iscoroutinefunction(func):
                     result = await func(**func_args)
+                elif run_sync_in_thread:
+                    result = await asyncio.to_thread(func, **func_args)
                 else:
                     result = func(**func_args)
 
@@ -155,27 +292,23 @@ class ModelService(ABC):
                             result_str += res.text + "\n"
                 else:
                     result_str = str(result)
-                func_call_results.append(
-                    FunctionCallResult(
-                        func_name=func_name,
-                        call_objective=call_objective,
-                        func_args=func_args,
-                        status=FunctionCallStatus.SUCCEEDED,
-                        output=result_str,
-                    )
-                )
-            except Exception as e:
-                func_call_results.append(
-                    FunctionCallResult(
-                        func_name=func_name,
-                        call_objective=call_objective,
-                        func_args=func_args,
-                        status=FunctionCallStatus.FAILED,
-                        output=f"Function {func_name} execution failed: {str(e)}",
-                    )
-                )
-
-        return func_call_results
+                if span.recording:
+                    span.set_attribute("output_bytes", len(result_str.encode("utf-8")))
+            return FunctionCallResult(
+                func_name=func_name,
+                call_objective=call_objective,
+                func_args=func_args,
+                status=FunctionCallStatus.SUCCEEDED,
+                output=result_str,
+            )
+        except Exception as e:
+            return FunctionCallResult(
+                func_name=func_name,
+                call_objective=call_objective,
+                func_args=func_args,
+                status=FunctionCallStatus.FAILED,
+                output=f"Function {func_name} execution failed: {str(e)}",
+            )
 
     def _parse_function_calls(
         self, text: str
@@ -265,3 +398,83 @@ class ModelService(ABC):
             if tool.name == func_name:
                 return tool.function
         return None
+
+
+class FunctionCallScheduler:
+    """Scheduler of the function calls of one model turn.
+
+    A function call starts as soon as it is submitted, so that it can be executed while the model
+    is still generating the rest of the turn. In the sequential mode, a function call starts
+    after the previous one completes. In the concurrent mode, the function calls run
+    concurrently, bounded by the global limit and the per-tool limits. In both modes, the results
+    keep the order of the function calls.
+
+    Attributes:
+        _model_service (ModelService): The model service calling the functions.
+        _tools (List[Tool]): The tools to call.
+        _tool_call_ctx (Optional[ToolCallContext]): The context of the tool calls.
+        _concurrent (bool): Whether the function calls run concurrently.
+        _tasks (List[asyncio.Task]): The tasks of the submitted function calls, in order.
+    """
+
+    def __init__(
+        self,
+        model_service: ModelService,
+        tools: List[Tool],
+        tool_call_ctx: Optional[ToolCallContext] = None,
+        concurrent: bool = False,
+    ):
+        self._model_service: ModelService = model_service
+        self._tools: List[Tool] = tools
+        self._tool_call_ctx: Optional[ToolCallContext] = tool_call_ctx
+        self._concurrent: bool = concurrent
+        self._semaphore = asyncio.Semaphore(max(1, SystemEnv.MAX_CONCURRENT_FUNCTION_CALLS))
+        self._tool_semaphores: Dict[str, asyncio.Semaphore] = {
+            tool.name: asyncio.Semaphore(tool.max_concurrency)
+            for tool in tools
+            if tool.max_concurrency
+        }
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def submitted_count(self) -> int:
+        """Get the number of the submitted function calls."""
+        return len(self._tasks)
+
+    def submit(
+        self, func_tuple: Optional[Tuple[str, str, Dict[str, Any]]], err: Optional[str]
+    ) -> None:
+        """Start a parsed function call in the background."""
+        previous_task = self._tasks[-1] if self._tasks and not self._concurrent else None
+        self._tasks.append(asyncio.create_task(self._run(func_tuple, err, previous_task)))
+
+    async def results(self) -> List[FunctionCallResult]:
+        """Wait for the submitted function calls, and get their results in order."""
+        return list(await asyncio.gather(*self._tasks))
+
+    def cancel(self) -> None:
+        """Cancel the unfinished function calls."""
+        for task in self._tasks:
+            task.cancel()
+
+    async def _run(
+        self,
+        func_tuple: Optional[Tuple[str, str, Dict[str, Any]]],
+        err: Optional[str],
+        previous_task: Optional[asyncio.Task],
+    ) -> FunctionCallResult:
+        if previous_task is not None:
+            await asyncio.wait([previous_task])
+
+        tool_semaphore = self._tool_semaphores.get(func_tuple[0], None) if func_tuple else None
+        async with tool_semaphore or contextlib.nullcontext():
+            async with self._semaphore:
+                # the sync functions run in worker threads, to not block the event loop which
+                # is executing the other function calls, or consuming the model output stream
+                return await self._model_service._call_function(
+                    tools=self._tools,
+                    func_tuple=func_tuple,
+                    err=err,
+                    tool_call_ctx=self._tool_call_ctx,
+                    run_sync_in_thread=True,
+                )
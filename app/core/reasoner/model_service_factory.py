@@ -1,6 +1,7 @@
 from app.core.common.type import ModelPlatformType
 from app.core.reasoner.model_service import ModelService
 from app.plugin.lite_llm.lite_llm_client import LiteLlmClient
+from app.plugin.mock.mock_llm_client import MockLlmClient
 
 
 class ModelServiceFactory:
@@ -11,5 +12,7 @@ class ModelServiceFactory:
         """Create a model service."""
         if model_platform_type == ModelPlatformType.LITELLM:
             return LiteLlmClient()
+        if model_platform_type == ModelPlatformType.MOCK:
+            return MockLlmClient()
         # TODO: add more platforms, so the **kwargs can be used to pass the necessary parameters
         raise ValueError(f"Cannot create model service of type {model_platform_type}")
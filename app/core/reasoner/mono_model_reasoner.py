@@ -10,6 +10,7 @@ from app.core.prompt.reasoner import MONO_PROMPT_TEMPLATE
 from app.core.reasoner.model_service import ModelService
 from app.core.reasoner.model_service_factory import ModelServiceFactory
 from app.core.reasoner.reasoner import Reasoner
+from app.core.tracer.tracer import trace_span
 
 
 class MonoModelReasoner(Reasoner):
@@ -20,7 +21,6 @@ class MonoModelReasoner(Reasoner):
         _thinker_name (str): The name of the thinker.
         _actor_model (ModelService): The actor model service.
         _thinker_model (ModelService): The thinker model service.
-        _memories (Dict[str, ReasonerMemory]): The memories of the reasonings.
     """
 
     def __init__(
@@ -68,37 +68,51 @@ class MonoModelReasoner(Reasoner):
         reasoner_memory = await self.get_memory(memory_key=task.get_reasoner_memory_key())
         reasoner_memory.add_message(init_message)
 
-        for _ in range(max_reasoning_rounds):
-            response = await self._model.generate(
-                sys_prompt=sys_prompt,
-                messages=reasoner_memory.get_messages(),
-                tools=task.tools,
-                tool_call_ctx=task.get_tool_call_ctx(),
-            )
-            response.set_source_type(MessageSourceType.MODEL)
-            reasoner_memory.add_message(response)
-
-            # TODO: use standard logging instead of print
-            if print_messages:
-                print(f"\033[92mjob_id: {task.job.id}\nModel:\n{response.get_payload()}\033[0m\n")
-                func_call_results = response.get_function_calls()
-                if func_call_results:
+        for reasoning_round in range(1, max_reasoning_rounds + 1):
+            with trace_span(
+                "reasoner.round",
+                job_id=task.job.id,
+                operator_id=task.get_tool_call_ctx().operator_id,
+                round=reasoning_round,
+            ):
+                # the in-flight model request and tool calls are aborted once the job graph is
+                # stopped or failed
+                response = await task.cancellation_token.run(
+                    self._model.generate(
+                        sys_prompt=sys_prompt,
+                        messages=reasoner_memory.get_context_messages(),
+                        tools=task.tools,
+                        tool_call_ctx=task.get_tool_call_ctx(),
+                    )
+                )
+                response.set_source_type(MessageSourceType.MODEL)
+                reasoner_memory.add_message(response)
+                self._publish_message(task=task, message=response)
+                self._record_usage(task=task, message=response)
+
+                # TODO: use standard logging instead of print
+                if print_messages:
                     print(
-                        "\033[92m<function_call_result>\n"
-                        + "\n".join(
-                            [
-                                f"{i + 1}. {result.status.value} called function "
-                                f"{result.func_name}:\n"
-                                f"Call objective: {result.call_objective}\n"
-                                f"Function Output: {result.output}"
-                                for i, result in enumerate(func_call_results)
-                            ]
-                        )
-                        + "\n</function_call_result>\033[0m\n"
+                        f"\033[92mjob_id: {task.job.id}\nModel:\n{response.get_payload()}\033[0m\n"
                     )
+                    func_call_results = response.get_function_calls()
+                    if func_call_results:
+                        print(
+                            "\033[92m<function_call_result>\n"
+                            + "\n".join(
+                                [
+                                    f"{i + 1}. {result.status.value} called function "
+                                    f"{result.func_name}:\n"
+                                    f"Call objective: {result.call_objective}\n"
+                                    f"Function Output: {result.output}"
+                                    for i, result in enumerate(func_call_results)
+                                ]
+                            )
+                            + "\n</function_call_result>\033[0m\n"
+                        )
 
-            if self.stopped(response):
-                break
+                if self.stopped(response):
+                    break
 
         return await self.conclude(reasoner_memory=reasoner_memory)
 
@@ -1,19 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Optional
 
+from app.core.common.type import JobEventType
 from app.core.memory.memory import Memory
+from app.core.model.message import ModelMessage
 from app.core.model.task import MemoryKey, Task
 from app.core.prompt.model_service import TASK_DESCRIPTOR_PROMPT_TEMPLATE
+from app.core.service.job_event_service import JobEventService
+from app.core.service.job_service import JobService
 from app.core.service.memory_service import MemoryService
 
 
 class Reasoner(ABC):
-    """Base Reasoner, an env element of the multi-agent system."""
+    """Base Reasoner, an env element of the multi-agent system.
 
-    def __init__(self):
-        self._memories: Dict[
-            str, Dict[str, Dict[str, Memory]]
-        ] = {}  # session_id -> job_id -> operator_id -> memory
+    The memories of the reasonings are kept by the memory service, which releases them once the
+    jobs are done, see `get_memory`.
+    """
 
     @abstractmethod
     async def infer(self, task: Task) -> str:
@@ -36,6 +39,43 @@ class Reasoner(ABC):
         memory_service: MemoryService = MemoryService.instance
         return await memory_service.get_or_create_reasoner_memory(reasoner_memory_key=memory_key)
 
+    def _publish_message(self, task: Task, message: ModelMessage) -> None:
+        """Publish the message appended to the reasoner memory to the subscribers of the job."""
+        job_event_service: JobEventService = JobEventService.instance
+        if not job_event_service.is_subscribed(task.job):
+            return
+        job_event_service.publish_event(
+            JobEventType.REASONER_MESSAGE_APPENDED,
+            job=task.job,
+            payload={
+                "source_type": message.get_source_type().value,
+                "step": message.get_step(),
+                "payload": message.get_payload(),
+                "function_calls": [
+                    {
+                        "func_name": result.func_name,
+                        "call_objective": result.call_objective,
+                        "status": result.status.value,
+                        "output": result.output,
+                    }
+                    for result in message.get_function_calls() or []
+                ],
+            },
+        )
+
+    def _record_usage(self, task: Task, message: ModelMessage) -> None:
+        """Record the usage of the model call which generated the message, accounted to the
+        operator of the task."""
+        usage = message.get_usage()
+        job_service: Optional[JobService] = JobService.instance
+        if usage is None or job_service is None:
+            return
+        job_service.record_model_usage(
+            job_id=task.job.id,
+            operator_id=task.get_tool_call_ctx().operator_id,
+            usage=usage,
+        )
+
     def _build_task_context(self, task: Task) -> str:
         """Build the task context string for system prompts."""
         if task.insights:
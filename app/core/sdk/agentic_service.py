@@ -209,6 +209,8 @@ class AgenticService(metaclass=Singleton):
                         module = importlib.import_module(tool_config.module_path)
                         tool_class = getattr(module, tool_config.name)
                         tool = tool_class()
+                        if tool_config.max_concurrency:
+                            tool.max_concurrency = tool_config.max_concurrency
                         action_tools.append(tool)
                     elif isinstance(tool_config, McpConfig):
                         # handle MCP tools from a remote service as tool group
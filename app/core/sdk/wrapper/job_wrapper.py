@@ -1,11 +1,11 @@
-import time
-from typing import cast
+from typing import Generator, Iterator, Optional, cast
 
 from app.core.common.type import ChatMessageRole
 from app.core.model.job import Job
-from app.core.model.job_result import JobResult
+from app.core.model.job_event import JobEvent
 from app.core.model.message import ChatMessage, HybridMessage
 from app.core.service.agent_service import AgentService
+from app.core.service.job_event_service import JobEventService, JobEventSubscription
 from app.core.service.job_service import JobService
 from app.core.service.message_service import MessageService
 
@@ -15,6 +15,7 @@ class JobWrapper:
 
     def __init__(self, job: Job):
         self._job: Job = job
+        self._subscription: Optional[JobEventSubscription] = None
 
     @property
     def job(self) -> Job:
@@ -31,32 +32,86 @@ class JobWrapper:
         agent_service: AgentService = AgentService.instance
         agent_service.leader.execute_original_job(original_job=self._job)
 
-    def get_stream(self):
-        """Get the stream of the job."""
-        # TODO: implement the stream function
-        raise NotImplementedError("Stream is not supported yet.")
+    def subscribe(self, buffer_size: Optional[int] = None) -> None:
+        """Subscribe to the events of the job, before it is executed, so the stream of the job
+        misses none of its events.
 
-    def wait(self, interval: int = 5) -> ChatMessage:
-        """Wait for the result."""
-        while 1:
-            # sleep for `interval` seconds
-            time.sleep(interval)
+        Args:
+            buffer_size (Optional[int]): The max buffered events, before the job execution waits
+                for the stream to be consumed. Defaults to `SystemEnv.JOB_EVENT_BUFFER_SIZE`.
+        """
+        if self._subscription is None:
+            job_event_service: JobEventService = JobEventService.instance
+            self._subscription = job_event_service.subscribe(
+                original_job_id=self._job.id, buffer_size=buffer_size
+            )
+
+    def get_stream(self, buffer_size: Optional[int] = None) -> Iterator[JobEvent]:
+        """Get the stream of the job.
+
+        The stream yields the events of the job as they are published: the subjob creations and
+        status changes of the leader, the thinker / actor messages (with their function call
+        results) of the reasoners, the artifact updates and the final answer. It ends once the
+        job reaches a final status, with the status change of the job.
 
-            # query the result every `interval` seconds.
-            # please note that the job is executed in the thread,
-            # so the result may not be queryed immediately.
+        The job is subscribed to by this call, not by the first iteration of the stream, so the
+        events published after this call are not missed. If the job was not subscribed before
+        its execution (see `subscribe`), the events published before this call are missed.
+
+        The events are buffered up to `buffer_size`, and the job execution waits for a slow
+        consumer (up to `SystemEnv.JOB_EVENT_PUBLISH_TIMEOUT` seconds per event). A consumer
+        slower than that is dropped, and its stream ends with a SUBSCRIPTION_DROPPED event instead
+        of the final status change. Consuming the stream to its end, or closing it early,
+        unsubscribes from the job.
+        """
+        self.subscribe(buffer_size=buffer_size)
+        subscription = cast(JobEventSubscription, self._subscription)
+        self._subscription = None
+        job_event_service: JobEventService = JobEventService.instance
+        try:
             job_service: JobService = JobService.instance
-            job_result: JobResult = job_service.query_original_job_result(
-                original_job_id=self._job.id
+            job_result = job_service.get_job_result(job_id=self._job.id)
+        except BaseException:
+            job_event_service.unsubscribe(subscription)
+            raise
+
+        if job_result.has_result() and not subscription.closed:
+            # the job reached a final status before the subscription, so no event will come
+            job_event_service.unsubscribe(subscription)
+            return iter(
+                [JobEvent.status_changed(original_job_id=self._job.id, job_result=job_result)]
             )
+        return self._consume_stream(subscription)
+
+    def _consume_stream(
+        self, subscription: JobEventSubscription
+    ) -> Generator[JobEvent, None, None]:
+        """Consume the events of the subscription, and unsubscribe once it is done."""
+        try:
+            yield from subscription
+        finally:
+            JobEventService.instance.unsubscribe(subscription)
+
+    def wait(self, timeout: Optional[float] = None) -> ChatMessage:
+        """Wait for the result.
+
+        The job is executed in another thread, and the caller is woken up as soon as the job
+        reaches a final status.
+
+        Args:
+            timeout (Optional[float]): The maximum seconds to wait. Waits forever if None.
+
+        Raises:
+            TimeoutError: If the job does not reach a final status within the timeout.
+        """
+        job_service: JobService = JobService.instance
+        job_service.wait_job_result(job_id=self._job.id, timeout=timeout)
 
-            # check if the job is finished
-            if job_result.has_result():
-                message_service: MessageService = MessageService.instance
-                return cast(
-                    HybridMessage,
-                    message_service.get_hybrid_message_by_job_id_and_role(
-                        job_id=self._job.id,
-                        role=ChatMessageRole.SYSTEM,
-                    ),
-                )
+        message_service: MessageService = MessageService.instance
+        return cast(
+            HybridMessage,
+            message_service.get_hybrid_message_by_job_id_and_role(
+                job_id=self._job.id,
+                role=ChatMessageRole.SYSTEM,
+            ),
+        )
@@ -24,8 +24,14 @@ class SessionWrapper:
         """Get the session."""
         return self._session
 
-    def submit(self, message: ChatMessage) -> JobWrapper:
-        """Submit the job."""
+    def submit(self, message: ChatMessage, stream: bool = False) -> JobWrapper:
+        """Submit the job.
+
+        Args:
+            message (ChatMessage): The message of the user.
+            stream (bool): Whether to subscribe to the events of the job before it is executed,
+                so `JobWrapper.get_stream` yields all of them.
+        """
         message_service: MessageService = MessageService.instance
         job_service: JobService = JobService.instance
 
@@ -52,11 +58,10 @@ class SessionWrapper:
         original_jobs = job_service.get_original_jobs_by_session_id(session_id=session_id)
         original_job_ids = [j.id for j in original_jobs]
 
-        # get message view data for the job
-        conversation_views_history: List[MessageView] = []
-        for original_job_id in original_job_ids:
-            conversation_view = job_service.get_conversation_view(original_job_id=original_job_id)
-            conversation_views_history.append(conversation_view)
+        # get message view data for the jobs, loaded in bulk
+        conversation_views_history: List[MessageView] = job_service.get_conversation_views(
+            original_job_ids=original_job_ids
+        )
 
         historical_context = self._format_conversation_history(
             conversation_views=conversation_views_history, current_question_message=text_message
@@ -85,6 +90,8 @@ class SessionWrapper:
         session_service.update_session(session=self._session)
 
         # (6) execute the job
+        if stream:
+            job_wrapper.subscribe()
         run_in_thread(job_wrapper.execute)
 
         return job_wrapper
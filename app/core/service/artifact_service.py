@@ -2,11 +2,14 @@ from copy import deepcopy
 from typing import Any, Dict, List, Optional, Tuple
 
 from app.core.common.singleton import Singleton
+from app.core.common.type import JobEventType
 from app.core.dal.dao.artifact_dao import ArtifactDao
+from app.core.dal.dao.job_dao import JobDao
 from app.core.model.artifact import (
     Artifact,
     ContentType,
 )
+from app.core.service.job_event_service import JobEventService
 
 
 class ArtifactService(metaclass=Singleton):
@@ -20,6 +23,8 @@ class ArtifactService(metaclass=Singleton):
 
     def __init__(self):
         self._artifact_dao: ArtifactDao = ArtifactDao.instance
+        self._job_dao: JobDao = JobDao.instance
+        self._job_event_service: JobEventService = JobEventService.instance
 
     def save_artifact(self, artifact: Artifact) -> str:
         """Create a new artifact or update an existing one.
@@ -31,6 +36,7 @@ class ArtifactService(metaclass=Singleton):
             str: ID of the artifact
         """
         artifact_do = self._artifact_dao.save_artifact(artifact)
+        self._publish_artifact_updated(artifact=artifact, artifact_id=str(artifact_do.id))
         return str(artifact_do.id)
 
     def get_artifact(self, artifact_id: str) -> Optional[Artifact]:
@@ -101,10 +107,27 @@ class ArtifactService(metaclass=Singleton):
         )
 
         # save the updated artifact
-        self._artifact_dao.save_artifact(artifact)
+        artifact_do = self._artifact_dao.save_artifact(artifact)
+        self._publish_artifact_updated(artifact=artifact, artifact_id=str(artifact_do.id))
 
         return artifact
 
+    def _publish_artifact_updated(self, artifact: Artifact, artifact_id: str) -> None:
+        """Publish the saved artifact to the subscribers of its job, if anyone subscribes."""
+        if not self._job_event_service.has_subscribers():
+            return
+        job = self._job_dao.get_job_by_id(artifact.source_reference.job_id)
+        self._job_event_service.publish_event(
+            JobEventType.ARTIFACT_UPDATED,
+            job=job,
+            payload={
+                "artifact_id": artifact_id,
+                "content_type": artifact.content_type.value,
+                "status": artifact.status.value,
+                "version": artifact.metadata.version,
+            },
+        )
+
     def _increment_content(
         self, content_type: ContentType, current_content: Any, new_content: Any
     ) -> Any:
@@ -1,13 +1,23 @@
+import atexit
 import json
-from typing import Any, Dict, List, cast
+import threading
+import time
+from typing import Any, Dict, List, Tuple, cast
 
+from app.core.common.logger import Chat2GraphLogger
 from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
 from app.core.common.type import GraphDbType
 from app.core.dal.dao.graph_db_dao import GraphDbDao
 from app.core.model.graph_db_config import GraphDbConfig, Neo4jDbConfig
 from app.core.toolkit.graph_db.graph_db import GraphDb
 from app.core.toolkit.graph_db.graph_db_factory import GraphDbFactory
 
+logger = Chat2GraphLogger.get_logger(__name__)
+
+# the fields of the graph db config used by the driver, whose updates rebuild the cached driver
+_CONNECTION_FIELDS = ("type", "host", "port", "user", "pwd")
+
 
 class GraphDbService(metaclass=Singleton):
     """GraphDB Service"""
@@ -15,6 +25,13 @@ class GraphDbService(metaclass=Singleton):
     def __init__(self):
         self._graph_db_dao: GraphDbDao = GraphDbDao.instance
 
+        # process-wide graph db registry: {graph_db_id: (version, graph_db, last_health_check)}
+        # each cached graph db owns one driver (a bounded bolt connection pool), which is shared
+        # by all the tool calls instead of being created (and leaked) per call
+        self._graph_dbs: Dict[str, Tuple[Tuple, GraphDb, float]] = {}
+        self._graph_dbs_lock = threading.Lock()
+        atexit.register(self.close_all_graph_dbs)
+
     def create_graph_db(self, graph_db_config: GraphDbConfig) -> GraphDbConfig:
         """Create a new GraphDB."""
         # determinate default flag
@@ -37,7 +54,76 @@ class GraphDbService(metaclass=Singleton):
     def get_default_graph_db(self) -> GraphDb:
         """Get the default GraphDB."""
         config = self.get_default_graph_db_config()
-        return GraphDbFactory.get_graph_db(graph_db_type=config.type, config=config)
+        return self.get_graph_db(graph_db_config=config)
+
+    def get_graph_db(self, graph_db_config: GraphDbConfig) -> GraphDb:
+        """Get the cached GraphDB of the config, or create one if it is absent, built from an
+        outdated connection config, or unhealthy. The returned GraphDB is shared, so the callers
+        must not close it.
+
+        The health check runs outside the registry lock, so a slow or dead database does not block
+        the callers of the other databases.
+        """
+        assert graph_db_config.id is not None, "ID is required to get a cached GraphDB"
+        id = graph_db_config.id
+        version = self._get_connection_version(graph_db_config)
+
+        with self._graph_dbs_lock:
+            cached = self._graph_dbs.get(id, None)
+        if cached and cached[0] == version:
+            _, graph_db, last_health_check = cached
+            if time.time() - last_health_check < SystemEnv.GRAPH_DB_HEALTH_CHECK_INTERVAL:
+                return graph_db
+            if graph_db.is_healthy():
+                with self._graph_dbs_lock:
+                    if self._graph_dbs.get(id, None) is cached:
+                        self._graph_dbs[id] = (version, graph_db, time.time())
+                return graph_db
+            logger.warning(f"GraphDB {id} failed the health check, reconnecting")
+
+        with self._graph_dbs_lock:
+            current = self._graph_dbs.get(id, None)
+            if current and current is not cached and current[0] == version:
+                # rebuilt by another caller in the meantime
+                return current[1]
+            graph_db = GraphDbFactory.get_graph_db(
+                graph_db_type=graph_db_config.type, config=graph_db_config
+            )
+            self._graph_dbs[id] = (version, graph_db, time.time())
+
+        # the connection config changed or the driver is broken, so close the evicted driver
+        if current:
+            self._close_graph_db(current[1])
+        return graph_db
+
+    def invalidate_graph_db(self, id: str) -> None:
+        """Close and evict the cached GraphDB by ID, if there is one."""
+        with self._graph_dbs_lock:
+            cached = self._graph_dbs.pop(id, None)
+        if cached:
+            self._close_graph_db(cached[1])
+
+    def close_all_graph_dbs(self) -> None:
+        """Close all the cached GraphDBs, e.g. when the process shuts down."""
+        with self._graph_dbs_lock:
+            cached_graph_dbs = list(self._graph_dbs.values())
+            self._graph_dbs.clear()
+        for _, graph_db, _ in cached_graph_dbs:
+            self._close_graph_db(graph_db)
+
+    def _get_connection_version(self, graph_db_config: GraphDbConfig) -> Tuple:
+        """Get the version of the connection-related fields of the config. The updates of the
+        other fields (e.g. the name or the schema metadata) do not change the version, so they do
+        not rebuild the driver.
+        """
+        return tuple(getattr(graph_db_config, field) for field in _CONNECTION_FIELDS)
+
+    def _close_graph_db(self, graph_db: GraphDb) -> None:
+        """Close the GraphDB quietly."""
+        try:
+            graph_db.close()
+        except Exception as e:
+            logger.warning(f"Failed to close GraphDB: {e}")
 
     def get_default_graph_db_config(self) -> GraphDbConfig:
         """Get the default GraphDB."""
@@ -59,6 +145,7 @@ class GraphDbService(metaclass=Singleton):
         if not graph_db:
             raise ValueError(f"GraphDB with ID {id} not found")
         self._graph_db_dao.delete(id=id)
+        self.invalidate_graph_db(id=id)
 
     def update_graph_db_config(self, graph_db_config: GraphDbConfig) -> GraphDbConfig:
         """Update a GraphDB by ID.
@@ -103,6 +190,9 @@ class GraphDbService(metaclass=Singleton):
         if fields_to_update:
             assert graph_db_config.id is not None, "ID must be provided for update"
             result = self._graph_db_dao.update(id=graph_db_config.id, **fields_to_update)
+            # only the connection fields rebuild the driver, e.g. not the name or the schema
+            if fields_to_update.keys() & _CONNECTION_FIELDS:
+                self.invalidate_graph_db(id=graph_db_config.id)
             return GraphDbConfig.from_do(result)
 
         return GraphDbConfig.from_do(graph_db_do)
@@ -0,0 +1,192 @@
+from collections import deque
+import threading
+from typing import Deque, Dict, Iterator, List, Optional
+
+from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobEventType
+from app.core.model.job import Job, SubJob
+from app.core.model.job_event import JobEvent
+
+
+class JobEventSubscription:
+    """A subscription to the events of an original job, buffered in a bounded queue.
+
+    The subscription is closed when the original job reaches a final status, when the subscriber
+    unsubscribes, or when the subscriber is too slow to drain its buffer. In the last case, the
+    subscription is dropped, and its events end with a SUBSCRIPTION_DROPPED event, so the
+    subscriber can tell it apart from the end of the job.
+    """
+
+    def __init__(self, original_job_id: str, buffer_size: int):
+        self._original_job_id: str = original_job_id
+        self._buffer_size: int = buffer_size
+        self._events: Deque[JobEvent] = deque()
+        self._condition: threading.Condition = threading.Condition()
+        self._closed: bool = False
+        self._dropped: bool = False
+        self._dropped_reported: bool = False
+
+    @property
+    def original_job_id(self) -> str:
+        """Get the ID of the subscribed original job."""
+        return self._original_job_id
+
+    @property
+    def closed(self) -> bool:
+        """Check if the subscription is closed."""
+        return self._closed
+
+    @property
+    def dropped(self) -> bool:
+        """Check if the subscription is dropped, because its buffer stayed full."""
+        return self._dropped
+
+    def put(self, event: JobEvent, timeout: Optional[float] = None) -> bool:
+        """Buffer an event, waiting for a free slot if the buffer is full.
+
+        Returns:
+            bool: False if the subscription is closed, or the buffer stays full for `timeout`
+                seconds, which drops the subscription.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._closed or len(self._events) < self._buffer_size, timeout=timeout
+            ):
+                self._dropped = True
+                self._closed = True
+                self._condition.notify_all()
+                return False
+            if self._closed:
+                return False
+            self._events.append(event)
+            self._condition.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[JobEvent]:
+        """Get the next event, waiting for it to be published.
+
+        Returns:
+            Optional[JobEvent]: The next event, or None if the subscription is closed and all
+                the buffered events have been consumed. A dropped subscription returns a
+                SUBSCRIPTION_DROPPED event once, before None.
+
+        Raises:
+            TimeoutError: If no event is published within `timeout` seconds.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._closed or len(self._events) > 0, timeout=timeout
+            ):
+                raise TimeoutError(f"No event of job {self._original_job_id} in {timeout} seconds.")
+            if self._events:
+                event = self._events.popleft()
+                self._condition.notify_all()
+                return event
+            if self._dropped and not self._dropped_reported:
+                self._dropped_reported = True
+                return JobEvent.subscription_dropped(self._original_job_id)
+            return None
+
+    def close(self) -> None:
+        """Close the subscription. The buffered events can still be consumed."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def __iter__(self) -> Iterator[JobEvent]:
+        """Iterate the events until the subscription is closed, ending with a SUBSCRIPTION_DROPPED
+        event if it is dropped."""
+        while True:
+            event = self.get()
+            if event is None:
+                return
+            yield event
+
+
+class JobEventService(metaclass=Singleton):
+    """Job event service, an in-process event bus of the job executions.
+
+    The leader, the experts and the reasoners publish the progress of the jobs (subjob creations,
+    status changes, reasoner messages, artifact updates and the final answers), which is pushed
+    to the subscribers of the original jobs.
+    """
+
+    def __init__(self):
+        self._subscriptions: Dict[str, List[JobEventSubscription]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def subscribe(
+        self, original_job_id: str, buffer_size: Optional[int] = None
+    ) -> JobEventSubscription:
+        """Subscribe to the events of an original job.
+
+        Args:
+            original_job_id (str): The ID of the original job.
+            buffer_size (Optional[int]): The max buffered events, before the publishers wait for
+                the subscriber. Defaults to `SystemEnv.JOB_EVENT_BUFFER_SIZE`.
+        """
+        subscription = JobEventSubscription(
+            original_job_id=original_job_id,
+            buffer_size=buffer_size or SystemEnv.JOB_EVENT_BUFFER_SIZE,
+        )
+        with self._lock:
+            self._subscriptions.setdefault(original_job_id, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: JobEventSubscription) -> None:
+        """Unsubscribe and close the subscription."""
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.original_job_id, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.original_job_id, None)
+        subscription.close()
+
+    def has_subscribers(self, original_job_id: Optional[str] = None) -> bool:
+        """Check if the original job (or any job, if not specified) has subscribers, so the
+        publishers can skip building the events nobody receives."""
+        if original_job_id is None:
+            return len(self._subscriptions) > 0
+        return original_job_id in self._subscriptions
+
+    def publish(self, event: JobEvent) -> None:
+        """Push the event to the subscribers of its original job.
+
+        A subscriber whose buffer stays full for `SystemEnv.JOB_EVENT_PUBLISH_TIMEOUT` seconds is
+        unsubscribed, so a slow subscriber can not stall the job execution. The subscriptions are
+        closed once the original job reaches a final status.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event.original_job_id, []))
+
+        timeout: float = SystemEnv.JOB_EVENT_PUBLISH_TIMEOUT
+        for subscription in subscriptions:
+            if not subscription.put(event, timeout=timeout) or event.is_final():
+                self.unsubscribe(subscription)
+
+    def publish_event(
+        self, event_type: JobEventType, job: Job, payload: Optional[Dict] = None
+    ) -> None:
+        """Publish an event about the job (original job / subjob), if its original job has
+        subscribers."""
+        if self.is_subscribed(job):
+            self.publish(
+                JobEvent(
+                    type=event_type,
+                    original_job_id=self._get_original_job_id(job),
+                    job_id=job.id,
+                    payload=payload or {},
+                )
+            )
+
+    def is_subscribed(self, job: Job) -> bool:
+        """Check if the original job of the job (original job / subjob) has subscribers."""
+        return self.has_subscribers(self._get_original_job_id(job))
+
+    def _get_original_job_id(self, job: Job) -> str:
+        """Get the original job ID of the job (original job / subjob)."""
+        if isinstance(job, SubJob) and job.original_job_id:
+            return job.original_job_id
+        return job.id
@@ -1,15 +1,25 @@
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import replace
 import re
-from typing import List, Optional, Set, Tuple, cast
+import threading
+import time
+from typing import Dict, Generator, List, Optional, Set, Tuple, cast
 
 import networkx as nx  # type: ignore
 
+from app.core.common.cancellation import CancellationToken
 from app.core.common.singleton import Singleton
-from app.core.common.type import ChatMessageRole, JobStatus
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import ChatMessageRole, JobEventType, JobStatus
+from app.core.dal.dao.dao import unit_of_work
 from app.core.dal.dao.job_dao import JobDao
+from app.core.dal.dao.job_graph_dao import JobGraphDao
 from app.core.dal.do.job_do import JobDo
 from app.core.model.job import Job, JobType, SubJob
+from app.core.model.job_event import JobEvent
 from app.core.model.job_graph import JobGraph
-from app.core.model.job_result import JobResult
+from app.core.model.job_result import JobResult, ModelUsage
 from app.core.model.message import (
     AgentMessage,
     GraphMessage,
@@ -17,6 +27,8 @@ from app.core.model.message import (
     MessageType,
     TextMessage,
 )
+from app.core.service.job_event_service import JobEventService
+from app.core.service.memory_service import MemoryService
 from app.core.service.message_service import MessageService
 from app.server.manager.view.message_view import MessageView
 
@@ -26,7 +38,29 @@ class JobService(metaclass=Singleton):
 
     def __init__(self):
         self._job_dao: JobDao = JobDao.instance
+        self._job_graph_dao: JobGraphDao = JobGraphDao.instance
         self._message_service: MessageService = MessageService.instance
+        self._job_event_service: JobEventService = JobEventService.instance
+
+        # the saved job graphs, from the least to the most recently used original jobs
+        self._job_graphs: OrderedDict[str, JobGraph] = OrderedDict()
+        self._job_graphs_lock: threading.RLock = threading.RLock()
+
+        # notified when a job reaches a final status, and the waiting jobs by their waiter count
+        self._job_result_condition: threading.Condition = threading.Condition()
+        self._waiting_job_ids: Counter[str] = Counter()
+
+        # the model usages of the running jobs (job_id -> operator_id -> usage), and the start
+        # times of the running jobs, which are rolled up into the job results once the jobs reach
+        # a final status
+        self._model_usages: Dict[str, Dict[str, ModelUsage]] = {}
+        self._job_start_times: Dict[str, float] = {}
+        self._subjob_tokens: Counter[str] = Counter()  # original job id -> tokens of subjobs
+        self._usage_lock: threading.Lock = threading.Lock()
+
+        # the cancellation tokens of the executing job graphs, by their original job ids
+        self._cancellation_tokens: Dict[str, CancellationToken] = {}
+        self._cancellation_tokens_lock: threading.Lock = threading.Lock()
 
     def save_job(self, job: Job) -> Job:
         """Save a new job."""
@@ -79,6 +113,12 @@ class JobService(metaclass=Singleton):
             subjobs.extend(self.get_subjobs(original_id))
         return subjobs
 
+    def get_subjob_results(self, original_job_id: str) -> List[JobResult]:
+        """Get the results of the subjobs of the original job."""
+        subjob_ids = self.get_subjob_ids(original_job_id=original_job_id)
+        subjob_results = self._job_dao.get_job_results_by_ids(subjob_ids)
+        return [subjob_results[id] for id in subjob_ids if id in subjob_results]
+
     def get_subjob(self, subjob_id: str) -> SubJob:
         """Get a Job from the job registry."""
         return cast(SubJob, self._job_dao.get_job_by_id(subjob_id))
@@ -96,8 +136,165 @@ class JobService(metaclass=Singleton):
         )
 
     def save_job_result(self, job_result: JobResult) -> None:
-        """Update the job (original job / subjob) result."""
-        self._job_dao.save_job_result(job_result=job_result)
+        """Update the job (original job / subjob) result, and notify the waiters of the job once
+        it reaches a final status.
+
+        The tokens and the duration of a job are accounted when it reaches a final status, see
+        `_account_job_result`.
+        """
+        accounted_tokens = self._account_job_result(job_result)
+        job_do = self._job_dao.save_job_result(job_result=job_result)
+        if accounted_tokens and job_do.original_job_id:
+            # rolled up into the original job, once it reaches a final status, unless it has been
+            # accounted already
+            with self._usage_lock:
+                if str(job_do.original_job_id) in self._job_start_times:
+                    self._subjob_tokens[str(job_do.original_job_id)] += accounted_tokens
+
+        # publish the status change to the subscribers of the original job
+        original_job_id = str(job_do.original_job_id or job_do.id)
+        if self._job_event_service.has_subscribers(original_job_id):
+            self._job_event_service.publish(
+                JobEvent.status_changed(original_job_id=original_job_id, job_result=job_result)
+            )
+        if job_result.has_result():
+            if not job_do.original_job_id:
+                self._release_job_memories(original_job_id)
+            with self._job_result_condition:
+                if job_result.job_id in self._waiting_job_ids:
+                    self._job_result_condition.notify_all()
+
+    def _release_job_memories(self, original_job_id: str) -> None:
+        """Release the memories of the original job and its subjobs, once it reaches a final
+        status.
+
+        The subjobs are found in the cached job graph, without reading the database. The memories
+        of the subjobs which are not in the cached job graph are evicted by the memory service.
+        """
+        memory_service: Optional[MemoryService] = MemoryService.instance
+        if memory_service is None:
+            return
+        with self._job_graphs_lock:
+            job_graph = self._job_graphs.get(original_job_id)
+            subjob_ids = job_graph.vertices() if job_graph else []
+        memory_service.release_job_memories([original_job_id, *subjob_ids])
+
+    def record_model_usage(self, job_id: str, operator_id: str, usage: ModelUsage) -> None:
+        """Record the usage of a model call of the operator, during the execution of the job.
+
+        The usage of a job which is not running (e.g. a model call finished after the job was
+        cancelled and its final status saved) is dropped, since the job has been accounted.
+        """
+        with self._usage_lock:
+            if job_id not in self._job_start_times:
+                return
+            operator_usages = self._model_usages.setdefault(job_id, {})
+            if operator_id in operator_usages:
+                operator_usages[operator_id].add(usage)
+            else:
+                operator_usages[operator_id] = replace(usage)
+
+    def get_model_usages(self, job_id: str) -> Dict[str, ModelUsage]:
+        """Get the model usages of the running job by its operators, which are not rolled up into
+        the job result yet."""
+        with self._usage_lock:
+            return {
+                operator_id: replace(usage)
+                for operator_id, usage in self._model_usages.get(job_id, {}).items()
+            }
+
+    def _account_job_result(self, job_result: JobResult) -> int:
+        """Roll up the model usages of the job into its result.
+
+        When the job starts running, its start time is recorded. When the job reaches a final
+        status, the tokens of its operators and of its final subjobs (for an original job) are
+        added to the job result, with the elapsed time since the job started. A job is accounted
+        once per run, so saving the final result again does not count the tokens twice.
+
+        Returns:
+            int: The tokens added to the job result.
+        """
+        job_id = job_result.job_id
+        if job_result.status == JobStatus.RUNNING:
+            with self._usage_lock:
+                self._job_start_times.setdefault(job_id, time.monotonic())
+            return 0
+        if not job_result.has_result():
+            return 0
+
+        with self._usage_lock:
+            start_time = self._job_start_times.pop(job_id, None)
+            operator_usages = self._model_usages.pop(job_id, {})
+            subjob_tokens = self._subjob_tokens.pop(job_id, 0)
+        if start_time is None:
+            # the job is not run by this process, or it has been accounted
+            return 0
+
+        tokens = sum(usage.total_tokens for usage in operator_usages.values()) + subjob_tokens
+        job_result.duration += time.monotonic() - start_time
+        job_result.tokens += tokens
+        return tokens
+
+    def wait_job_result(self, job_id: str, timeout: Optional[float] = None) -> JobResult:
+        """Block until the job (original job / subjob) reaches a final status.
+
+        The waiter is woken up by `save_job_result` when the final status is saved, instead of
+        polling the job result.
+
+        Args:
+            job_id (str): The ID of the job to wait for.
+            timeout (Optional[float]): The maximum seconds to wait. Waits forever if None.
+
+        Returns:
+            JobResult: The final job result.
+
+        Raises:
+            TimeoutError: If the job does not reach a final status within the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._job_result_condition:
+            self._waiting_job_ids[job_id] += 1
+            try:
+                while True:
+                    # check under the lock, so the notification can not be missed
+                    job_result = self.get_job_result(job_id)
+                    if job_result.has_result():
+                        return job_result
+
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(
+                            f"Job {job_id} did not reach a final status in {timeout} seconds."
+                        )
+                    self._job_result_condition.wait(timeout=remaining)
+            finally:
+                self._waiting_job_ids[job_id] -= 1
+                if self._waiting_job_ids[job_id] == 0:
+                    del self._waiting_job_ids[job_id]
+
+    def get_cancellation_token(self, original_job_id: str) -> CancellationToken:
+        """Get the cancellation token of the executing job graph of the original job, or create
+        one if the job graph is not executing."""
+        with self._cancellation_tokens_lock:
+            token = self._cancellation_tokens.get(original_job_id, None)
+            if token is None:
+                token = CancellationToken()
+                self._cancellation_tokens[original_job_id] = token
+            return token
+
+    def cancel_job_graph(self, original_job_id: str, reason: str) -> None:
+        """Cancel the executing job graph of the original job, which stops its running subjobs
+        and aborts their in-flight model requests and tool calls. No-op if the job graph is not
+        executing."""
+        with self._cancellation_tokens_lock:
+            token = self._cancellation_tokens.get(original_job_id, None)
+        if token is not None:
+            token.cancel(reason=reason)
+
+    def release_cancellation_token(self, original_job_id: str) -> None:
+        """Release the cancellation token, once the job graph of the original job is executed."""
+        with self._cancellation_tokens_lock:
+            self._cancellation_tokens.pop(original_job_id, None)
 
     def query_original_job_result(self, original_job_id: str) -> JobResult:
         """Query and process the original job result of the multi-agent system.
@@ -179,13 +376,6 @@ class JobService(metaclass=Singleton):
                 ]
             )
 
-        if len(job_graph.vertices()) > 0:
-            # save the original job result
-            original_job_result = self.get_job_result(original_job_id)
-            if not original_job_result.has_result():
-                original_job_result.status = JobStatus.FINISHED
-                self.save_job_result(job_result=original_job_result)
-
         # save/update the multi-agent result to the database
         original_job: Job = self.get_original_job(original_job_id)
         try:
@@ -223,105 +413,205 @@ class JobService(metaclass=Singleton):
         multi_agent_hybrid_message.set_attached_messages(attached_messages=graph_messages)
         self._message_service.save_message(message=multi_agent_hybrid_message)
 
+        if len(job_graph.vertices()) > 0:
+            # save the original job result, after the answer messages, since the waiters of the
+            # job read them once it is finished
+            original_job_result = self.get_job_result(original_job_id)
+            if not original_job_result.has_result():
+                self._job_event_service.publish_event(
+                    JobEventType.FINAL_ANSWER,
+                    job=original_job,
+                    payload={
+                        "answer": multi_agent_payload,
+                        "attached_message_ids": [message.get_id() for message in graph_messages],
+                    },
+                )
+                original_job_result.status = JobStatus.FINISHED
+                self.save_job_result(job_result=original_job_result)
+
         return original_job_result
 
     def get_conversation_view(self, original_job_id: str) -> MessageView:
         """Get conversation view (including thinking chain) for a specific job."""
-        # get original job
-        original_job = self.get_original_job(original_job_id=original_job_id)
+        return self.get_conversation_views(original_job_ids=[original_job_id])[0]
 
-        # get original job result
-        original_job_result = self.query_original_job_result(original_job_id=original_job_id)
+    def get_conversation_views(self, original_job_ids: List[str]) -> List[MessageView]:
+        """Get the conversation views (including thinking chains) of the original jobs.
 
-        # get the user question message
-        question_message = self._message_service.get_hybrid_message_by_job_id_and_role(
-            job_id=original_job_id,
-            role=ChatMessageRole.USER,
-        )
+        The jobs, job results and messages of all the views are loaded in bulk, so the number of
+        queries does not grow with the number of jobs and subjobs.
+        """
+        # get the original jobs
+        original_jobs = self._job_dao.get_jobs_by_ids(original_job_ids)
+        for original_job_id in original_job_ids:
+            if original_job_id not in original_jobs:
+                raise ValueError(f"Job with ID {original_job_id} not found")
+            if isinstance(original_jobs[original_job_id], SubJob):
+                raise ValueError(f"Job with id {original_job_id} is a subjob, not an original job.")
+
+        # get the original job results, and assemble the results of the unfinished jobs
+        original_job_results = self._job_dao.get_job_results_by_ids(original_job_ids)
+        for original_job_id, original_job_result in original_job_results.items():
+            if not original_job_result.has_result():
+                original_job_results[original_job_id] = self.query_original_job_result(
+                    original_job_id=original_job_id
+                )
 
-        # get the AI answer message
-        answer_message = self._message_service.get_hybrid_message_by_job_id_and_role(
-            job_id=original_job_id,
-            role=ChatMessageRole.SYSTEM,
-        )
+        # get the user question messages and the AI answer messages
+        hybrid_messages = self._message_service.get_hybrid_messages_by_job_ids(original_job_ids)
 
-        # get thinking chain messages
-        message_result_pairs: List[
-            Tuple[AgentMessage, SubJob, JobResult]
-        ] = []  # to sort by timestamp
-
-        subjob_ids = self.get_subjob_ids(original_job_id=original_job.id)
-        for subjob_id in subjob_ids:
-            # get the information, whose job is not legacy
-            subjob = self.get_subjob(subjob_id=subjob_id)
-            if not subjob.is_legacy:
-                # get the subjob result
-                subjob_result = self.get_job_result(job_id=subjob_id)
-
-                # get the agent message
-                agent_messages = cast(
-                    List[AgentMessage],
-                    self._message_service.get_message_by_job_id(
-                        job_id=subjob_id, message_type=MessageType.AGENT_MESSAGE
-                    ),
-                )
-                if len(agent_messages) == 1:
-                    thinking_message = agent_messages[0]
-                elif len(agent_messages) == 0:
+        # get the subjobs, whose jobs are not legacy, with their results and agent messages
+        subjobs_by_original_job_id = self._job_dao.get_subjobs_by_original_job_ids(original_job_ids)
+        for original_job_id, subjobs in subjobs_by_original_job_id.items():
+            subjobs_by_original_job_id[original_job_id] = [
+                subjob for subjob in subjobs if not subjob.is_legacy
+            ]
+        subjob_ids = [
+            subjob.id for subjobs in subjobs_by_original_job_id.values() for subjob in subjobs
+        ]
+        subjob_results = self._job_dao.get_job_results_by_ids(subjob_ids)
+        agent_messages = self._message_service.get_agent_messages_by_job_ids(subjob_ids)
+
+        conversation_views: List[MessageView] = []
+        for original_job_id in original_job_ids:
+            question_message, answer_message = (
+                self._get_hybrid_message(hybrid_messages, original_job_id, role)
+                for role in (ChatMessageRole.USER, ChatMessageRole.SYSTEM)
+            )
+
+            # get thinking chain messages
+            message_result_pairs: List[
+                Tuple[AgentMessage, SubJob, JobResult]
+            ] = []  # to sort by timestamp
+            for subjob in subjobs_by_original_job_id[original_job_id]:
+                subjob_result = subjob_results[subjob.id]
+                subjob_agent_messages = agent_messages[subjob.id]
+                if len(subjob_agent_messages) == 1:
+                    thinking_message = subjob_agent_messages[0]
+                elif len(subjob_agent_messages) == 0:
                     # handle the unexecuted subjob
                     thinking_message = AgentMessage(
-                        job_id=subjob_id, payload=f"The subjob is {subjob_result.status.value}."
+                        job_id=subjob.id, payload=f"The subjob is {subjob_result.status.value}."
                     )
                 else:
                     raise ValueError(
-                        f"Multiple agent messages found for job ID {subjob_id}: {agent_messages}"
+                        f"Multiple agent messages found for job ID {subjob.id}: "
+                        f"{subjob_agent_messages}"
                     )
                 # store the pair of message and result
                 message_result_pairs.append((thinking_message, subjob, subjob_result))
 
-        # sort pairs by message timestamp
-        message_result_pairs.sort(
-            key=lambda pair: cast(int, pair[0].get_timestamp())
-            if pair[0].get_timestamp() is not None
-            else float("inf")
-        )
+            # sort pairs by message timestamp
+            message_result_pairs.sort(
+                key=lambda pair: (
+                    cast(int, pair[0].get_timestamp())
+                    if pair[0].get_timestamp() is not None
+                    else float("inf")
+                )
+            )
 
-        # separate the sorted pairs back into individual lists
-        thinking_messages: List[AgentMessage] = [pair[0] for pair in message_result_pairs]
-        subjobs: List[SubJob] = [pair[1] for pair in message_result_pairs]
-        subjob_results: List[JobResult] = [pair[2] for pair in message_result_pairs]
-
-        return MessageView(
-            question=question_message,
-            answer=answer_message,
-            answer_metrics=original_job_result,
-            thinking_messages=thinking_messages,
-            thinking_subjobs=subjobs,
-            thinking_metrics=subjob_results,
-        )
+            conversation_views.append(
+                MessageView(
+                    question=question_message,
+                    answer=answer_message,
+                    answer_metrics=original_job_results[original_job_id],
+                    thinking_messages=[pair[0] for pair in message_result_pairs],
+                    thinking_subjobs=[pair[1] for pair in message_result_pairs],
+                    thinking_metrics=[pair[2] for pair in message_result_pairs],
+                )
+            )
+
+        return conversation_views
+
+    def _get_hybrid_message(
+        self,
+        hybrid_messages: Dict[Tuple[str, ChatMessageRole], HybridMessage],
+        job_id: str,
+        role: ChatMessageRole,
+    ) -> HybridMessage:
+        """Get the hybrid message of the job and role from the loaded hybrid messages."""
+        hybrid_message = hybrid_messages.get((job_id, role))
+        if not hybrid_message:
+            raise ValueError(f"Hybrid message not found for job {job_id} and role {role.value}.")
+        return hybrid_message
 
     def get_job_graph(self, original_job_id: str) -> JobGraph:
-        """Get the job graph by the original job id. If the job graph does not exist,
-        create a new one and save it to the database."""
+        """Get the job graph by the original job id. If the job graph does not exist, an empty
+        job graph is returned.
+
+        The job graph is served from the cache, and the returned job graph is a copy, which can
+        be modified and then saved by `set_job_graph`.
+        """
+        with self._job_graphs_lock:
+            job_graph = self._job_graphs.get(original_job_id)
+            if job_graph is None:
+                job_graph = self._load_job_graph(original_job_id)
+                self._cache_job_graph(original_job_id, job_graph)
+            else:
+                self._job_graphs.move_to_end(original_job_id)
+            return JobGraph(job_graph.get_graph().copy())
+
+    def set_job_graph(self, original_job_id: str, job_graph: JobGraph) -> None:
+        """Set the job graph by the original job id.
+
+        Only the vertices and the edges which differ from the saved job graph are written.
+        """
+        with self._updating_job_graph(original_job_id):
+            saved_job_graph = self._job_graphs.get(original_job_id)
+            if saved_job_graph is None:
+                saved_job_graph = self._load_job_graph(original_job_id)
+            saved_vertices = set(saved_job_graph.vertices())
+            saved_edges = set(saved_job_graph.edges())
+            vertices = set(job_graph.vertices())
+            edges = set(job_graph.edges())
+
+            self._job_graph_dao.remove_edges(original_job_id, saved_edges - edges)
+            self._job_graph_dao.remove_vertices(original_job_id, saved_vertices - vertices)
+            self._job_graph_dao.add_vertices(
+                original_job_id, [v for v in job_graph.vertices() if v not in saved_vertices]
+            )
+            self._job_graph_dao.add_edges(
+                original_job_id, [e for e in job_graph.edges() if e not in saved_edges]
+            )
+
+            self._cache_job_graph(original_job_id, JobGraph(job_graph.get_graph().copy()))
+
+    @contextmanager
+    def _updating_job_graph(self, original_job_id: str) -> Generator[None, None, None]:
+        """Serialize the updates of the job graph, and write them in one transaction.
+
+        The cached job graph is dropped if the update fails, since it may be ahead of the
+        database.
+        """
+        with self._job_graphs_lock:
+            try:
+                with unit_of_work():
+                    yield
+            except BaseException:
+                self._job_graphs.pop(original_job_id, None)
+                raise
+
+    def _load_job_graph(self, original_job_id: str) -> JobGraph:
+        """Load the job graph from the database."""
         job_do = self._job_dao.get_by_id(original_job_id)
         if not job_do:
             raise ValueError(f"Job with ID {original_job_id} not found in the job registry")
 
-        if not job_do.dag:
-            job_graph: JobGraph = JobGraph()
-            self._job_dao.update(id=original_job_id, dag=job_graph.to_json_str())
-        else:
+        job_graph = self._job_graph_dao.get_job_graph(original_job_id)
+        if job_graph.vertices_count() == 0 and job_do.dag:
+            # migrate the job graph saved as a JSON string by the former versions
             job_graph = JobGraph.from_json_str(str(job_do.dag))
+            with unit_of_work():
+                self._job_graph_dao.add_vertices(original_job_id, job_graph.vertices())
+                self._job_graph_dao.add_edges(original_job_id, job_graph.edges())
+                self._job_dao.update(id=original_job_id, dag=None)
         return job_graph
 
-    def set_job_graph(self, original_job_id: str, job_graph: JobGraph) -> None:
-        """Set the job graph by the original job id."""
-        # save the jobs to the databases
-        original_job: Job = self.get_original_job(original_job_id)
-        original_job.dag = job_graph.to_json_str()
-        self.save_job(original_job)
-        for subjob_id in job_graph.vertices():
-            self.save_job(job=self.get_subjob(subjob_id))
+    def _cache_job_graph(self, original_job_id: str, job_graph: JobGraph) -> None:
+        self._job_graphs[original_job_id] = job_graph
+        self._job_graphs.move_to_end(original_job_id)
+        while len(self._job_graphs) > max(1, SystemEnv.JOB_GRAPH_CACHE_SIZE):
+            self._job_graphs.popitem(last=False)
 
     def add_subjob(
         self,
@@ -332,41 +622,43 @@ class JobService(metaclass=Singleton):
         successors: Optional[List[SubJob]] = None,
     ) -> None:
         """Assign a subjob to an expert and return the expert instance."""
-        # add job to the jobs graph
-        job_graph = self.get_job_graph(original_job_id)
-        job_graph.add_vertex(job.id)
+        with self._updating_job_graph(original_job_id):
+            # add job to the jobs graph
+            job_graph = self.get_job_graph(original_job_id)
+            job_graph.add_vertex(job.id)
+
+            job.original_job_id = original_job_id
+            job.expert_id = expert_id
+
+            # save the job to the database
+            self.save_job(job=job)
+
+            if not predecessors:
+                predecessors = []
+            if not successors:
+                successors = []
+            for predecessor in predecessors:
+                job_graph.add_edge(predecessor.id, job.id)
+                self.save_job(predecessor)
+            for successor in successors:
+                self.save_job(successor)
+                job_graph.add_edge(job.id, successor.id)
 
-        job.original_job_id = original_job_id
-        job.expert_id = expert_id
-
-        # save the job to the database
-        self.save_job(job=job)
-
-        if not predecessors:
-            predecessors = []
-        if not successors:
-            successors = []
-        for predecessor in predecessors:
-            job_graph.add_edge(predecessor.id, job.id)
-            self.save_job(predecessor)
-        for successor in successors:
-            self.save_job(successor)
-            job_graph.add_edge(job.id, successor.id)
-
-        self.set_job_graph(original_job_id, job_graph)
+            self.set_job_graph(original_job_id, job_graph)
 
     def remove_subjob(self, original_job_id: str, job_id: str) -> None:
         """Remove a subjob from the job registry."""
-        # remove the job from the database
-        # and mark the job as a legacy job
-        subjob = self.get_subjob(job_id)
-        subjob.is_legacy = True
-        self.save_job(subjob)
-
-        # update the state of the job service
-        job_graph = self.get_job_graph(original_job_id)
-        job_graph.remove_vertex(job_id)
-        self.set_job_graph(original_job_id=original_job_id, job_graph=job_graph)
+        with self._updating_job_graph(original_job_id):
+            # remove the job from the database
+            # and mark the job as a legacy job
+            subjob = self.get_subjob(job_id)
+            subjob.is_legacy = True
+            self.save_job(subjob)
+
+            # update the state of the job service
+            job_graph = self.get_job_graph(original_job_id)
+            job_graph.remove_vertex(job_id)
+            self.set_job_graph(original_job_id=original_job_id, job_graph=job_graph)
 
     def replace_subgraph(
         self,
@@ -411,81 +703,86 @@ class JobService(metaclass=Singleton):
             old_subgraph (Optional[JobGraph]): The subgraph to be replaced. Must be a connected
                 component of the current jobs DAG with exactly one entry and one exit vertex.
         """
-        job_graph: JobGraph = self.get_job_graph(original_job_id)
-
-        if not old_subgraph:
-            job_graph.update(new_subgraph)
-
-            # save the updated jobs to the database
-            self.set_job_graph(original_job_id, job_graph)
-            return
-
-        if new_subgraph.vertices_count() == 0:
-            # if the new subgraph is empty, we can simply remove the old subgraph and return.
-            # this will effectively remove the subgraph from the job graph.
-            job_graph.remove_vertices(set(old_subgraph.vertices()))
-            self.set_job_graph(original_job_id, job_graph)
-            return
+        # read the job graph under the lock, so the replacement is not computed from a stale
+        # job graph, which would drop the concurrent updates (e.g. the other replacements)
+        with self._updating_job_graph(original_job_id):
+            job_graph: JobGraph = self.get_job_graph(original_job_id)
+
+            if not old_subgraph:
+                job_graph.update(new_subgraph)
+
+                # save the updated jobs to the database
+                self.set_job_graph(original_job_id, job_graph)
+                return
+
+            if new_subgraph.vertices_count() == 0:
+                # if the new subgraph is empty, we can simply remove the old subgraph and return.
+                # this will effectively remove the subgraph from the job graph.
+                job_graph.remove_vertices(set(old_subgraph.vertices()))
+                self.set_job_graph(original_job_id, job_graph)
+                return
+
+            old_subgraph_vertices: Set[str] = set(old_subgraph.vertices())
+            entry_vertices: List[str] = []
+            exit_vertices: List[str] = []
+
+            # find the entry and exit vertex of the job_graph
+            for vertex in old_subgraph_vertices:
+                entry_vertices.extend(
+                    vertex
+                    for pred in job_graph.predecessors(vertex)
+                    if pred not in old_subgraph_vertices
+                )
+                exit_vertices.extend(
+                    vertex
+                    for succ in job_graph.successors(vertex)
+                    if succ not in old_subgraph_vertices
+                )
 
-        old_subgraph_vertices: Set[str] = set(old_subgraph.vertices())
-        entry_vertices: List[str] = []
-        exit_vertices: List[str] = []
+            # validate the subgraph has exactly one entry and one exit vertex
+            if len(entry_vertices) > 1 or len(exit_vertices) > 1:
+                raise ValueError("Subgraph must have no more than one entry and one exit vertex")
+            entry_vertex = entry_vertices[0] if entry_vertices else None
+            exit_vertex = exit_vertices[0] if exit_vertices else None
 
-        # find the entry and exit vertex of the job_graph
-        for vertex in old_subgraph_vertices:
-            entry_vertices.extend(
-                vertex
-                for pred in job_graph.predecessors(vertex)
-                if pred not in old_subgraph_vertices
+            # collect all edges pointing to and from the old subgraph
+            predecessors = (
+                [
+                    vertex
+                    for vertex in job_graph.predecessors(entry_vertex)
+                    if vertex not in old_subgraph_vertices
+                ]
+                if entry_vertex
+                else []
             )
-            exit_vertices.extend(
-                vertex for succ in job_graph.successors(vertex) if succ not in old_subgraph_vertices
+            successors = (
+                [
+                    vertex
+                    for vertex in job_graph.successors(exit_vertex)
+                    if vertex not in old_subgraph_vertices
+                ]
+                if exit_vertex
+                else []
             )
 
-        # validate the subgraph has exactly one entry and one exit vertex
-        if len(entry_vertices) > 1 or len(exit_vertices) > 1:
-            raise ValueError("Subgraph must have no more than one entry and one exit vertex")
-        entry_vertex = entry_vertices[0] if entry_vertices else None
-        exit_vertex = exit_vertices[0] if exit_vertices else None
-
-        # collect all edges pointing to and from the old subgraph
-        predecessors = (
-            [
-                vertex
-                for vertex in job_graph.predecessors(entry_vertex)
-                if vertex not in old_subgraph_vertices
-            ]
-            if entry_vertex
-            else []
-        )
-        successors = (
-            [
-                vertex
-                for vertex in job_graph.successors(exit_vertex)
-                if vertex not in old_subgraph_vertices
-            ]
-            if exit_vertex
-            else []
-        )
+            # remove old subgraph
+            job_graph.remove_vertices(old_subgraph_vertices)
+            for vertex in old_subgraph_vertices:
+                job = self.get_subjob(vertex)
+                job.is_legacy = True
+                self._job_dao.save_job(job=job)
+
+            # add the new subgraph without connecting it to the rest of the graph
+            job_graph.update(new_subgraph)
 
-        # remove old subgraph
-        job_graph.remove_vertices(old_subgraph_vertices)
-        for vertex in old_subgraph_vertices:
-            job = self.get_subjob(vertex)
-            job.is_legacy = True
-            self._job_dao.save_job(job=job)
-
-        # add the new subgraph without connecting it to the rest of the graph
-        job_graph.update(new_subgraph)
-
-        # connect the new subgraph with the rest of the graph
-        topological_sorted_vertices = list(nx.topological_sort(new_subgraph.get_graph()))
-        head_vertex = topological_sorted_vertices[0]
-        tail_vertex = topological_sorted_vertices[-1]
-        for predecessor in predecessors:
-            job_graph.add_edge(predecessor, head_vertex)
-        for successor in successors:
-            job_graph.add_edge(tail_vertex, successor)
-
-        # save the updated jobs to the database
-        self.set_job_graph(original_job_id, job_graph)
+            # connect the new subgraph with the rest of the graph
+            topological_sorted_vertices = list(nx.topological_sort(new_subgraph.get_graph()))
+            head_vertex = topological_sorted_vertices[0]
+            tail_vertex = topological_sorted_vertices[-1]
+            for predecessor in predecessors:
+                job_graph.add_edge(predecessor, head_vertex)
+            for successor in successors:
+                job_graph.add_edge(tail_vertex, successor)
+
+            # save the updated jobs to the database
+            self.set_job_graph(original_job_id, job_graph)
@@ -23,6 +23,7 @@ from app.core.model.knowledge_base import (
     KnowledgeBase,
 )
 from app.core.service.file_service import FileService
+from app.core.tracer.tracer import trace_span
 
 
 class KnowledgeBaseService(metaclass=Singleton):
@@ -166,6 +167,7 @@ class KnowledgeBaseService(metaclass=Singleton):
             self._knowledge_base_dao.delete(id=id)
             # drop knowledge base folder
             KnowledgeStoreFactory.get_or_create(id).drop()
+            KnowledgeStoreFactory.invalidate(id)
 
     def get_all_knowledge_bases(self) -> Tuple[KnowledgeBase, List[KnowledgeBase]]:
         """Get all knowledge bases.
@@ -233,19 +235,29 @@ class KnowledgeBaseService(metaclass=Singleton):
 
     def get_knowledge(self, query: str, session_id: Optional[str]) -> Knowledge:
         """Get knowledge by ID."""
-        # get global knowledge
-        global_chunks = KnowledgeStoreFactory.get_or_create(str(self._global_kb_do.id)).retrieve(
-            query
-        )
-        # get local knowledge
-        local_chunks = []
-        if session_id:
-            kbs = self._knowledge_base_dao.filter_by(session_id=session_id)
-            if len(kbs) == 1:
-                kb = kbs[0]
-                knowledge_base_id = kb.id
-                local_chunks = KnowledgeStoreFactory.get_or_create(str(knowledge_base_id)).retrieve(
-                    query
+        with trace_span("knowledge.retrieve", session_id=session_id) as span:
+            # get global knowledge
+            global_chunks = KnowledgeStoreFactory.get_or_create(
+                str(self._global_kb_do.id)
+            ).retrieve(query)
+            # get local knowledge
+            local_chunks = []
+            if session_id:
+                kbs = self._knowledge_base_dao.filter_by(session_id=session_id)
+                if len(kbs) == 1:
+                    kb = kbs[0]
+                    knowledge_base_id = kb.id
+                    local_chunks = KnowledgeStoreFactory.get_or_create(
+                        str(knowledge_base_id)
+                    ).retrieve(query)
+            if span.recording:
+                chunks = global_chunks + local_chunks
+                span.set_attributes(
+                    {
+                        "query_bytes": len(query.encode("utf-8")),
+                        "chunk_count": len(chunks),
+                        "chunk_bytes": sum(len(chunk.content.encode("utf-8")) for chunk in chunks),
+                    }
                 )
         return Knowledge(global_chunks, local_chunks)
 
@@ -1,9 +1,15 @@
-from typing import Dict
+from collections import OrderedDict
+import threading
+import time
+from typing import Collection, Dict, Optional, Tuple
+import weakref
 
 from app.core.common.singleton import Singleton
 from app.core.common.system_env import SystemEnv
 from app.core.memory.memory import BuiltinMemory, Memory
+from app.core.memory.memory_policy import MemoryPolicy, TokenBudgetMemoryPolicy
 from app.core.model.task import MemoryKey
+from app.core.service.message_service import MessageService
 from app.plugin.memfuse.operator_memory import MemFuseOperatorMemory
 from app.plugin.memfuse.reasoner_memory import MemFuseReasonerMemory
 
@@ -14,30 +20,56 @@ class MemoryService(metaclass=Singleton):
     Manages in-process reasoner/operator memories keyed by job and operator.
     Chooses memory implementation based on feature toggles, with a safe fallback
     to builtin in-memory storage when MemFuse is disabled or unavailable.
+
+    The memories of a job are released once its original job reaches a final status (see
+    `release_job_memories`). The memories of the other jobs are evicted once they are not used
+    for `MEMORY_TTL` seconds, or once more than `MEMORY_CACHE_SIZE` jobs have memories, from the
+    least recently used job. If `ENABLE_MEMORY_SPILL` is set, the evicted builtin reasoner
+    memories are spilled to the message table, and loaded back when they are used again.
     """
 
     def __init__(self) -> None:
         # job_id -> operator_id -> ReasonerMemory
         self._reasoner_memories: Dict[str, Dict[str, Memory]] = {}
         self._operator_memories: Dict[str, Dict[str, Memory]] = {}
+        # job_id -> the last time its memories are used, from the least to the most recently used
+        self._last_used_times: OrderedDict[str, float] = OrderedDict()
+        # the evicted memories which are still used (e.g. by a running reasoner), which are
+        # reused instead of being loaded again
+        self._evicted_memories: weakref.WeakValueDictionary[Tuple[str, str, str], Memory] = (
+            weakref.WeakValueDictionary()
+        )
+        self._lock: threading.Lock = threading.Lock()
+
+        self._evicted_count: int = 0
+        self._spilled_count: int = 0
+        self._released_count: int = 0
 
-    async def get_or_create_reasoner_memory(self, reasoner_memory_key: MemoryKey) -> Memory:
+    async def get_or_create_reasoner_memory(
+        self, reasoner_memory_key: MemoryKey, memory_policy: Optional[MemoryPolicy] = None
+    ) -> Memory:
         """Get or create a ReasonerMemory instance for a job/operator pair.
 
-        If `ENABLE_MEMFUSE` is set, create a MemFuse-backed memory.
+        If `ENABLE_MEMFUSE` is set, create a MemFuse-backed memory. The created memory is given
+        the memory policy, or a token budget policy if `ENABLE_MEMORY_COMPACTION` is set, which
+        chooses the history messages sent to the model.
         """
         job_id = reasoner_memory_key.job_id
         operator_id = reasoner_memory_key.operator_id
-        if job_id not in self._reasoner_memories:
-            self._reasoner_memories[job_id] = {}
-        if operator_id not in self._reasoner_memories[job_id]:
+        memory = self._get_memory(self._reasoner_memories, "reasoner", job_id, operator_id)
+        if memory is None:
             if SystemEnv.ENABLE_MEMFUSE:
-                memory = MemFuseReasonerMemory(job_id=job_id, operator_id=operator_id)
-                await memory.initialize()
-                self._reasoner_memories[job_id][operator_id] = memory
+                memfuse_memory = MemFuseReasonerMemory(job_id=job_id, operator_id=operator_id)
+                await memfuse_memory.initialize()
+                memory = memfuse_memory
             else:
-                self._reasoner_memories[job_id][operator_id] = BuiltinMemory()
-        return self._reasoner_memories[job_id][operator_id]
+                memory = self._load_spilled_memory(job_id, operator_id)
+            if memory_policy is None and SystemEnv.ENABLE_MEMORY_COMPACTION:
+                # the policy caches the compacted messages, so each memory has its own policy
+                memory_policy = TokenBudgetMemoryPolicy()
+            memory.set_policy(memory_policy)
+            memory = self._put_memory(self._reasoner_memories, job_id, operator_id, memory)
+        return memory
 
     async def get_or_create_operator_memory(self, operator_memory_key: MemoryKey) -> Memory:
         """Get or create an Operator memory instance for a job/operator pair.
@@ -46,13 +78,165 @@ class MemoryService(metaclass=Singleton):
         """
         job_id = operator_memory_key.job_id
         operator_id = operator_memory_key.operator_id
-        if job_id not in self._operator_memories:
-            self._operator_memories[job_id] = {}
-        if operator_id not in self._operator_memories[job_id]:
+        memory = self._get_memory(self._operator_memories, "operator", job_id, operator_id)
+        if memory is None:
             if SystemEnv.ENABLE_MEMFUSE:
-                memory = MemFuseOperatorMemory(job_id=job_id, operator_id=operator_id)
-                await memory.initialize()
-                self._operator_memories[job_id][operator_id] = memory
+                memfuse_memory = MemFuseOperatorMemory(job_id=job_id, operator_id=operator_id)
+                await memfuse_memory.initialize()
+                memory = memfuse_memory
             else:
-                self._operator_memories[job_id][operator_id] = BuiltinMemory()
-        return self._operator_memories[job_id][operator_id]
+                memory = BuiltinMemory()
+            memory = self._put_memory(self._operator_memories, job_id, operator_id, memory)
+        return memory
+
+    def release_job_memories(self, job_ids: Collection[str]) -> None:
+        """Release the memories of the jobs, e.g. once their original job reaches a final status.
+
+        The released memories are not spilled, since they are not used any more.
+        """
+        with self._lock:
+            for job_id in job_ids:
+                released = False
+                for memories in (self._reasoner_memories, self._operator_memories):
+                    released = memories.pop(job_id, None) is not None or released
+                self._last_used_times.pop(job_id, None)
+                self._released_count += released
+            for key in list(self._evicted_memories.keys()):
+                if key[1] in job_ids:
+                    self._evicted_memories.pop(key, None)
+
+    def get_memory_usage(self, job_ids: Optional[Collection[str]] = None) -> Dict[str, int]:
+        """Get the usage of the memories kept in the process, of all the jobs or of the given
+        jobs: the numbers of the jobs, the memories, the messages and the characters of the
+        messages (including the function outputs), which approximates the size of the memories.
+        """
+        with self._lock:
+            jobs = set(self._reasoner_memories) | set(self._operator_memories)
+            if job_ids is not None:
+                jobs &= set(job_ids)
+            memories = [
+                memory
+                for job_id in jobs
+                for job_memories in (
+                    self._reasoner_memories.get(job_id, {}),
+                    self._operator_memories.get(job_id, {}),
+                )
+                for memory in job_memories.values()
+            ]
+
+        messages = [message for memory in memories for message in memory.get_messages()]
+        return {
+            "jobs": len(jobs),
+            "memories": len(memories),
+            "messages": len(messages),
+            "chars": sum(
+                len(message.get_payload())
+                + sum(len(result.output) for result in message.get_function_calls() or [])
+                for message in messages
+            ),
+        }
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Get the usage of the memories kept in the process, with the numbers of the evicted and
+        released jobs and of the spilled memories since the service started."""
+        metrics = self.get_memory_usage()
+        with self._lock:
+            metrics.update(
+                evicted_jobs=self._evicted_count,
+                spilled_memories=self._spilled_count,
+                released_jobs=self._released_count,
+            )
+        return metrics
+
+    def _get_memory(
+        self,
+        memories: Dict[str, Dict[str, Memory]],
+        kind: str,
+        job_id: str,
+        operator_id: str,
+    ) -> Optional[Memory]:
+        """Get the memory kept in the process, and mark the job as the most recently used."""
+        with self._lock:
+            memory = memories.get(job_id, {}).get(operator_id)
+            if memory is None:
+                memory = self._evicted_memories.pop((kind, job_id, operator_id), None)
+                if memory is not None:
+                    memories.setdefault(job_id, {})[operator_id] = memory
+            if memory is not None:
+                self._touch(job_id)
+        if memory is None:
+            return None
+        self._evict()
+        return memory
+
+    def _put_memory(
+        self,
+        memories: Dict[str, Dict[str, Memory]],
+        job_id: str,
+        operator_id: str,
+        memory: Memory,
+    ) -> Memory:
+        """Keep the created memory, unless a memory of the job/operator pair is created
+        concurrently, which is returned instead."""
+        with self._lock:
+            memory = memories.setdefault(job_id, {}).setdefault(operator_id, memory)
+            self._touch(job_id)
+        self._evict()
+        return memory
+
+    def _touch(self, job_id: str) -> None:
+        """Mark the job as the most recently used. The lock must be held."""
+        self._last_used_times[job_id] = time.monotonic()
+        self._last_used_times.move_to_end(job_id)
+
+    def _evict(self) -> None:
+        """Evict the memories of the expired jobs, and of the least recently used jobs beyond the
+        cache size."""
+        max_jobs = max(1, SystemEnv.MEMORY_CACHE_SIZE)
+        expire_time = time.monotonic() - SystemEnv.MEMORY_TTL
+        evicted: Dict[str, Dict[str, Memory]] = {}
+        with self._lock:
+            # the jobs are ordered by their last used times, so the expired jobs come first
+            while self._last_used_times:
+                job_id, last_used_time = next(iter(self._last_used_times.items()))
+                if len(self._last_used_times) <= max_jobs and last_used_time > expire_time:
+                    break
+                self._last_used_times.popitem(last=False)
+                for kind, memories in (
+                    ("reasoner", self._reasoner_memories),
+                    ("operator", self._operator_memories),
+                ):
+                    for operator_id, memory in memories.pop(job_id, {}).items():
+                        self._evicted_memories[(kind, job_id, operator_id)] = memory
+                        if kind == "reasoner":
+                            evicted.setdefault(job_id, {})[operator_id] = memory
+                self._evicted_count += 1
+
+        if SystemEnv.ENABLE_MEMORY_SPILL:
+            for job_id, job_memories in evicted.items():
+                for operator_id, memory in job_memories.items():
+                    self._spill_memory(job_id, operator_id, memory)
+
+    def _spill_memory(self, job_id: str, operator_id: str, memory: Memory) -> None:
+        """Save the messages of an evicted builtin memory to the message table."""
+        message_service: Optional[MessageService] = MessageService.instance
+        if not isinstance(memory, BuiltinMemory) or not message_service:
+            return
+        try:
+            message_service.save_model_messages(memory.get_messages(), operator_id=operator_id)
+            with self._lock:
+                self._spilled_count += 1
+        except Exception as e:
+            print(
+                f"\033[38;5;208m[Warning]: Failed to spill the memory of job {job_id}, operator "
+                f"{operator_id}: {e}\033[0m"
+            )
+
+    def _load_spilled_memory(self, job_id: str, operator_id: str) -> BuiltinMemory:
+        """Create a builtin memory, with the messages spilled to the message table, if any."""
+        memory = BuiltinMemory()
+        message_service: Optional[MessageService] = MessageService.instance
+        if SystemEnv.ENABLE_MEMORY_SPILL and message_service:
+            for message in message_service.get_model_messages(job_id, operator_id):
+                memory.add_message(message)
+        return memory
@@ -1,10 +1,17 @@
-from typing import List, cast
+from typing import Collection, Dict, List, Tuple, cast
 
 from app.core.common.singleton import Singleton
 from app.core.common.type import ChatMessageRole
 from app.core.dal.dao.message_dao import MessageDao
-from app.core.dal.do.message_do import TextMessageDo
-from app.core.model.message import HybridMessage, Message, MessageType, TextMessage
+from app.core.dal.do.message_do import HybridMessageDo, TextMessageDo
+from app.core.model.message import (
+    AgentMessage,
+    HybridMessage,
+    Message,
+    MessageType,
+    ModelMessage,
+    TextMessage,
+)
 
 
 class MessageService(metaclass=Singleton):
@@ -28,7 +35,32 @@ class MessageService(metaclass=Singleton):
         results = self._message_dao.filter_by(job_id=job_id, type=message_type.value)
         if not results:
             return []
-        return [self._message_dao.parse_into_message(message_do=result) for result in results]
+        return self._message_dao.parse_into_messages(message_dos=results)
+
+    def save_model_messages(self, messages: List[ModelMessage], operator_id: str) -> None:
+        """Save the model messages of the operator, e.g. the messages of a reasoner memory."""
+        self._message_dao.save_model_messages(messages=messages, operator_id=operator_id)
+
+    def get_model_messages(self, job_id: str, operator_id: str) -> List[ModelMessage]:
+        """Get the model messages of the operator in the job, ordered by their steps."""
+        return self._message_dao.get_model_messages(job_id=job_id, operator_id=operator_id)
+
+    def get_agent_messages_by_job_ids(
+        self, job_ids: Collection[str]
+    ) -> Dict[str, List[AgentMessage]]:
+        """Get the agent messages of the jobs, in a constant number of queries."""
+        return self._message_dao.get_agent_messages_by_job_ids(job_ids=job_ids)
+
+    def get_hybrid_messages_by_job_ids(
+        self, job_ids: Collection[str]
+    ) -> Dict[Tuple[str, ChatMessageRole], HybridMessage]:
+        """Get the hybrid messages of the jobs by (job ID, role), in a constant number of
+        queries."""
+        hybrid_messages: Dict[Tuple[str, ChatMessageRole], HybridMessage] = {}
+        for message in self._message_dao.get_hybrid_messages_by_job_ids(job_ids=job_ids):
+            key = (str(message.get_job_id()), message.get_role())
+            hybrid_messages.setdefault(key, message)
+        return hybrid_messages
 
     def get_text_message_by_job_id_and_role(
         self, job_id: str, role: ChatMessageRole
@@ -47,15 +79,13 @@ class MessageService(metaclass=Singleton):
         self, job_id: str, role: ChatMessageRole
     ) -> HybridMessage:
         """Get system text messages by job ID."""
-        hybrid_messages = cast(
-            List[HybridMessage],
-            self.get_message_by_job_id(job_id=job_id, message_type=MessageType.HYBRID_MESSAGE),
+        # the role of the hybrid message is the role of its instruction message
+        results: List[HybridMessageDo] = self._message_dao.get_hybrid_message_by_job_id_and_role(
+            job_id=job_id, role=role
         )
-        for hybrid_message in hybrid_messages:
-            instruction_message = cast(TextMessage, hybrid_message.get_instruction_message())
-            if instruction_message.get_role() == role:
-                return hybrid_message
-        raise ValueError(f"Hybrid message not found for job {job_id} and role {role.value}.")
+        if not results:
+            raise ValueError(f"Hybrid message not found for job {job_id} and role {role.value}.")
+        return cast(HybridMessage, self._message_dao.parse_into_message(message_do=results[0]))
 
     def filter_text_messages_by_session(self, session_id: str) -> List[TextMessage]:
         """Filter messages by session ID.
@@ -66,10 +96,8 @@ class MessageService(metaclass=Singleton):
         Returns:
             List[TextMessage]: List of TextMessage objects
         """
-        # fetch filtered messages
-        results = self._message_dao.filter_by(
-            session_id=session_id, type=MessageType.TEXT_MESSAGE.value
-        )
+        # fetch filtered messages, in chronological order
+        results = self._message_dao.filter_text_messages_by_session(session_id=session_id)
         return [
             cast(TextMessage, self._message_dao.parse_into_message(message_do=result))
             for result in results
@@ -4,6 +4,7 @@ from pathlib import Path
 import pkgutil
 from typing import Any, Dict, List, Type
 
+from app.core.service.job_event_service import JobEventService
 from app.core.service.job_service import JobService
 from app.core.service.message_service import MessageService
 
@@ -14,7 +15,11 @@ class ServiceFactory:
     # define service initialization order by class name
     # services listed here will be initialized first, in the order specified
     # any services not listed will be initialized after these, in discovery order
-    _initialization_order: List[str] = [MessageService.__name__, JobService.__name__]
+    _initialization_order: List[str] = [
+        JobEventService.__name__,
+        MessageService.__name__,
+        JobService.__name__,
+    ]
 
     @classmethod
     def initialize(cls) -> None:
@@ -1,24 +1,44 @@
+import asyncio
+import atexit
 from typing import Dict, Optional
 
+from app.core.common.async_func import BackgroundEventLoop
 from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
 from app.core.model.task import ToolCallContext
+from app.core.toolkit.tool_config import McpConfig
 from app.core.toolkit.tool_connection import ToolConnection
-from app.core.toolkit.tool_connection_factory import ToolConnectionFactory
+from app.core.toolkit.tool_connection_pool import LeasedConnection, ToolConnectionPool
 from app.core.toolkit.tool_group import ToolGroupConfig
 
 
 class ToolConnectionService(metaclass=Singleton):
     """Service for managing MCP tool connections.
 
+    The connections are kept warm in a bounded pool per tool group, and shared across operators
+    and jobs, so that an operator does not cold-start the MCP server (e.g. spawn a STDIO
+    subprocess) on every run. The pooled connections live in a background event loop, because
+    the MCP sessions are bound to the event loop which created them, while the operators are
+    executed in their own event loops.
+
     Attributes:
-        _connections (Dict[str, Dict[str, Dict[str, ToolConnection]]]): A dictionary mapping job IDs
-            to operator IDs to their respective tool group connections. The structure is:
-            {job_id: {operator_id: {tool_group_id: tool_connection}}}.
+        _loop (BackgroundEventLoop): The event loop owning all the pooled connections.
+        _pools (Dict[str, ToolConnectionPool]): A dictionary mapping tool group IDs to their
+            connection pools.
+        _leases (Dict[str, Dict[str, Dict[str, asyncio.Future]]]): A dictionary mapping job IDs
+            to operator IDs to the leases of their tool groups. The structure is:
+            {job_id: {operator_id: {tool_group_id: future of the leased connection}}}.
     """
 
     def __init__(self):
-        # structure: {job_id: {operator_id: {tool_group_id: tool_connection}}}
-        self._connections: Dict[str, Dict[str, Dict[str, ToolConnection]]] = {}
+        self._loop: BackgroundEventLoop = BackgroundEventLoop(name="tool-connection-loop")
+        self._pools: Dict[str, ToolConnectionPool] = {}
+        # structure: {job_id: {operator_id: {tool_group_id: future of the leased connection}}}
+        # only accessed in the background event loop, so no lock is required
+        self._leases: Dict[str, Dict[str, Dict[str, asyncio.Future]]] = {}
+        self._reaper_task: Optional[asyncio.Task] = None
+
+        atexit.register(self.close_all_connections)
 
     async def get_or_create_connection(
         self,
@@ -26,45 +46,114 @@ class ToolConnectionService(metaclass=Singleton):
         tool_group_config: ToolGroupConfig,
         tool_call_ctx: Optional[ToolCallContext] = None,
     ) -> ToolConnection:
-        """Get or create a connection for the specified tool group.
+        """Lease a pooled connection for the specified tool group.
 
-        If an task is provided, the connection will be associated with that task.
-        If no task is provided, a new connection can be used temporarily, which will be
-        closed after use.
+        If a tool call context is provided, the lease is held by the operator of the context,
+        so the tool calls of the operator are sent through the same connection, until the lease
+        is returned by `release_connection`. If no context is provided, the caller holds the
+        lease, and must close the returned connection to return it to the pool.
         """
-        if tool_call_ctx is None:
-            return await ToolConnectionFactory.create_connection(
-                tool_group_config=tool_group_config
-            )
+        return await self._loop.run_async(
+            self._get_or_create_lease(tool_group_id, tool_group_config, tool_call_ctx)
+        )
 
-        job_id = tool_call_ctx.job_id
-        operator_id = tool_call_ctx.operator_id
+    async def release_connection(self, call_tool_ctx: ToolCallContext) -> None:
+        """Return the connections leased by the operator of the context to their pools."""
+        await self._loop.run_async(self._release_leases(call_tool_ctx))
+
+    def close_all_connections(self) -> None:
+        """Close all the pooled connections, and stop the background event loop."""
+        if not self._pools:
+            return
+        try:
+            self._loop.run(self._close_pools(), timeout=SystemEnv.MCP_CONNECTION_LEASE_TIMEOUT)
+        finally:
+            self._loop.stop(timeout=5)
+
+    async def _get_or_create_lease(
+        self,
+        tool_group_id: str,
+        tool_group_config: ToolGroupConfig,
+        tool_call_ctx: Optional[ToolCallContext],
+    ) -> LeasedConnection:
+        pool = self._get_or_create_pool(tool_group_id, tool_group_config)
+        if tool_call_ctx is None:
+            return await self._lease(pool)
 
-        if job_id not in self._connections:
-            self._connections[job_id] = {}
+        operator_leases = self._leases.setdefault(tool_call_ctx.job_id, {}).setdefault(
+            tool_call_ctx.operator_id, {}
+        )
+        lease_future = operator_leases.get(tool_group_id)
+        if lease_future is None:
+            # the concurrent tool calls of the operator wait for the same lease
+            lease_future = asyncio.ensure_future(self._lease(pool))
+            operator_leases[tool_group_id] = lease_future
 
-        if operator_id not in self._connections[job_id]:
-            self._connections[job_id][operator_id] = {}
+        try:
+            return await asyncio.shield(lease_future)
+        except Exception:
+            if lease_future.done() and operator_leases.get(tool_group_id) is lease_future:
+                del operator_leases[tool_group_id]
+            raise
 
-        if tool_group_id not in self._connections[job_id][operator_id]:
-            connection = await ToolConnectionFactory.create_connection(
-                tool_group_config=tool_group_config
-            )
-            self._connections[job_id][operator_id][tool_group_id] = connection
-        else:
-            connection = self._connections[job_id][operator_id][tool_group_id]
-        return connection
+    async def _lease(self, pool: ToolConnectionPool) -> LeasedConnection:
+        connection = await pool.lease()
+        return LeasedConnection(connection=connection, pool=pool, loop=self._loop)
 
-    async def release_connection(self, call_tool_ctx: ToolCallContext) -> None:
-        """Destroy the specified connection."""
+    async def _release_leases(self, call_tool_ctx: ToolCallContext) -> None:
         job_id = call_tool_ctx.job_id
         operator_id = call_tool_ctx.operator_id
 
-        if job_id in self._connections and operator_id in self._connections[job_id]:
-            for connection in self._connections[job_id][operator_id].values():
-                await connection.close()
-            del self._connections[job_id][operator_id]
+        if job_id in self._leases and operator_id in self._leases[job_id]:
+            for lease_future in self._leases[job_id][operator_id].values():
+                if not lease_future.done():
+                    lease_future.cancel()
+                elif not lease_future.cancelled() and lease_future.exception() is None:
+                    await lease_future.result().close()
+            del self._leases[job_id][operator_id]
 
             # clean up empty job_id entry
-            if not self._connections[job_id]:
-                del self._connections[job_id]
+            if not self._leases[job_id]:
+                del self._leases[job_id]
+
+    def _get_or_create_pool(
+        self, tool_group_id: str, tool_group_config: ToolGroupConfig
+    ) -> ToolConnectionPool:
+        if tool_group_id not in self._pools:
+            self._pools[tool_group_id] = ToolConnectionPool(
+                tool_group_config=tool_group_config,
+                max_size=SystemEnv.MCP_CONNECTION_POOL_SIZE,
+                idle_timeout=SystemEnv.MCP_CONNECTION_IDLE_TIMEOUT,
+                health_check_interval=SystemEnv.MCP_CONNECTION_HEALTH_CHECK_INTERVAL,
+                lease_timeout=SystemEnv.MCP_CONNECTION_LEASE_TIMEOUT,
+                exclusive=(
+                    isinstance(tool_group_config, McpConfig)
+                    and tool_group_config.exclusive_connection
+                ),
+            )
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.create_task(self._evict_idle_connections())
+        return self._pools[tool_group_id]
+
+    async def _evict_idle_connections(self) -> None:
+        """Periodically close the connections idle longer than the idle timeout."""
+        interval = max(1.0, SystemEnv.MCP_CONNECTION_IDLE_TIMEOUT / 2)
+        while True:
+            await asyncio.sleep(interval)
+            for pool in list(self._pools.values()):
+                await pool.evict_idle()
+
+    async def _close_pools(self) -> None:
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+        for operator_leases in self._leases.values():
+            for leases in operator_leases.values():
+                for lease_future in leases.values():
+                    lease_future.cancel()
+        self._leases.clear()
+
+        pools = list(self._pools.values())
+        self._pools.clear()
+        for pool in pools:
+            await pool.close()
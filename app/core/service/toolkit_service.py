@@ -1,11 +1,12 @@
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
 
 import matplotlib
 from matplotlib.lines import Line2D
 import matplotlib.pyplot as plt
 import networkx as nx  # type: ignore
 
-from app.core.common.async_func import run_async_function
+from app.core.common.async_func import EventLoopRunner
 from app.core.common.singleton import Singleton
 from app.core.toolkit.action import Action
 from app.core.toolkit.tool import Tool
@@ -17,10 +18,22 @@ matplotlib.use("Agg")
 
 
 class ToolkitService(metaclass=Singleton):
-    """The toolkit service provides functionalities for the toolkit."""
+    """The toolkit service provides functionalities for the toolkit.
+
+    Attributes:
+        _toolkit (Toolkit): The toolkit graph.
+        _recommendations (Dict[Tuple[FrozenSet[str], float, int, int], Tuple[Tuple[Tool, ...],
+            Tuple[Action, ...]]]): The cached recommended tools and actions, keyed by
+            (action ids, threshold, hops, toolkit version). Any modification of the toolkit
+            renews its version, so that the stale recommendations are never hit.
+    """
 
     def __init__(self):
         self._toolkit: Toolkit = Toolkit()
+        self._recommendations: Dict[
+            Tuple[FrozenSet[str], float, int, int], Tuple[Tuple[Tool, ...], Tuple[Action, ...]]
+        ] = {}
+        self._recommendations_lock = threading.Lock()
 
     def get_toolkit(self) -> Toolkit:
         """Get the current toolkit."""
@@ -99,7 +112,7 @@ class ToolkitService(metaclass=Singleton):
             toolkit.add_vertex(group_id, data=tool_group)
 
         # create and store tools listed in the tool group
-        tools: List[Tool] = run_async_function(tool_group.list_tools)
+        tools: List[Tool] = EventLoopRunner().run(tool_group.list_tools())
         for tool in tools:
             self.add_tool(tool, connected_actions=connected_actions)
             toolkit.add_edge(group_id, tool.id)
@@ -215,7 +228,6 @@ class ToolkitService(metaclass=Singleton):
         for u, v in toolkit_subgraph.edges():
             if toolkit_subgraph.get_score(u, v) < threshold:
                 toolkit_subgraph.remove_edge(u, v)
-        self.visualize(graph=toolkit_subgraph, title="Recommended Toolkit")
 
         return toolkit_subgraph
 
@@ -230,20 +242,35 @@ class ToolkitService(metaclass=Singleton):
             hops: Number of hops to search for recommendations
 
         Returns:
-            nx.DiGraph: The toolkit subgraph with recommended tools
+            Tuple[List[Tool], List[Action]]: The recommended tools and actions. They are shared by
+                the callers with the same recommendation, so they must not be modified.
         """
-        subgraph = self.recommend_subgraph(actions, threshold, hops)
-        rec_actions: List[Action] = []
-        rec_tools: List[Tool] = []
-        for n in subgraph.vertices():
-            item: Optional[Union[Action, Tool]] = subgraph.get_action(n) or subgraph.get_tool(n)
-            assert item is not None
-            if isinstance(item, Action):
-                rec_actions.append(item)
-            elif isinstance(item, Tool):
-                rec_tools.append(item)
-
-        return rec_tools, rec_actions
+        toolkit_version = self.get_toolkit().version
+        key = (frozenset(action.id for action in actions), threshold, hops, toolkit_version)
+        with self._recommendations_lock:
+            recommendation = self._recommendations.get(key, None)
+
+        if recommendation is None:
+            subgraph = self.recommend_subgraph(actions, threshold, hops)
+            rec_actions: List[Action] = []
+            rec_tools: List[Tool] = []
+            for n in subgraph.vertices():
+                item: Optional[Union[Action, Tool]] = subgraph.get_action(n) or subgraph.get_tool(n)
+                assert item is not None
+                if isinstance(item, Action):
+                    rec_actions.append(item)
+                elif isinstance(item, Tool):
+                    rec_tools.append(item)
+            recommendation = (tuple(rec_tools), tuple(rec_actions))
+
+            with self._recommendations_lock:
+                # drop the recommendations of the previous versions of the toolkit
+                self._recommendations = {
+                    k: v for k, v in self._recommendations.items() if k[3] == toolkit_version
+                }
+                self._recommendations[key] = recommendation
+
+        return list(recommendation[0]), list(recommendation[1])
 
     def update_action(self, text: str, called_tools: List[Tool]):
         """Update the toolkit graph by reinforcement learning.
@@ -263,15 +290,19 @@ class ToolkitService(metaclass=Singleton):
     def visualize(self, graph: Toolkit, title: str, show=False):
         """Visualize the toolkit graph with different colors for actions and tools.
 
+        It is a debug API which is expensive (spring layout and drawing), so it is never called
+        in the hot path (e.g. by recommend_subgraph), and should be invoked explicitly.
+
         Args:
             graph (Toolkit): The graph to visualize.
             title (str): Title for the plot.
-            show (bool): Whether to show the plot.
+            show (bool): Whether to show the plot. If not, the figure is released by pyplot, so
+                it is garbage collected once the caller drops it (e.g. after saving it).
 
         Returns:
             plt.Figure: The plot figure.
         """
-        plt.figure(figsize=(12, 8))
+        figure, ax = plt.subplots(figsize=(12, 8))
 
         # get vertex positions using spring layout with larger distance and more iterations
         pos = nx.spring_layout(
@@ -286,6 +317,7 @@ class ToolkitService(metaclass=Singleton):
         nx.draw_networkx_nodes(
             graph.get_graph(),
             pos,
+            ax=ax,
             nodelist=action_vertices,
             node_color="lightblue",
             node_size=2000,
@@ -296,6 +328,7 @@ class ToolkitService(metaclass=Singleton):
         nx.draw_networkx_nodes(
             graph.get_graph(),
             pos,
+            ax=ax,
             nodelist=tool_vertices,
             node_color="lightgreen",
             node_size=1500,
@@ -310,6 +343,7 @@ class ToolkitService(metaclass=Singleton):
         nx.draw_networkx_edges(
             graph.get_graph(),
             pos,
+            ax=ax,
             edgelist=next_edges,
             edge_color="blue",
             arrows=True,
@@ -321,6 +355,7 @@ class ToolkitService(metaclass=Singleton):
         nx.draw_networkx_edges(
             graph.get_graph(),
             pos,
+            ax=ax,
             edgelist=call_edges,
             edge_color="green",
             arrows=True,
@@ -335,6 +370,7 @@ class ToolkitService(metaclass=Singleton):
             graph.get_graph(),
             pos,
             edge_labels,
+            ax=ax,
             font_size=8,
             label_pos=0.5,
             bbox={"facecolor": "white", "edgecolor": "none", "alpha": 0.7},
@@ -352,25 +388,44 @@ class ToolkitService(metaclass=Singleton):
             graph.get_graph(),
             pos,
             vertex_labels,
+            ax=ax,
             font_size=8,
             # bbox=dict(facecolor="white", edgecolor="none", alpha=0.7),
         )
 
-        plt.title(title)
-        plt.axis("off")
+        ax.set_title(title)
+        ax.axis("off")
 
         # add a legend
-
         legend_elements = [
             Line2D([0], [0], color="blue", label="Action→Action"),
             Line2D([0], [0], color="green", label="Action→Tool"),
-            plt.scatter([0], [0], color="lightblue", s=100, label="Action"),
-            plt.scatter([0], [0], color="lightgreen", marker="s", s=100, label="Tool"),
+            Line2D(
+                [0],
+                [0],
+                color="none",
+                marker="o",
+                markerfacecolor="lightblue",
+                markersize=10,
+                label="Action",
+            ),
+            Line2D(
+                [0],
+                [0],
+                color="none",
+                marker="s",
+                markerfacecolor="lightgreen",
+                markersize=10,
+                label="Tool",
+            ),
         ]
-        plt.legend(handles=legend_elements, loc="upper left", bbox_to_anchor=(1, 1))
+        ax.legend(handles=legend_elements, loc="upper left", bbox_to_anchor=(1, 1))
 
-        plt.tight_layout()
+        figure.tight_layout()
 
         if show:
             plt.show(block=False)
-        return plt.gcf()
+        else:
+            # release the figure from pyplot, otherwise it is kept alive until closed explicitly
+            plt.close(figure)
+        return figure
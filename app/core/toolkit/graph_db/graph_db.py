@@ -12,7 +12,26 @@ class GraphDb(Generic[T]):
         self._config: T = config
         self._driver = None
 
+    @property
+    def config(self) -> T:
+        """Get the graph database configuration."""
+        return self._config
+
     @property
     def conn(self):
         """Get the database connection."""
         raise NotImplementedError("Subclasses should implement this method.")
+
+    def is_healthy(self) -> bool:
+        """Check whether the database connection is still usable."""
+        try:
+            self.conn.verify_connectivity()
+            return True
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        """Close the database connection and release the underlying connection pool."""
+        if self._driver:
+            self._driver.close()
+            self._driver = None
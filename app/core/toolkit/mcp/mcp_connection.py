@@ -1,5 +1,5 @@
+import asyncio
 from contextlib import AsyncExitStack
-from threading import Lock
 from typing import List, Optional, Union, cast
 from urllib.parse import urljoin
 
@@ -20,6 +20,11 @@ class McpConnection(ToolConnection):
 
     Manages connections to MCP servers through various transport protocols including
     STDIO, SSE, WebSocket, and Streamable HTTP.
+
+    The transport and the session are opened and closed by a lifecycle task, since the
+    underlying anyio cancel scopes must be exited by the task which entered them. So the
+    connection can be connected, used and closed by different tasks of the same event loop,
+    which is what a connection pool needs.
     """
 
     def __init__(self, tool_group_config: McpConfig):
@@ -28,7 +33,10 @@ class McpConnection(ToolConnection):
         self._session: Optional[ClientSession] = None
         self._cached_tools: List[McpBaseTool] = []
         self._exit_stack: AsyncExitStack = AsyncExitStack()
-        self._lock = Lock()
+        self._lock = asyncio.Lock()
+
+        self._lifecycle_task: Optional[asyncio.Task] = None
+        self._shutdown_event: Optional[asyncio.Event] = None
 
     @property
     def transport_config(self) -> McpTransportConfig:
@@ -48,80 +56,138 @@ class McpConnection(ToolConnection):
             List[Union[TextContent, ImageContent, EmbeddedResource]]: The result
                 of the tool call, which may include multiple content blocks.
         """
-        with self._lock:
-            if self._session is None:
-                raise RuntimeError("MCP connection is not initialized.")
+        if self._session is None:
+            raise RuntimeError("MCP connection is not initialized.")
 
-            result = await self._session.call_tool(tool_name, kwargs or {})
-            return result.content
+        result = await self._session.call_tool(tool_name, kwargs or {})
+        return result.content
 
     async def close(self) -> None:
         """Close and release MCP connection resources.
 
         Safely closes the session and cleans up transport resources.
         """
-        with self._lock:
-            if self._session is None:
+        async with self._lock:
+            if self._lifecycle_task is None:
                 return
 
+            await self.reset()
+
+            # let the lifecycle task close the session and transport resources
+            assert self._shutdown_event is not None
+            self._shutdown_event.set()
             try:
-                # TODO: remove this hardcoded check
-                # used to close every 'browser-use' session,
-                # since the session won't be released after the shutdown
-                if self._mcp_config.name == "BrowserTool":
-                    await self._session.call_tool("browser_close")
+                await self._lifecycle_task
             except Exception:
                 pass
 
-            # close session and transport resources
-            await self._exit_stack.aclose()
-
+            self._lifecycle_task = None
+            self._shutdown_event = None
             self._session = None
 
+    async def reset(self) -> None:
+        """Clean up the server side state of the session, before it is reused or closed."""
+        if self._session is None:
+            return
+
+        try:
+            # TODO: remove this hardcoded check
+            # used to close every 'browser-use' session,
+            # since the session won't be released after the shutdown
+            if self._mcp_config.name == "BrowserTool":
+                await self._session.call_tool("browser_close")
+        except Exception:
+            pass
+
+    async def is_healthy(self) -> bool:
+        """Check whether the connection is alive by pinging the MCP server."""
+        if self._session is None or self._lifecycle_task is None or self._lifecycle_task.done():
+            return False
+
+        try:
+            await asyncio.wait_for(self._session.send_ping(), timeout=self.transport_config.timeout)
+            return True
+        except Exception:
+            return False
+
     async def connect(self) -> None:
         """Establish MCP connection based on transport type.
 
         Creates the appropriate transport connection (STDIO, SSE, WebSocket, or
         Streamable HTTP) and initializes the session.
         """
-        with self._lock:
+        async with self._lock:
             if self._session is not None:
                 return
 
-            transport_config = self.transport_config
+            ready_future: asyncio.Future = asyncio.get_running_loop().create_future()
+            self._shutdown_event = asyncio.Event()
+            self._lifecycle_task = asyncio.create_task(
+                self._run_lifecycle(ready_future, self._shutdown_event)
+            )
 
-            # establish transport connection
             try:
-                if transport_config.transport_type == McpTransportType.STDIO:
-                    await self._connect_stdio()
-                elif transport_config.transport_type == McpTransportType.SSE:
-                    await self._connect_sse()
-                elif transport_config.transport_type == McpTransportType.WEBSOCKET:
-                    await self._connect_websocket()
-                elif transport_config.transport_type == McpTransportType.STREAMABLE_HTTP:
-                    await self._connect_streamable_http()
-                else:
-                    raise ValueError(
-                        f"Unsupported transport type: {transport_config.transport_type}"
-                    )
-            except ValueError:
-                await self._exit_stack.aclose()
+                await ready_future
+            except BaseException:
+                # the lifecycle task releases the resources when it fails or is cancelled
+                if not self._lifecycle_task.done():
+                    self._lifecycle_task.cancel()
+                self._lifecycle_task = None
+                self._shutdown_event = None
                 self._session = None
                 raise
-            except Exception as e:
-                await self._exit_stack.aclose()
-                self._session = None
-                raise RuntimeError(
-                    "Failed to connect to MCP server. "
-                    f"Please check out the port/connection of the MCP server:\n{e}"
-                ) from e
 
-            if self._session is None:
-                raise RuntimeError("MCP session was not properly connected.")
+    async def _run_lifecycle(
+        self, ready_future: asyncio.Future, shutdown_event: asyncio.Event
+    ) -> None:
+        """Open the transport and the session, and hold them until the shutdown is requested."""
+        try:
+            async with AsyncExitStack() as exit_stack:
+                self._exit_stack = exit_stack
+                await self._open_session()
+
+                ready_future.set_result(None)
+                await shutdown_event.wait()
+        except BaseException as e:
+            if ready_future.done():
+                raise
+            if isinstance(e, asyncio.CancelledError):
+                ready_future.cancel()
+            else:
+                ready_future.set_exception(e)
+        finally:
+            self._session = None
+
+    async def _open_session(self) -> None:
+        """Open the transport and initialize the session in the current exit stack."""
+        transport_config = self.transport_config
+
+        # establish transport connection
+        try:
+            if transport_config.transport_type == McpTransportType.STDIO:
+                await self._connect_stdio()
+            elif transport_config.transport_type == McpTransportType.SSE:
+                await self._connect_sse()
+            elif transport_config.transport_type == McpTransportType.WEBSOCKET:
+                await self._connect_websocket()
+            elif transport_config.transport_type == McpTransportType.STREAMABLE_HTTP:
+                await self._connect_streamable_http()
+            else:
+                raise ValueError(f"Unsupported transport type: {transport_config.transport_type}")
+        except ValueError:
+            raise
+        except Exception as e:
+            raise RuntimeError(
+                "Failed to connect to MCP server. "
+                f"Please check out the port/connection of the MCP server:\n{e}"
+            ) from e
+
+        if self._session is None:
+            raise RuntimeError("MCP session was not properly connected.")
 
-            # Initialize session
-            session: ClientSession = cast(ClientSession, self._session)
-            await session.initialize()
+        # Initialize session
+        session: ClientSession = cast(ClientSession, self._session)
+        await session.initialize()
 
     async def _connect_stdio(self):
         """Initialize STDIO transport connection using AsyncExitStack."""
@@ -178,7 +244,8 @@ class McpConnection(ToolConnection):
     async def list_tools(self) -> List[McpBaseTool]:
         """Get available tools from MCP server with caching support.
 
-        Returns cached tools if available, otherwise fetches from the server.
+        Returns cached tools if available, otherwise fetches from the server. The connection
+        is kept open, so that it can be reused afterwards.
 
         Returns:
             List of available MCP tools.
@@ -190,6 +257,5 @@ class McpConnection(ToolConnection):
 
         assert self._session is not None, "MCP session is not initialized"
         response = await self._session.list_tools()
-        await self.close()
         self._cached_tools = response.tools
-        return self._cached_tools
\ No newline at end of file
+        return self._cached_tools
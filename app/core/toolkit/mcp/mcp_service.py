@@ -38,7 +38,11 @@ class McpService(ToolGroup):
     async def list_tools(self) -> List[Tool]:
         """Get available tool list from MCP server, with caching support."""
         connection = await self.create_connection()
-        mcp_base_tools: List[McpBaseTool] = await connection.list_tools()
+        try:
+            mcp_base_tools: List[McpBaseTool] = await connection.list_tools()
+        finally:
+            # return the connection to the pool, where it keeps warm for the operators
+            await connection.close()
         tools: List[Tool] = []
         for mcp_base_tool in mcp_base_tools:
             tool_description = mcp_base_tool.description + "\n" if mcp_base_tool.description else ""
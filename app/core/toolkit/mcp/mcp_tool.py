@@ -4,8 +4,9 @@ from mcp.types import EmbeddedResource, ImageContent, TextContent
 
 from app.core.common.type import ToolType
 from app.core.model.task import ToolCallContext
-from app.core.toolkit.mcp.mcp_connection import McpConnection
 from app.core.toolkit.tool import Tool
+from app.core.toolkit.tool_config import McpConfig
+from app.core.toolkit.tool_connection import ToolConnection
 
 if TYPE_CHECKING:
     from app.core.toolkit.mcp.mcp_service import McpService
@@ -24,6 +25,7 @@ class McpTool(Tool):
             description=description,
             function=self._create_function(name, description, tool_group),
             tool_type=ToolType.MCP_TOOL,
+            max_concurrency=cast(McpConfig, tool_group.get_tool_group_config()).max_concurrency,
         )
 
         self._tool_group: McpService = tool_group
@@ -43,8 +45,8 @@ class McpTool(Tool):
         async def function(
             tool_call_ctx: ToolCallContext, **kwargs
         ) -> List[Union[TextContent, ImageContent, EmbeddedResource]]:
-            connection: McpConnection = cast(
-                McpConnection, await tool_group.create_connection(tool_call_ctx=tool_call_ctx)
+            connection: ToolConnection = await tool_group.create_connection(
+                tool_call_ctx=tool_call_ctx
             )
             result = await connection.call(tool_name=name, **kwargs)
             return result
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional
 from uuid import uuid4
 
 from app.core.common.type import FunctionCallStatus, ToolType
@@ -43,6 +43,7 @@ class Tool:
         _description: Description of the tool, will be shown to the LLM.
         _function: Callable function that can be invoked by the LLM.
         _tool_type: Type of the tool, default is LOCAL_TOOL.
+        _max_concurrency: Max concurrent calls of the tool in one turn, no limit if None.
     """
 
     def __init__(
@@ -51,6 +52,7 @@ class Tool:
         description: str,
         function: Callable,
         tool_type: ToolType = ToolType.LOCAL_TOOL,
+        max_concurrency: Optional[int] = None,
     ):
         """Initialize the Tool with name, description, and optional function."""
         self._id: str = str(uuid4())
@@ -58,6 +60,7 @@ class Tool:
         self._description: str = description
         self._type: ToolType = tool_type
         self._function: Callable = function
+        self._max_concurrency: Optional[int] = max_concurrency
 
     @property
     def id(self) -> str:
@@ -84,6 +87,16 @@ class Tool:
         """Get the callable function of the tool."""
         return self._function
 
+    @property
+    def max_concurrency(self) -> Optional[int]:
+        """Get the max concurrent calls of the tool in one turn."""
+        return self._max_concurrency
+
+    @max_concurrency.setter
+    def max_concurrency(self, max_concurrency: Optional[int]) -> None:
+        """Set the max concurrent calls of the tool in one turn."""
+        self._max_concurrency = max_concurrency
+
     def copy(self) -> "Tool":
         """Create a copy of the tool."""
         return Tool(
@@ -91,4 +104,5 @@ class Tool:
             description=self._description,
             function=self._function,
             tool_type=self._type,
+            max_concurrency=self._max_concurrency,
         )
@@ -94,6 +94,13 @@ class McpConfig(ToolGroupConfig):
     Attributes:
         ...
         transport_config (McpTransportConfig): Configuration for the MCP transport.
+        max_concurrency (Optional[int]): Max concurrent calls of each tool of the MCP service
+            in one turn, no limit if None.
+        exclusive_connection (bool): Whether a pooled connection is leased by one operator at
+            a time, which the stateful MCP services (e.g. browsers) require. Otherwise, the
+            pooled connections are shared by the operators.
     """
 
     transport_config: McpTransportConfig
+    max_concurrency: Optional[int] = None
+    exclusive_connection: bool = False
@@ -36,6 +36,14 @@ class ToolConnection(ABC):
     async def close(self) -> None:
         """Close and release connection resources."""
 
+    async def is_healthy(self) -> bool:
+        """Check whether the connection can still be used, before it is reused."""
+        return True
+
+    async def reset(self) -> None:
+        """Clean up the state left by the previous holder, before the connection is reused."""
+        return None
+
 
 class PackageConnection(ToolConnection):
     """Concrete implementation for interacting with ToolPackage tools.
@@ -0,0 +1,230 @@
+import asyncio
+from collections import deque
+import time
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.common.async_func import BackgroundEventLoop
+from app.core.toolkit.tool_config import ToolGroupConfig
+from app.core.toolkit.tool_connection import ToolConnection
+from app.core.toolkit.tool_connection_factory import ToolConnectionFactory
+
+
+class PooledConnection:
+    """A connection owned by a tool connection pool, with its lease bookkeeping.
+
+    Attributes:
+        connection (ToolConnection): The underlying connection.
+        lease_count (int): The number of holders currently leasing the connection.
+        last_used_at (float): The monotonic time when the connection was last returned.
+        last_checked_at (float): The monotonic time of the last health check.
+    """
+
+    def __init__(self, connection: ToolConnection):
+        self.connection: ToolConnection = connection
+        self.lease_count: int = 0
+        self.last_used_at: float = time.monotonic()
+        self.last_checked_at: float = time.monotonic()
+
+
+class ToolConnectionPool:
+    """A bounded pool of warm connections to one tool group.
+
+    A connection is leased by a holder, and returned to the pool (instead of being closed) when
+    the holder releases it. With shared leases, a connection may be leased by several holders
+    at the same time, because the requests are multiplexed over one session. With exclusive
+    leases, which stateful tools (e.g. browsers) require, a connection is leased by one holder
+    at a time, and its state is reset when it is returned.
+
+    Idle connections are health-checked before they are leased again, and closed after the idle
+    timeout. All the methods must be called in the event loop which owns the connections.
+
+    Attributes:
+        _tool_group_config (ToolGroupConfig): The configuration to create the connections.
+        _max_size (int): The max number of connections, including the connecting ones.
+        _idle_timeout (float): Seconds before an idle connection is closed.
+        _health_check_interval (float): Min seconds between two health checks of a connection.
+        _lease_timeout (float): Seconds to wait for a connection when the pool is exhausted.
+        _exclusive (bool): Whether a connection is leased by one holder at a time.
+    """
+
+    def __init__(
+        self,
+        tool_group_config: ToolGroupConfig,
+        max_size: int,
+        idle_timeout: float,
+        health_check_interval: float,
+        lease_timeout: float,
+        exclusive: bool = False,
+    ):
+        self._tool_group_config: ToolGroupConfig = tool_group_config
+        self._max_size: int = max(1, max_size)
+        self._idle_timeout: float = idle_timeout
+        self._health_check_interval: float = health_check_interval
+        self._lease_timeout: float = lease_timeout
+        self._exclusive: bool = exclusive
+
+        self._idle: Deque[PooledConnection] = deque()
+        self._leased: Dict[str, PooledConnection] = {}  # connection id -> pooled connection
+        self._size: int = 0
+        self._closed: bool = False
+        self._condition: asyncio.Condition = asyncio.Condition()
+
+    @property
+    def size(self) -> int:
+        """Get the number of connections owned by the pool, including the connecting ones."""
+        return self._size
+
+    @property
+    def idle_size(self) -> int:
+        """Get the number of idle connections."""
+        return len(self._idle)
+
+    async def lease(self) -> ToolConnection:
+        """Lease a connection, reusing an idle one when possible.
+
+        Raises:
+            TimeoutError: If no connection becomes available within the lease timeout.
+        """
+        if self._closed:
+            raise RuntimeError(f"The connection pool of {self._tool_group_config.name} is closed.")
+
+        deadline = time.monotonic() + self._lease_timeout
+        while True:
+            pooled_connection = await self._take_idle()
+            if pooled_connection is None and self._size < self._max_size:
+                pooled_connection = await self._open()
+            if pooled_connection is None and not self._exclusive and self._leased:
+                # multiplex the least loaded connection, since the pool is exhausted
+                pooled_connection = min(self._leased.values(), key=lambda c: c.lease_count)
+
+            if pooled_connection is not None:
+                pooled_connection.lease_count += 1
+                self._leased[pooled_connection.connection.get_id()] = pooled_connection
+                return pooled_connection.connection
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"No connection of {self._tool_group_config.name} is available after "
+                    f"{self._lease_timeout} seconds, since all {self._max_size} connections "
+                    "are leased."
+                )
+            async with self._condition:
+                try:
+                    await asyncio.wait_for(self._condition.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, connection: ToolConnection) -> None:
+        """Return a leased connection to the pool."""
+        pooled_connection = self._leased.get(connection.get_id())
+        if pooled_connection is None:
+            return
+
+        pooled_connection.lease_count -= 1
+        if pooled_connection.lease_count > 0:
+            return
+        del self._leased[connection.get_id()]
+
+        if self._closed:
+            await self._discard(pooled_connection)
+            return
+        if self._exclusive:
+            await connection.reset()
+
+        pooled_connection.last_used_at = time.monotonic()
+        self._idle.append(pooled_connection)
+        await self._notify()
+
+    async def evict_idle(self) -> None:
+        """Close the connections which have been idle longer than the idle timeout."""
+        now = time.monotonic()
+        expired = [c for c in self._idle if now - c.last_used_at >= self._idle_timeout]
+        for pooled_connection in expired:
+            self._idle.remove(pooled_connection)
+            await self._discard(pooled_connection)
+
+    async def close(self) -> None:
+        """Close all the connections of the pool, including the leased ones."""
+        self._closed = True
+        pooled_connections: List[PooledConnection] = [*self._idle, *self._leased.values()]
+        self._idle.clear()
+        self._leased.clear()
+        for pooled_connection in pooled_connections:
+            await self._discard(pooled_connection)
+
+    async def _take_idle(self) -> Optional[PooledConnection]:
+        """Take the most recently used idle connection which passes the health check."""
+        while self._idle:
+            pooled_connection = self._idle.pop()
+            now = time.monotonic()
+            if now - pooled_connection.last_checked_at >= self._health_check_interval:
+                pooled_connection.last_checked_at = now
+                if not await pooled_connection.connection.is_healthy():
+                    await self._discard(pooled_connection)
+                    continue
+            return pooled_connection
+        return None
+
+    async def _open(self) -> PooledConnection:
+        """Create a new connection, which is counted in the pool size while connecting."""
+        self._size += 1
+        try:
+            connection = await ToolConnectionFactory.create_connection(
+                tool_group_config=self._tool_group_config
+            )
+        except BaseException:
+            self._size -= 1
+            await self._notify()
+            raise
+        return PooledConnection(connection)
+
+    async def _discard(self, pooled_connection: PooledConnection) -> None:
+        """Close a connection and remove it from the pool size."""
+        self._size -= 1
+        try:
+            await pooled_connection.connection.close()
+        except Exception:
+            pass
+        await self._notify()
+
+    async def _notify(self) -> None:
+        async with self._condition:
+            self._condition.notify_all()
+
+
+class LeasedConnection(ToolConnection):
+    """A lease of a pooled connection, which can be used from any event loop.
+
+    The calls are forwarded to the background event loop owning the pooled connection, and
+    closing the lease returns the connection to the pool, instead of closing it.
+    """
+
+    def __init__(
+        self, connection: ToolConnection, pool: ToolConnectionPool, loop: BackgroundEventLoop
+    ):
+        super().__init__()
+        self._id = connection.get_id()
+        self._connection: ToolConnection = connection
+        self._pool: ToolConnectionPool = pool
+        self._loop: BackgroundEventLoop = loop
+        self._released: bool = False
+
+    async def call(self, tool_name: str, **kwargs) -> Any:
+        """Execute tool call through the pooled connection."""
+        if self._released:
+            raise RuntimeError("The connection lease has been released.")
+        return await self._loop.run_async(self._connection.call(tool_name, **kwargs))
+
+    async def list_tools(self) -> List[Any]:
+        """Get available tool list from the pooled connection."""
+        if self._released:
+            raise RuntimeError("The connection lease has been released.")
+        return await self._loop.run_async(self._connection.list_tools())
+
+    async def close(self) -> None:
+        """Return the pooled connection to the pool."""
+        if self._released:
+            return
+        self._released = True
+        await self._loop.run_async(self._pool.release(self._connection))
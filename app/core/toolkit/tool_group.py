@@ -24,6 +24,10 @@ class ToolGroup(ABC):
         """Get the unique identifier of the tool group."""
         return self._id
 
+    def get_tool_group_config(self) -> ToolGroupConfig:
+        """Get the configuration of the tool group."""
+        return self._tool_group_config
+
     @abstractmethod
     async def create_connection(
         self, tool_call_ctx: Optional[ToolCallContext] = None
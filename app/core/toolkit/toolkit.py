@@ -1,3 +1,4 @@
+import itertools
 from typing import Dict, List, Optional, Tuple, Union
 
 import networkx as nx  # type: ignore
@@ -7,6 +8,9 @@ from app.core.toolkit.action import Action
 from app.core.toolkit.tool import Tool
 from app.core.toolkit.tool_group import ToolGroup
 
+# the versions are unique across the toolkits, so a version identifies the state of one toolkit
+_versions = itertools.count()
+
 
 class Toolkit(Graph):
     """The toolkit is a graph of actions and tools.
@@ -22,6 +26,8 @@ class Toolkit(Graph):
         _tools (Dict[str, Tool]): The tools in the graph.
         _tool_groups (Dict[str, ToolGroup]): The tool groups in the graph.
         _scores (Dict[Tuple[str, str], float]): The scores of the edges in the graph.
+        _version (int): The version of the graph, renewed by every modification, so that the
+            results computed from the graph (e.g. the recommendations) can be cached.
     """
 
     def __init__(self, graph: Optional[nx.DiGraph] = None) -> None:
@@ -30,9 +36,16 @@ class Toolkit(Graph):
         self._tools: Dict[str, Tool] = {}  # vertex_id -> Tool
         self._tool_groups: Dict[str, ToolGroup] = {}  # vertex_id -> ToolGroup
         self._scores: Dict[Tuple[str, str], float] = {}  # (u, v) -> score
+        self._version: int = next(_versions)
+
+    @property
+    def version(self) -> int:
+        """Get the version of the toolkit graph."""
+        return self._version
 
     def add_vertex(self, id, **properties) -> None:
         """Add a vertex to the graph."""
+        self._version = next(_versions)
         self._graph.add_node(id)
 
         if isinstance(properties["data"], Action):
@@ -42,6 +55,16 @@ class Toolkit(Graph):
         if isinstance(properties["data"], ToolGroup):
             self._tool_groups[id] = properties["data"]
 
+    def add_edge(self, u_of_edge: str, v_of_edge: str) -> None:
+        """Add an edge to the graph."""
+        self._version = next(_versions)
+        super().add_edge(u_of_edge, v_of_edge)
+
+    def remove_edge(self, u_of_edge: str, v_of_edge: str) -> None:
+        """Remove an edge from the graph."""
+        self._version = next(_versions)
+        super().remove_edge(u_of_edge, v_of_edge)
+
     def vertices_data(self) -> List[Tuple[str, Dict[str, Union[Action, Tool, ToolGroup]]]]:
         """Get the vertices of the toolkit graph with data.
 
@@ -64,6 +87,7 @@ class Toolkit(Graph):
                 graph.
         """
         assert isinstance(other, Toolkit)
+        self._version = next(_versions)
 
         # update vertices
         for vertex_id, data in other.vertices_data():
@@ -115,6 +139,7 @@ class Toolkit(Graph):
         """Remove a vertex from the job graph, handling cascading deletions correctly."""
         if not self._graph.has_node(id):
             return
+        self._version = next(_versions)
 
         item = self.get_action(id) or self.get_tool(id) or self.get_tool_group(id)
 
@@ -178,4 +203,5 @@ class Toolkit(Graph):
 
     def set_score(self, u: str, v: str, score: float) -> None:
         """Set the score of an edge."""
+        self._version = next(_versions)
         self._scores[(u, v)] = score
@@ -0,0 +1,171 @@
+import os
+import time
+import traceback
+from typing import Any, Dict, Optional, Union
+
+# the types of the span attribute values, which are supported by all the exporters
+AttributeValue = Union[str, bool, int, float]
+
+
+def generate_trace_id() -> str:
+    """Generate a random 128-bit trace ID, in the W3C trace context format."""
+    return os.urandom(16).hex()
+
+
+def generate_span_id() -> str:
+    """Generate a random 64-bit span ID, in the W3C trace context format."""
+    return os.urandom(8).hex()
+
+
+class Span:
+    """A timed operation of the job execution (e.g. an operator execution, or an LLM call).
+
+    The spans of an original job share one trace, and are linked to their parent spans, so that
+    the time of a job can be broken down into the time of its steps.
+
+    Attributes:
+        _name (str): The name of the span, e.g. "operator.execute".
+        _trace_id (str): The ID of the trace, shared by the spans of one job execution.
+        _span_id (str): The ID of the span.
+        _parent_id (Optional[str]): The ID of the parent span, None for the root span.
+        _start_time_ns (int): The start time, in nanoseconds since the epoch.
+        _end_time_ns (Optional[int]): The end time, None if the span has not ended.
+        _attributes (Dict[str, AttributeValue]): The attributes, e.g. the job ID and the tokens.
+        _error (Optional[str]): The error which ended the span, None if the span succeeded.
+        _error_type (Optional[str]): The type name of the error.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Optional[AttributeValue]]] = None,
+    ):
+        self._name: str = name
+        self._trace_id: str = trace_id or generate_trace_id()
+        self._span_id: str = generate_span_id()
+        self._parent_id: Optional[str] = parent_id
+        self._start_time_ns: int = time.time_ns()
+        # the duration is measured by the monotonic clock, which is not affected by clock changes
+        self._start_perf_ns: int = time.perf_counter_ns()
+        self._end_time_ns: Optional[int] = None
+        self._attributes: Dict[str, AttributeValue] = {}
+        self._error: Optional[str] = None
+        self._error_type: Optional[str] = None
+        if attributes:
+            self.set_attributes(attributes)
+
+    @property
+    def recording(self) -> bool:
+        """Check if the span is recorded, so the callers can skip computing its attributes."""
+        return True
+
+    @property
+    def name(self) -> str:
+        """Get the name of the span."""
+        return self._name
+
+    @property
+    def trace_id(self) -> str:
+        """Get the trace ID of the span."""
+        return self._trace_id
+
+    @property
+    def span_id(self) -> str:
+        """Get the ID of the span."""
+        return self._span_id
+
+    @property
+    def parent_id(self) -> Optional[str]:
+        """Get the ID of the parent span."""
+        return self._parent_id
+
+    @property
+    def start_time_ns(self) -> int:
+        """Get the start time of the span, in nanoseconds since the epoch."""
+        return self._start_time_ns
+
+    @property
+    def end_time_ns(self) -> Optional[int]:
+        """Get the end time of the span, in nanoseconds since the epoch."""
+        return self._end_time_ns
+
+    @property
+    def duration(self) -> float:
+        """Get the duration of the span in seconds, or the elapsed time if it has not ended."""
+        end_time_ns = self._end_time_ns or self._start_time_ns + (
+            time.perf_counter_ns() - self._start_perf_ns
+        )
+        return (end_time_ns - self._start_time_ns) / 1e9
+
+    @property
+    def attributes(self) -> Dict[str, AttributeValue]:
+        """Get the attributes of the span."""
+        return self._attributes
+
+    @property
+    def error(self) -> Optional[str]:
+        """Get the error which ended the span."""
+        return self._error
+
+    def set_attribute(self, key: str, value: Optional[AttributeValue]) -> None:
+        """Set an attribute of the span. The None values are skipped."""
+        if value is not None:
+            self._attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Optional[AttributeValue]]) -> None:
+        """Set the attributes of the span. The None values are skipped."""
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_error(self, error: BaseException) -> None:
+        """Record the error which ends the span."""
+        self._error_type = type(error).__name__
+        self._error = "".join(traceback.format_exception_only(type(error), error)).strip()
+
+    def end(self) -> None:
+        """End the span. Ending twice is a no-op."""
+        if self._end_time_ns is None:
+            self._end_time_ns = self._start_time_ns + (time.perf_counter_ns() - self._start_perf_ns)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the span to a JSON-serializable dict."""
+        return {
+            "name": self._name,
+            "trace_id": self._trace_id,
+            "span_id": self._span_id,
+            "parent_id": self._parent_id,
+            "start_time_ns": self._start_time_ns,
+            "end_time_ns": self._end_time_ns,
+            "duration": self.duration,
+            "attributes": self._attributes,
+            "error": self._error,
+            "error_type": self._error_type,
+        }
+
+
+class NoopSpan(Span):
+    """The span returned when the tracing is disabled, which records nothing."""
+
+    def __init__(self):
+        super().__init__(name="noop", trace_id="0" * 32, parent_id=None)
+
+    @property
+    def recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Optional[AttributeValue]) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Optional[AttributeValue]]) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = NoopSpan()
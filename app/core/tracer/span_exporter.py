@@ -0,0 +1,137 @@
+from abc import ABC, abstractmethod
+from collections import deque
+import json
+from pathlib import Path
+import threading
+from typing import Any, Deque, List, Optional
+
+from app.core.tracer.span import Span
+
+
+class SpanExporter(ABC):
+    """Exporter of the ended spans.
+
+    The spans are exported from the threads running the jobs, so the exporters must be
+    thread-safe, and should not block the caller for long.
+    """
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Export an ended span."""
+
+    @abstractmethod
+    def shutdown(self) -> None:
+        """Flush the pending spans, and release the resources of the exporter."""
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keep the most recent spans in a ring buffer, e.g. to inspect them in the tests."""
+
+    def __init__(self, buffer_size: int = 4096):
+        self._spans: Deque[Span] = deque(maxlen=max(1, buffer_size))
+        self._lock: threading.Lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def get_spans(self, trace_id: Optional[str] = None, name: Optional[str] = None) -> List[Span]:
+        """Get the buffered spans in the order they ended, filtered by trace ID and name."""
+        with self._lock:
+            spans = list(self._spans)
+        return [
+            span
+            for span in spans
+            if (trace_id is None or span.trace_id == trace_id)
+            and (name is None or span.name == name)
+        ]
+
+    def clear(self) -> None:
+        """Drop the buffered spans."""
+        with self._lock:
+            self._spans.clear()
+
+    def shutdown(self) -> None:
+        # keep the buffered spans, which can still be inspected
+        pass
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Append the spans to a JSON Lines file, one span per line."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock: threading.Lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+                self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class OtlpSpanExporter(SpanExporter):
+    """Send the spans to an OpenTelemetry collector by OTLP/gRPC, in batches.
+
+    It requires the `opentelemetry-sdk` and `opentelemetry-exporter-otlp-proto-grpc` packages.
+    The trace and span IDs are kept, so the spans are linked in the same way as in the other
+    exporters.
+    """
+
+    def __init__(self, endpoint: str, service_name: str = "chat2graph"):
+        try:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+                OTLPSpanExporter,
+            )
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError as e:
+            raise ImportError(
+                "The OTLP span exporter requires the OpenTelemetry SDK, please install it by "
+                "`pip install opentelemetry-sdk opentelemetry-exporter-otlp-proto-grpc`."
+            ) from e
+
+        self._resource: Any = Resource.create({"service.name": service_name})
+        self._processor: Any = BatchSpanProcessor(
+            OTLPSpanExporter(endpoint=endpoint, insecure=endpoint.startswith("http://"))
+        )
+
+    def export(self, span: Span) -> None:
+        self._processor.on_end(self._to_otel_span(span))
+
+    def shutdown(self) -> None:
+        self._processor.shutdown()
+
+    def _to_otel_span(self, span: Span) -> Any:
+        """Convert the span to a readable span of the OpenTelemetry SDK."""
+        from opentelemetry.sdk.trace import ReadableSpan
+        from opentelemetry.trace import SpanContext, StatusCode, TraceFlags
+        from opentelemetry.trace.status import Status
+
+        trace_id = int(span.trace_id, 16)
+        parent = (
+            SpanContext(trace_id=trace_id, span_id=int(span.parent_id, 16), is_remote=False)
+            if span.parent_id
+            else None
+        )
+        return ReadableSpan(
+            name=span.name,
+            context=SpanContext(
+                trace_id=trace_id,
+                span_id=int(span.span_id, 16),
+                is_remote=False,
+                trace_flags=TraceFlags(TraceFlags.SAMPLED),
+            ),
+            parent=parent,
+            resource=self._resource,
+            attributes=span.attributes,
+            status=Status(StatusCode.ERROR, span.error) if span.error else Status(StatusCode.OK),
+            start_time=span.start_time_ns,
+            end_time=span.end_time_ns,
+        )
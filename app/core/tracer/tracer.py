@@ -0,0 +1,157 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import threading
+from typing import Any, Callable, ContextManager, Generator, List, Optional, TypeVar
+
+from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import SpanExporterType
+from app.core.tracer.span import NOOP_SPAN, AttributeValue, Span
+from app.core.tracer.span_exporter import (
+    InMemorySpanExporter,
+    JsonlSpanExporter,
+    OtlpSpanExporter,
+    SpanExporter,
+)
+
+T = TypeVar("T")
+
+# the span of the current thread / asyncio task, which is the parent of the new spans
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class SpanExporterFactory:
+    """Span exporter factory."""
+
+    @classmethod
+    def create(cls, exporter_type: SpanExporterType) -> SpanExporter:
+        """Create a span exporter, configured by the system environment."""
+        if exporter_type == SpanExporterType.MEMORY:
+            return InMemorySpanExporter(buffer_size=SystemEnv.TRACING_BUFFER_SIZE)
+        if exporter_type == SpanExporterType.JSONL:
+            return JsonlSpanExporter(path=SystemEnv.TRACING_JSONL_PATH)
+        if exporter_type == SpanExporterType.OTLP:
+            return OtlpSpanExporter(endpoint=SystemEnv.TRACING_OTLP_ENDPOINT)
+        raise ValueError(f"Cannot create span exporter of type {exporter_type}")
+
+
+class Tracer(metaclass=Singleton):
+    """Tracer of the job executions.
+
+    The spans are opened by `span` around the hot paths (the leader decomposition, the expert,
+    workflow, operator and reasoner executions, the LLM calls, the tool calls, the DB writes and
+    the knowledge retrievals), and handed to the exporters once they end. The current span is
+    kept in a context variable, so the spans opened in it (in the same thread, or in the asyncio
+    tasks created by it) become its children.
+
+    The tracing is disabled unless `SystemEnv.ENABLE_TRACING` is set, and a disabled tracer
+    returns a shared no-op span, so the instrumentation costs almost nothing.
+    """
+
+    def __init__(
+        self, enabled: Optional[bool] = None, exporters: Optional[List[SpanExporter]] = None
+    ):
+        self._enabled: bool = SystemEnv.ENABLE_TRACING if enabled is None else enabled
+        self._lock: threading.Lock = threading.Lock()
+        if exporters is None and self._enabled:
+            exporters = [
+                SpanExporterFactory.create(SpanExporterType(name.strip().upper()))
+                for name in (SystemEnv.TRACING_EXPORTERS or "").split(",")
+                if name.strip()
+            ]
+        self._exporters: List[SpanExporter] = exporters or []
+
+    @property
+    def enabled(self) -> bool:
+        """Check if the tracing is enabled."""
+        return self._enabled
+
+    def enable(self, exporters: Optional[List[SpanExporter]] = None) -> None:
+        """Enable the tracing, and add the exporters."""
+        with self._lock:
+            self._exporters = self._exporters + (exporters or [])
+            self._enabled = True
+
+    def disable(self) -> None:
+        """Disable the tracing, and shut down the exporters."""
+        with self._lock:
+            exporters, self._exporters = self._exporters, []
+            self._enabled = False
+        for exporter in exporters:
+            exporter.shutdown()
+
+    def get_exporters(self) -> List[SpanExporter]:
+        """Get the span exporters."""
+        return list(self._exporters)
+
+    def current_span(self) -> Optional[Span]:
+        """Get the current span, None if there is no span open in the current context."""
+        return _current_span.get()
+
+    @contextmanager
+    def span(
+        self, name: str, **attributes: Optional[AttributeValue]
+    ) -> Generator[Span, None, None]:
+        """Open a span in the block, as a child of the current span.
+
+        The error raised in the block is recorded in the span, and re-raised.
+
+        Args:
+            name (str): The name of the span, e.g. "operator.execute".
+            **attributes (Optional[AttributeValue]): The attributes of the span, e.g. the job ID.
+                The None values are skipped.
+        """
+        if not self._enabled:
+            yield NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else None,
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            self._export(span)
+
+    def propagate(self, func: Callable[..., T]) -> Callable[..., T]:
+        """Bind the function to the current span, so the spans opened by the function are its
+        children, even if the function is called in another thread (e.g. by a thread pool)."""
+        parent = _current_span.get()
+        if not self._enabled or parent is None:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            token = _current_span.set(parent)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _current_span.reset(token)
+
+        return wrapper
+
+    def _export(self, span: Span) -> None:
+        for exporter in self._exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                print(f"\033[38;5;208m[Warning]: Failed to export span {span.name}: {e}\033[0m")
+
+
+def trace_span(name: str, **attributes: Optional[AttributeValue]) -> ContextManager[Span]:
+    """Open a span in the block by the tracer, as a child of the current span.
+
+    It is a shortcut of `Tracer().span(name, **attributes)`.
+    """
+    return Tracer().span(name, **attributes)
@@ -1,6 +1,7 @@
 import json
 from typing import List, Optional
 
+from app.core.common.cancellation import CancellationToken
 from app.core.common.type import WorkflowStatus
 from app.core.common.util import parse_jsons
 from app.core.model.job import Job
@@ -8,6 +9,7 @@ from app.core.model.message import WorkflowMessage
 from app.core.model.task import Task
 from app.core.reasoner.reasoner import Reasoner
 from app.core.service.toolkit_service import ToolkitService
+from app.core.tracer.tracer import trace_span
 from app.core.workflow.operator import Operator
 
 
@@ -21,6 +23,7 @@ class EvalOperator(Operator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         """Execute the operator by LLM client.
 
@@ -33,6 +36,8 @@ class EvalOperator(Operator):
             previous_expert_outputs (Optional[List[WorkflowMessage]]): The outputs of previous
                 experts in workflow message type.
             lesson (Optional[str]): The lesson learned (provided by the successor expert).
+            cancellation_token (Optional[CancellationToken]): The cancellation token of the job
+                graph.
         """
         assert workflow_messages is not None and len(workflow_messages) == 1, (
             "There should be only one tail operator in the workflow, "
@@ -42,35 +47,37 @@ class EvalOperator(Operator):
         # is the output of the evaluated operator
         previous_op_message = workflow_messages[0].scratchpad
 
-        task = await self._build_task(
-            job=job,
-            workflow_messages=workflow_messages,
-            previous_expert_outputs=previous_expert_outputs,
-            lesson=lesson,
-        )
-
-        result = await reasoner.infer(task=task)
-
-        try:
-            parse_result = parse_jsons(text=result)[0]
-            if isinstance(parse_result, json.JSONDecodeError):
-                raise parse_result
-            result_dict = parse_result
-        except (ValueError, json.JSONDecodeError) as e:
-            # not validated json format
-            # color: red
-            print(f"\033[38;5;196m[JSON]: {str(e)}\033[0m")
-            task.lesson = lesson or "" + (
-                "LLM output format (json format) specification is crucial for "
-                "reliable parsing. And do not forget ```json prefix and ``` suffix when "
-                "you generate the json block in <deliverable>...</deliverable>. Error info: "
-                + str(e)
+        with trace_span("operator.execute", job_id=job.id, operator_id=self.get_id()):
+            task = await self._build_task(
+                job=job,
+                workflow_messages=workflow_messages,
+                previous_expert_outputs=previous_expert_outputs,
+                lesson=lesson,
+                cancellation_token=cancellation_token,
             )
+
             result = await reasoner.infer(task=task)
-            parse_result = parse_jsons(text=result)[0]
-            if isinstance(parse_result, json.JSONDecodeError):
-                raise parse_result from e
-            result_dict = parse_result
+
+            try:
+                parse_result = parse_jsons(text=result)[0]
+                if isinstance(parse_result, json.JSONDecodeError):
+                    raise parse_result
+                result_dict = parse_result
+            except (ValueError, json.JSONDecodeError) as e:
+                # not validated json format
+                # color: red
+                print(f"\033[38;5;196m[JSON]: {str(e)}\033[0m")
+                task.lesson = lesson or "" + (
+                    "LLM output format (json format) specification is crucial for "
+                    "reliable parsing. And do not forget ```json prefix and ``` suffix when "
+                    "you generate the json block in <deliverable>...</deliverable>. Error info: "
+                    + str(e)
+                )
+                result = await reasoner.infer(task=task)
+                parse_result = parse_jsons(text=result)[0]
+                if isinstance(parse_result, json.JSONDecodeError):
+                    raise parse_result from e
+                result_dict = parse_result
 
         return WorkflowMessage(
             payload={
@@ -88,6 +95,7 @@ class EvalOperator(Operator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> Task:
         toolkit_service: ToolkitService = ToolkitService.instance
 
@@ -141,5 +149,6 @@ class EvalOperator(Operator):
             knowledge=self.get_knowledge(job),
             insights=None,  # TODO: get insights from memory for the evaluation
             lesson=lesson,
+            cancellation_token=cancellation_token or CancellationToken(),
         )
         return task
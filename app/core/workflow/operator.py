@@ -1,5 +1,6 @@
 from typing import List, Optional, cast
 
+from app.core.common.cancellation import CancellationToken
 from app.core.common.system_env import SystemEnv
 from app.core.env.insight.insight import Insight
 from app.core.model.file_descriptor import FileDescriptor
@@ -14,6 +15,7 @@ from app.core.service.memory_service import MemoryService
 from app.core.service.message_service import MessageService
 from app.core.service.tool_connection_service import ToolConnectionService
 from app.core.service.toolkit_service import ToolkitService
+from app.core.tracer.tracer import trace_span
 from app.core.workflow.operator_config import OperatorConfig
 from app.plugin.memfuse.operator_memory import MemFuseOperatorMemory
 
@@ -36,6 +38,7 @@ class Operator:
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         """Execute the operator by LLM client.
 
@@ -46,23 +49,30 @@ class Operator:
             previous_expert_outputs (Optional[List[WorkflowMessage]]): The outputs of previous
                 experts in workflow message type.
             lesson (Optional[str]): The lesson learned (provided by the successor expert).
+            cancellation_token (Optional[CancellationToken]): The cancellation token of the job
+                graph.
         """
-        task = await self._build_task(
-            job=job,
-            workflow_messages=workflow_messages,
-            previous_expert_outputs=previous_expert_outputs,
-            lesson=lesson,
-        )
-
-        # infer by the reasoner using enriched task
-        result = await reasoner.infer(task=task)
+        with trace_span("operator.execute", job_id=job.id, operator_id=self.get_id()):
+            task = await self._build_task(
+                job=job,
+                workflow_messages=workflow_messages,
+                previous_expert_outputs=previous_expert_outputs,
+                lesson=lesson,
+                cancellation_token=cancellation_token,
+            )
 
-        # post-execution hook to persist operator experience (best-effort)
-        await self.memorize(task=task, result=result)
+            try:
+                # infer by the reasoner using enriched task
+                result = await reasoner.infer(task=task)
+            finally:
+                # return the MCP connections of the operator to the connection pools
+                tool_connection_service: ToolConnectionService = ToolConnectionService.instance
+                await tool_connection_service.release_connection(
+                    call_tool_ctx=task.get_tool_call_ctx()
+                )
 
-        # destroy MCP connections for the operator
-        tool_connection_service: ToolConnectionService = ToolConnectionService.instance
-        await tool_connection_service.release_connection(call_tool_ctx=task.get_tool_call_ctx())
+            # post-execution hook to persist operator experience (best-effort)
+            await self.memorize(task=task, result=result)
 
         return WorkflowMessage(payload={"scratchpad": result}, job_id=job.id)
 
@@ -72,6 +82,7 @@ class Operator:
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> Task:
         toolkit_service: ToolkitService = ToolkitService.instance
         file_service: FileService = FileService.instance
@@ -127,6 +138,7 @@ class Operator:
             insights=insights,
             lesson=lesson,
             file_descriptors=file_descriptors,
+            cancellation_token=cancellation_token or CancellationToken(),
         )
         return task
 
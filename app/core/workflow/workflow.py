@@ -4,11 +4,13 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import networkx as nx  # type: ignore
 
-from app.core.common.async_func import run_async_function
+from app.core.common.async_func import EventLoopRunner
+from app.core.common.cancellation import CancellationToken
 from app.core.common.type import WorkflowStatus
 from app.core.model.job import Job
 from app.core.model.message import WorkflowMessage
 from app.core.reasoner.reasoner import Reasoner
+from app.core.tracer.tracer import trace_span
 from app.core.workflow.eval_operator import EvalOperator
 from app.core.workflow.operator import Operator
 
@@ -39,6 +41,7 @@ class Workflow(ABC):
         reasoner: Reasoner,
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         """Execute the workflow.
 
@@ -48,9 +51,14 @@ class Workflow(ABC):
             workflow_messages (Optional[List[WorkflowMessage]]): The workflow messages
                 generated by the previous agents.
             lesson (Optional[str]): The lesson learned from the job execution.
+            cancellation_token (Optional[CancellationToken]): The cancellation token of the job
+                graph, which stops the operators once the job graph is stopped or failed.
 
         Returns:
             WorkflowMessage: The output of the workflow.
+
+        Raises:
+            JobCancelledError: If the job graph is cancelled during the execution.
         """
 
         def build_workflow():
@@ -59,11 +67,14 @@ class Workflow(ABC):
                     self.__workflow = self._build_workflow(reasoner)
                 return self.__workflow
 
+        cancellation_token = cancellation_token or CancellationToken()
+        cancellation_token.raise_if_cancelled()
         try:
-            built_workflow = build_workflow()
-            workflow_message = self._execute_workflow(
-                built_workflow, job, workflow_messages, lesson
-            )
+            with trace_span("workflow.execute", job_id=job.id):
+                built_workflow = build_workflow()
+                workflow_message = self._execute_workflow(
+                    built_workflow, job, workflow_messages, lesson, cancellation_token
+                )
         except Exception as e:
             raise e from None
         if not self._evaluator:
@@ -140,6 +151,7 @@ class Workflow(ABC):
         job: Job,
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         """Execute the workflow."""
 
@@ -175,13 +187,17 @@ class BuiltinWorkflow(Workflow):
         job: Job,
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         """Execute the workflow."""
         if workflow_messages is None:
             workflow_messages = []
+        if cancellation_token is None:
+            cancellation_token = CancellationToken()
 
         # use a dictionary to store the output of each operator
         operator_outputs: Dict[str, WorkflowMessage] = {}
+        event_loop_runner = EventLoopRunner()
 
         # execute operators in topological order.
         for op_id in nx.topological_sort(workflow):
@@ -195,13 +211,16 @@ class BuiltinWorkflow(Workflow):
                 if pred_id in operator_outputs
             ]
 
-            output_message = run_async_function(
-                operator.execute,
-                reasoner=self._reasoner,
-                job=job,
-                workflow_messages=previous_operator_outputs,
-                previous_expert_outputs=workflow_messages,
-                lesson=lesson,
+            cancellation_token.raise_if_cancelled()
+            output_message = event_loop_runner.run(
+                operator.execute(
+                    reasoner=self._reasoner,
+                    job=job,
+                    workflow_messages=previous_operator_outputs,
+                    previous_expert_outputs=workflow_messages,
+                    lesson=lesson,
+                    cancellation_token=cancellation_token,
+                )
             )
 
             # store the output
@@ -216,13 +235,16 @@ class BuiltinWorkflow(Workflow):
         final_message = operator_outputs[final_op_id]
 
         if self._evaluator:
-            final_message = run_async_function(
-                self._evaluator.execute,
-                reasoner=self._reasoner,
-                job=job,
-                workflow_messages=[final_message],
-                previous_expert_outputs=workflow_messages,
-                lesson=lesson,
+            cancellation_token.raise_if_cancelled()
+            final_message = event_loop_runner.run(
+                self._evaluator.execute(
+                    reasoner=self._reasoner,
+                    job=job,
+                    workflow_messages=[final_message],
+                    previous_expert_outputs=workflow_messages,
+                    lesson=lesson,
+                    cancellation_token=cancellation_token,
+                )
             )
 
         return final_message
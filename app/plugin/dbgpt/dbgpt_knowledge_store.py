@@ -16,7 +16,7 @@ from dbgpt_ext.storage.vector_store.chroma_store import (  # type: ignore
     ChromaVectorConfig,
 )
 
-from app.core.common.async_func import run_async_function
+from app.core.common.async_func import EventLoopRunner
 from app.core.common.system_env import SystemEnv
 from app.core.knowledge.knowledge_config import KnowledgeConfig
 from app.core.knowledge.knowledge_store import KnowledgeStore
@@ -56,7 +56,7 @@ class VectorKnowledgeStore(KnowledgeStore):
         assembler = EmbeddingAssembler.load_from_knowledge(
             knowledge=knowledge, chunk_parameters=chunk_parameters, index_store=self._vector_store
         )
-        chunk_ids = run_async_function(assembler.apersist)
+        chunk_ids = EventLoopRunner().run(assembler.apersist())
         return ",".join(chunk_ids)
 
     def delete_document(self, chunk_ids: str) -> None:
@@ -64,11 +64,11 @@ class VectorKnowledgeStore(KnowledgeStore):
 
     def update_document(self, file_path: str, chunk_ids: str) -> str:
         self.delete_document(chunk_ids)
-        return run_async_function(self.load_document, file_path=file_path)
+        return self.load_document(file_path=file_path, config=None)
 
     def retrieve(self, query: str) -> List[KnowledgeChunk]:
-        chunks = run_async_function(
-            self._retriever.aretrieve_with_scores, query=query, score_threshold=0.3
+        chunks = EventLoopRunner().run(
+            self._retriever.aretrieve_with_scores(query=query, score_threshold=0.3)
         )
         knowledge_chunks = [
             KnowledgeChunk(chunk_name=chunk.chunk_name, content=chunk.content) for chunk in chunks
@@ -121,7 +121,7 @@ class GraphKnowledgeStore(KnowledgeStore):
             index_store=self._graph_store,
             retrieve_strategy=RetrieverStrategy.GRAPH,
         )
-        chunk_ids = run_async_function(assembler.apersist)
+        chunk_ids = EventLoopRunner().run(assembler.apersist())
         return ",".join(chunk_ids)
 
     def delete_document(self, chunk_ids: str) -> None:
@@ -129,11 +129,11 @@ class GraphKnowledgeStore(KnowledgeStore):
 
     def update_document(self, file_path: str, chunk_ids: str) -> str:
         self.delete_document(chunk_ids)
-        return run_async_function(self.load_document, file_path=file_path)
+        return self.load_document(file_path=file_path, config=None)
 
     def retrieve(self, query: str) -> List[KnowledgeChunk]:
-        chunks = run_async_function(
-            self._graph_store.asimilar_search_with_scores, text=query, topk=3, score_threshold=0.3
+        chunks = EventLoopRunner().run(
+            self._graph_store.asimilar_search_with_scores(text=query, topk=3, score_threshold=0.3)
         )
         knowledge_chunks = [
             KnowledgeChunk(chunk_name=chunk.chunk_name, content=chunk.content) for chunk in chunks
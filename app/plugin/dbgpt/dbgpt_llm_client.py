@@ -1,3 +1,4 @@
+import time
 from typing import List, Optional
 
 from dbgpt.core import (  # type: ignore
@@ -14,11 +15,13 @@ from dbgpt.model.proxy.llms.chatgpt import OpenAILLMClient  # type: ignore
 
 from app.core.common.system_env import SystemEnv
 from app.core.common.type import MessageSourceType
+from app.core.model.job_result import ModelUsage
 from app.core.model.message import ModelMessage
 from app.core.model.task import ToolCallContext
 from app.core.prompt.model_service import FUNC_CALLING_PROMPT
 from app.core.reasoner.model_service import ModelService
 from app.core.toolkit.tool import FunctionCallResult, Tool
+from app.core.tracer.tracer import trace_span
 
 
 class DbgptLlmClient(ModelService):
@@ -58,7 +61,28 @@ class DbgptLlmClient(ModelService):
         )
 
         # generate response using the llm client
-        model_response: ModelOutput = await self._llm_client.generate(model_request)
+        with trace_span(
+            "llm.generate",
+            model=model_request.model,
+            job_id=tool_call_ctx.job_id if tool_call_ctx else None,
+            operator_id=tool_call_ctx.operator_id if tool_call_ctx else None,
+        ) as span:
+            start_time = time.perf_counter()
+            model_response: ModelOutput = await self._llm_client.generate(model_request)
+            reported_usage = model_response.usage or {}
+            usage = ModelUsage(
+                prompt_tokens=int(reported_usage.get("prompt_tokens", 0) or 0),
+                completion_tokens=int(reported_usage.get("completion_tokens", 0) or 0),
+                duration=time.perf_counter() - start_time,
+            )
+            if span.recording:
+                span.set_attributes(
+                    self._get_span_attributes(
+                        usage=usage,
+                        prompt_texts=[str(message.content) for message in model_request.messages],
+                        response_text=model_response.text,
+                    )
+                )
 
         # call functions based on the model output
         func_call_results: Optional[List[FunctionCallResult]] = None
@@ -73,6 +97,7 @@ class DbgptLlmClient(ModelService):
             messages=messages,
             func_call_results=func_call_results,
         )
+        response.set_usage(usage)
 
         return response
 
@@ -95,22 +120,9 @@ class DbgptLlmClient(ModelService):
 
         for i, message in enumerate(messages):
             # handle the func call information in the agent message
-            base_message_content = message.get_payload()
-            func_call_results = message.get_function_calls()
-            if func_call_results and i >= len(messages) - 2:
-                base_message_content += (
-                    "<function_call_result>\n"
-                    + "\n".join(
-                        [
-                            f"{j + 1}. {result.status.value} called function "
-                            f"{result.func_name}:\n"
-                            f"Call objective: {result.call_objective}\n"
-                            f"Function Output: {result.output}"
-                            for j, result in enumerate(func_call_results)
-                        ]
-                    )
-                    + "\n</function_call_result>"
-                )
+            base_message_content = self._render_message(
+                message, with_function_calls=i >= len(messages) - 2
+            )
 
             # make sure the last message is a human message
             if (len(base_messages) + i) % 2 == 1:
@@ -2,17 +2,20 @@ from typing import List, Optional, Tuple
 
 from dbgpt.core.awel import MapOperator  # type: ignore
 
+from app.core.common.cancellation import CancellationToken
 from app.core.model.job import Job
 from app.core.model.message import WorkflowMessage
 from app.core.reasoner.reasoner import Reasoner
 from app.core.workflow.operator import Operator
 
+# the job, the outputs of previous experts, the outputs of previous operators, the lesson and
+# the cancellation token of the job graph
+MapInput = Tuple[
+    Job, List[WorkflowMessage], List[WorkflowMessage], Optional[str], Optional[CancellationToken]
+]
 
-class DbgptMapOperator(
-    MapOperator[
-        Tuple[Job, List[WorkflowMessage], List[WorkflowMessage], Optional[str]], WorkflowMessage
-    ]
-):
+
+class DbgptMapOperator(MapOperator[MapInput, WorkflowMessage]):
     """DB-GPT map operator"""
 
     def __init__(self, operator: Operator, reasoner: Reasoner, **kwargs):
@@ -20,25 +23,28 @@ class DbgptMapOperator(
         self._operator: Operator = operator
         self._reasoner: Reasoner = reasoner
 
-    async def map(
-        self, input_value: Tuple[Job, List[WorkflowMessage], List[WorkflowMessage], Optional[str]]
-    ) -> WorkflowMessage:
+    async def map(self, input_value: MapInput) -> WorkflowMessage:
         """Execute the operator.
 
         Args:
-            input_value (Tuple[Job, List[WorkflowMessage], List[WorkflowMessage], Optional[str]]):
-                The input value, which is a tuple of the job assigned to the expert,
-                the outputs of previous experts, the outputs of previous operators,
-                and the lesson learned (provided by the successor expert).
+            input_value (MapInput): The input value, which is a tuple of the job assigned to the
+                expert, the outputs of previous experts, the outputs of previous operators,
+                the lesson learned (provided by the successor expert), and the cancellation token
+                of the job graph.
 
         Returns:
             WorkflowMessage: The output message of the operator.
         """
-        job, previous_expert_outputs, previous_operator_outputs, lesson = input_value
+        job, previous_expert_outputs, previous_operator_outputs, lesson, cancellation_token = (
+            input_value
+        )
+        if cancellation_token:
+            cancellation_token.raise_if_cancelled()
         return await self._operator.execute(
             reasoner=self._reasoner,
             job=job,
             workflow_messages=previous_operator_outputs,
             previous_expert_outputs=previous_expert_outputs,
             lesson=lesson,
+            cancellation_token=cancellation_token,
         )
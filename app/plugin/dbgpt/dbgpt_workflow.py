@@ -8,7 +8,8 @@ from dbgpt.core.awel import (  # type: ignore
 )
 import networkx as nx  # type: ignore
 
-from app.core.common.async_func import run_async_function
+from app.core.common.async_func import EventLoopRunner
+from app.core.common.cancellation import CancellationToken
 from app.core.model.job import Job
 from app.core.model.message import WorkflowMessage
 from app.core.reasoner.reasoner import Reasoner
@@ -30,21 +31,31 @@ class DbgptWorkflow(Workflow):
 
         def _merge_workflow_messages(
             *args,
-        ) -> Tuple[Job, List[WorkflowMessage], List[WorkflowMessage], Optional[str]]:
+        ) -> Tuple[
+            Job,
+            List[WorkflowMessage],
+            List[WorkflowMessage],
+            Optional[str],
+            Optional[CancellationToken],
+        ]:
             """Combine the outputs from the previous MapOPs and the InputOP."""
             job: Optional[Job] = None
             previous_expert_outputs: List[WorkflowMessage] = []
             previous_operator_outputs: List[WorkflowMessage] = []
             lesson: Optional[str] = None
+            cancellation_token: Optional[CancellationToken] = None
 
             for arg in args:
                 if isinstance(arg, tuple):
-                    # the Tuple[Job, List[WorkflowMessage], Optional[str]] comes from
-                    # the job assigned to expert, outputs of previous experts,
-                    # and lesson learned (provided by the successor expert)
+                    # the Tuple[Job, List[WorkflowMessage], Optional[str], CancellationToken]
+                    # comes from the job assigned to expert, outputs of previous experts,
+                    # lesson learned (provided by the successor expert), and the cancellation
+                    # token of the job graph
                     for item in arg:
                         if isinstance(item, Job):
                             job = item
+                        elif isinstance(item, CancellationToken):
+                            cancellation_token = item
                         elif isinstance(item, list):
                             if all(isinstance(i, WorkflowMessage) for i in item):
                                 previous_expert_outputs.extend(item)
@@ -66,7 +77,13 @@ class DbgptWorkflow(Workflow):
             if not job:
                 raise ValueError("No job provided in the workflow.")
 
-            return job, previous_expert_outputs, previous_operator_outputs, lesson
+            return (
+                job,
+                previous_expert_outputs,
+                previous_operator_outputs,
+                lesson,
+                cancellation_token,
+            )
 
         with DAG("dbgpt_workflow"):
             input_op = InputOperator(input_source=SimpleCallDataInputSource())
@@ -125,6 +142,9 @@ class DbgptWorkflow(Workflow):
         job: Job,
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         """Execute the workflow."""
-        return run_async_function(workflow.call, call_data=(job, workflow_messages, [], lesson))
+        return EventLoopRunner().run(
+            workflow.call(call_data=(job, workflow_messages, [], lesson, cancellation_token))
+        )
@@ -1,13 +1,23 @@
+import asyncio
 import re
-from typing import Any, Dict, List, Optional, Union, cast
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, cast
 
+from app.core.common.async_func import BackgroundEventLoop
 from app.core.common.system_env import SystemEnv
 from app.core.common.type import MessageSourceType
+from app.core.model.job_result import ModelUsage
 from app.core.model.message import ModelMessage
 from app.core.model.task import ToolCallContext
 from app.core.prompt.model_service import FUNC_CALLING_PROMPT
-from app.core.reasoner.model_service import ModelService
+from app.core.reasoner.model_service import FunctionCallScheduler, ModelService
 from app.core.toolkit.tool import FunctionCallResult, Tool
+from app.core.tracer.tracer import trace_span
+from app.plugin.lite_llm.request_limiter import RequestLimiter
+
+# a closed function calling block, matched in the same way as ModelService._parse_function_calls
+_FUNC_CALL_BLOCK_PATTERN = r"^\s*<function_call>\s*.*?</function_call>"
+_FUNC_CALL_END_MARKER = "</function_call>"
 
 
 class LiteLlmClient(ModelService):
@@ -15,19 +25,30 @@ class LiteLlmClient(ModelService):
     Uses LiteLLM to interact with various LLM providers.
     API keys for providers (OpenAI, Anthropic, etc.) should be set as environment variables
     (e.g., OPENAI_API_KEY, ANTHROPIC_API_KEY). LiteLLM will pick them up.
+
+    The requests of all the clients are sent from one shared event loop, so that the HTTP
+    clients cached by LiteLLM (which are bound to an event loop) are reused across the
+    operators, and the requests to each provider are limited by one request limiter.
     """
 
+    _event_loop: BackgroundEventLoop = BackgroundEventLoop(name="lite-llm-loop")
+    _request_limiter: RequestLimiter = RequestLimiter()
+
     def __init__(self):
         super().__init__()
         # e.g., "openai/gpt-4o", "anthropic/claude-3-sonnet-20240229"
         # SystemEnv.LLM_ENDPOINT can be used as api_base for custom OpenAI-compatible endpoints
         self._model_alias: str = SystemEnv.LLM_NAME
+        # e.g., "openai" for "openai/gpt-4o", used to limit the requests per provider
+        self._provider: str = (self._model_alias or "").split("/", 1)[0]
         self._api_base: str = SystemEnv.LLM_ENDPOINT
         self._api_key: str = SystemEnv.LLM_APIKEY
         self._temperature: float = SystemEnv.TEMPERATURE
 
         self._max_tokens: int = SystemEnv.MAX_TOKENS
         self._max_completion_tokens: int = SystemEnv.MAX_COMPLETION_TOKENS
+        # whether to mark the prompt cache breakpoints, checked on the first request
+        self._prompt_caching: Optional[bool] = None
 
     async def generate(
         self,
@@ -42,45 +63,70 @@ class LiteLlmClient(ModelService):
             sys_prompt=sys_prompt, messages=messages, tools=tools
         )
 
-        from litellm import completion
-        from litellm.litellm_core_utils.streaming_handler import CustomStreamWrapper
-        from litellm.types.utils import ModelResponse, StreamingChoices
-
-        model_response: Union[ModelResponse, CustomStreamWrapper] = completion(
+        streaming: bool = SystemEnv.ENABLE_LLM_STREAMING
+        func_call_results: Optional[List[FunctionCallResult]] = None
+        with trace_span(
+            "llm.generate",
             model=self._model_alias,
-            api_base=self._api_base,
-            api_key=self._api_key,
-            messages=litellm_messages,
-            temperature=self._temperature,
-            max_tokens=self._max_tokens,
-            max_completion_tokens=self._max_completion_tokens,
-            stream=False,
-        )
-        if isinstance(model_response, CustomStreamWrapper) or isinstance(
-            model_response.choices[0], StreamingChoices
-        ):
-            raise ValueError(
-                "Streaming responses are not supported in LiteLlmClient. "
-                "Please PR to add a streaming feature."
-            )
+            job_id=tool_call_ctx.job_id if tool_call_ctx else None,
+            operator_id=tool_call_ctx.operator_id if tool_call_ctx else None,
+            streaming=streaming,
+        ) as span:
+            if streaming:
+                # the functions are called while streaming, so they are traced in this span
+                model_response_text, func_call_results, usage = await self._generate_streaming(
+                    litellm_messages=litellm_messages, tools=tools, tool_call_ctx=tool_call_ctx
+                )
+            else:
+                from litellm.litellm_core_utils.streaming_handler import CustomStreamWrapper
+                from litellm.types.utils import ModelResponse, StreamingChoices
+
+                # await the request in the shared LLM event loop, instead of blocking the
+                # caller's event loop (and the other operators in it) during the network round
+                # trip
+                start_time = time.perf_counter()
+                model_response: Union[
+                    ModelResponse, CustomStreamWrapper
+                ] = await self._event_loop.run_async(self._complete(litellm_messages))
+                if isinstance(model_response, CustomStreamWrapper) or isinstance(
+                    model_response.choices[0], StreamingChoices
+                ):
+                    raise ValueError(
+                        "Streaming responses are not expected when the streaming is disabled. "
+                        "Please set ENABLE_LLM_STREAMING to use the streaming mode."
+                    )
+                model_response_text = cast(str, model_response.choices[0].message.content)
+                usage = self._build_usage(
+                    litellm_messages=litellm_messages,
+                    model_response_text=model_response_text,
+                    reported_usage=getattr(model_response, "usage", None),
+                    duration=time.perf_counter() - start_time,
+                )
+            if span.recording:
+                span.set_attributes(
+                    self._get_span_attributes(
+                        usage=usage,
+                        prompt_texts=[message["content"] for message in litellm_messages],
+                        response_text=model_response_text,
+                    )
+                )
 
         # call functions based on the model output
-        func_call_results: Optional[List[FunctionCallResult]] = None
-        if tools:
+        if tools and not streaming:
             func_call_results = await self.call_function(
                 tools=tools,
-                model_response_text=cast(str, model_response.choices[0].message.content),
+                model_response_text=model_response_text,
                 tool_call_ctx=tool_call_ctx,
             )
 
         # filter <function_call_result>...</function_call_result> content
         # since LLM may image the function call result, which should have been provided
         # by the function's execution return values
-        model_response.choices[0].message.content = (
+        model_response_text = (
             re.sub(
                 r"<function_call_result>.*?</function_call_result>",
                 "",
-                cast(str, model_response.choices[0].message.content),
+                model_response_text or "",
                 flags=re.DOTALL,
             ).strip()
             + "\n"
@@ -88,13 +134,228 @@ class LiteLlmClient(ModelService):
 
         # parse model response to agent message
         response: ModelMessage = self._parse_model_response(
-            model_response=model_response,
+            model_response_text=model_response_text,
             messages=messages,
             func_call_results=func_call_results,
         )
+        response.set_usage(usage)
 
         return response
 
+    async def _generate_streaming(
+        self,
+        litellm_messages: List[Dict[str, str]],
+        tools: Optional[List[Tool]] = None,
+        tool_call_ctx: Optional[ToolCallContext] = None,
+    ) -> Tuple[str, Optional[List[FunctionCallResult]], ModelUsage]:
+        """Generate the text by streaming, and call the functions as soon as they are closed.
+
+        Each text chunk is sent to the token observers. Once a <function_call>...</function_call>
+        block is closed in the streamed text, the function call is started, while the model is
+        still generating the rest of the turn.
+
+        Returns:
+            Tuple[str, Optional[List[FunctionCallResult]], ModelUsage]: The generated text, the
+                results of the function calls (None if no function is called), and the usage of
+                the model call.
+        """
+        # the stream is consumed in the shared LLM event loop, and the deltas are forwarded to
+        # this event loop, where the function calls are dispatched
+        caller_loop = asyncio.get_running_loop()
+        deltas: asyncio.Queue[Union[str, Any, BaseException, None]] = asyncio.Queue()
+
+        def forward(item: Union[str, Any, BaseException, None]) -> None:
+            caller_loop.call_soon_threadsafe(deltas.put_nowait, item)
+
+        start_time = time.perf_counter()
+        producer = self._event_loop.submit(self._stream_deltas(litellm_messages, forward))
+
+        scheduler: Optional[FunctionCallScheduler] = None
+        if tools:
+            scheduler = FunctionCallScheduler(
+                model_service=self,
+                tools=tools,
+                tool_call_ctx=tool_call_ctx,
+                concurrent=SystemEnv.ENABLE_CONCURRENT_FUNCTION_CALLING,
+            )
+
+        model_response_text = ""
+        reported_usage: Any = None
+        try:
+            while True:
+                delta = await deltas.get()
+                if delta is None:
+                    break
+                if isinstance(delta, BaseException):
+                    raise delta
+                if not isinstance(delta, str):
+                    # the usage reported by the provider in the last chunk (if any)
+                    reported_usage = delta
+                    continue
+                model_response_text += delta
+                self._notify_token_observers(delta, tool_call_ctx)
+
+                # the end marker may be split across the chunks
+                tail = model_response_text[-(len(delta) + len(_FUNC_CALL_END_MARKER)) :]
+                if scheduler and _FUNC_CALL_END_MARKER in tail:
+                    self._dispatch_closed_function_calls(scheduler, model_response_text)
+
+            usage = self._build_usage(
+                litellm_messages=litellm_messages,
+                model_response_text=model_response_text,
+                reported_usage=reported_usage,
+                duration=time.perf_counter() - start_time,
+            )
+            if scheduler is None:
+                return model_response_text, None, usage
+
+            # the function calls which were not closed in the stream (e.g. in the JSON format)
+            func_calls = self._parse_function_calls(model_response_text)
+            for func_tuple, err in func_calls[scheduler.submitted_count :]:
+                scheduler.submit(func_tuple=func_tuple, err=err)
+            if scheduler.submitted_count == 0:
+                return model_response_text, None, usage
+            return model_response_text, await scheduler.results(), usage
+        except BaseException:
+            if scheduler:
+                scheduler.cancel()
+            raise
+        finally:
+            producer.cancel()
+
+    async def _complete(self, litellm_messages: List[Dict[str, str]]):
+        """Send the completion request within the limits of the LLM provider.
+
+        It must be called in the shared LLM event loop, where the request limiter and the HTTP
+        clients cached by LiteLLM live.
+        """
+        async with self._request_limiter.limit(self._provider):
+            return await self._acompletion(litellm_messages, stream=False)
+
+    async def _stream_deltas(
+        self,
+        litellm_messages: List[Dict[str, str]],
+        forward: Callable[[Union[str, Any, BaseException, None]], None],
+    ) -> None:
+        """Stream the completion, and forward the text deltas and the reported usage (if any),
+        then None or the raised error.
+
+        It must be called in the shared LLM event loop. The provider slot is held until the
+        stream is consumed, since the connection is in use until then.
+        """
+        try:
+            async with self._request_limiter.limit(self._provider):
+                stream = await self._acompletion(litellm_messages, stream=True)
+                async for chunk in stream:
+                    delta: str = (chunk.choices[0].delta.content or "") if chunk.choices else ""
+                    if delta:
+                        forward(delta)
+                    usage = getattr(chunk, "usage", None)
+                    if usage:
+                        forward(usage)
+            forward(None)
+        except Exception as e:
+            forward(e)
+
+    async def _acompletion(self, litellm_messages: List[Dict[str, str]], stream: bool):
+        from litellm import acompletion
+
+        return await acompletion(
+            model=self._model_alias,
+            api_base=self._api_base,
+            api_key=self._api_key,
+            messages=self._mark_cache_breakpoints(litellm_messages),
+            temperature=self._temperature,
+            max_tokens=self._max_tokens,
+            max_completion_tokens=self._max_completion_tokens,
+            stream=stream,
+        )
+
+    def _mark_cache_breakpoints(
+        self, litellm_messages: List[Dict[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """Mark the stable prefix of the prompt as cacheable, for the providers which cache the
+        prompts by explicit breakpoints (e.g. Anthropic).
+
+        The system prompt is the same in all the rounds of a reasoner, and the history is only
+        appended, so the system message and the last message are marked: the next round reads
+        the prefix up to the last message of this round from the cache. The providers which
+        cache the prompt prefixes automatically (e.g. OpenAI) need no marks, and LiteLLM drops
+        the marks for them.
+        """
+        if self._prompt_caching is None:
+            self._prompt_caching = (
+                SystemEnv.ENABLE_PROMPT_CACHING and self._supports_prompt_caching()
+            )
+        if not self._prompt_caching:
+            return cast(List[Dict[str, Any]], litellm_messages)
+
+        marked_messages: List[Dict[str, Any]] = list(litellm_messages)
+        for index in {0, len(marked_messages) - 1}:
+            message = marked_messages[index]
+            marked_messages[index] = {
+                "role": message["role"],
+                "content": [
+                    {
+                        "type": "text",
+                        "text": message["content"],
+                        "cache_control": {"type": "ephemeral"},
+                    }
+                ],
+            }
+        return marked_messages
+
+    def _supports_prompt_caching(self) -> bool:
+        """Check if the model supports the prompt caching, according to LiteLLM."""
+        from litellm.utils import supports_prompt_caching
+
+        try:
+            return supports_prompt_caching(model=self._model_alias)
+        except Exception:
+            # the model is unknown to LiteLLM
+            return False
+
+    def _build_usage(
+        self,
+        litellm_messages: List[Dict[str, str]],
+        model_response_text: str,
+        reported_usage: Any,
+        duration: float,
+    ) -> ModelUsage:
+        """Build the usage of a model call, from the usage reported by the provider, or counted
+        by the tokenizer of the model if the provider does not report it."""
+        prompt_tokens = getattr(reported_usage, "prompt_tokens", None)
+        completion_tokens = getattr(reported_usage, "completion_tokens", None)
+        if prompt_tokens is None or completion_tokens is None:
+            from litellm import token_counter
+
+            try:
+                prompt_tokens = token_counter(model=self._model_alias, messages=litellm_messages)
+                completion_tokens = token_counter(
+                    model=self._model_alias, text=model_response_text or ""
+                )
+            except Exception as e:
+                print(f"\033[38;5;208m[Warning]: Failed to count the tokens: {e}\033[0m")
+                prompt_tokens, completion_tokens = 0, 0
+        return ModelUsage(
+            prompt_tokens=int(prompt_tokens),
+            completion_tokens=int(completion_tokens),
+            duration=duration,
+        )
+
+    def _dispatch_closed_function_calls(
+        self, scheduler: FunctionCallScheduler, model_response_text: str
+    ) -> None:
+        """Submit the function calls closed in the streamed text, which are not submitted yet."""
+        closed_blocks = re.findall(
+            _FUNC_CALL_BLOCK_PATTERN, model_response_text, flags=re.DOTALL | re.MULTILINE
+        )
+        for block in closed_blocks[scheduler.submitted_count :]:
+            func_calls = self._parse_function_calls(block)
+            if func_calls:
+                func_tuple, err = func_calls[0]
+                scheduler.submit(func_tuple=func_tuple, err=err)
+
     def _prepare_model_request(
         self,
         sys_prompt: str,
@@ -112,37 +373,18 @@ class LiteLlmClient(ModelService):
             sys_message = sys_prompt.strip()
         base_messages: List[Dict[str, str]] = [{"role": "system", "content": sys_message}]
 
-        # convert the conversation messages for LiteLLM
+        # convert the conversation messages for LiteLLM, reusing the contents rendered in the
+        # previous rounds
         for i, message in enumerate(messages):
-            # handle the func call information in the agent message
-            base_message_content = message.get_payload()
-            func_call_results = message.get_function_calls()
-            if func_call_results:
-                base_message_content += (
-                    "<function_call_result>\n"
-                    + "\n".join(
-                        [
-                            f"{i + 1}. {result.status.value} called function "
-                            f"{result.func_name}:\n"
-                            f"Call objective: {result.call_objective}\n"
-                            f"Function Output: {result.output}"
-                            for j, result in enumerate(func_call_results)
-                        ]
-                    )
-                    + "\n</function_call_result>"
-                )
-
             # Chat2Graph <-> LiteLLM's last message role should be "user"
-            if (len(messages) + i) % 2 == 1:
-                base_messages.append({"role": "user", "content": base_message_content.strip()})
-            else:
-                base_messages.append({"role": "assistant", "content": base_message_content.strip()})
+            role = "user" if (len(messages) + i) % 2 == 1 else "assistant"
+            base_messages.append({"role": role, "content": self._render_message(message)})
 
         return base_messages
 
     def _parse_model_response(
         self,
-        model_response: Any,
+        model_response_text: str,
         messages: List[ModelMessage],
         func_call_results: Optional[List[FunctionCallResult]] = None,
     ) -> ModelMessage:
@@ -159,9 +401,7 @@ class LiteLlmClient(ModelService):
         response = ModelMessage(
             payload=cast(
                 str,
-                (
-                    model_response.choices[0].message.content or "The LLM response was missing."
-                ).strip(),
+                model_response_text.strip() or "The LLM response was missing.",
             ),
             job_id=messages[-1].get_job_id(),
             step=messages[-1].get_step() + 1,
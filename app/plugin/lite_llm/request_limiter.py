@@ -0,0 +1,57 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+import time
+from typing import AsyncIterator, Deque, Dict
+
+from app.core.common.system_env import SystemEnv
+
+
+class RequestLimiter:
+    """Limiter of the concurrent LLM requests and the LLM request rate, per provider.
+
+    The limits are read from LLM_MAX_CONCURRENCY_PER_PROVIDER and
+    LLM_MAX_REQUESTS_PER_MINUTE_PER_PROVIDER (no rate limit if not set). The limiter must be used
+    in one event loop, since it is built on asyncio primitives.
+
+    Attributes:
+        _semaphores (Dict[str, asyncio.Semaphore]): The concurrency limit of each provider.
+        _rate_locks (Dict[str, asyncio.Lock]): The locks serializing the rate checks.
+        _request_times (Dict[str, Deque[float]]): The start times of the requests of each
+            provider in the last minute.
+    """
+
+    def __init__(self):
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._rate_locks: Dict[str, asyncio.Lock] = {}
+        self._request_times: Dict[str, Deque[float]] = {}
+
+    @asynccontextmanager
+    async def limit(self, provider: str) -> AsyncIterator[None]:
+        """Wait until a request to the provider is allowed, and hold the slot until it exits."""
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(
+                max(1, SystemEnv.LLM_MAX_CONCURRENCY_PER_PROVIDER)
+            )
+
+        async with self._semaphores[provider]:
+            await self._wait_for_rate(provider)
+            yield
+
+    async def _wait_for_rate(self, provider: str) -> None:
+        """Wait until the request rate of the provider is under the limit."""
+        max_requests_per_minute = SystemEnv.LLM_MAX_REQUESTS_PER_MINUTE_PER_PROVIDER
+        if not max_requests_per_minute:
+            return
+
+        lock = self._rate_locks.setdefault(provider, asyncio.Lock())
+        request_times = self._request_times.setdefault(provider, deque())
+        async with lock:
+            while True:
+                now = time.monotonic()
+                while request_times and now - request_times[0] >= 60:
+                    request_times.popleft()
+                if len(request_times) < max_requests_per_minute:
+                    break
+                await asyncio.sleep(60 - (now - request_times[0]))
+            request_times.append(time.monotonic())
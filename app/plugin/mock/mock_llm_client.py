@@ -0,0 +1,211 @@
+import asyncio
+from functools import lru_cache
+from pathlib import Path
+import re
+import time
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+import yaml  # type: ignore
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import MessageSourceType
+from app.core.model.job_result import ModelUsage
+from app.core.model.message import ModelMessage
+from app.core.model.task import ToolCallContext
+from app.core.reasoner.model_service import ModelService
+from app.core.toolkit.tool import FunctionCallResult, Tool
+from app.core.tracer.tracer import trace_span
+
+_DEFAULT_RESPONSES: Dict[MessageSourceType, str] = {
+    MessageSourceType.THINKER: (
+        "<deep_thinking>\nThe task can be delivered now.\n</deep_thinking>\n"
+        "<instruction>\nDeliver the result of the task.\n</instruction>\n"
+        "<input>\nNone\n</input>"
+    ),
+    MessageSourceType.ACTOR: (
+        "<shallow_thinking>\nI will deliver the result.\n</shallow_thinking>\n"
+        "<action>\nNo function needs to be called.\n</action>\n"
+        "<deliverable>\n<final_output>\nThe scripted result of the mock LLM.\n</final_output>\n"
+        "TASK_DONE\n</deliverable>"
+    ),
+    MessageSourceType.MODEL: (
+        "<deep_thinking>\nThe task can be delivered now.\n</deep_thinking>\n"
+        "<action>\nNo function needs to be called.\n</action>\n"
+        "<deliverable>\n<final_output>\nThe scripted result of the mock LLM.\n</final_output>\n"
+        "TASK_DONE\n</deliverable>"
+    ),
+}
+
+
+class MockResponseRule:
+    """A rule of the mock LLM script, which gives the responses of the model requests it matches.
+
+    Attributes:
+        match (Optional[Pattern[str]]): The pattern searched in the system prompt (e.g. a part of
+            the operator instruction), which matches all the requests if None.
+        source_type (Optional[MessageSourceType]): The source type of the matched responses
+            (THINKER, ACTOR or MODEL), which matches all the source types if None.
+        responses (List[str]): The responses of the reasoning rounds, in order. The last one is
+            repeated in the later rounds.
+        latency (Optional[float]): The simulated seconds per model call, overriding the default.
+        prompt_tokens (Optional[int]): The reported prompt tokens, estimated if None.
+        completion_tokens (Optional[int]): The reported completion tokens, estimated if None.
+    """
+
+    def __init__(self, rule: Dict[str, Any]):
+        responses = rule.get("responses")
+        if not isinstance(responses, list) or not responses:
+            raise ValueError(f"The mock LLM rule must have a list of responses: {rule}.")
+        self.match: Optional[Pattern[str]] = (
+            re.compile(rule["match"], re.DOTALL) if rule.get("match") else None
+        )
+        self.source_type: Optional[MessageSourceType] = (
+            MessageSourceType(rule["source_type"]) if rule.get("source_type") else None
+        )
+        self.responses: List[str] = [str(response) for response in responses]
+        self.latency: Optional[float] = rule.get("latency")
+        self.prompt_tokens: Optional[int] = rule.get("prompt_tokens")
+        self.completion_tokens: Optional[int] = rule.get("completion_tokens")
+
+    def matches(self, sys_prompt: str, source_type: MessageSourceType) -> bool:
+        """Check if the rule matches the model request."""
+        if self.source_type and self.source_type != source_type:
+            return False
+        return self.match is None or self.match.search(sys_prompt) is not None
+
+
+@lru_cache(maxsize=8)
+def load_mock_script(path: str) -> Tuple[MockResponseRule, ...]:
+    """Load the rules of the mock LLM script, which is shared by all the mock LLM clients."""
+    rules = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or []
+    if not isinstance(rules, list):
+        raise ValueError(f"The mock LLM script {path} must be a list of rules.")
+    return tuple(MockResponseRule(rule) for rule in rules)
+
+
+class MockLlmClient(ModelService):
+    """Mock LLM client, which replays the scripted responses without calling any LLM, so the
+    system can be run and benchmarked offline, deterministically.
+
+    The script (`SystemEnv.MOCK_LLM_SCRIPT_PATH`) is a YAML (or JSON) list of rules:
+
+        - match: "Count the vertices"  # regex searched in the system prompt
+          source_type: "ACTOR"  # optional, THINKER, ACTOR or MODEL
+          responses:  # the responses of the 1st, 2nd, ... reasoning rounds
+            - "<action>\\n<function_call>{...}</function_call>\\n</action>"
+            - "<action>\\nDone.\\n</action>\\n<deliverable>...TASK_DONE</deliverable>"
+          latency: 0.5  # optional, overrides MOCK_LLM_LATENCY
+          completion_tokens: 200  # optional, estimated if not set
+
+    A request is answered by the first rule it matches, with the response of its reasoning round,
+    which is derived from the step of the response, so a recorded conversation of an operator is
+    replayed by listing its responses in order. The requests matched by no rule are answered by a
+    default response, which delivers the task in the first round. The function calls in the
+    responses are called as the real LLM clients do.
+
+    Each call sleeps `MOCK_LLM_LATENCY` seconds, plus the completion tokens divided by
+    `MOCK_LLM_TOKENS_PER_SECOND` if set, and reports the token counts of the rule, or estimated
+    by 4 characters per token.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._script_path: Optional[str] = SystemEnv.MOCK_LLM_SCRIPT_PATH
+        self._latency: float = SystemEnv.MOCK_LLM_LATENCY or 0.0
+        self._tokens_per_second: Optional[float] = SystemEnv.MOCK_LLM_TOKENS_PER_SECOND
+
+    async def generate(
+        self,
+        sys_prompt: str,
+        messages: List[ModelMessage],
+        tools: Optional[List[Tool]] = None,
+        tool_call_ctx: Optional[ToolCallContext] = None,
+    ) -> ModelMessage:
+        """Generate the scripted response of the model request."""
+        if len(messages) == 0:
+            raise ValueError("No messages provided.")
+        source_type = self._get_source_type(messages)
+        step = messages[-1].get_step() + 1
+
+        with trace_span(
+            "llm.generate",
+            model="mock",
+            job_id=tool_call_ctx.job_id if tool_call_ctx else None,
+            operator_id=tool_call_ctx.operator_id if tool_call_ctx else None,
+        ) as span:
+            start_time = time.perf_counter()
+            rule = self._match_rule(sys_prompt, source_type)
+            if rule:
+                # the thinker and the actor take turns in the rounds of a dual model reasoner
+                reasoning_round = step - 1 if source_type == MessageSourceType.MODEL else step // 2
+                model_response_text = rule.responses[
+                    min(max(reasoning_round, 1), len(rule.responses)) - 1
+                ]
+            else:
+                model_response_text = _DEFAULT_RESPONSES[source_type]
+
+            prompt_texts = [sys_prompt] + [self._render_message(message) for message in messages]
+            prompt_tokens = (rule.prompt_tokens if rule else None) or (
+                sum(len(text) for text in prompt_texts) // 4 + 1
+            )
+            completion_tokens = (rule.completion_tokens if rule else None) or (
+                len(model_response_text) // 4 + 1
+            )
+
+            latency = rule.latency if rule and rule.latency is not None else self._latency
+            if self._tokens_per_second:
+                latency += completion_tokens / self._tokens_per_second
+            if latency > 0:
+                await asyncio.sleep(latency)
+            if SystemEnv.ENABLE_LLM_STREAMING:
+                self._notify_token_observers(model_response_text, tool_call_ctx)
+
+            usage = ModelUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                duration=time.perf_counter() - start_time,
+            )
+            if span.recording:
+                span.set_attributes(
+                    self._get_span_attributes(
+                        usage=usage, prompt_texts=prompt_texts, response_text=model_response_text
+                    )
+                )
+
+        # call functions based on the model output
+        func_call_results: Optional[List[FunctionCallResult]] = None
+        if tools:
+            func_call_results = await self.call_function(
+                tools=tools,
+                model_response_text=model_response_text,
+                tool_call_ctx=tool_call_ctx,
+            )
+
+        response = ModelMessage(
+            payload=model_response_text.strip() + "\n",
+            job_id=messages[-1].get_job_id(),
+            step=step,
+            source_type=source_type,
+            function_calls=func_call_results,
+        )
+        response.set_usage(usage)
+        return response
+
+    def _get_source_type(self, messages: List[ModelMessage]) -> MessageSourceType:
+        """Get the source type of the response, which answers the last message."""
+        if messages[-1].get_source_type() == MessageSourceType.MODEL:
+            return MessageSourceType.MODEL
+        if messages[-1].get_source_type() == MessageSourceType.ACTOR:
+            return MessageSourceType.THINKER
+        return MessageSourceType.ACTOR
+
+    def _match_rule(
+        self, sys_prompt: str, source_type: MessageSourceType
+    ) -> Optional[MockResponseRule]:
+        """Get the first rule of the script matching the model request, if any."""
+        if not self._script_path:
+            return None
+        for rule in load_mock_script(self._script_path):
+            if rule.matches(sys_prompt, source_type):
+                return rule
+        return None
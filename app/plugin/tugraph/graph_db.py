@@ -1,5 +1,6 @@
 from neo4j import GraphDatabase
 
+from app.core.common.system_env import SystemEnv
 from app.core.model.graph_db_config import TuGraphDbConfig
 from app.core.toolkit.graph_db.graph_db import GraphDb
 
@@ -15,6 +16,10 @@ class TuGraphDb(GraphDb[TuGraphDbConfig]):
         """Get the database connection."""
         if not self._driver:
             self._driver = GraphDatabase.driver(
-                self._config.uri, auth=(self._config.user, self._config.pwd)
+                self._config.uri,
+                auth=(self._config.user, self._config.pwd),
+                max_connection_pool_size=SystemEnv.GRAPH_DB_MAX_CONNECTION_POOL_SIZE,
+                connection_acquisition_timeout=SystemEnv.GRAPH_DB_CONNECTION_ACQUISITION_TIMEOUT,
+                max_connection_lifetime=SystemEnv.GRAPH_DB_MAX_CONNECTION_LIFETIME,
             )
         return self._driver
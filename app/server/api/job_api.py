@@ -1,4 +1,6 @@
-from flask import Blueprint
+import json
+
+from flask import Blueprint, Response, stream_with_context
 
 from app.server.common.util import make_response
 from app.server.manager.job_manager import JobManager
@@ -17,3 +19,47 @@ def get_job_message_view(job_id: str):
     message_view_data, message = manager.get_conversation_view(job_id=job_id)
 
     return make_response(data=message_view_data, message=message)
+
+
+@jobs_bp.route("/<string:job_id>/metrics", methods=["GET"])
+def get_job_metrics(job_id: str):
+    """Get the tokens and the duration of a specific job and its subjobs.
+    The running jobs also report the model usages of their operators, and the memories kept for
+    them.
+    """
+    manager = JobManager()
+
+    metrics, message = manager.get_job_metrics(job_id=job_id)
+
+    return make_response(data=metrics, message=message)
+
+
+@jobs_bp.route("/<string:job_id>/events", methods=["GET"])
+def stream_job_events(job_id: str):
+    """Stream the progress events of a specific job as Server-Sent Events.
+    Pushes the subjob creations, status changes, reasoner messages, artifact updates and the final
+    answer, and ends when the job reaches a final status.
+    """
+    manager = JobManager()
+
+    # check the job before the response starts, so an unknown job gets an error response. The job
+    # is subscribed to once the stream starts, so a client disconnected before it leaks nothing
+    events = manager.get_job_events(job_id=job_id)
+
+    def generate():
+        try:
+            for event in events:
+                if event is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    data = json.dumps(event, ensure_ascii=False)
+                    yield f"event: {event['type']}\ndata: {data}\n\n"
+        finally:
+            # unsubscribe when the client disconnects
+            events.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,6 +1,12 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Generator, Optional, Tuple
 
+from app.core.common.system_env import SystemEnv
+from app.core.model.job_event import JobEvent
+from app.core.model.job_result import JobResult
+from app.core.service.job_event_service import JobEventService
 from app.core.service.job_service import JobService
+from app.core.service.memory_service import MemoryService
+from app.server.manager.view.job_view import JobView
 from app.server.manager.view.message_view import MessageViewTransformer
 
 
@@ -9,9 +15,82 @@ class JobManager:
 
     def __init__(self):
         self._job_service: JobService = JobService.instance
+        self._job_event_service: JobEventService = JobEventService.instance
 
     def get_conversation_view(self, job_id: str) -> Tuple[Dict[str, Any], str]:
         """Get message view (including thinking chain) for a specific job."""
         return MessageViewTransformer.serialize_conversation_view(
             self._job_service.get_conversation_view(original_job_id=job_id)
         ), "Message view retrieved successfully"
+
+    def get_job_metrics(self, job_id: str) -> Tuple[Dict[str, Any], str]:
+        """Get the tokens and the duration of a specific job and its subjobs.
+
+        The running jobs also report the model usages of their operators, which are not rolled up
+        into the job results yet, and the memories kept for the job, with the memory usage of the
+        whole process.
+        """
+        original_job = self._job_service.get_original_job(original_job_id=job_id)
+        job_result = self._job_service.get_job_result(job_id=original_job.id)
+        subjob_results = self._job_service.get_subjob_results(original_job_id=original_job.id)
+        memory_service: MemoryService = MemoryService.instance or MemoryService()
+        job_ids = [original_job.id, *(result.job_id for result in subjob_results)]
+        return {
+            "job": self._serialize_job_metrics(job_result),
+            "subjobs": [self._serialize_job_metrics(result) for result in subjob_results],
+            "memory": {
+                "job": memory_service.get_memory_usage(job_ids=job_ids),
+                "process": memory_service.get_metrics(),
+            },
+        }, "Job metrics retrieved successfully"
+
+    def _serialize_job_metrics(self, job_result: JobResult) -> Dict[str, Any]:
+        metrics = JobView.serialize_job_result(job_result)
+        metrics["operators"] = {
+            operator_id: JobView.serialize_model_usage(usage)
+            for operator_id, usage in self._job_service.get_model_usages(job_result.job_id).items()
+        }
+        return metrics
+
+    def get_job_events(self, job_id: str) -> Generator[Optional[Dict[str, Any]], None, None]:
+        """Subscribe to the progress events of a specific job.
+
+        The job is checked before the events are consumed, so an unknown job raises here. The
+        subscription is made when the first event is requested, inside the generator, so it is
+        always released by closing the generator, even if the client disconnects before the first
+        event. A final status reached before the subscription is still reported.
+
+        Returns:
+            Generator[Optional[Dict[str, Any]], None, None]: The events until the job reaches a
+                final status. None is yielded when no event is published for
+                `SystemEnv.JOB_EVENT_HEARTBEAT_INTERVAL` seconds, to keep the connection alive.
+        """
+        original_job = self._job_service.get_original_job(original_job_id=job_id)
+        return self._consume_job_events(original_job.id)
+
+    def _consume_job_events(
+        self, original_job_id: str
+    ) -> Generator[Optional[Dict[str, Any]], None, None]:
+        """Subscribe to the events of the original job, and unsubscribe once it is done."""
+        subscription = self._job_event_service.subscribe(original_job_id=original_job_id)
+        try:
+            # the job may have reached a final status before the subscription
+            job_result = self._job_service.get_job_result(job_id=subscription.original_job_id)
+            if job_result.has_result():
+                yield JobEvent.status_changed(
+                    original_job_id=subscription.original_job_id, job_result=job_result
+                ).to_dict()
+                return
+
+            heartbeat_interval: float = SystemEnv.JOB_EVENT_HEARTBEAT_INTERVAL
+            while True:
+                try:
+                    event = subscription.get(timeout=heartbeat_interval)
+                except TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                yield event.to_dict()
+        finally:
+            self._job_event_service.unsubscribe(subscription)
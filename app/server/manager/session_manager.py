@@ -159,13 +159,13 @@ class SessionManager:
         # get all job ids in the session
         job_ids: List[str] = self.get_all_job_ids(session_id=session_id)[0]
 
-        # get message view data for the job
-        conversation_views: List[Dict[str, Any]] = []
-        for job_id in job_ids:
-            conversation_view = self._job_service.get_conversation_view(original_job_id=job_id)
-            conversation_views.append(
-                MessageViewTransformer.serialize_conversation_view(conversation_view)
+        # get message view data for the jobs, loaded in bulk
+        conversation_views: List[Dict[str, Any]] = [
+            MessageViewTransformer.serialize_conversation_view(conversation_view)
+            for conversation_view in self._job_service.get_conversation_views(
+                original_job_ids=job_ids
             )
+        ]
 
         return conversation_views, "Get all conversation views successfully"
 
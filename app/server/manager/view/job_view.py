@@ -1,7 +1,7 @@
 from typing import Any, Dict, TypeVar
 
 from app.core.model.job import Job, SubJob
-from app.core.model.job_result import JobResult
+from app.core.model.job_result import JobResult, ModelUsage
 
 T = TypeVar("T", bound=Job)
 
@@ -36,3 +36,14 @@ class JobView:
             "duration": job_result.duration,
             "tokens": job_result.tokens,
         }
+
+    @staticmethod
+    def serialize_model_usage(usage: ModelUsage) -> Dict[str, Any]:
+        """Serialize model usage object into a dictionary."""
+        return {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "tokens": usage.total_tokens,
+            "duration": usage.duration,
+            "calls": usage.calls,
+        }
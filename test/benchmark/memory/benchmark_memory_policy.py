@@ -0,0 +1,168 @@
+"""Benchmark of the history sent to the model by the dual model reasoner, without and with the
+token budget memory policy, on synthetic traces with large Cypher and GraphJSON tool outputs.
+
+Usage:
+    python -m test.benchmark.memory.benchmark_memory_policy --traces 10 --rounds 20
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+from app.core.common.type import MessageSourceType
+from app.core.memory.memory_policy import MemoryPolicy, TokenBudgetMemoryPolicy, TokenCounter
+from app.core.model.message import ModelMessage
+from app.core.toolkit.tool import FunctionCallResult
+
+
+def cypher_output(rng: random.Random, rows: int) -> str:
+    """Build the output of a Cypher query, with a row per line."""
+    return "\n".join(
+        json.dumps({"n": {"id": i, "label": "Person", "name": f"person_{rng.randint(0, 10**6)}"}})
+        for i in range(rows)
+    )
+
+
+def graph_json_output(rng: random.Random, vertices: int) -> str:
+    """Build the output of a graph query in the GraphJSON format."""
+    return json.dumps(
+        {
+            "vertices": [
+                {"id": i, "label": "Person", "properties": {"age": rng.randint(1, 99)}}
+                for i in range(vertices)
+            ],
+            "edges": [
+                {"source": i, "target": rng.randrange(vertices), "label": "KNOWS"}
+                for i in range(vertices)
+            ],
+        }
+    )
+
+
+def build_trace(rng: random.Random, rounds: int) -> List[ModelMessage]:
+    """Build the history of a dual model reasoner, where every actor message calls a graph
+    query function, whose output size follows a long-tailed distribution."""
+    messages = [
+        ModelMessage(
+            payload="<shallow_thinking>\nLet's start.\n</shallow_thinking>\n<action>\nEmpty\n"
+            "</action>",
+            job_id="job",
+            step=1,
+            source_type=MessageSourceType.ACTOR,
+        )
+    ]
+    for i in range(rounds):
+        step = 2 * i + 2
+        messages.append(
+            ModelMessage(
+                payload=f"<deep_thinking>\n{'Reason about the graph. ' * 20}\n</deep_thinking>\n"
+                f"<instruction>\nQuery the neighbours of the vertices of hop {i}.\n</instruction>",
+                job_id="job",
+                step=step,
+                source_type=MessageSourceType.THINKER,
+            )
+        )
+        size = min(int(rng.lognormvariate(3.5, 1.2)), 2000)
+        output = cypher_output(rng, size) if i % 2 else graph_json_output(rng, size)
+        messages.append(
+            ModelMessage(
+                payload=f"<shallow_thinking>\nRun the query of hop {i}.\n</shallow_thinking>\n"
+                "<action>\n<function_call>...</function_call>\n</action>",
+                job_id="job",
+                step=step + 1,
+                source_type=MessageSourceType.ACTOR,
+                function_calls=[
+                    FunctionCallResult(
+                        func_name="cypher_executor" if i % 2 else "graph_json_query",
+                        func_args={"hop": i},
+                        call_objective=f"query the neighbours of hop {i}",
+                        output=output,
+                    )
+                ],
+            )
+        )
+    return messages
+
+
+def count_tokens(counter: TokenCounter, messages: List[ModelMessage]) -> int:
+    """Count the tokens of the messages, with the outputs of their function calls."""
+    return sum(
+        counter.count(message.get_payload())
+        + sum(counter.count(result.output) for result in message.get_function_calls() or [])
+        for message in messages
+    )
+
+
+def replay(
+    trace: List[ModelMessage], counter: TokenCounter, policy: Optional[MemoryPolicy]
+) -> Dict[str, float]:
+    """Replay the trace as the reasoner does, sending the history to the model before each
+    message, and measure the tokens sent and the time spent by the policy."""
+    prompt_tokens: List[int] = []
+    policy_time = 0.0
+    for end in range(1, len(trace)):
+        history = trace[:end]
+        start_time = time.perf_counter()
+        messages = policy.apply(history) if policy else history
+        policy_time += time.perf_counter() - start_time
+        prompt_tokens.append(count_tokens(counter, messages))
+    return {
+        "total_tokens": sum(prompt_tokens),
+        "max_tokens": max(prompt_tokens),
+        "policy_ms": policy_time * 1000,
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--traces", type=int, default=10, help="Number of synthetic traces.")
+    parser.add_argument("--rounds", type=int, default=20, help="Reasoning rounds of each trace.")
+    parser.add_argument("--verbatim-rounds", type=int, default=4, help="Rounds kept verbatim.")
+    parser.add_argument("--budget", type=int, default=32768, help="Token budget per request.")
+    parser.add_argument(
+        "--max-output-tokens", type=int, default=2048, help="Max tokens of a function output."
+    )
+    parser.add_argument("--model", type=str, default="gpt-4o", help="Model of the tokenizer.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the traces.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    counter = TokenCounter(args.model)
+    traces = [build_trace(rng, args.rounds) for _ in range(args.traces)]
+
+    print(
+        f"\n{'trace':<8}{'full (tok)':>14}{'policy (tok)':>14}{'saved':>8}"
+        f"{'max full':>12}{'max policy':>12}{'policy (ms)':>13}"
+    )
+    total_full = total_compacted = 0.0
+    for i, trace in enumerate(traces):
+        full = replay(trace, counter, policy=None)
+        compacted = replay(
+            trace,
+            counter,
+            policy=TokenBudgetMemoryPolicy(
+                verbatim_rounds=args.verbatim_rounds,
+                max_tokens=args.budget,
+                max_function_output_tokens=args.max_output_tokens,
+                token_counter=counter,
+            ),
+        )
+        total_full += full["total_tokens"]
+        total_compacted += compacted["total_tokens"]
+        print(
+            f"{i:<8}{full['total_tokens']:>14.0f}{compacted['total_tokens']:>14.0f}"
+            f"{1 - compacted['total_tokens'] / full['total_tokens']:>8.0%}"
+            f"{full['max_tokens']:>12.0f}{compacted['max_tokens']:>12.0f}"
+            f"{compacted['policy_ms']:>13.1f}"
+        )
+    print(
+        f"\nPrompt tokens of all the requests: {total_full:.0f} -> {total_compacted:.0f} "
+        f"({1 - total_compacted / total_full:.0%} saved)"
+    )
+
+
+if __name__ == "__main__":
+    main()
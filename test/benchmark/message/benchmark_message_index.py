@@ -0,0 +1,131 @@
+"""Benchmark of the message lookups, without and with the indexes of the message table.
+
+Usage:
+    python -m test.benchmark.message.benchmark_message_index --messages 1000000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+from uuid import uuid4
+
+from sqlalchemy import Engine, Select, create_engine, insert, select
+
+from app.core.common.type import ChatMessageRole
+from app.core.dal.do.message_do import MessageDo
+from app.core.model.message import MessageType
+
+MESSAGES_PER_JOB = 50
+JOBS_PER_SESSION = 10
+MESSAGE_TYPES = [
+    MessageType.TEXT_MESSAGE,
+    MessageType.HYBRID_MESSAGE,
+    MessageType.AGENT_MESSAGE,
+    MessageType.WORKFLOW_MESSAGE,
+    MessageType.MODEL_MESSAGE,
+]
+ROLES = [ChatMessageRole.USER, ChatMessageRole.SYSTEM]
+
+
+def populate(engine: Engine, message_count: int, batch_size: int = 50000) -> Dict[str, List[str]]:
+    """Insert the messages, spread over the jobs and the sessions, and return their ids."""
+    job_ids = [str(uuid4()) for _ in range(max(1, message_count // MESSAGES_PER_JOB))]
+    session_ids = [str(uuid4()) for _ in range(max(1, len(job_ids) // JOBS_PER_SESSION))]
+
+    table = MessageDo.__table__
+    with engine.begin() as conn:
+        for start in range(0, message_count, batch_size):
+            rows = []
+            for i in range(start, min(start + batch_size, message_count)):
+                job_index = i % len(job_ids)
+                rows.append(
+                    {
+                        "id": str(uuid4()),
+                        "timestamp": 1700000000 + i,
+                        "job_id": job_ids[job_index],
+                        "session_id": session_ids[job_index % len(session_ids)],
+                        "type": MESSAGE_TYPES[i % len(MESSAGE_TYPES)].value,
+                        "role": ROLES[(i // len(MESSAGE_TYPES)) % len(ROLES)].value,
+                        "payload": "payload",
+                    }
+                )
+            conn.execute(insert(table), rows)
+    return {"job_ids": job_ids, "session_ids": session_ids}
+
+
+def lookups(ids: Dict[str, List[str]]) -> Dict[str, Callable[[], Select]]:
+    """Get the lookups of the hot paths, with random job and session ids."""
+    table = MessageDo.__table__
+    return {
+        "messages by job and type": lambda: select(table).where(
+            table.c.job_id == random.choice(ids["job_ids"]),
+            table.c.type == MessageType.AGENT_MESSAGE.value,
+        ),
+        "messages by job, type and role": lambda: select(table).where(
+            table.c.job_id == random.choice(ids["job_ids"]),
+            table.c.type == MessageType.TEXT_MESSAGE.value,
+            table.c.role == ChatMessageRole.SYSTEM.value,
+        ),
+        "text messages by session": lambda: (
+            select(table)
+            .where(
+                table.c.session_id == random.choice(ids["session_ids"]),
+                table.c.type == MessageType.TEXT_MESSAGE.value,
+            )
+            .order_by(table.c.timestamp)
+        ),
+    }
+
+
+def measure(engine: Engine, ids: Dict[str, List[str]], rounds: int) -> Dict[str, float]:
+    """Measure the mean latency (ms) of each lookup."""
+    latencies: Dict[str, float] = {}
+    with engine.connect() as conn:
+        for name, lookup in lookups(ids).items():
+            start_time = time.perf_counter()
+            for _ in range(rounds):
+                conn.execute(lookup()).fetchall()
+            latencies[name] = (time.perf_counter() - start_time) * 1000 / rounds
+    return latencies
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1000000, help="Number of messages.")
+    parser.add_argument("--rounds", type=int, default=20, help="Rounds of each lookup.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(temp_dir, 'benchmark.db')}")
+        table = MessageDo.__table__
+        table.create(bind=engine)
+        for index in table.indexes:
+            index.drop(bind=engine)
+
+        print(f"Inserting {args.messages} messages...")
+        ids = populate(engine, args.messages)
+        without_indexes = measure(engine, ids, args.rounds)
+
+        print("Creating the indexes...")
+        start_time = time.perf_counter()
+        for index in table.indexes:
+            index.create(bind=engine)
+        print(f"Indexes created in {time.perf_counter() - start_time:.1f} s")
+        with_indexes = measure(engine, ids, args.rounds)
+        engine.dispose()
+
+    print(f"\n{'lookup':<35}{'no index (ms)':>15}{'indexed (ms)':>15}{'speedup':>10}")
+    for name, latency in without_indexes.items():
+        indexed_latency = with_indexes[name]
+        print(
+            f"{name:<35}{latency:>15.2f}{indexed_latency:>15.2f}"
+            f"{latency / max(indexed_latency, 1e-6):>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
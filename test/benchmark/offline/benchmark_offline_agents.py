@@ -0,0 +1,135 @@
+"""Benchmark of the overheads of the agentic system per job, run end-to-end offline: the leader
+decomposes each job, and the experts execute the subjobs, on the MOCK model platform replaying
+offline_script.yml, with the simulated graph query tool of mock_tools.py.
+
+The spans of each job are recorded, to split its wall time into the model calls, the tool calls,
+the database operations, and the rest, which is the overhead of the scheduling (the leader, the
+workflows, the operators and the reasoners). The knowledge retrieval is skipped, since it needs an
+embedding model endpoint.
+
+Usage:
+    python -m test.benchmark.offline.benchmark_offline_agents --jobs 20 --concurrency 4
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import ModelPlatformType
+
+BENCHMARK_DIR = Path(__file__).parent
+
+
+def summarize_job(spans: List, wall_time: float) -> Dict[str, float]:
+    """Split the wall time of a job by its spans, counting the outermost database spans only,
+    since a unit of work contains its writes."""
+    span_ids = {span.span_id: span for span in spans}
+
+    def total(name: str) -> float:
+        return sum(span.duration for span in spans if span.name == name)
+
+    db_spans = [
+        span
+        for span in spans
+        if span.name.startswith("db.")
+        and not (span.parent_id in span_ids and span_ids[span.parent_id].name.startswith("db."))
+    ]
+    llm_time = total("llm.generate")
+    tool_time = total("tool.call")
+    db_time = sum(span.duration for span in db_spans)
+    return {
+        "wall": wall_time,
+        "llm_calls": sum(span.name == "llm.generate" for span in spans),
+        "llm": llm_time,
+        "tool_calls": sum(span.name == "tool.call" for span in spans),
+        "tool": tool_time,
+        "db_ops": len(db_spans),
+        "db": db_time,
+        "scheduler": wall_time - llm_time - tool_time - db_time,
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=20, help="Number of jobs.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs executed concurrently.")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per model call.")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Seconds per tool call.")
+    parser.add_argument(
+        "--workdir", type=str, default=None, help="Directory of the database (a temp dir if unset)."
+    )
+    args = parser.parse_args()
+
+    # configure the system before the database engine is created on the first import
+    workdir = args.workdir or tempfile.mkdtemp(prefix="chat2graph-offline-")
+    SystemEnv.APP_ROOT = workdir
+    SystemEnv.DATABASE_URL = f"sqlite:///{workdir}/chat2graph.db"
+    SystemEnv.MODEL_PLATFORM_TYPE = ModelPlatformType.MOCK
+    SystemEnv.MOCK_LLM_SCRIPT_PATH = str(BENCHMARK_DIR / "offline_script.yml")
+    SystemEnv.MOCK_LLM_LATENCY = args.llm_latency
+    SystemEnv.PRINT_SYSTEM_PROMPT = False
+    SystemEnv.PRINT_REASONER_MESSAGES = False
+    SystemEnv.PRINT_REASONER_OUTPUT = False
+
+    from app.core.model.knowledge import Knowledge
+    from app.core.sdk.agentic_service import AgenticService
+    from app.core.service.knowledge_base_service import KnowledgeBaseService
+    from app.core.tracer.span_exporter import InMemorySpanExporter
+    from app.core.tracer.tracer import Tracer
+    from test.benchmark.offline.mock_tools import GraphQuerySimulator
+
+    GraphQuerySimulator.latency = args.tool_latency
+    exporter = InMemorySpanExporter(buffer_size=1000 * args.jobs)
+    Tracer().enable(exporters=[exporter])
+    mas = AgenticService.load(BENCHMARK_DIR / "offline_agents.yml")
+
+    def get_no_knowledge(query: str, session_id: Optional[str]) -> Knowledge:
+        return Knowledge(global_chunks=[], local_chunks=[])
+
+    # the knowledge retrieval embeds the query by the embedding model endpoint
+    KnowledgeBaseService.instance.get_knowledge = get_no_knowledge
+
+    def execute(index: int) -> float:
+        start_time = time.perf_counter()
+        mas.execute(f"Count the vertices of the graph #{index}.")
+        return time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        wall_times = list(executor.map(execute, range(args.jobs)))
+    total_time = time.perf_counter() - start_time
+    Tracer().disable()
+
+    root_spans = exporter.get_spans(name="leader.execute_original_job")
+    results = [
+        summarize_job(exporter.get_spans(trace_id=span.trace_id), span.duration)
+        for span in root_spans
+    ]
+    if len(results) != args.jobs:
+        print(f"[Warning]: {len(results)} of the {args.jobs} jobs are traced.")
+
+    print(
+        f"\n{'per job':<10}{'wall (s)':>10}{'llm calls':>11}{'llm (s)':>9}{'tool calls':>12}"
+        f"{'tool (s)':>10}{'db ops':>8}{'db (s)':>9}{'scheduler (s)':>15}"
+    )
+    for label, aggregate in (("mean", statistics.mean), ("max", max)):
+        row = {key: aggregate(result[key] for result in results) for key in results[0]}
+        print(
+            f"{label:<10}{row['wall']:>10.3f}{row['llm_calls']:>11.1f}{row['llm']:>9.3f}"
+            f"{row['tool_calls']:>12.1f}{row['tool']:>10.3f}{row['db_ops']:>8.1f}"
+            f"{row['db']:>9.3f}{row['scheduler']:>15.3f}"
+        )
+    print(
+        f"\n{args.jobs} jobs in {total_time:.2f}s ({args.jobs / total_time:.2f} jobs/s, "
+        f"concurrency {args.concurrency}), mean latency {statistics.mean(wall_times):.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
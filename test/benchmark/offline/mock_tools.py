@@ -0,0 +1,33 @@
+import asyncio
+
+from app.core.toolkit.tool import Tool
+
+
+class GraphQuerySimulator(Tool):
+    """Tool simulating a graph query, which sleeps instead of querying a graph database.
+
+    Attributes:
+        latency (float): The simulated seconds per query, shared by all the instances.
+    """
+
+    latency: float = 0.0
+
+    def __init__(self):
+        super().__init__(
+            name=self.query_graph.__name__,
+            description=self.query_graph.__doc__ or "",
+            function=self.query_graph,
+        )
+
+    async def query_graph(self, query: str) -> str:
+        """Run a query on the graph, and get the result.
+
+        Args:
+            query (str): The query to run.
+
+        Returns:
+            str: The result of the query.
+        """
+        if GraphQuerySimulator.latency > 0:
+            await asyncio.sleep(GraphQuerySimulator.latency)
+        return f"The query `{query}` returns 42 vertices."
@@ -0,0 +1,159 @@
+"""Benchmark of the model calls and the wall time of the dual model reasoner per task, with and
+without the thinker deliverable fast path, on the MOCK model platform replaying a generated
+script, with a simulated model latency.
+
+The messages are reported as in production: each one is published to a job event subscriber
+(drained by another thread) and its usage is recorded, and the time spent reporting them is
+measured separately from the wall time.
+
+Usage:
+    python -m test.benchmark.reasoner.benchmark_reasoner_fast_path --tasks 10 --llm-latency 0.2
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import yaml  # type: ignore
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import ModelPlatformType
+from app.core.model.job import SubJob
+from app.core.model.message import ModelMessage
+from app.core.model.task import Task
+from app.core.reasoner.dual_model_reasoner import DualModelReasoner
+from app.core.service.job_event_service import JobEventService, JobEventSubscription
+from app.core.service.memory_service import MemoryService
+from app.core.workflow.operator_config import OperatorConfig
+
+DELIVERABLE = "<deliverable>\nThe graph has 42 vertices.\nTASK_DONE\n</deliverable>"
+
+
+def build_script(work_rounds: List[int]) -> List[Dict]:
+    """Build the mock LLM script of the tasks, which need a number of work rounds before they can
+    be delivered. The thinker delivers the task itself once the fast path prompt is in its system
+    prompt, otherwise it instructs the actor to deliver it."""
+    rules: List[Dict] = []
+    for rounds in sorted(set(work_rounds)):
+        instructions = [
+            f"<instruction>\nQuery the hop {hop}.\n</instruction>" for hop in range(1, rounds + 1)
+        ]
+        actions = [
+            f"<action>\nQueried the hop {hop}: 42 vertices.\n</action>"
+            for hop in range(1, rounds + 1)
+        ]
+        match = f"Query {rounds} hops\\."
+        rules += [
+            {
+                "match": f"{match}.*DIRECT DELIVERABLE",
+                "source_type": "THINKER",
+                "responses": instructions + [DELIVERABLE],
+            },
+            {
+                "match": match,
+                "source_type": "THINKER",
+                "responses": instructions + ["<instruction>\nDeliver the result.\n</instruction>"],
+            },
+            {
+                "match": match,
+                "source_type": "ACTOR",
+                "responses": actions + [f"<action>\nDeliver.\n</action>\n{DELIVERABLE}"],
+            },
+        ]
+    return rules
+
+
+class BenchmarkReasoner(DualModelReasoner):
+    """Dual model reasoner, which counts its model calls and measures the time spent reporting
+    the messages."""
+
+    def __init__(self):
+        super().__init__()
+        self.model_calls = 0
+        self.report_seconds = 0.0
+
+    def _report_message(self, task: Task, message: ModelMessage, print_messages: bool) -> None:
+        self.model_calls += 1
+        start_time = time.perf_counter()
+        super()._report_message(task, message, print_messages)
+        self.report_seconds += time.perf_counter() - start_time
+
+
+def drain(subscription: JobEventSubscription) -> None:
+    """Consume the events of the subscription, as a job event stream does."""
+    for _ in subscription:
+        pass
+
+
+async def run_task(rounds: int, fast_path: bool) -> Dict[str, float]:
+    """Run a task by the reasoner, and measure its model calls, reporting time and wall time."""
+    SystemEnv.ENABLE_THINKER_DELIVERABLE = fast_path
+    reasoner = BenchmarkReasoner()
+    task = Task(
+        job=SubJob(session_id="benchmark", goal="Count the vertices.", original_job_id="benchmark"),
+        operator_config=OperatorConfig(instruction=f"Query {rounds} hops.", actions=[]),
+    )
+    job_event_service: JobEventService = JobEventService.instance
+    subscription = job_event_service.subscribe(original_job_id="benchmark")
+    consumer = threading.Thread(target=drain, args=(subscription,), daemon=True)
+    consumer.start()
+
+    start_time = time.perf_counter()
+    try:
+        await reasoner.infer(task)
+    finally:
+        seconds = time.perf_counter() - start_time
+        job_event_service.unsubscribe(subscription)
+        consumer.join()
+    return {
+        "calls": reasoner.model_calls,
+        "report_ms": reasoner.report_seconds * 1000,
+        "seconds": seconds,
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=10, help="Number of tasks.")
+    parser.add_argument("--max-work-rounds", type=int, default=5, help="Max work rounds.")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per model call.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the tasks.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    work_rounds = [rng.randint(1, args.max_work_rounds) for _ in range(args.tasks)]
+    script_path = Path(tempfile.mkdtemp(prefix="reasoner_benchmark_")) / "script.yml"
+    script_path.write_text(yaml.safe_dump(build_script(work_rounds)), encoding="utf-8")
+
+    SystemEnv.MODEL_PLATFORM_TYPE = ModelPlatformType.MOCK
+    SystemEnv.MOCK_LLM_SCRIPT_PATH = str(script_path)
+    SystemEnv.MOCK_LLM_LATENCY = args.llm_latency
+    SystemEnv.PRINT_SYSTEM_PROMPT = False
+    SystemEnv.PRINT_REASONER_MESSAGES = False
+    SystemEnv.PRINT_REASONER_OUTPUT = False
+    MemoryService.instance or MemoryService()
+    JobEventService.instance or JobEventService()
+
+    print(
+        f"\n{'mode':<12}{'calls/task':>12}{'report ms/task':>16}{'seconds/task':>14}{'speedup':>9}"
+    )
+    baseline: Optional[float] = None
+    for mode, fast_path in {"sequential": False, "fast path": True}.items():
+        results = [asyncio.run(run_task(rounds, fast_path)) for rounds in work_rounds]
+        calls = sum(result["calls"] for result in results) / len(results)
+        report_ms = sum(result["report_ms"] for result in results) / len(results)
+        seconds = sum(result["seconds"] for result in results) / len(results)
+        baseline = baseline or seconds
+        print(
+            f"{mode:<12}{calls:>12.1f}{report_ms:>16.3f}{seconds:>14.3f}{baseline / seconds:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
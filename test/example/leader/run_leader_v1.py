@@ -2,6 +2,7 @@ from typing import List, Optional, cast
 
 from app.core.agent.agent import AgentConfig, Profile
 from app.core.agent.leader import Leader
+from app.core.common.cancellation import CancellationToken
 from app.core.dal.dao.dao_factory import DaoFactory
 from app.core.dal.database import DbSession
 from app.core.model.job import Job, SubJob
@@ -34,6 +35,7 @@ class BaseTestOperator(Operator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         raise NotImplementedError
 
@@ -48,6 +50,7 @@ class NumberGeneratorOperator(BaseTestOperator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         last_line = job.context.strip().split("\n")[-1]
         numbers = [int(x) for x in last_line.split()]
@@ -67,6 +70,7 @@ class MultiplyByTwoOperator(BaseTestOperator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         assert workflow_messages is not None, "Workflow messages should not be None"
         last_line = workflow_messages[-1].scratchpad.strip()
@@ -87,6 +91,7 @@ class AddTenOperator(BaseTestOperator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         assert workflow_messages is not None, "Workflow messages should not be None"
         last_line = workflow_messages[-1].scratchpad.strip()
@@ -107,6 +112,7 @@ class SumOperator(BaseTestOperator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         assert workflow_messages is not None, "Workflow messages should not be None"
         last_line = workflow_messages[-1].scratchpad.strip()
@@ -127,6 +133,7 @@ class FormatResultOperator(BaseTestOperator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         assert workflow_messages is not None, "Workflow messages should not be None"
         result = (
@@ -2,6 +2,7 @@ import asyncio
 import time
 from typing import Any, List, Optional
 
+from app.core.common.cancellation import CancellationToken
 from app.core.common.type import WorkflowStatus
 from app.core.memory.memory import BuiltinMemory, Memory
 from app.core.model.job import Job, SubJob
@@ -56,6 +57,7 @@ class BaseTestOperator(Operator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         raise NotImplementedError
 
@@ -73,6 +75,7 @@ class UpperOperator(BaseTestOperator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         scratchpad_content = ""
         if workflow_messages:
@@ -98,6 +101,7 @@ class AddPrefixOperator(BaseTestOperator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         # to avoid the async issue of UpperOperator
         time.sleep(1)
@@ -126,6 +130,7 @@ class AddSuffixOperator(BaseTestOperator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         scratchpad_content = ""
         if workflow_messages:
@@ -151,6 +156,7 @@ class EvalOperator(BaseTestOperator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         scratchpad_content = ""
         if workflow_messages:
@@ -0,0 +1,60 @@
+import asyncio
+from typing import Dict
+
+import pytest
+
+from app.core.common.system_env import SystemEnv
+from app.plugin.lite_llm.request_limiter import RequestLimiter
+
+
+@pytest.mark.asyncio
+async def test_request_limiter_caps_concurrency_per_provider():
+    """Test the in-flight requests are capped per provider, and the providers are independent."""
+    original = SystemEnv.LLM_MAX_CONCURRENCY_PER_PROVIDER
+    SystemEnv.LLM_MAX_CONCURRENCY_PER_PROVIDER = 2
+    try:
+        limiter = RequestLimiter()
+        in_flight: Dict[str, int] = {"openai": 0, "anthropic": 0}
+        max_in_flight: Dict[str, int] = {"openai": 0, "anthropic": 0}
+
+        async def request(provider: str) -> None:
+            async with limiter.limit(provider):
+                in_flight[provider] += 1
+                max_in_flight[provider] = max(max_in_flight[provider], in_flight[provider])
+                await asyncio.sleep(0.01)
+                in_flight[provider] -= 1
+
+        await asyncio.gather(
+            *[request("openai") for _ in range(6)], *[request("anthropic") for _ in range(2)]
+        )
+    finally:
+        SystemEnv.LLM_MAX_CONCURRENCY_PER_PROVIDER = original
+
+    assert max_in_flight == {"openai": 2, "anthropic": 2}
+
+
+@pytest.mark.asyncio
+async def test_request_limiter_waits_for_rate_limit(monkeypatch):
+    """Test the requests over the per-minute limit wait until the window moves."""
+    now = 1000.0
+    sleeps = []
+
+    async def fake_sleep(seconds: float) -> None:
+        nonlocal now
+        sleeps.append(seconds)
+        now += seconds
+
+    monkeypatch.setattr("app.plugin.lite_llm.request_limiter.time.monotonic", lambda: now)
+    monkeypatch.setattr("app.plugin.lite_llm.request_limiter.asyncio.sleep", fake_sleep)
+
+    original = SystemEnv.LLM_MAX_REQUESTS_PER_MINUTE_PER_PROVIDER
+    SystemEnv.LLM_MAX_REQUESTS_PER_MINUTE_PER_PROVIDER = 2
+    try:
+        limiter = RequestLimiter()
+        for _ in range(3):
+            async with limiter.limit("openai"):
+                pass
+    finally:
+        SystemEnv.LLM_MAX_REQUESTS_PER_MINUTE_PER_PROVIDER = original
+
+    assert sleeps == [60.0]
@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import FunctionCallStatus, MessageSourceType, ModelPlatformType
+from app.core.model.message import ModelMessage
+from app.core.reasoner.model_service_factory import ModelServiceFactory
+from app.core.toolkit.tool import Tool
+from app.plugin.mock.mock_llm_client import MockLlmClient
+
+SCRIPT = """
+- match: "Count the vertices"
+  source_type: "THINKER"
+  responses:
+    - "<instruction>\\nCount the vertices.\\n</instruction>"
+    - "<instruction>\\nDeliver the count.\\n</instruction>"
+- match: "Count the vertices"
+  source_type: "ACTOR"
+  completion_tokens: 50
+  responses:
+    - |
+      <action>
+      <function_call>
+      {"name": "count_vertices", "call_objective": "count", "args": {"label": "Person"}}
+      </function_call>
+      </action>
+    - "<action>\\nDone.\\n</action>\\n<deliverable>\\n42\\nTASK_DONE\\n</deliverable>"
+"""
+
+
+def count_vertices(label: str) -> str:
+    """Count the vertices of the label."""
+    return f"42 {label} vertices"
+
+
+@pytest.fixture
+def mock_client(tmp_path: Path):
+    """Create a mock LLM client replaying the script, with a simulated latency."""
+    script_path = tmp_path / "script.yml"
+    script_path.write_text(SCRIPT, encoding="utf-8")
+    original_script_path, original_latency = (
+        SystemEnv.MOCK_LLM_SCRIPT_PATH,
+        SystemEnv.MOCK_LLM_LATENCY,
+    )
+    SystemEnv.MOCK_LLM_SCRIPT_PATH = str(script_path)
+    SystemEnv.MOCK_LLM_LATENCY = 0.01
+    try:
+        client = ModelServiceFactory.create(model_platform_type=ModelPlatformType.MOCK)
+    finally:
+        SystemEnv.MOCK_LLM_SCRIPT_PATH = original_script_path
+        SystemEnv.MOCK_LLM_LATENCY = original_latency
+    assert isinstance(client, MockLlmClient)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_scripted_responses_are_replayed_by_round(mock_client: MockLlmClient):
+    """Test the thinker and the actor replay the responses of their rounds, and the scripted
+    function calls are called."""
+    tool = Tool(name="count_vertices", description="Count the vertices.", function=count_vertices)
+    messages = [
+        ModelMessage(
+            payload="<action>\nEmpty\n</action>",
+            job_id="job",
+            step=1,
+            source_type=MessageSourceType.ACTOR,
+        )
+    ]
+    sys_prompt = "TASK: Count the vertices of the graph."
+
+    thinker_response = await mock_client.generate(sys_prompt=sys_prompt, messages=messages)
+    assert thinker_response.get_source_type() == MessageSourceType.THINKER
+    assert thinker_response.get_step() == 2
+    assert "Count the vertices." in thinker_response.get_payload()
+    messages.append(thinker_response)
+
+    actor_response = await mock_client.generate(
+        sys_prompt=sys_prompt, messages=messages, tools=[tool]
+    )
+    assert actor_response.get_source_type() == MessageSourceType.ACTOR
+    func_call_results = actor_response.get_function_calls()
+    assert func_call_results and len(func_call_results) == 1
+    assert func_call_results[0].status == FunctionCallStatus.SUCCEEDED
+    assert func_call_results[0].output == "42 Person vertices"
+    usage = actor_response.get_usage()
+    assert usage and usage.completion_tokens == 50 and usage.prompt_tokens > 0
+    assert usage.duration >= 0.01
+    messages.append(actor_response)
+
+    # the second round, and the last response is repeated in the later rounds
+    for _ in range(2):
+        thinker_response = await mock_client.generate(sys_prompt=sys_prompt, messages=messages)
+        assert "Deliver the count." in thinker_response.get_payload()
+        messages.append(thinker_response)
+        actor_response = await mock_client.generate(sys_prompt=sys_prompt, messages=messages)
+        assert "<deliverable>\n42\nTASK_DONE\n</deliverable>" in actor_response.get_payload()
+        messages.append(actor_response)
+
+
+@pytest.mark.asyncio
+async def test_unmatched_requests_are_delivered(mock_client: MockLlmClient):
+    """Test the requests matched by no rule get the default response, which delivers the task."""
+    response = await mock_client.generate(
+        sys_prompt="Another task.",
+        messages=[ModelMessage(payload="<action>\nEmpty\n</action>", job_id="job", step=1)],
+    )
+    assert response.get_source_type() == MessageSourceType.MODEL
+    assert "TASK_DONE" in response.get_payload()
+    assert response.get_function_calls() is None
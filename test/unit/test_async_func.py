@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+from app.core.common.async_func import EventLoopRunner
+
+
+async def _current_loop() -> asyncio.AbstractEventLoop:
+    await asyncio.sleep(0)
+    return asyncio.get_running_loop()
+
+
+def test_event_loop_runner_reuses_the_thread_loop():
+    """Test the calls of a thread are run on the same persistent event loop."""
+    runner = EventLoopRunner()
+    loop_1 = runner.run(_current_loop())
+    loop_2 = runner.run(_current_loop())
+    assert loop_1 is loop_2
+    assert not loop_1.is_closed()
+
+    # another thread owns another event loop
+    other_loops = []
+    thread = threading.Thread(target=lambda: other_loops.append(runner.run(_current_loop())))
+    thread.start()
+    thread.join()
+    assert other_loops[0] is not loop_1
+
+
+def test_event_loop_runner_runs_nested_calls():
+    """Test the sync code called by a coroutine can run another coroutine to completion."""
+    runner = EventLoopRunner()
+
+    def retrieve() -> asyncio.AbstractEventLoop:
+        # sync code which runs a coroutine, e.g. the knowledge retrieval of an operator
+        return runner.run(_current_loop())
+
+    async def execute():
+        return asyncio.get_running_loop(), retrieve()
+
+    outer_loop, inner_loop = runner.run(execute())
+    assert outer_loop is not inner_loop
+    assert runner.run(_current_loop()) is outer_loop
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.common.async_func import BackgroundEventLoop
+from app.core.common.cancellation import CancellationToken, JobCancelledError
+
+
+def test_cancellation_token_aborts_in_flight_awaitable():
+    """Test cancelling the token from another thread aborts the awaitable it runs, including the
+    coroutine running in a background event loop (e.g. the LLM request)."""
+    token = CancellationToken()
+    background_loop = BackgroundEventLoop()
+    request_cancelled = threading.Event()
+
+    async def request() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            request_cancelled.set()
+            raise
+        return "response"
+
+    threading.Timer(0.1, token.cancel, kwargs={"reason": "stopped by the user"}).start()
+    start_time = time.perf_counter()
+    with pytest.raises(JobCancelledError, match="stopped by the user"):
+        asyncio.run(token.run(background_loop.run_async(request())))
+    assert time.perf_counter() - start_time < 1
+    assert request_cancelled.wait(timeout=1)
+    background_loop.stop()
+
+    # a cancelled token aborts the later awaitables without running them
+    with pytest.raises(JobCancelledError):
+        asyncio.run(token.run(request()))
+    with pytest.raises(JobCancelledError):
+        token.raise_if_cancelled()
+
+
+def test_cancellation_token_does_not_affect_completed_awaitable():
+    """Test the awaitable completed before the cancellation keeps its result."""
+    token = CancellationToken()
+
+    async def request() -> str:
+        return "response"
+
+    assert asyncio.run(token.run(request())) == "response"
+    token.cancel()
+    token.cancel()
+    assert token.cancelled
+    assert not token._callbacks
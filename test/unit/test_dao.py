@@ -0,0 +1,458 @@
+import gc
+import threading
+import time
+from typing import Generator, List
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import ChatMessageRole, JobStatus, MessageSourceType
+from app.core.dal.dao.dao import unit_of_work
+from app.core.dal.dao.file_descriptor_dao import FileDescriptorDao
+from app.core.dal.dao.job_dao import JobDao
+from app.core.dal.dao.job_graph_dao import JobGraphDao
+from app.core.dal.dao.message_dao import MessageDao
+from app.core.dal.database import Do
+from app.core.model.job import Job, SubJob
+from app.core.model.job_graph import JobGraph
+from app.core.model.job_result import JobResult, ModelUsage
+from app.core.model.message import (
+    AgentMessage,
+    HybridMessage,
+    ModelMessage,
+    TextMessage,
+    WorkflowMessage,
+)
+from app.core.model.task import MemoryKey
+from app.core.service.job_event_service import JobEventService
+from app.core.service.job_service import JobService
+from app.core.service.memory_service import MemoryService
+from app.core.service.message_service import MessageService
+from app.core.toolkit.tool import FunctionCallResult
+
+
+@pytest.fixture
+def statements() -> Generator[List[str], None, None]:
+    """Bind the DAOs to an in-memory database, and record the executed statements."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Do.metadata.create_all(engine)
+    executed: List[str] = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: executed.append(statement.split()[0]),
+    )
+    event.listen(engine, "commit", lambda conn: executed.append("COMMIT"))
+
+    db_session = sessionmaker(autocommit=False, autoflush=True, bind=engine)
+    read_session = db_session()
+    # the services reach the job event service by its singleton instance
+    JobEventService.instance or JobEventService()
+    job_dao = JobDao(read_session)
+    job_graph_dao = JobGraphDao(read_session)
+    message_dao = MessageDao(read_session)
+    file_descriptor_dao = FileDescriptorDao(read_session)
+    with (
+        patch("app.core.dal.dao.dao.DbSession", db_session),
+        patch.object(job_dao, "_session", read_session),
+        patch.object(job_graph_dao, "_session", read_session),
+        patch.object(message_dao, "_session", read_session),
+        patch.object(file_descriptor_dao, "_session", read_session),
+    ):
+        yield executed
+    read_session.close()
+    engine.dispose()
+
+
+def _subjob(id: str, goal: str = "goal", original_job_id: str = "job") -> SubJob:
+    return SubJob(
+        id=id,
+        session_id="session",
+        goal=goal,
+        context="context",
+        original_job_id=original_job_id,
+        expert_id="expert",
+    )
+
+
+def test_save_job_upserts_in_one_statement(statements: List[str]):
+    """Test saving a job inserts or updates it without reading it first."""
+    job_dao: JobDao = JobDao.instance
+
+    job_dao.save_job(job=_subjob("subjob"))
+    assert job_dao.get_job_by_id("subjob").goal == "goal"
+
+    statements.clear()
+    job_dao.save_job(job=_subjob("subjob", goal="new goal"))
+    assert statements == ["INSERT", "COMMIT"]
+
+    # the cached copy of the read session is expired by the write
+    assert job_dao.get_job_by_id("subjob").goal == "new goal"
+
+    statements.clear()
+    job_do = job_dao.save_job_result(
+        JobResult(job_id="subjob", status=JobStatus.FINISHED, duration=1.0, tokens=10)
+    )
+    assert statements == ["UPDATE", "COMMIT"]
+    assert job_do.status == JobStatus.FINISHED.value
+
+
+def test_upsert_keeps_server_defaults(statements: List[str]):
+    """Test the unset columns with server defaults (e.g. the message timestamps) are filled by the
+    database on insert, and are still written on update."""
+    message_dao: MessageDao = MessageDao.instance
+    text_message = TextMessage(payload="text", job_id="job", session_id="session")
+    assert text_message.get_timestamp() is None
+
+    message_dao.save_message(text_message)
+    saved_message = message_dao.get_message(text_message.get_id())
+    assert saved_message.get_timestamp() is not None
+
+    message_dao.save_message(
+        TextMessage(
+            id=text_message.get_id(),
+            payload="new text",
+            job_id="job",
+            session_id="session",
+            timestamp=saved_message.get_timestamp() + 1,
+        )
+    )
+    updated_message = message_dao.get_message(text_message.get_id())
+    assert updated_message.get_payload() == "new text"
+    assert updated_message.get_timestamp() == saved_message.get_timestamp() + 1
+
+
+def test_unit_of_work_commits_once(statements: List[str]):
+    """Test the writes of a unit of work share one transaction, and are rolled back on error."""
+    job_dao: JobDao = JobDao.instance
+
+    with unit_of_work():
+        job_dao.save_job(job=Job(id="job", session_id="session", goal="goal"))
+        job_dao.save_job(job=_subjob("subjob_1"))
+        # the reads in the unit of work see its pending writes
+        assert job_dao.get_job_by_id("subjob_1").goal == "goal"
+        job_dao.save_job(job=_subjob("subjob_2"))
+    assert statements.count("COMMIT") == 1
+    assert statements.count("INSERT") == 3
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            job_dao.save_job(job=_subjob("subjob_3"))
+            raise RuntimeError("failed")
+    with pytest.raises(ValueError):
+        job_dao.get_job_by_id("subjob_3")
+
+
+def test_job_graph_is_saved_incrementally(statements: List[str]):
+    """Test only the changed vertices and edges of the job graph are written."""
+    job_service: JobService = JobService.instance or JobService()
+    job_service._job_graphs.clear()
+    job_service.save_job(Job(id="job", session_id="session", goal="goal"))
+    for id in ["a", "b", "c"]:
+        job_service.save_job(_subjob(id))
+
+    job_graph = job_service.get_job_graph("job")
+    job_graph.add_vertex("a")
+    job_graph.add_vertex("b")
+    job_graph.add_edge("a", "b")
+    job_service.set_job_graph("job", job_graph)
+
+    statements.clear()
+    job_graph = job_service.get_job_graph("job")
+    job_graph.remove_vertex("b")
+    job_graph.add_vertex("c")
+    job_graph.add_edge("a", "c")
+    job_service.set_job_graph("job", job_graph)
+    # no read, and no rewrite of the unchanged vertex
+    assert "SELECT" not in statements
+    assert statements.count("INSERT") == 2
+    assert statements.count("COMMIT") == 1
+
+    # the cached job graph is a copy, and matches the saved job graph
+    job_graph.add_vertex("d")
+    assert job_service.get_job_graph("job").edges() == [("a", "c")]
+    assert JobGraphDao.instance.get_job_graph("job").edges() == [("a", "c")]
+
+
+def test_job_graph_is_migrated_from_json(statements: List[str]):
+    """Test the job graph saved as a JSON string is migrated to the vertex and edge tables."""
+    job_service: JobService = JobService.instance or JobService()
+    job_service._job_graphs.clear()
+    legacy_job_graph = JobGraph()
+    legacy_job_graph.add_vertex("a")
+    legacy_job_graph.add_vertex("b")
+    legacy_job_graph.add_edge("a", "b")
+    JobDao.instance.create(
+        id="legacy_job", session_id="session", goal="goal", dag=legacy_job_graph.to_json_str()
+    )
+
+    assert job_service.get_job_graph("legacy_job").edges() == [("a", "b")]
+    assert JobGraphDao.instance.get_job_graph("legacy_job").edges() == [("a", "b")]
+    assert JobDao.instance.get_by_id("legacy_job").dag is None
+
+
+def test_replace_subgraph_keeps_concurrent_updates(statements: List[str]):
+    """Test the subgraph replacement reads the job graph under the lock, so a subjob added
+    concurrently is not lost."""
+    job_service: JobService = JobService.instance or JobService()
+    job_service._job_graphs.clear()
+    job_service.save_job(Job(id="job", session_id="session", goal="goal"))
+    for id in ["a", "b", "b_1"]:
+        job_service.save_job(_subjob(id))
+    job_graph = job_service.get_job_graph("job")
+    job_graph.add_vertex("a")
+    job_graph.add_vertex("b")
+    job_graph.add_edge("a", "b")
+    job_service.set_job_graph("job", job_graph)
+
+    get_job_graph = job_service.get_job_graph
+    adders: List[threading.Thread] = []
+
+    def get_job_graph_and_add_subjob(original_job_id: str) -> JobGraph:
+        job_graph = get_job_graph(original_job_id)
+        if not adders:
+            # another subjob is added once the replacement has read the job graph
+            adder = threading.Thread(
+                target=job_service.add_subjob,
+                kwargs={"original_job_id": "job", "job": _subjob("c"), "expert_id": "expert"},
+            )
+            adders.append(adder)
+            adder.start()
+            adder.join(timeout=0.2)
+        return job_graph
+
+    old_subgraph, new_subgraph = JobGraph(), JobGraph()
+    old_subgraph.add_vertex("b")
+    new_subgraph.add_vertex("b_1")
+    with patch.object(job_service, "get_job_graph", side_effect=get_job_graph_and_add_subjob):
+        job_service.replace_subgraph("job", new_subgraph=new_subgraph, old_subgraph=old_subgraph)
+        adders[0].join(timeout=5)
+
+    job_graph = job_service.get_job_graph("job")
+    assert sorted(job_graph.vertices()) == ["a", "b_1", "c"]
+    assert job_graph.edges() == [("a", "b_1")]
+    assert sorted(JobGraphDao.instance.get_job_graph("job").vertices()) == ["a", "b_1", "c"]
+
+
+def _save_conversation(job_id: str, subjob_count: int) -> None:
+    """Save a finished job, with its question, answer and thinking chain."""
+    job_dao: JobDao = JobDao.instance
+    message_dao: MessageDao = MessageDao.instance
+    job_dao.save_job(job=Job(id=job_id, session_id="session", goal="goal"))
+    job_dao.save_job_result(JobResult(job_id=job_id, status=JobStatus.FINISHED))
+    for role in [ChatMessageRole.USER, ChatMessageRole.SYSTEM]:
+        text_message = TextMessage(
+            payload="text", job_id=job_id, session_id="session", role=role, timestamp=0
+        )
+        message_dao.save_message(text_message)
+        message_dao.save_message(
+            HybridMessage(
+                instruction_message=text_message,
+                job_id=job_id,
+                session_id="session",
+                role=role,
+                timestamp=0,
+            )
+        )
+    for i in range(subjob_count):
+        subjob_id = f"{job_id}_subjob_{i}"
+        job_dao.save_job(job=_subjob(subjob_id, original_job_id=job_id))
+        workflow_message = WorkflowMessage(payload={"step": i}, job_id=subjob_id, timestamp=i)
+        message_dao.save_message(workflow_message)
+        message_dao.save_message(
+            AgentMessage(
+                job_id=subjob_id,
+                payload=f"thinking {i}",
+                workflow_messages=[workflow_message],
+                timestamp=i,
+            )
+        )
+
+
+def test_conversation_views_are_loaded_in_constant_queries(statements: List[str]):
+    """Test the conversation views are loaded in the same number of queries, however many jobs
+    and subjobs there are."""
+    job_service: JobService = JobService.instance or JobService()
+    for i in range(10):
+        _save_conversation(f"job_{i}", subjob_count=i)
+
+    statements.clear()
+    with patch.object(job_service, "_message_service", MessageService.instance or MessageService()):
+        views = job_service.get_conversation_views([f"job_{i}" for i in range(1, 10)])
+        query_count = len(statements)
+
+        statements.clear()
+        job_service.get_conversation_view("job_1")
+        assert len(statements) == query_count <= 10
+
+    assert [len(view.thinking_messages) for view in views] == list(range(1, 10))
+    assert views[3].thinking_messages[2].get_payload() == "thinking 2"
+    assert views[3].thinking_messages[2].get_workflow_messages()[0].get_payload() == {"step": 2}
+    assert views[3].question.get_instruction_message().get_payload() == "text"
+    assert views[3].answer.get_role() == ChatMessageRole.SYSTEM
+
+
+def test_wait_job_result_is_notified(statements: List[str]):
+    """Test the waiter of a job is woken up once the job reaches a final status, without
+    polling the job result."""
+    job_service: JobService = JobService.instance or JobService()
+    job_service.save_job(Job(id="job", session_id="session", goal="goal"))
+
+    def finish() -> None:
+        time.sleep(0.2)
+        job_service.save_job_result(JobResult(job_id="job", status=JobStatus.RUNNING))
+        job_service.save_job_result(JobResult(job_id="job", status=JobStatus.FINISHED))
+
+    statements.clear()
+    thread = threading.Thread(target=finish)
+    start_time = time.perf_counter()
+    thread.start()
+    job_result = job_service.wait_job_result("job", timeout=5)
+    assert time.perf_counter() - start_time < 1
+    assert job_result.status == JobStatus.FINISHED
+    # one read before the wait, and one read after the notification
+    assert statements.count("SELECT") == 2
+    thread.join()
+
+    job_service.save_job(Job(id="unfinished_job", session_id="session", goal="goal"))
+    with pytest.raises(TimeoutError):
+        job_service.wait_job_result("unfinished_job", timeout=0.05)
+    assert not job_service._waiting_job_ids
+
+
+def test_job_status_changes_are_published(statements: List[str]):
+    """Test the saved job results are published to the subscribers of the original job."""
+    job_service: JobService = JobService.instance or JobService()
+    job_service.save_job(Job(id="job", session_id="session", goal="goal"))
+    job_service.save_job(_subjob("subjob"))
+
+    subscription = JobEventService().subscribe(original_job_id="job")
+    job_service.save_job_result(JobResult(job_id="subjob", status=JobStatus.FINISHED))
+    job_service.save_job_result(JobResult(job_id="job", status=JobStatus.FINISHED))
+
+    assert [(event.job_id, event.get_status()) for event in subscription] == [
+        ("subjob", JobStatus.FINISHED),
+        ("job", JobStatus.FINISHED),
+    ]
+
+
+def test_model_usages_are_rolled_up_into_job_results(statements: List[str]):
+    """Test the model usages of the operators are rolled up into the subjob results, and the
+    subjob tokens into the original job result, once per run."""
+    job_service: JobService = JobService.instance or JobService()
+    job_service.save_job(Job(id="job", session_id="session", goal="goal"))
+    job_service.save_job(_subjob("subjob"))
+
+    job_service.save_job_result(JobResult(job_id="job", status=JobStatus.RUNNING))
+    job_service.record_model_usage("job", "decomposition", ModelUsage(10, 5))
+    job_service.save_job_result(JobResult(job_id="subjob", status=JobStatus.RUNNING))
+    job_service.record_model_usage("subjob", "operator_1", ModelUsage(100, 20, duration=1.0))
+    job_service.record_model_usage("subjob", "operator_1", ModelUsage(200, 30, duration=2.0))
+    job_service.record_model_usage("subjob", "operator_2", ModelUsage(50, 10))
+
+    operator_usages = job_service.get_model_usages("subjob")
+    assert operator_usages["operator_1"] == ModelUsage(300, 50, duration=3.0, calls=2)
+    assert operator_usages["operator_2"].total_tokens == 60
+
+    job_service.save_job_result(JobResult(job_id="subjob", status=JobStatus.FINISHED))
+    subjob_result = job_service.get_job_result("subjob")
+    assert subjob_result.tokens == 410
+    assert subjob_result.duration > 0
+    assert not job_service.get_model_usages("subjob")
+
+    job_service.save_job_result(JobResult(job_id="job", status=JobStatus.FINISHED))
+    assert job_service.get_job_result("job").tokens == 425
+
+    # saving the final result again does not count the tokens twice
+    job_result = job_service.get_job_result("job")
+    job_service.save_job_result(job_result)
+    assert job_service.get_job_result("job").tokens == 425
+
+
+def test_late_model_usages_are_dropped(statements: List[str]):
+    """Test the model usages recorded after the job reaches a final status are dropped, instead
+    of being kept forever."""
+    job_service: JobService = JobService.instance or JobService()
+    job_service.save_job(Job(id="job", session_id="session", goal="goal"))
+    job_service.save_job(_subjob("subjob"))
+
+    job_service.save_job_result(JobResult(job_id="job", status=JobStatus.RUNNING))
+    job_service.save_job_result(JobResult(job_id="subjob", status=JobStatus.RUNNING))
+    job_service.save_job_result(JobResult(job_id="job", status=JobStatus.STOPPED))
+
+    # the subjob finishes after its original job is stopped
+    job_service.record_model_usage("subjob", "operator", ModelUsage(100, 20))
+    job_service.save_job_result(JobResult(job_id="subjob", status=JobStatus.FINISHED))
+    assert job_service.get_job_result("subjob").tokens == 120
+
+    # a model call finishes after the final status is saved
+    job_service.record_model_usage("subjob", "operator", ModelUsage(100, 20))
+    job_service.record_model_usage("job", "decomposition", ModelUsage(10, 5))
+
+    assert not job_service._model_usages
+    assert not job_service._subjob_tokens
+    assert not job_service._job_start_times
+    assert job_service.get_job_result("job").tokens == 0
+
+
+@pytest.mark.asyncio
+async def test_reasoner_memories_are_spilled_and_released(statements: List[str]):
+    """Test the evicted reasoner memories are spilled to the message table and loaded back, and
+    the memories of a job are released once the original job is finished."""
+    job_service: JobService = JobService.instance or JobService()
+    memory_service: MemoryService = MemoryService.instance or MemoryService()
+    if not MessageService.instance:
+        MessageService()
+    original = (SystemEnv.ENABLE_MEMFUSE, SystemEnv.ENABLE_MEMORY_SPILL, SystemEnv.MEMORY_TTL)
+    SystemEnv.ENABLE_MEMFUSE = False
+    SystemEnv.ENABLE_MEMORY_SPILL = True
+    try:
+        job_service.save_job(Job(id="job", session_id="session", goal="goal"))
+        job_service.add_subjob(original_job_id="job", job=_subjob("subjob"), expert_id="expert")
+        memory = await memory_service.get_or_create_reasoner_memory(
+            MemoryKey(job_id="subjob", operator_id="operator")
+        )
+        memory.add_message(ModelMessage(payload="init", job_id="subjob", step=1))
+        memory.add_message(
+            ModelMessage(
+                payload="query",
+                job_id="subjob",
+                step=2,
+                source_type=MessageSourceType.ACTOR,
+                function_calls=[
+                    FunctionCallResult(
+                        func_name="query", func_args={"n": 1}, call_objective="q", output="rows"
+                    )
+                ],
+            )
+        )
+
+        # evict the memory, which is not used any more
+        SystemEnv.MEMORY_TTL = 0.01
+        del memory
+        gc.collect()
+        time.sleep(0.02)
+        await memory_service.get_or_create_reasoner_memory(
+            MemoryKey(job_id="other_job", operator_id="operator")
+        )
+        SystemEnv.MEMORY_TTL = original[2]
+        assert memory_service.get_metrics()["spilled_memories"] >= 1
+
+        memory = await memory_service.get_or_create_reasoner_memory(
+            MemoryKey(job_id="subjob", operator_id="operator")
+        )
+        messages = memory.get_messages()
+        assert [message.get_payload() for message in messages] == ["init", "query"]
+        assert messages[1].get_source_type() == MessageSourceType.ACTOR
+        assert messages[1].get_function_calls()[0].output == "rows"
+
+        job_service.save_job_result(JobResult(job_id="job", status=JobStatus.FINISHED))
+        assert memory_service.get_memory_usage(job_ids=["job", "subjob"])["memories"] == 0
+    finally:
+        SystemEnv.ENABLE_MEMFUSE, SystemEnv.ENABLE_MEMORY_SPILL, SystemEnv.MEMORY_TTL = original
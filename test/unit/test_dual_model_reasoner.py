@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock
 
 import pytest
 
+from app.core.common.system_env import SystemEnv
 from app.core.common.type import MessageSourceType
 from app.core.model.job import SubJob
 from app.core.model.message import ModelMessage
@@ -160,3 +161,27 @@ async def test_infer_without_operator(mock_reasoner: DualModelReasoner, task: Ta
     reasoner_memory = await mock_reasoner.get_memory(memory_key=task.get_reasoner_memory_key())
     messages = reasoner_memory.get_messages()
     assert len(messages) == 201
+
+
+@pytest.mark.asyncio
+async def test_infer_thinker_deliverable(mock_reasoner: DualModelReasoner, task: Task):
+    """Test the thinker delivers the task without an actor round, once it is enabled."""
+    mock_reasoner._thinker_model.generate = AsyncMock(
+        return_value=ModelMessage(
+            payload="<deliverable>\nDelivered by the thinker\nTASK_DONE\n</deliverable>",
+            job_id=job_id,
+            step=2,
+        )
+    )
+    original_thinker_deliverable = SystemEnv.ENABLE_THINKER_DELIVERABLE
+    SystemEnv.ENABLE_THINKER_DELIVERABLE = True
+    try:
+        result = await mock_reasoner.infer(task=task)
+        thinker_sys_prompt = mock_reasoner._format_thinker_sys_prompt(task=task)
+    finally:
+        SystemEnv.ENABLE_THINKER_DELIVERABLE = original_thinker_deliverable
+
+    assert result.strip() == "Delivered by the thinker"
+    assert "DIRECT DELIVERABLE" in thinker_sys_prompt
+    assert mock_reasoner._thinker_model.generate.call_count == 1
+    assert not mock_reasoner._actor_model.generate.called
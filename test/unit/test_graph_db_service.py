@@ -0,0 +1,154 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import GraphDbType
+from app.core.model.graph_db_config import Neo4jDbConfig
+from app.core.service.graph_db_service import GraphDbService
+
+
+def _config(host: str = "localhost", id: str = "test_graph_db_id") -> Neo4jDbConfig:
+    return Neo4jDbConfig(id=id, type=GraphDbType.NEO4J, name="test", host=host, port=7687)
+
+
+def test_graph_db_is_cached_and_invalidated():
+    """Test the graph db is shared across calls, and rebuilt after invalidation."""
+    service = GraphDbService.instance or GraphDbService()
+    service.close_all_graph_dbs()
+
+    with patch(
+        "app.core.service.graph_db_service.GraphDbFactory.get_graph_db",
+        side_effect=lambda graph_db_type, config: MagicMock(),
+    ) as mock_get_graph_db:
+        graph_db_1 = service.get_graph_db(_config())
+        graph_db_2 = service.get_graph_db(_config())
+        assert graph_db_1 is graph_db_2
+        assert mock_get_graph_db.call_count == 1
+
+        # connection config changed, so the old driver is closed and a new one is built
+        graph_db_3 = service.get_graph_db(_config(host="127.0.0.1"))
+        assert graph_db_3 is not graph_db_1
+        graph_db_1.close.assert_called_once()
+
+        service.invalidate_graph_db("test_graph_db_id")
+        graph_db_3.close.assert_called_once()
+        assert service.get_graph_db(_config(host="127.0.0.1")) is not graph_db_3
+        assert mock_get_graph_db.call_count == 3
+
+    service.close_all_graph_dbs()
+
+
+def test_unhealthy_graph_db_is_rebuilt():
+    """Test the cached graph db is rebuilt when it fails the health check."""
+    service = GraphDbService.instance or GraphDbService()
+    service.close_all_graph_dbs()
+
+    original_interval = SystemEnv.GRAPH_DB_HEALTH_CHECK_INTERVAL
+    SystemEnv.GRAPH_DB_HEALTH_CHECK_INTERVAL = -1
+    try:
+        with patch(
+            "app.core.service.graph_db_service.GraphDbFactory.get_graph_db",
+            side_effect=lambda graph_db_type, config: MagicMock(),
+        ):
+            graph_db = service.get_graph_db(_config())
+            graph_db.is_healthy.return_value = True
+            assert service.get_graph_db(_config()) is graph_db
+
+            graph_db.is_healthy.return_value = False
+            assert service.get_graph_db(_config()) is not graph_db
+            graph_db.close.assert_called_once()
+    finally:
+        SystemEnv.GRAPH_DB_HEALTH_CHECK_INTERVAL = original_interval
+        service.close_all_graph_dbs()
+
+
+def test_health_check_does_not_block_other_graph_dbs():
+    """Test a slow health check runs outside the registry lock, so the other graph dbs are still
+    served, and the driver evicted after it fails is closed."""
+    service = GraphDbService.instance or GraphDbService()
+    service.close_all_graph_dbs()
+
+    original_interval = SystemEnv.GRAPH_DB_HEALTH_CHECK_INTERVAL
+    SystemEnv.GRAPH_DB_HEALTH_CHECK_INTERVAL = -1
+    health_check_started, health_check_released = threading.Event(), threading.Event()
+
+    def slow_health_check() -> bool:
+        health_check_started.set()
+        health_check_released.wait(timeout=5)
+        return False
+
+    try:
+        with patch(
+            "app.core.service.graph_db_service.GraphDbFactory.get_graph_db",
+            side_effect=lambda graph_db_type, config: MagicMock(),
+        ):
+            slow_graph_db = service.get_graph_db(_config())
+            slow_graph_db.is_healthy.side_effect = slow_health_check
+            checker = threading.Thread(target=service.get_graph_db, args=(_config(),))
+            checker.start()
+            assert health_check_started.wait(timeout=5)
+
+            other_config = _config(id="other_graph_db_id")
+            other_graph_db = service.get_graph_db(other_config)
+            assert service.get_graph_db(other_config) is other_graph_db
+            slow_graph_db.close.assert_not_called()
+
+            health_check_released.set()
+            checker.join(timeout=5)
+            slow_graph_db.close.assert_called_once()
+    finally:
+        health_check_released.set()
+        SystemEnv.GRAPH_DB_HEALTH_CHECK_INTERVAL = original_interval
+        service.close_all_graph_dbs()
+
+
+def test_only_connection_updates_rebuild_graph_db():
+    """Test updating the name of a graph db keeps its cached driver, and updating its host
+    rebuilds it."""
+    service = GraphDbService.instance or GraphDbService()
+    service.close_all_graph_dbs()
+
+    graph_db_do = SimpleNamespace(
+        id="test_graph_db_id",
+        create_time=0,
+        update_time=0,
+        type=GraphDbType.NEO4J.value,
+        name="test",
+        desc="",
+        host="localhost",
+        port=7687,
+        user=None,
+        pwd=None,
+        default_schema=None,
+        is_default_db=True,
+        schema_metadata=None,
+    )
+    graph_db_dao = MagicMock()
+    graph_db_dao.get_by_id.return_value = graph_db_do
+    graph_db_dao.update.side_effect = lambda id, **fields: SimpleNamespace(
+        **{**vars(graph_db_do), **fields}
+    )
+
+    with (
+        patch.object(service, "_graph_db_dao", graph_db_dao),
+        patch(
+            "app.core.service.graph_db_service.GraphDbFactory.get_graph_db",
+            side_effect=lambda graph_db_type, config: MagicMock(),
+        ),
+    ):
+        graph_db = service.get_graph_db(_config())
+
+        renamed_config = _config()
+        renamed_config.name = "renamed"
+        renamed_config.is_default_db = True
+        assert service.update_graph_db_config(renamed_config).name == "renamed"
+        graph_db.close.assert_not_called()
+        assert service.get_graph_db(_config()) is graph_db
+
+        moved_config = _config(host="127.0.0.1")
+        moved_config.is_default_db = True
+        service.update_graph_db_config(moved_config)
+        graph_db.close.assert_called_once()
+
+    service.close_all_graph_dbs()
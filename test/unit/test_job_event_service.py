@@ -0,0 +1,104 @@
+import threading
+from typing import List
+from unittest.mock import MagicMock
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobEventType, JobStatus
+from app.core.model.job import Job, SubJob
+from app.core.model.job_event import JobEvent
+from app.core.model.job_result import JobResult
+from app.core.service.job_event_service import JobEventService
+from app.server.manager.job_manager import JobManager
+
+
+def _status_event(job_id: str, status: JobStatus, original_job_id: str = "job") -> JobEvent:
+    return JobEvent(
+        type=JobEventType.JOB_STATUS_CHANGED,
+        original_job_id=original_job_id,
+        job_id=job_id,
+        payload={"status": status.value},
+    )
+
+
+def test_job_events_are_pushed_until_the_job_is_final():
+    """Test the subscribers receive the events of their job in order, until the job is final."""
+    job_event_service = JobEventService()
+    subscription = job_event_service.subscribe(original_job_id="job")
+    subjob = SubJob(
+        id="subjob",
+        session_id="session",
+        goal="goal",
+        original_job_id="job",
+        expert_id="expert",
+    )
+
+    received: List[JobEvent] = []
+    consumer = threading.Thread(target=lambda: received.extend(subscription))
+    consumer.start()
+
+    job_event_service.publish_event(JobEventType.SUBJOB_CREATED, job=subjob)
+    job_event_service.publish(_status_event("other_job", JobStatus.RUNNING, "other_job"))
+    job_event_service.publish(_status_event("subjob", JobStatus.FINISHED))
+    job_event_service.publish_event(
+        JobEventType.FINAL_ANSWER,
+        job=Job(id="job", session_id="session", goal="goal"),
+        payload={"answer": "a"},
+    )
+    job_event_service.publish(_status_event("job", JobStatus.FINISHED))
+    consumer.join(timeout=5)
+
+    assert [(event.type, event.job_id) for event in received] == [
+        (JobEventType.SUBJOB_CREATED, "subjob"),
+        (JobEventType.JOB_STATUS_CHANGED, "subjob"),
+        (JobEventType.FINAL_ANSWER, "job"),
+        (JobEventType.JOB_STATUS_CHANGED, "job"),
+    ]
+    assert subscription.closed
+    assert not job_event_service.has_subscribers("job")
+
+
+def test_slow_subscriber_is_dropped():
+    """Test a subscriber whose buffer stays full is dropped, and does not block the publisher."""
+    job_event_service = JobEventService()
+    original = SystemEnv.JOB_EVENT_PUBLISH_TIMEOUT
+    SystemEnv.JOB_EVENT_PUBLISH_TIMEOUT = 0.01
+    try:
+        subscription = job_event_service.subscribe(original_job_id="job", buffer_size=1)
+        job_event_service.publish(_status_event("subjob_1", JobStatus.RUNNING))
+        job_event_service.publish(_status_event("subjob_2", JobStatus.RUNNING))
+    finally:
+        SystemEnv.JOB_EVENT_PUBLISH_TIMEOUT = original
+
+    assert not job_event_service.has_subscribers("job")
+    assert subscription.dropped
+    # the buffered event can still be consumed, and the drop is reported after it
+    assert [event.job_id for event in subscription] == ["subjob_1", "job"]
+    assert subscription.get() is None
+
+
+def test_server_stream_closed_before_start_leaves_no_subscriber():
+    """Test the job events of the server are subscribed to once the stream starts, so a stream
+    closed before its first event (e.g. the client disconnected) leaves no subscriber."""
+    job_event_service = JobEventService.instance or JobEventService()
+    manager = JobManager()
+    manager._job_service = MagicMock()
+    manager._job_service.get_original_job.return_value = Job(id="job", session_id="s", goal="g")
+    manager._job_service.get_job_result.return_value = JobResult(
+        job_id="job", status=JobStatus.RUNNING
+    )
+
+    events = manager.get_job_events(job_id="job")
+    assert not job_event_service.has_subscribers("job")
+    events.close()
+    assert not job_event_service.has_subscribers("job")
+
+    original_interval = SystemEnv.JOB_EVENT_HEARTBEAT_INTERVAL
+    SystemEnv.JOB_EVENT_HEARTBEAT_INTERVAL = 0.01
+    try:
+        events = manager.get_job_events(job_id="job")
+        assert next(events) is None  # the keep-alive of the idle stream
+        assert job_event_service.has_subscribers("job")
+        events.close()
+        assert not job_event_service.has_subscribers("job")
+    finally:
+        SystemEnv.JOB_EVENT_HEARTBEAT_INTERVAL = original_interval
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+from unittest.mock import MagicMock, patch
+
+from app.core.common.system_env import SystemEnv
+from app.core.knowledge.knowledge_store_factory import KnowledgeStoreFactory
+
+
+def _slow_create(knowledge_store_type, name):
+    time.sleep(0.05)
+    return MagicMock()
+
+
+def test_knowledge_store_is_cached_with_lru_eviction():
+    """Test the knowledge stores are cached, evicted in LRU order, and invalidated."""
+    KnowledgeStoreFactory.clear()
+    original_cache_size = SystemEnv.KNOWLEDGE_STORE_CACHE_SIZE
+    SystemEnv.KNOWLEDGE_STORE_CACHE_SIZE = 2
+    try:
+        with patch.object(
+            KnowledgeStoreFactory, "_create", side_effect=lambda t, n: MagicMock()
+        ) as mock_create:
+            store_1 = KnowledgeStoreFactory.get_or_create("kb_1")
+            store_2 = KnowledgeStoreFactory.get_or_create("kb_2")
+            assert KnowledgeStoreFactory.get_or_create("kb_1") is store_1
+            assert mock_create.call_count == 2
+
+            # kb_2 is the least recently used one, so it is evicted
+            KnowledgeStoreFactory.get_or_create("kb_3")
+            assert KnowledgeStoreFactory.get_or_create("kb_1") is store_1
+            assert KnowledgeStoreFactory.get_or_create("kb_2") is not store_2
+
+            KnowledgeStoreFactory.invalidate("kb_1")
+            assert KnowledgeStoreFactory.get_or_create("kb_1") is not store_1
+            assert mock_create.call_count == 5
+    finally:
+        SystemEnv.KNOWLEDGE_STORE_CACHE_SIZE = original_cache_size
+        KnowledgeStoreFactory.clear()
+
+
+def test_knowledge_store_is_built_once_concurrently():
+    """Test the concurrent callers share the knowledge store built once."""
+    KnowledgeStoreFactory.clear()
+    try:
+        with patch.object(
+            KnowledgeStoreFactory, "_create", side_effect=_slow_create
+        ) as mock_create:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                stores = list(
+                    executor.map(lambda _: KnowledgeStoreFactory.get_or_create("kb"), range(8))
+                )
+            assert all(store is stores[0] for store in stores)
+            assert mock_create.call_count == 1
+    finally:
+        KnowledgeStoreFactory.clear()
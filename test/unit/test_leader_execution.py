@@ -3,6 +3,7 @@ from uuid import uuid4
 
 from app.core.agent.agent import AgentConfig, Profile
 from app.core.agent.leader import Leader
+from app.core.common.cancellation import CancellationToken
 from app.core.common.type import JobStatus
 from app.core.model.job import Job, SubJob
 from app.core.model.job_graph import JobGraph
@@ -33,6 +34,7 @@ class TestAgentOperator(Operator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         # job1: generate numbers
         if self._config.id == "gen":
@@ -0,0 +1,183 @@
+import threading
+import time
+from typing import Dict, List, Optional
+from unittest.mock import MagicMock
+
+import networkx as nx  # type: ignore
+
+from app.core.agent.agent import AgentConfig, Profile
+from app.core.agent.expert import Expert
+from app.core.agent.leader import Leader
+from app.core.common.cancellation import CancellationToken
+from app.core.common.type import WorkflowStatus
+from app.core.model.job import SubJob
+from app.core.model.job_graph import JobGraph
+from app.core.model.message import AgentMessage, WorkflowMessage
+
+
+class StubJobService:
+    """In-memory job service of a job graph, without the database."""
+
+    def __init__(self, edges: List[tuple], vertices: Optional[List[str]] = None):
+        self.job_graph = JobGraph()
+        for vertex in vertices or []:
+            self.job_graph.add_vertex(vertex)
+        for pred_id, succ_id in edges:
+            self.job_graph.add_vertex(pred_id)
+            self.job_graph.add_vertex(succ_id)
+            self.job_graph.add_edge(pred_id, succ_id)
+        self.removed_job_ids: List[str] = []
+
+    def get_job_graph(self, original_job_id: str) -> JobGraph:
+        return JobGraph(self.job_graph.get_graph().copy())
+
+    def get_subjob(self, subjob_id: str) -> SubJob:
+        return SubJob(
+            id=subjob_id,
+            session_id="session",
+            goal=subjob_id,
+            original_job_id="job",
+            expert_id="expert",
+        )
+
+    def get_cancellation_token(self, original_job_id: str) -> CancellationToken:
+        return CancellationToken()
+
+    def release_cancellation_token(self, original_job_id: str) -> None:
+        pass
+
+    def query_original_job_result(self, original_job_id: str) -> None:
+        pass
+
+    def remove_subjob(self, original_job_id: str, job_id: str) -> None:
+        self.removed_job_ids.append(job_id)
+
+    def replace_subgraph(
+        self, original_job_id: str, new_subgraph: JobGraph, old_subgraph: JobGraph
+    ) -> None:
+        (old_vertex,) = old_subgraph.vertices()
+        predecessors = self.job_graph.predecessors(old_vertex)
+        successors = self.job_graph.successors(old_vertex)
+        self.job_graph.remove_vertex(old_vertex)
+        self.job_graph.update(new_subgraph)
+        sorted_vertices = list(nx.topological_sort(new_subgraph.get_graph()))
+        for pred_id in predecessors:
+            self.job_graph.add_edge(pred_id, sorted_vertices[0])
+        for succ_id in successors:
+            self.job_graph.add_edge(sorted_vertices[-1], succ_id)
+
+
+class StubExpert:
+    """Stub of the expert execution, which records the order, the inputs and the concurrency of
+    the executed jobs, and returns the scripted statuses of each job in turn."""
+
+    def __init__(
+        self,
+        statuses: Optional[Dict[str, List[WorkflowStatus]]] = None,
+        duration: float = 0.0,
+    ):
+        self._statuses = statuses or {}
+        self._duration = duration
+        self._lock = threading.Lock()
+        self.started: List[str] = []
+        self.finished: List[str] = []
+        self.inputs: Dict[str, List[AgentMessage]] = {}
+        self.running = 0
+        self.max_running = 0
+
+    def execute_job(self, expert: Expert, agent_message: AgentMessage) -> AgentMessage:
+        job_id = agent_message.get_job_id()
+        with self._lock:
+            self.started.append(job_id)
+            self.inputs.setdefault(job_id, []).append(agent_message)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            statuses = self._statuses.get(job_id, [])
+            status = statuses.pop(0) if statuses else WorkflowStatus.SUCCESS
+        time.sleep(self._duration)
+        with self._lock:
+            self.running -= 1
+            self.finished.append(job_id)
+        return AgentMessage(
+            job_id=job_id,
+            workflow_messages=[
+                WorkflowMessage(payload={"scratchpad": job_id, "status": status}, job_id=job_id)
+            ],
+            lesson=f"lesson of {job_id}" if status != WorkflowStatus.SUCCESS else None,
+        )
+
+
+def _leader(job_service: StubJobService, expert: StubExpert, max_concurrency: int = 4) -> Leader:
+    leader = Leader(
+        agent_config=AgentConfig(
+            profile=Profile(name="Leader"), reasoner=MagicMock(), workflow=MagicMock()
+        ),
+        leader_state=MagicMock(),
+        max_concurrency=max_concurrency,
+    )
+    leader._job_service = job_service  # type: ignore
+    leader._job_event_service = MagicMock(has_subscribers=MagicMock(return_value=False))
+    leader._execute_job = expert.execute_job  # type: ignore
+    return leader
+
+
+def test_concurrency_is_bounded():
+    """Test the independent jobs run concurrently, but never more than the max concurrency."""
+    job_service = StubJobService(edges=[], vertices=[f"job_{i}" for i in range(8)])
+    expert = StubExpert(duration=0.05)
+
+    _leader(job_service, expert, max_concurrency=3).execute_job_graph("job")
+
+    assert sorted(expert.finished) == sorted(job_service.job_graph.vertices())
+    assert expert.max_running == 3
+
+
+def test_dependents_run_after_predecessors():
+    """Test a job is dispatched only once all its predecessors are finished, with their
+    results."""
+    #   a -> b -> d
+    #    \-> c -/
+    job_service = StubJobService(edges=[("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")])
+    expert = StubExpert(duration=0.01)
+
+    _leader(job_service, expert).execute_job_graph("job")
+
+    assert expert.started[0] == "a"
+    assert expert.started[-1] == "d"
+    assert expert.finished.index("b") < expert.started.index("d")
+    assert expert.finished.index("c") < expert.started.index("d")
+    (d_input,) = expert.inputs["d"]
+    assert sorted(message.scratchpad for message in d_input.get_workflow_messages()) == ["b", "c"]
+
+
+def test_input_data_error_reschedules_predecessors():
+    """Test a job failed by the input data reruns its predecessors with the lesson, and runs
+    again, before its dependents."""
+    job_service = StubJobService(edges=[("a", "b"), ("b", "c")])
+    expert = StubExpert(statuses={"b": [WorkflowStatus.INPUT_DATA_ERROR]})
+
+    _leader(job_service, expert).execute_job_graph("job")
+
+    assert expert.started == ["a", "b", "a", "b", "c"]
+    assert job_service.removed_job_ids == ["a"]
+    assert expert.inputs["a"][1].get_lesson() == "lesson of b"
+
+
+def test_too_complicated_job_is_replaced_by_subgraph():
+    """Test a too complicated job is replaced by its decomposed subgraph, which is rewired
+    between its predecessors and its dependents."""
+    job_service = StubJobService(edges=[("a", "b"), ("b", "c")])
+    expert = StubExpert(statuses={"b": [WorkflowStatus.JOB_TOO_COMPLICATED_ERROR]})
+    leader = _leader(job_service, expert)
+    new_subgraph = JobGraph()
+    new_subgraph.add_vertex("b_1")
+    new_subgraph.add_vertex("b_2")
+    new_subgraph.add_edge("b_1", "b_2")
+    leader.execute = MagicMock(return_value=new_subgraph)  # type: ignore
+
+    leader.execute_job_graph("job")
+
+    assert expert.started == ["a", "b", "b_1", "b_2", "c"]
+    assert sorted(job_service.job_graph.edges()) == [("a", "b_1"), ("b_1", "b_2"), ("b_2", "c")]
+    (c_input,) = expert.inputs["c"]
+    assert [message.scratchpad for message in c_input.get_workflow_messages()] == ["b_2"]
@@ -0,0 +1,166 @@
+from typing import List
+from uuid import uuid4
+
+import pytest
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import MessageSourceType
+from app.core.memory.memory import BuiltinMemory
+from app.core.memory.memory_policy import TokenBudgetMemoryPolicy, TokenCounter
+from app.core.model.message import ModelMessage
+from app.core.model.task import MemoryKey
+from app.core.service.memory_service import MemoryService
+from app.core.toolkit.tool import FunctionCallResult
+
+
+class CharTokenCounter(TokenCounter):
+    """Count 4 characters as a token, to make the budgets predictable."""
+
+    def count(self, text: str) -> int:
+        return len(text) // 4
+
+
+def _trace(rounds: int, output_chars: int) -> List[ModelMessage]:
+    """Build the history of a mono model reasoner, with a function call in each round."""
+    messages = [ModelMessage(payload="<action>\nEmpty\n</action>", job_id="job", step=1)]
+    for step in range(2, rounds + 2):
+        messages.append(
+            ModelMessage(
+                payload=f"<deep_thinking>\nthinking {step}\n</deep_thinking>\n"
+                f"<action>\nquery the graph {step}\n</action>",
+                job_id="job",
+                step=step,
+                function_calls=[
+                    FunctionCallResult(
+                        func_name="cypher_executor",
+                        func_args={"query": "MATCH (n) RETURN n"},
+                        call_objective=f"query {step}",
+                        output="x" * output_chars,
+                    )
+                ],
+            )
+        )
+    return messages
+
+
+def _tokens(messages: List[ModelMessage]) -> int:
+    counter = CharTokenCounter()
+    return sum(
+        counter.count(message.get_payload())
+        + sum(counter.count(result.output) for result in message.get_function_calls() or [])
+        for message in messages
+    )
+
+
+def test_history_is_summarized_and_truncated():
+    """Test the last rounds are kept, the older rounds are summarized, and the oversized outputs
+    are truncated, without changing the history."""
+    messages = _trace(rounds=20, output_chars=40000)
+    policy = TokenBudgetMemoryPolicy(
+        verbatim_rounds=3,
+        max_tokens=100000,
+        max_function_output_tokens=500,
+        token_counter=CharTokenCounter(),
+    )
+
+    context_messages = policy.apply(messages)
+    assert len(context_messages) == 4
+    summary = context_messages[0].get_payload()
+    assert summary.startswith("<history_summary>")
+    assert "- Step 1: model: Empty" in summary
+    assert "- Step 18: model: query the graph 18; SUCCEEDED called function cypher_executor" in (
+        summary
+    )
+    assert "Step 19" not in summary
+
+    # the last message keeps its id, step and source type, which the next response relies on
+    last_message = context_messages[-1]
+    assert last_message.get_id() == messages[-1].get_id()
+    assert last_message.get_step() == 21
+    assert last_message.get_source_type() == MessageSourceType.MODEL
+    output = last_message.get_function_calls()[0].output
+    assert output.startswith("x" * 1000)
+    assert f"function call result #1 of the message {messages[-1].get_id()}" in output
+    assert len(messages[-1].get_function_calls()[0].output) == 40000
+    assert _tokens(context_messages) < 3000 < _tokens(messages)
+
+    # the compacted messages are reused in the next round
+    assert policy.apply(messages)[-1] is last_message
+
+
+def test_history_is_kept_in_budget():
+    """Test fewer rounds are kept verbatim, and the oldest rounds are omitted from the summary,
+    once the history exceeds the token budget."""
+    messages = _trace(rounds=20, output_chars=4000)
+    policy = TokenBudgetMemoryPolicy(
+        verbatim_rounds=5,
+        max_tokens=1300,
+        max_function_output_tokens=1000,
+        token_counter=CharTokenCounter(),
+    )
+
+    context_messages = policy.apply(messages)
+    assert len(context_messages) == 2
+    assert context_messages[-1] is messages[-1]
+    summary = context_messages[0].get_payload()
+    assert "earlier rounds are omitted" in summary
+    assert "Step 20" in summary
+    assert _tokens(context_messages) <= 1300
+
+
+def test_thinker_and_actor_messages_are_one_round():
+    """Test the thinker message is kept or summarized together with the actor message."""
+    messages = [ModelMessage(payload="init", job_id="job", step=1)]
+    for step in range(2, 12, 2):
+        messages.append(
+            ModelMessage(
+                payload=f"<instruction>\ndo {step}\n</instruction>",
+                job_id="job",
+                step=step,
+                source_type=MessageSourceType.THINKER,
+            )
+        )
+        messages.append(
+            ModelMessage(
+                payload=f"<action>\ndone {step}\n</action>",
+                job_id="job",
+                step=step + 1,
+                source_type=MessageSourceType.ACTOR,
+            )
+        )
+
+    policy = TokenBudgetMemoryPolicy(
+        verbatim_rounds=2, max_tokens=10000, token_counter=CharTokenCounter()
+    )
+    context_messages = policy.apply(messages)
+    assert context_messages[1:] == messages[-4:]
+    assert "- Step 6: thinker: do 6; actor: done 6" in context_messages[0].get_payload()
+
+
+@pytest.mark.asyncio
+async def test_memory_service_sets_memory_policy():
+    """Test the reasoner memories are given the memory policy once the compaction is enabled."""
+    memory_service = MemoryService.instance or MemoryService()
+    original_memfuse, original_compaction = (
+        SystemEnv.ENABLE_MEMFUSE,
+        SystemEnv.ENABLE_MEMORY_COMPACTION,
+    )
+    SystemEnv.ENABLE_MEMFUSE = False
+    SystemEnv.ENABLE_MEMORY_COMPACTION = True
+    try:
+        memory = await memory_service.get_or_create_reasoner_memory(
+            MemoryKey(job_id="job_" + str(uuid4()), operator_id="operator")
+        )
+    finally:
+        SystemEnv.ENABLE_MEMFUSE = original_memfuse
+        SystemEnv.ENABLE_MEMORY_COMPACTION = original_compaction
+    assert isinstance(memory, BuiltinMemory)
+    assert isinstance(memory._policy, TokenBudgetMemoryPolicy)
+
+    for message in _trace(rounds=20, output_chars=100):
+        memory.add_message(message)
+    assert len(memory.get_messages()) == 21
+    assert len(memory.get_context_messages()) == SystemEnv.MEMORY_VERBATIM_ROUNDS + 1
+
+    memory.set_policy(None)
+    assert memory.get_context_messages() is memory.get_messages()
@@ -1,9 +1,11 @@
+import time
 from uuid import uuid4
 
 import pytest
 
 from app.core.common.system_env import SystemEnv
 from app.core.memory.memory import BuiltinMemory
+from app.core.model.message import ModelMessage
 from app.core.model.task import MemoryKey
 from app.core.sdk.init_server import init_server
 from app.core.service.memory_service import MemoryService
@@ -45,3 +47,50 @@ async def test_operator_memory_factory_when_memfuse_enabled():
         MemoryKey(job_id="job_test_builtin" + str(uuid4()), operator_id="op_a" + str(uuid4()))
     )
     assert isinstance(mem, MemFuseOperatorMemory)
+
+
+@pytest.mark.asyncio
+async def test_memories_are_evicted_and_released():
+    """Test the memories of the least recently used and expired jobs are evicted, unless they are
+    still used, and the memories of the finished jobs are released."""
+    ms: MemoryService = MemoryService.instance
+    original = (SystemEnv.ENABLE_MEMFUSE, SystemEnv.MEMORY_CACHE_SIZE, SystemEnv.MEMORY_TTL)
+    SystemEnv.ENABLE_MEMFUSE = False
+    SystemEnv.MEMORY_CACHE_SIZE = 2
+    try:
+        job_ids = ["job_test_lru" + str(uuid4()) for _ in range(3)]
+        memories = [
+            await ms.get_or_create_reasoner_memory(MemoryKey(job_id=job_id, operator_id="op"))
+            for job_id in job_ids
+        ]
+        assert ms.get_memory_usage(job_ids=job_ids)["jobs"] == 2
+
+        # the evicted memory is still used, so it is reused
+        memory = await ms.get_or_create_reasoner_memory(
+            MemoryKey(job_id=job_ids[0], operator_id="op")
+        )
+        assert memory is memories[0]
+        memory.add_message(ModelMessage(payload="a", job_id=job_ids[0], step=1))
+        assert ms.get_memory_usage(job_ids=job_ids) == {
+            "jobs": 2,
+            "memories": 2,
+            "messages": 1,
+            "chars": 1,
+        }
+
+        SystemEnv.MEMORY_TTL = 0.05
+        time.sleep(0.1)
+        await ms.get_or_create_reasoner_memory(MemoryKey(job_id="job_test_ttl", operator_id="op"))
+        assert ms.get_memory_usage(job_ids=job_ids)["jobs"] == 0
+        assert ms.get_metrics()["evicted_jobs"] >= 3
+
+        SystemEnv.MEMORY_TTL = original[2]
+        await ms.get_or_create_reasoner_memory(MemoryKey(job_id=job_ids[1], operator_id="op"))
+        ms.release_job_memories(job_ids)
+        assert ms.get_memory_usage(job_ids=job_ids)["jobs"] == 0
+        memory = await ms.get_or_create_reasoner_memory(
+            MemoryKey(job_id=job_ids[0], operator_id="op")
+        )
+        assert memory is not memories[0]
+    finally:
+        SystemEnv.ENABLE_MEMFUSE, SystemEnv.MEMORY_CACHE_SIZE, SystemEnv.MEMORY_TTL = original
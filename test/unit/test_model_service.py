@@ -1,4 +1,7 @@
-from typing import List
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import List, Optional
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -6,8 +9,12 @@ import pytest
 from app.core.common.system_env import SystemEnv
 from app.core.common.type import MessageSourceType
 from app.core.model.message import ModelMessage
+from app.core.model.task import ToolCallContext
+from app.core.reasoner.model_service import ModelService
 from app.core.reasoner.model_service_factory import ModelServiceFactory
 from app.core.sdk.init_server import init_server
+from app.core.toolkit.tool import FunctionCallResult, Tool
+from app.plugin.lite_llm.lite_llm_client import LiteLlmClient
 
 init_server()
 
@@ -118,3 +125,208 @@ def test_agent_message_creation():
     assert message.get_payload() == "Test message"
     assert message.get_job_id() == job_id
     assert message.get_step() == 1
+
+
+class EchoModelService(ModelService):
+    """Model service which only calls the functions."""
+
+    async def generate(
+        self,
+        sys_prompt: str,
+        messages: List[ModelMessage],
+        tools: Optional[List[Tool]] = None,
+        tool_call_ctx: Optional[ToolCallContext] = None,
+    ) -> ModelMessage:
+        raise NotImplementedError
+
+
+@pytest.mark.asyncio
+async def test_call_function_concurrently():
+    """Test the function calls of one turn run concurrently and keep their order."""
+    running = 0
+    max_running = 0
+
+    async def slow_echo(text: str) -> str:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.1)
+        running -= 1
+        return text
+
+    tool = Tool(name="slow_echo", description="echo", function=slow_echo)
+    model_response_text = "\n".join(
+        f'<function_call>{{"name": "slow_echo", "call_objective": "echo", '
+        f'"args": {{"text": "{i}"}}}}</function_call>'
+        for i in range(4)
+    )
+
+    original = SystemEnv.ENABLE_CONCURRENT_FUNCTION_CALLING
+    SystemEnv.ENABLE_CONCURRENT_FUNCTION_CALLING = True
+    try:
+        start_time = time.time()
+        results = await EchoModelService().call_function(
+            tools=[tool], model_response_text=model_response_text
+        )
+        assert time.time() - start_time < 0.3
+        assert results is not None
+        assert [result.output for result in results] == ["0", "1", "2", "3"]
+        assert max_running == 4
+
+        # the per-tool limit caps the concurrent calls of the tool
+        max_running = 0
+        tool.max_concurrency = 1
+        results = await EchoModelService().call_function(
+            tools=[tool], model_response_text=model_response_text
+        )
+        assert results is not None
+        assert [result.output for result in results] == ["0", "1", "2", "3"]
+        assert max_running == 1
+    finally:
+        SystemEnv.ENABLE_CONCURRENT_FUNCTION_CALLING = original
+
+
+@pytest.mark.asyncio
+async def test_lite_llm_streaming_calls_function_early():
+    """Test the streamed function call starts before the model output is complete."""
+    events: List[str] = []
+
+    async def echo(text: str) -> str:
+        events.append(f"call {text}")
+        return text
+
+    function_call = (
+        '<function_call>{{"name": "echo", "call_objective": "echo", '
+        '"args": {{"text": "{text}"}}}}</function_call>\n'
+    )
+    text_chunks = [
+        "I will echo.\n",
+        function_call.format(text="a")[:40],
+        function_call.format(text="a")[40:],
+        "Then echo again.\n",
+        function_call.format(text="b"),
+    ]
+
+    async def stream():
+        for text_chunk in text_chunks:
+            await asyncio.sleep(0.01)
+            events.append("chunk")
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=text_chunk))]
+            )
+
+    streamed_chunks: List[str] = []
+
+    def observer(chunk: str, tool_call_ctx: Optional[ToolCallContext]) -> None:
+        streamed_chunks.append(chunk)
+
+    original = SystemEnv.ENABLE_LLM_STREAMING
+    SystemEnv.ENABLE_LLM_STREAMING = True
+    ModelService.add_token_observer(observer)
+    try:
+        with patch("litellm.acompletion", AsyncMock(return_value=stream())):
+            response = await LiteLlmClient().generate(
+                sys_prompt="You are an echo bot.",
+                messages=[
+                    ModelMessage(
+                        source_type=MessageSourceType.THINKER,
+                        payload="Echo a and b.",
+                        job_id=job_id,
+                        step=1,
+                    )
+                ],
+                tools=[Tool(name="echo", description="echo", function=echo)],
+            )
+    finally:
+        ModelService.remove_token_observer(observer)
+        SystemEnv.ENABLE_LLM_STREAMING = original
+
+    # the first function call is executed before the model output is complete
+    assert events.index("call a") < len(events) - 2
+    function_calls = response.get_function_calls()
+    assert function_calls is not None
+    assert [result.output for result in function_calls] == ["a", "b"]
+    assert "".join(streamed_chunks) == "".join(text_chunks)
+
+
+@pytest.mark.asyncio
+async def test_lite_llm_requests_overlap():
+    """Test the concurrent LLM requests overlap their network waits, instead of blocking."""
+
+    async def acompletion(**kwargs):
+        await asyncio.sleep(0.2)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Hello."))])
+
+    message = ModelMessage(
+        source_type=MessageSourceType.THINKER, payload="Hello?", job_id=job_id, step=1
+    )
+    with patch("litellm.acompletion", side_effect=acompletion):
+        start_time = time.time()
+        responses = await asyncio.gather(
+            *[LiteLlmClient().generate(sys_prompt="", messages=[message]) for _ in range(4)]
+        )
+        elapsed_time = time.time() - start_time
+
+    assert [response.get_payload() for response in responses] == ["Hello."] * 4
+    assert elapsed_time < 0.6
+
+
+@pytest.mark.asyncio
+async def test_lite_llm_reuses_rendered_history():
+    """Test the rendered history is reused across the rounds, and the stable prompt prefix is
+    marked as cacheable."""
+    messages = [
+        ModelMessage(
+            source_type=MessageSourceType.ACTOR,
+            payload="Query the graph.",
+            job_id=job_id,
+            step=1,
+            function_calls=[
+                FunctionCallResult(
+                    func_name="query", func_args={}, call_objective="count", output=str(i)
+                )
+                for i in range(2)
+            ],
+        ),
+        ModelMessage(
+            source_type=MessageSourceType.THINKER, payload="Go on.", job_id=job_id, step=2
+        ),
+    ]
+    client = LiteLlmClient()
+    first_request = client._prepare_model_request(sys_prompt="System.", messages=messages)
+    assert first_request[1]["content"].endswith(
+        "1. SUCCEEDED called function query:\nCall objective: count\nFunction Output: 0\n"
+        "2. SUCCEEDED called function query:\nCall objective: count\nFunction Output: 1\n"
+        "</function_call_result>"
+    )
+
+    # the unchanged history is not rendered again, and the changed message is
+    messages.append(
+        ModelMessage(source_type=MessageSourceType.ACTOR, payload="Done.", job_id=job_id, step=3)
+    )
+    messages[1] = messages[1].copy()
+    messages[1]._payload = "Go on, please."
+    second_request = client._prepare_model_request(sys_prompt="System.", messages=messages)
+    assert second_request[1]["content"] is first_request[1]["content"]
+    assert second_request[2]["content"] == "Go on, please."
+
+    acompletion = AsyncMock(
+        return_value=SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Hello."))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=2),
+        )
+    )
+    with (
+        patch("litellm.acompletion", acompletion),
+        patch.object(LiteLlmClient, "_supports_prompt_caching", return_value=True),
+    ):
+        await LiteLlmClient().generate(sys_prompt="System.", messages=messages)
+
+    sent_messages = acompletion.call_args.kwargs["messages"]
+    cached_indexes = [
+        i
+        for i, message in enumerate(sent_messages)
+        if isinstance(message["content"], list) and message["content"][0].get("cache_control")
+    ]
+    assert cached_indexes == [0, len(sent_messages) - 1]
+    assert sent_messages[0]["content"][0]["text"] == "System."
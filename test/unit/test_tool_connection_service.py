@@ -0,0 +1,112 @@
+import asyncio
+from typing import Any, List
+from unittest.mock import patch
+
+import pytest
+
+from app.core.common.type import McpTransportType, ToolGroupType
+from app.core.model.task import ToolCallContext
+from app.core.service.tool_connection_service import ToolConnectionService
+from app.core.toolkit.tool_config import McpConfig, McpTransportConfig
+from app.core.toolkit.tool_connection import ToolConnection
+
+
+class FakeConnection(ToolConnection):
+    """Fake connection recording its lifecycle, and the event loop serving its calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.reset_count = 0
+        self.closed = False
+
+    async def call(self, tool_name: str, **kwargs) -> Any:
+        return asyncio.get_running_loop()
+
+    async def list_tools(self) -> List[Any]:
+        return []
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def reset(self) -> None:
+        self.reset_count += 1
+
+
+def _config(exclusive_connection: bool = False) -> McpConfig:
+    return McpConfig(
+        type=ToolGroupType.MCP,
+        name="test_mcp",
+        transport_config=McpTransportConfig(transport_type=McpTransportType.STDIO),
+        exclusive_connection=exclusive_connection,
+    )
+
+
+async def _create_connection(tool_group_config: McpConfig) -> FakeConnection:
+    return FakeConnection()
+
+
+@pytest.mark.asyncio
+async def test_shared_connection_is_reused_across_operators():
+    """Test the pooled connection is reused by the following operators and jobs."""
+    service = ToolConnectionService.instance or ToolConnectionService()
+    ctx_1 = ToolCallContext(job_id="job_1", operator_id="operator_1")
+    ctx_2 = ToolCallContext(job_id="job_2", operator_id="operator_2")
+
+    with patch(
+        "app.core.toolkit.tool_connection_pool.ToolConnectionFactory.create_connection",
+        side_effect=_create_connection,
+    ) as mock_create_connection:
+        try:
+            # the concurrent tool calls of an operator share one lease
+            connection_1, connection_2 = await asyncio.gather(
+                service.get_or_create_connection("shared_group", _config(), ctx_1),
+                service.get_or_create_connection("shared_group", _config(), ctx_1),
+            )
+            assert connection_1 is connection_2
+
+            # the calls are served by the background event loop owning the connection
+            assert await connection_1.call("tool") is not asyncio.get_running_loop()
+
+            await service.release_connection(call_tool_ctx=ctx_1)
+            connection_3 = await service.get_or_create_connection("shared_group", _config(), ctx_2)
+            assert connection_3.get_id() == connection_1.get_id()
+            assert mock_create_connection.call_count == 1
+        finally:
+            service.close_all_connections()
+
+
+@pytest.mark.asyncio
+async def test_exclusive_connection_is_leased_by_one_operator():
+    """Test the exclusive connection is leased by one operator at a time, and reset after."""
+    service = ToolConnectionService.instance or ToolConnectionService()
+    ctx_1 = ToolCallContext(job_id="job_1", operator_id="operator_1")
+    ctx_2 = ToolCallContext(job_id="job_1", operator_id="operator_2")
+    ctx_3 = ToolCallContext(job_id="job_2", operator_id="operator_3")
+    config = _config(exclusive_connection=True)
+
+    created_connections: List[FakeConnection] = []
+
+    async def create_connection(tool_group_config: McpConfig) -> FakeConnection:
+        created_connections.append(FakeConnection())
+        return created_connections[-1]
+
+    with patch(
+        "app.core.toolkit.tool_connection_pool.ToolConnectionFactory.create_connection",
+        side_effect=create_connection,
+    ):
+        try:
+            connection_1 = await service.get_or_create_connection("exclusive_group", config, ctx_1)
+            connection_2 = await service.get_or_create_connection("exclusive_group", config, ctx_2)
+            assert connection_1.get_id() != connection_2.get_id()
+
+            await service.release_connection(call_tool_ctx=ctx_1)
+            assert created_connections[0].reset_count == 1
+            assert not created_connections[0].closed
+
+            connection_3 = await service.get_or_create_connection("exclusive_group", config, ctx_3)
+            assert connection_3.get_id() == connection_1.get_id()
+            assert len(created_connections) == 2
+        finally:
+            service.close_all_connections()
+
+    assert all(connection.closed for connection in created_connections)
@@ -1,5 +1,7 @@
 from typing import List
+from unittest.mock import patch
 
+import matplotlib.pyplot as plt
 from mcp.types import Tool as McpBaseTool
 import networkx as nx
 import pytest
@@ -406,3 +408,54 @@ async def test_recommend_subgraph_multiple_start_points(
 
     assert len(subgraph.vertices()) == 8  # all vertices should be included
     assert len(subgraph.edges()) == 9  # all edges above threshold
+
+
+@pytest.mark.asyncio
+async def test_visualize_releases_figure(
+    populated_toolkit_service: ToolkitService, sample_actions: List[Action]
+):
+    """Test the recommendation does not draw, and the visualization does not leak figures."""
+    open_figures = plt.get_fignums()
+
+    subgraph = populated_toolkit_service.recommend_subgraph(
+        actions=sample_actions, threshold=0.5, hops=1
+    )
+    assert plt.get_fignums() == open_figures
+
+    figure = populated_toolkit_service.visualize(graph=subgraph, title="Recommended Toolkit")
+    assert figure.axes
+    assert plt.get_fignums() == open_figures
+
+
+@pytest.mark.asyncio
+async def test_recommend_tools_actions_is_cached_by_toolkit_version(
+    populated_toolkit_service: ToolkitService, sample_actions: List[Action]
+):
+    """Test the recommendation is cached until the toolkit is modified."""
+    action1 = sample_actions[0]
+    with patch.object(
+        populated_toolkit_service,
+        "recommend_subgraph",
+        wraps=populated_toolkit_service.recommend_subgraph,
+    ) as mock_recommend_subgraph:
+        tools_1, actions_1 = populated_toolkit_service.recommend_tools_actions(
+            actions=[action1], threshold=0.5, hops=1
+        )
+        tools_2, actions_2 = populated_toolkit_service.recommend_tools_actions(
+            actions=[action1], threshold=0.5, hops=1
+        )
+        assert mock_recommend_subgraph.call_count == 1
+        assert [tool.id for tool in tools_1] == [tool.id for tool in tools_2]
+        assert all(t1 is t2 for t1, t2 in zip(tools_1, tools_2, strict=True))
+        assert all(a1 is a2 for a1, a2 in zip(actions_1, actions_2, strict=True))
+
+        # the modification of the toolkit invalidates the cached recommendation
+        new_action = Action(id="action 5", name="Action 5", description="Description 5")
+        populated_toolkit_service.add_action(
+            action=new_action, next_actions=[], prev_actions=[(action1, 0.9)]
+        )
+        _, actions_3 = populated_toolkit_service.recommend_tools_actions(
+            actions=[action1], threshold=0.5, hops=1
+        )
+        assert mock_recommend_subgraph.call_count == 2
+        assert "action 5" in [action.id for action in actions_3]
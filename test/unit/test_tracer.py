@@ -0,0 +1,108 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+from pathlib import Path
+from typing import Generator
+
+import pytest
+
+from app.core.tracer.span import NOOP_SPAN
+from app.core.tracer.span_exporter import InMemorySpanExporter, JsonlSpanExporter
+from app.core.tracer.tracer import Tracer, trace_span
+
+
+@pytest.fixture
+def exporter() -> Generator[InMemorySpanExporter, None, None]:
+    """Enable the tracing, and record the spans in memory."""
+    exporter = InMemorySpanExporter(buffer_size=16)
+    Tracer().enable(exporters=[exporter])
+    yield exporter
+    Tracer().disable()
+
+
+def test_spans_are_nested_in_threads_and_tasks(exporter: InMemorySpanExporter):
+    """Test the spans opened in the current span, its asyncio tasks and the propagated threads
+    are its children, in the same trace."""
+
+    async def call_llm() -> None:
+        with trace_span("llm.generate", prompt_tokens=10, model=None) as span:
+            span.set_attribute("completion_tokens", 5)
+
+    def execute_expert() -> None:
+        with trace_span("expert.execute", job_id="subjob"):
+            asyncio.run(call_llm())
+
+    with trace_span("leader.execute_original_job", job_id="job") as root:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            executor.submit(Tracer().propagate(execute_expert)).result()
+            # the span is not propagated to the thread
+            executor.submit(execute_expert).result()
+
+    spans = exporter.get_spans(trace_id=root.trace_id)
+    assert [span.name for span in spans] == [
+        "llm.generate",
+        "expert.execute",
+        "leader.execute_original_job",
+    ]
+    llm_span, expert_span, _ = spans
+    assert expert_span.parent_id == root.span_id
+    assert llm_span.parent_id == expert_span.span_id
+    assert llm_span.attributes == {"prompt_tokens": 10, "completion_tokens": 5}
+    assert root.parent_id is None
+    assert root.duration >= expert_span.duration > 0
+
+    orphan_span = exporter.get_spans(name="expert.execute")[-1]
+    assert orphan_span.trace_id != root.trace_id
+    assert orphan_span.parent_id is None
+    assert Tracer().current_span() is None
+
+
+def test_span_records_error(exporter: InMemorySpanExporter):
+    """Test the error raised in a span is recorded, and re-raised."""
+    with pytest.raises(ValueError):
+        with trace_span("tool.call", function="query"):
+            raise ValueError("bad query")
+
+    (span,) = exporter.get_spans()
+    assert span.error == "ValueError: bad query"
+    assert span.end_time_ns is not None
+
+
+def test_in_memory_exporter_keeps_recent_spans(exporter: InMemorySpanExporter):
+    """Test the in-memory exporter drops the oldest spans once its ring buffer is full."""
+    for i in range(20):
+        with trace_span("db.write", index=i):
+            pass
+
+    spans = exporter.get_spans()
+    assert len(spans) == 16
+    assert spans[0].attributes["index"] == 4
+
+
+def test_jsonl_exporter_appends_spans(tmp_path: Path):
+    """Test the JSONL exporter writes one span per line."""
+    path = tmp_path / "traces" / "traces.jsonl"
+    exporter = JsonlSpanExporter(path=str(path))
+    Tracer().enable(exporters=[exporter])
+    try:
+        with trace_span("operator.execute", operator_id="operator"):
+            with trace_span("reasoner.round", round=1):
+                pass
+    finally:
+        Tracer().disable()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["reasoner.round", "operator.execute"]
+    assert lines[0]["parent_id"] == lines[1]["span_id"]
+    assert lines[0]["attributes"] == {"round": 1}
+
+
+def test_disabled_tracer_returns_noop_span():
+    """Test the disabled tracer records nothing."""
+    Tracer().disable()
+    with trace_span("llm.generate", job_id="job") as span:
+        span.set_attribute("prompt_tokens", 10)
+        assert Tracer().current_span() is None
+    assert span is NOOP_SPAN
+    assert not span.recording
+    assert not span.attributes
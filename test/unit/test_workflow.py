@@ -2,6 +2,7 @@ from typing import Any, List, Optional
 
 import pytest
 
+from app.core.common.cancellation import CancellationToken, JobCancelledError
 from app.core.memory.memory import Memory
 from app.core.model.job import Job, SubJob
 from app.core.model.message import WorkflowMessage
@@ -64,9 +65,10 @@ def mock_reasoner():
 class MockOperator(Operator):
     """Test operator that tracks execution order."""
 
-    def __init__(self, id: str, execution_order: List[str]):
+    def __init__(self, id: str, execution_order: List[str], cancel: bool = False):
         self._config = OperatorConfig(id=id, instruction="Test instruction", actions=[])
         self._execution_order = execution_order
+        self._cancel = cancel
 
     async def execute(
         self,
@@ -75,8 +77,12 @@ class MockOperator(Operator):
         workflow_messages: Optional[List[WorkflowMessage]] = None,
         previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
         lesson: Optional[str] = None,
+        cancellation_token: Optional[CancellationToken] = None,
     ) -> WorkflowMessage:
         self._execution_order.append(self._config.id)
+        if self._cancel and cancellation_token:
+            # the job graph is stopped while the operator is running
+            cancellation_token.cancel(reason="The job graph is stopped.")
         return WorkflowMessage(
             payload={"scratchpad": f"Output from {self._config.id}"}, job_id=job.id
         )
@@ -104,6 +110,22 @@ def test_basic_workflow_execution(workflow_class, job: Job, mock_reasoner: Reaso
     assert result.scratchpad == "Output from op2"
 
 
+@pytest.mark.parametrize("workflow_class", [BuiltinWorkflow, DbgptWorkflow])
+def test_cancelled_workflow_execution(workflow_class, job: Job, mock_reasoner: Reasoner):
+    """Test the operators after the cancellation of the job graph are not executed."""
+    execution_order = []
+
+    op1 = MockOperator("op1", execution_order, cancel=True)
+    op2 = MockOperator("op2", execution_order)
+    workflow = workflow_class()
+    workflow.add_operator(op1)
+    workflow.add_operator(op2, previous_ops=[op1])
+
+    with pytest.raises(JobCancelledError, match="stopped"):
+        workflow.execute(job=job, reasoner=mock_reasoner, cancellation_token=CancellationToken())
+    assert execution_order == ["op1"]
+
+
 @pytest.mark.parametrize("workflow_class", [BuiltinWorkflow, DbgptWorkflow])
 def test_parallel_workflow_execution(workflow_class, job: Job, mock_reasoner: Reasoner):
     """Test parallel workflow execution."""
@@ -144,6 +166,7 @@ def test_workflow_error_handling(workflow_class, job: Job, mock_reasoner: Reason
             workflow_messages: Optional[List[WorkflowMessage]] = None,
             previous_expert_outputs: Optional[List[WorkflowMessage]] = None,
             lesson: Optional[str] = None,
+            cancellation_token: Optional[CancellationToken] = None,
         ) -> WorkflowMessage:
             raise ValueError("Test error")
 
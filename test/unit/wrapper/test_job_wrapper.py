@@ -0,0 +1,120 @@
+import threading
+from unittest.mock import patch
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobEventType, JobStatus
+from app.core.model.job import Job, SubJob
+from app.core.model.job_event import JobEvent
+from app.core.model.job_result import JobResult
+from app.core.sdk.wrapper.job_wrapper import JobWrapper
+from app.core.service.job_event_service import JobEventService
+
+
+def test_job_wrapper_streams_the_job_events():
+    """Test the stream yields the events of the job, and ends once the job is final."""
+    job = Job(id="job", session_id="session", goal="goal")
+    subjob = SubJob(
+        id="subjob", session_id="session", goal="goal", original_job_id="job", expert_id="expert"
+    )
+    JobEventService.instance or JobEventService()
+    job_wrapper = JobWrapper(job)
+    job_wrapper.subscribe(buffer_size=2)
+
+    def execute() -> None:
+        job_event_service = JobEventService()
+        job_event_service.publish_event(JobEventType.SUBJOB_CREATED, job=subjob)
+        for step in range(3):
+            job_event_service.publish_event(
+                JobEventType.REASONER_MESSAGE_APPENDED, job=subjob, payload={"step": step}
+            )
+        job_event_service.publish(
+            JobEvent.status_changed("job", JobResult(job_id="job", status=JobStatus.FINISHED))
+        )
+
+    # the job is executed before the stream is consumed, and waits for the bounded buffer
+    thread = threading.Thread(target=execute)
+    thread.start()
+    with patch("app.core.sdk.wrapper.job_wrapper.JobService") as job_service:
+        job_service.instance.get_job_result.return_value = JobResult(
+            job_id="job", status=JobStatus.RUNNING
+        )
+        events = list(job_wrapper.get_stream())
+    thread.join()
+
+    assert [event.type for event in events] == [
+        JobEventType.SUBJOB_CREATED,
+        *[JobEventType.REASONER_MESSAGE_APPENDED] * 3,
+        JobEventType.JOB_STATUS_CHANGED,
+    ]
+    assert [event.payload["step"] for event in events[1:4]] == [0, 1, 2]
+    assert not JobEventService().has_subscribers("job")
+
+
+def test_job_wrapper_stream_of_a_final_job():
+    """Test the stream of a job, which is final before the subscription, ends immediately."""
+    JobEventService.instance or JobEventService()
+    job_wrapper = JobWrapper(Job(id="job", session_id="session", goal="goal"))
+    with patch("app.core.sdk.wrapper.job_wrapper.JobService") as job_service:
+        job_service.instance.get_job_result.return_value = JobResult(
+            job_id="job", status=JobStatus.FAILED
+        )
+        events = list(job_wrapper.get_stream())
+
+    assert [event.get_status() for event in events] == [JobStatus.FAILED]
+    assert not JobEventService().has_subscribers("job")
+
+
+def test_job_wrapper_stream_subscribes_eagerly():
+    """Test the job is subscribed to when the stream is got, before it is iterated."""
+    job_event_service = JobEventService.instance or JobEventService()
+    subjob = SubJob(
+        id="subjob", session_id="session", goal="goal", original_job_id="job", expert_id="expert"
+    )
+    job_wrapper = JobWrapper(Job(id="job", session_id="session", goal="goal"))
+    with patch("app.core.sdk.wrapper.job_wrapper.JobService") as job_service:
+        job_service.instance.get_job_result.return_value = JobResult(
+            job_id="job", status=JobStatus.RUNNING
+        )
+        stream = job_wrapper.get_stream()
+
+    assert job_event_service.has_subscribers("job")
+    job_event_service.publish_event(JobEventType.SUBJOB_CREATED, job=subjob)
+    job_event_service.publish(
+        JobEvent.status_changed("job", JobResult(job_id="job", status=JobStatus.FINISHED))
+    )
+    assert [event.type for event in stream] == [
+        JobEventType.SUBJOB_CREATED,
+        JobEventType.JOB_STATUS_CHANGED,
+    ]
+    assert not job_event_service.has_subscribers("job")
+
+
+def test_job_wrapper_stream_of_a_dropped_subscriber():
+    """Test the stream of a consumer too slow for the job ends with a SUBSCRIPTION_DROPPED event,
+    instead of the final status change."""
+    job_event_service = JobEventService.instance or JobEventService()
+    subjob = SubJob(
+        id="subjob", session_id="session", goal="goal", original_job_id="job", expert_id="expert"
+    )
+    job_wrapper = JobWrapper(Job(id="job", session_id="session", goal="goal"))
+    with patch("app.core.sdk.wrapper.job_wrapper.JobService") as job_service:
+        job_service.instance.get_job_result.return_value = JobResult(
+            job_id="job", status=JobStatus.RUNNING
+        )
+        stream = job_wrapper.get_stream(buffer_size=1)
+
+    original_timeout = SystemEnv.JOB_EVENT_PUBLISH_TIMEOUT
+    SystemEnv.JOB_EVENT_PUBLISH_TIMEOUT = 0.01
+    try:
+        for step in range(2):
+            job_event_service.publish_event(
+                JobEventType.REASONER_MESSAGE_APPENDED, job=subjob, payload={"step": step}
+            )
+    finally:
+        SystemEnv.JOB_EVENT_PUBLISH_TIMEOUT = original_timeout
+
+    assert not job_event_service.has_subscribers("job")
+    assert [event.type for event in stream] == [
+        JobEventType.REASONER_MESSAGE_APPENDED,
+        JobEventType.SUBSCRIPTION_DROPPED,
+    ]